@@ -222,6 +222,11 @@ def APP_VERSION(cls) -> str:
     EMAIL_PORT = values.IntegerValue(default=25)
     EMAIL_USE_TLS = values.BooleanValue(default=True)
     EMAIL_MAX_RECIPIENTS = values.IntegerValue(default=100)
+    # Max rate of email sending tasks per worker, e.g. "60/m". Empty for no limit.
+    EMAIL_TASK_RATE_LIMIT = values.StringValue(default="120/m")
+    # How long HTML templates compiled from email MJML templates are kept in the shared cache.
+    # Compiled templates contain no personal data, and are keyed by the hash of their layout.
+    EMAIL_HTML_TEMPLATE_CACHE_TIMEOUT_SECONDS = values.IntegerValue(default=604_800)
     EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
     DEFAULT_FROM_EMAIL = values.StringValue(default="tilavarauspalvelu@localhost")
 
@@ -322,6 +327,8 @@ def LOGGING(cls):
     OPEN_CITY_PROFILE_SCOPE = values.StringValue()
     OPEN_CITY_PROFILE_GRAPHQL_API = values.StringValue()
     PREFILL_RESERVATION_WITH_PROFILE_DATA = values.BooleanValue(default=False)
+    # How long reservation prefill info stored in the user's session can be used before fetching it again
+    PREFILL_INFO_MAX_AGE_SECONDS = values.IntegerValue(default=3_600)
 
     # --- Tunnistamo / Social Auth settings --------------------------------------------------------------------------
 
@@ -370,6 +377,13 @@ def OIDC_API_TOKEN_AUTH(cls):
     GDPR_API_AUDIENCE = values.StringValue(env_name="TUNNISTAMO_AUDIENCE")
     GDPR_API_ISSUER = values.StringValue(env_name="TUNNISTAMO_ISSUER")
 
+    # --- External service settings ----------------------------------------------------------------------------------
+
+    # Each external service has its own connection pool in each process.
+    EXTERNAL_SERVICE_POOL_CONNECTIONS = values.IntegerValue(default=10)  # Number of hosts to keep pools for
+    EXTERNAL_SERVICE_POOL_MAXSIZE = values.IntegerValue(default=10)  # Number of connections to keep open per host
+    EXTERNAL_SERVICE_CONNECT_TIMEOUT_SECONDS = values.IntegerValue(default=5)
+
     # --- (H)Aukiolosovellus settings --------------------------------------------------------------------------------
 
     HAUKI_API_URL = values.StringValue()
@@ -381,6 +395,11 @@ def OIDC_API_TOKEN_AUTH(cls):
     HAUKI_API_KEY = values.StringValue()
     HAUKI_DAYS_TO_FETCH = 730  # 2 years
     HAUKI_RESOURCE_BATCH_SIZE = values.IntegerValue(default=500)
+    # Number of threads used to fetch opening hours from Hauki API concurrently.
+    # Should not be larger than EXTERNAL_SERVICE_POOL_MAXSIZE, so that connections can be reused.
+    HAUKI_SYNC_WORKERS = values.IntegerValue(default=8)
+    # How long date periods fetched from Hauki API are cached when generating reservations from allocations.
+    HAUKI_DATE_PERIODS_CACHE_TIMEOUT_SECONDS = values.IntegerValue(default=600)
 
     # --- Verkkokauppa settings --------------------------------------------------------------------------------------
 
@@ -390,6 +409,9 @@ def OIDC_API_TOKEN_AUTH(cls):
     VERKKOKAUPPA_MERCHANT_API_URL = values.StringValue()
     VERKKOKAUPPA_NAMESPACE = values.StringValue()
     VERKKOKAUPPA_ORDER_EXPIRATION_MINUTES = values.IntegerValue(default=10)
+    # Number of threads used to fetch payments from Verkkokauppa concurrently in background tasks.
+    # Should not be larger than EXTERNAL_SERVICE_POOL_MAXSIZE, so that connections can be reused.
+    VERKKOKAUPPA_SYNC_WORKERS = values.IntegerValue(default=8)
     VERKKOKAUPPA_NEW_LOGIN = values.BooleanValue(default=True)
     VERKKOKAUPPA_TIMEZONE = zoneinfo.ZoneInfo("Europe/Helsinki")
     VERKKOKAUPPA_API_KEY = values.StringValue()
@@ -406,6 +428,9 @@ def OIDC_API_TOKEN_AUTH(cls):
     PINDORA_API_KEY = values.StringValue()
 
     PINDORA_MOCK_ENABLED = values.BooleanValue(default=False)
+    # Number of threads used to make requests to Pindora concurrently in background tasks.
+    # Should not be larger than EXTERNAL_SERVICE_POOL_MAXSIZE, so that connections can be reused.
+    PINDORA_SYNC_WORKERS = values.IntegerValue(default=8)
 
     # --- Graphene settings ------------------------------------------------------------------------------------------
 
@@ -513,10 +538,16 @@ def CACHES(cls):
     RESERVATION_UNIT_PURPOSE_IMAGES_ROOT = "reservation_unit_purpose_images"
     TPREK_UNIT_URL = values.URLValue()
     UPDATE_RESERVATION_UNIT_HIERARCHY = True
+    UPDATE_FIRST_RESERVABLE_TIMES = True
+    # Number of worker processes used to calculate first reservable times when refreshing the pre-calculated
+    # results in the background task. Zero or one calculates them in the task's own process.
+    FIRST_RESERVABLE_TIME_REFRESH_WORKERS = values.IntegerValue(default=0)
     UPDATE_SEARCH_VECTORS = True
     UPDATE_AFFECTING_TIME_SPANS = True
     SAVE_RESERVATION_STATISTICS = True
     REBUILD_SPACE_HIERARCHY = True
+    COALESCE_SIGNAL_TASKS = True
+    COALESCE_SIGNAL_TASKS_WINDOW_SECONDS = values.IntegerValue(default=5)
     SENTRY_LOGGER_ALWAYS_RE_RAISE = False
     UNSAFE_SKIP_IAT_CLAIM_VALIDATION = False
     UPDATE_RESERVATION_UNIT_THUMBNAILS = True
@@ -742,6 +773,7 @@ class Local(Common, overrides_from=LocalMixin):
     EXPORT_AUTHORIZATION_TOKEN = values.StringValue(default="")  # nosec # NOSONAR
     ROBOT_TEST_DATA_TOKEN = values.StringValue(default="")  # nosec # NOSONAR
     UPDATE_RESERVATION_UNIT_HIERARCHY = values.BooleanValue(default=True)
+    UPDATE_FIRST_RESERVABLE_TIMES = values.BooleanValue(default=True)
     UPDATE_SEARCH_VECTORS = values.BooleanValue(default=True)
     UPDATE_AFFECTING_TIME_SPANS = values.BooleanValue(default=True)
     SAVE_RESERVATION_STATISTICS = values.BooleanValue(default=True)
@@ -889,6 +921,7 @@ class AutomatedTests(EmptyDefaults, Common, dotenv_path=None, overrides_from=Aut
     HAUKI_ORGANISATION_ID = "test-org:965b1630-6e5a-41f9-ab19-217d90e9729b"
     HAUKI_SECRET = "HAUKI_SECRET"  # noqa: S105 # nosec # NOSONAR
     HAUKI_API_KEY = "HAUKI_API_KEY"
+    HAUKI_DATE_PERIODS_CACHE_TIMEOUT_SECONDS = 0  # Don't cache date periods between tests
 
     # --- Pindora settings -------------------------------------------------------------------------------------------
 
@@ -931,6 +964,7 @@ class AutomatedTests(EmptyDefaults, Common, dotenv_path=None, overrides_from=Aut
     # Turn off materialized view updates from signals during tests,
     # since they slow them down a lot in CI. Refresh should be called manually when needed.
     UPDATE_RESERVATION_UNIT_HIERARCHY = False
+    UPDATE_FIRST_RESERVABLE_TIMES = False
     UPDATE_AFFECTING_TIME_SPANS = False
     # Turn off search vector updates from signals during tests.
     UPDATE_SEARCH_VECTORS = False
@@ -940,6 +974,8 @@ class AutomatedTests(EmptyDefaults, Common, dotenv_path=None, overrides_from=Aut
     DOWNLOAD_IMAGES_FOR_TEST_DATA = False
     # Turn off statistics saving during tests for performance reasons
     SAVE_RESERVATION_STATISTICS = False
+    # Run tasks triggered from signals immediately, since tests are run inside transactions
+    COALESCE_SIGNAL_TASKS = False
     # Always re-raise silenced Sentry errors during testing for better debugging
     SENTRY_LOGGER_ALWAYS_RE_RAISE = True
     # Enable feature flag for testing
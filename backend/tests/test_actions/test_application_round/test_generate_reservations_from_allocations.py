@@ -21,7 +21,7 @@
 from tilavarauspalvelu.typing import Allocation
 from utils.date_utils import DEFAULT_TIMEZONE, local_date, local_datetime, local_time, next_date_matching_weekday
 
-from tests.factories import ReservationFactory, ReservationUnitAccessTypeFactory, UserFactory
+from tests.factories import ReservationFactory, ReservationSeriesFactory, ReservationUnitAccessTypeFactory, UserFactory
 from tests.factories.application_round import ApplicationRoundFactory
 from tests.factories.reservation_unit import ReservationUnitBuilder
 from tests.factories.unit import UnitBuilder
@@ -381,6 +381,98 @@ def test_generate_reservation_series_from_allocations__overlapping_reservation()
     assert rejected[0].end_datetime.astimezone(DEFAULT_TIMEZONE) == local_datetime(2024, 1, 1, 14, 0)
 
 
+@freezegun.freeze_time(local_datetime(2024, 1, 1))  # Monday
+def test_generate_reservation_series_from_allocations__overlap_planner__reservations_in_series_buffers():
+    reservation_unit = ReservationUnitBuilder().create(
+        buffer_time_before=datetime.timedelta(hours=1),
+        buffer_time_after=datetime.timedelta(hours=1),
+    )
+
+    ReservationUnitHierarchy.refresh()
+
+    series = ReservationSeriesFactory.create(
+        reservation_unit=reservation_unit,
+        begin_date=local_date(2024, 1, 8),
+        begin_time=local_time(12, 0),
+        end_date=local_date(2024, 1, 15),
+        end_time=local_time(14, 0),
+        weekdays=[Weekday.MONDAY.value],
+    )
+
+    # Reservations in the buffers of the first and last reservations of the series,
+    # but not in the period of the series itself.
+    before_first = ReservationFactory.create(
+        reservation_unit=reservation_unit,
+        begins_at=local_datetime(2024, 1, 8, 10, 30),
+        ends_at=local_datetime(2024, 1, 8, 11, 30),
+    )
+    after_last = ReservationFactory.create(
+        reservation_unit=reservation_unit,
+        begins_at=local_datetime(2024, 1, 15, 14, 30),
+        ends_at=local_datetime(2024, 1, 15, 15, 30),
+    )
+
+    application_round = ApplicationRoundFactory.create()
+    overlap_planner = application_round.actions._get_overlap_planner([series])
+
+    overlapping = overlap_planner.overlapping_time_spans(
+        reservation_unit=reservation_unit,
+        begin=local_datetime(2024, 1, 8, 11, 0),
+        end=local_datetime(2024, 1, 8, 15, 0),
+    )
+    assert list(overlapping) == [before_first.as_time_span_element()]
+
+    overlapping = overlap_planner.overlapping_time_spans(
+        reservation_unit=reservation_unit,
+        begin=local_datetime(2024, 1, 15, 11, 0),
+        end=local_datetime(2024, 1, 15, 15, 0),
+    )
+    assert list(overlapping) == [after_last.as_time_span_element()]
+
+
+@freezegun.freeze_time(local_datetime(2024, 1, 1))  # Monday
+def test_generate_reservation_series_from_allocations__overlapping_allocations():
+    user = UserFactory.create()
+    unit = UnitBuilder().with_hauki_resource().create()
+    reservation_unit = ReservationUnitBuilder().for_unit(unit).with_free_pricing().with_unrestricted_access().create()
+
+    ReservationUnitHierarchy.refresh()
+
+    next_monday = next_date_matching_weekday(local_date(), Weekday.MONDAY)
+
+    application_round = ApplicationRoundFactory.create_with_allocations(
+        allocations=[
+            Allocation(
+                reservation_unit=reservation_unit,
+                day_of_the_week=Weekday.MONDAY,
+                begin_time=local_time(12, 0),
+                end_time=local_time(14, 0),
+            ),
+            Allocation(
+                reservation_unit=reservation_unit,
+                day_of_the_week=Weekday.MONDAY,
+                begin_time=local_time(13, 0),
+                end_time=local_time(15, 0),
+            ),
+        ],
+        reservation_period_begin_date=next_monday,
+        reservation_period_end_date=next_monday + datetime.timedelta(days=1),
+        user=user,
+    )
+
+    application_round.actions.generate_reservations_from_allocations()
+
+    # Reservations created for one allocation are accounted for when generating reservations for the other one.
+    reservations: list[Reservation] = list(Reservation.objects.all())
+    assert len(reservations) == 1
+
+    rejected: list[RejectedOccurrence] = list(RejectedOccurrence.objects.all())
+    assert len(rejected) == 1
+
+    assert rejected[0].rejection_reason == RejectionReadinessChoice.OVERLAPPING_RESERVATIONS
+    assert rejected[0].reservation_series != reservations[0].reservation_series
+
+
 @freezegun.freeze_time(local_datetime(2024, 1, 1))  # Monday
 def test_generate_reservation_series_from_allocations__explicitly_closed_opening_hours():
     user = UserFactory.create()
@@ -484,6 +576,66 @@ def test_generate_reservation_series_from_allocations__explicitly_closed_opening
     assert HaukiAPIClient.get_date_periods.call_count == 1
 
 
+@freezegun.freeze_time(local_datetime(2024, 1, 1))  # Monday
+def test_generate_reservation_series_from_allocations__explicitly_closed_opening_hours__cached(settings):
+    settings.HAUKI_DATE_PERIODS_CACHE_TIMEOUT_SECONDS = 60
+
+    user = UserFactory.create()
+    reservation_units = [
+        ReservationUnitBuilder()
+        .for_unit(UnitBuilder().with_hauki_resource().create())
+        .with_free_pricing()
+        .with_unrestricted_access()
+        .create()
+        for _ in range(2)
+    ]
+
+    next_monday = next_date_matching_weekday(local_date(), Weekday.MONDAY)
+
+    application_round = ApplicationRoundFactory.create_with_allocations(
+        allocations=[
+            Allocation(
+                reservation_unit=reservation_unit,
+                day_of_the_week=Weekday.MONDAY,
+                begin_time=local_time(12, 0),
+                end_time=local_time(14, 0),
+            )
+            for reservation_unit in reservation_units
+        ],
+        reservation_period_begin_date=next_monday,
+        reservation_period_end_date=next_monday + datetime.timedelta(days=1),
+        user=user,
+    )
+
+    HaukiAPIClient.get_date_periods.return_value = [
+        HaukiAPIDatePeriod(
+            start_date="2024-01-01",
+            end_date="2024-01-01",
+            resource_state=HaukiResourceState.CLOSED.value,
+            override=True,
+        ),
+    ]
+
+    closed_time_spans = application_round.actions.get_series_override_closed_time_spans()
+
+    # Date periods are fetched for each hauki resource.
+    assert HaukiAPIClient.get_date_periods.call_count == 2
+    assert sorted(closed_time_spans) == sorted(
+        reservation_unit.origin_hauki_resource_id for reservation_unit in reservation_units
+    )
+
+    application_round.actions.generate_reservations_from_allocations()
+
+    # Date periods are not fetched again while they are cached.
+    assert HaukiAPIClient.get_date_periods.call_count == 2
+
+    rejected: list[RejectedOccurrence] = list(RejectedOccurrence.objects.all())
+    assert len(rejected) == 2
+    assert all(
+        occurrence.rejection_reason == RejectionReadinessChoice.RESERVATION_UNIT_CLOSED for occurrence in rejected
+    )
+
+
 @freezegun.freeze_time(local_datetime(2024, 1, 1))  # Monday
 def test_generate_reservation_series_from_allocations__access_code():
     user = UserFactory.create()
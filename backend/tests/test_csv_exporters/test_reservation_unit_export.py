@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import csv
 import datetime
+import io
 import itertools
 from decimal import Decimal
 
@@ -14,11 +16,13 @@
     ReservationKind,
     ReservationStartInterval,
 )
+from tilavarauspalvelu.integrations.sentry import SentryLogger
 from tilavarauspalvelu.models import ReservationUnit
 from tilavarauspalvelu.services.export import ReservationUnitExporter
 from utils.date_utils import DEFAULT_TIMEZONE, local_datetime_string, local_timedelta_string
 
 from tests.factories import ReservationUnitFactory
+from tests.helpers import patch_method
 
 from .helpers import Missing, MissingParams, mock_csv_writer
 
@@ -264,3 +268,63 @@ def test_reservation_unit_export_subset():
     # - the writes contain only 3 rows (+header)
     writes = mock_writer.get_writes()
     assert len(writes) == 4, writes
+
+
+def test_reservation_unit_export__file_response_streamed():
+    # given:
+    # - There are 3 reservation units in the system
+    ReservationUnitFactory.create_batch(3, spaces__name="Space", pricings__highest_price=Decimal(20))
+
+    # when:
+    # - The exporter is streamed as a file response in chunks smaller than the number of reservation units
+    exporter = ReservationUnitExporter()
+    exporter.chunk_size = 2
+    response = exporter.to_file_response(file_name="reservation_units")
+
+    # then:
+    # - the streamed file contains the same data as the one written at once
+    assert response["Content-Disposition"] == "attachment;filename=reservation_units.csv"
+    content = b"".join(response.streaming_content).decode()
+    assert content == exporter.write_csv().getvalue()
+    assert len(list(csv.reader(io.StringIO(content)))) == 4
+
+
+@patch_method(SentryLogger.log_exception)
+def test_reservation_unit_export__file_response_streamed__error_in_first_row():
+    # given:
+    # - There is a reservation unit in the system
+    ReservationUnitFactory.create()
+
+    # when:
+    # - Exporting the first reservation unit fails
+    # then:
+    # - The error is raised before the response is returned
+    exporter = ReservationUnitExporter()
+    with (
+        patch_method(ReservationUnitExporter.get_data_rows, side_effect=ValueError("foo")),
+        pytest.raises(ValueError, match="foo"),
+    ):
+        exporter.to_file_response(file_name="reservation_units")
+
+    assert SentryLogger.log_exception.call_count == 0
+
+
+@patch_method(SentryLogger.log_exception)
+def test_reservation_unit_export__file_response_streamed__error_in_later_row():
+    # given:
+    # - There are 2 reservation units in the system
+    ReservationUnitFactory.create_batch(2)
+
+    # when:
+    # - Exporting the second reservation unit fails while the response is streamed
+    exporter = ReservationUnitExporter()
+    first_rows = list(exporter.get_data_rows(exporter.queryset.first()))
+    with patch_method(ReservationUnitExporter.get_data_rows, side_effect=[first_rows, ValueError("foo")]):
+        response = exporter.to_file_response(file_name="reservation_units")
+
+        # then:
+        # - The download is interrupted, and the error is logged to Sentry
+        with pytest.raises(ValueError, match="foo"):
+            b"".join(response.streaming_content)
+
+    assert SentryLogger.log_exception.call_count == 1
@@ -16,6 +16,8 @@
 from tests.helpers import ResponseMock, patch_method
 
 if TYPE_CHECKING:
+    from graphene_django_extensions.testing.client import GQLResponse
+
     from tilavarauspalvelu.models import Reservation, ReservationUnit
 
 reservation_query = partial(build_query, "reservation")
@@ -48,6 +50,21 @@
 )
 
 
+def queries_to_table(response: GQLResponse, table: str) -> int:
+    """Count the database queries made during the request that read from or write to the given table."""
+    return sum(f'"{table}"' in query for query in response.queries)
+
+
+# Tables of the data that validating a reservation to a reservation unit requires.
+# These are loaded once per request with a `BookingContext`, so no validator should query them separately.
+BOOKING_CONTEXT_TABLES = [
+    "application_round",
+    "reservable_time_span",
+    "reservation_unit_access_type",
+    "reservation_unit_pricing",
+]
+
+
 @contextmanager
 def mock_profile_reader(**kwargs: Any):
     profile_data = MyProfileDataFactory.create_basic(**kwargs)
@@ -27,7 +27,7 @@
 )
 from tests.helpers import patch_method
 
-from .helpers import ADJUST_MUTATION, get_adjust_data
+from .helpers import ADJUST_MUTATION, BOOKING_CONTEXT_TABLES, get_adjust_data, queries_to_table
 
 pytestmark = [
     pytest.mark.django_db,
@@ -53,6 +53,24 @@ def test_reservation__adjust_time__success(graphql):
     assert EmailService.send_reservation_rescheduled_email.called is True
 
 
+@patch_method(EmailService.send_reservation_rescheduled_email)
+def test_reservation__adjust_time__query_budget(graphql):
+    reservation = ReservationFactory.create_for_time_adjustment()
+
+    graphql.login_with_superuser()
+    data = get_adjust_data(reservation)
+    response = graphql(ADJUST_MUTATION, input_data=data)
+
+    assert response.has_errors is False, response.errors
+
+    # Data required for validation is loaded once, regardless of how many validators use it.
+    for table in BOOKING_CONTEXT_TABLES:
+        assert queries_to_table(response, table) == 1, response.query_log
+
+    # Total budget for the whole mutation, so that new per-row queries outside these tables are noticed too.
+    assert len(response.queries) <= 30, response.query_log
+
+
 def test_reservation__adjust_time__wrong_state(graphql):
     reservation = ReservationFactory.create_for_time_adjustment(state=ReservationStateChoice.CANCELLED)
 
@@ -16,6 +16,7 @@
     ReservationStateChoice,
     ReserveeType,
 )
+from tilavarauspalvelu.integrations.email.main import EmailService
 from tilavarauspalvelu.integrations.keyless_entry import PindoraClient, PindoraService
 from tilavarauspalvelu.integrations.keyless_entry.exceptions import PindoraAPIError, PindoraNotFoundError
 from tilavarauspalvelu.integrations.sentry import SentryLogger
@@ -26,7 +27,7 @@
 from tests.factories import OrderFactory, PaymentOrderFactory, ReservationFactory, UserFactory
 from tests.helpers import patch_method
 
-from .helpers import CONFIRM_MUTATION, get_confirm_data
+from .helpers import CONFIRM_MUTATION, get_confirm_data, queries_to_table
 
 if TYPE_CHECKING:
     from tilavarauspalvelu.integrations.verkkokauppa.order.types import CreateOrderParams
@@ -121,6 +122,23 @@ def test_reservation__confirm__changes_state_to_requires_handling_on_subsidy_req
     assert outbox[1].subject == f"New booking {reservation.id} requires handling at unit {unit_name}"
 
 
+@patch_method(EmailService.send_reservation_created_email)
+@patch_method(EmailService.send_reservation_created_staff_notification_email)
+def test_reservation__confirm__query_budget(graphql):
+    reservation = ReservationFactory.create_for_confirmation()
+
+    graphql.login_with_superuser()
+    data = get_confirm_data(reservation)
+    response = graphql(CONFIRM_MUTATION, input_data=data)
+
+    assert response.has_errors is False, response.errors
+
+    assert queries_to_table(response, "reservation_unit_pricing") == 1, response.query_log
+
+    # Total budget for the whole mutation, so that new per-row queries outside these tables are noticed too.
+    assert len(response.queries) <= 20, response.query_log
+
+
 def test_reservation__confirm__fails_if_state_is_not_created(graphql):
     reservation = ReservationFactory.create_for_confirmation(state=ReservationStateChoice.DENIED)
 
@@ -27,7 +27,7 @@
 from tilavarauspalvelu.integrations.keyless_entry.exceptions import PindoraAPIError
 from tilavarauspalvelu.integrations.sentry import SentryLogger
 from tilavarauspalvelu.models import Reservation, ReservationUnitHierarchy
-from tilavarauspalvelu.models.reservation.actions import ReservationActions
+from tilavarauspalvelu.models.reservation_unit.validators import ReservationUnitValidator
 from utils.date_utils import DEFAULT_TIMEZONE, local_date, local_datetime, local_start_of_day, next_hour
 
 from tests.factories import (
@@ -40,7 +40,7 @@
 )
 from tests.helpers import ResponseMock, patch_method
 
-from .helpers import CREATE_MUTATION, get_create_data, mock_profile_reader
+from .helpers import BOOKING_CONTEXT_TABLES, CREATE_MUTATION, get_create_data, mock_profile_reader, queries_to_table
 
 if TYPE_CHECKING:
     from tilavarauspalvelu.models import ReservationUnit
@@ -64,6 +64,23 @@ def test_reservation__create__success(graphql):
     assert Reservation.objects.count() == 1
 
 
+def test_reservation__create__query_budget(graphql):
+    reservation_unit = ReservationUnitFactory.create_reservable_now(max_reservations_per_user=10)
+
+    graphql.login_with_superuser()
+    data = get_create_data(reservation_unit)
+    response = graphql(CREATE_MUTATION, input_data=data)
+
+    assert response.has_errors is False, response.errors
+
+    # Data required for validation is loaded once, regardless of how many validators use it.
+    for table in BOOKING_CONTEXT_TABLES:
+        assert queries_to_table(response, table) == 1, response.query_log
+
+    # Total budget for the whole mutation, so that new per-row queries outside these tables are noticed too.
+    assert len(response.queries) <= 25, response.query_log
+
+
 def test_reservation__create__cannot_set_reservation_price(graphql):
     #
     # Reservation price is always calculated, so check that it cannot be set in the request.
@@ -896,6 +913,92 @@ def update_session_prefill_info(session: SessionMapping, **kwargs: Any) -> str:
     assert reservation.municipality == MunicipalityChoice.HELSINKI
 
 
+@patch_method(HelsinkiProfileClient.get_reservation_prefill_info)
+def test_reservation__create__prefilled_with_profile_data__recent_data_in_session(graphql, settings):
+    # given:
+    # - Prefill setting is on
+    # - There is a reservation unit in the system
+    # - A regular user who has logged in with Suomi.fi is using the system
+    # - Prefill data was fetched from Helsinki profile to the session recently, e.g. during login
+    settings.PREFILL_RESERVATION_WITH_PROFILE_DATA = True
+    settings.PREFILL_INFO_MAX_AGE_SECONDS = 3600
+
+    reservation_unit = ReservationUnitFactory.create_reservable_now()
+    user = UserFactory.create(social_auth__extra_data__amr=ProfileLoginAMR.SUOMI_FI)
+    graphql.force_login(user)
+
+    session = graphql.session
+    session["reservation_prefill_info"] = ReservationPrefillInfo(
+        reservee_first_name="Example",
+        reservee_last_name="User",
+        reservee_email="user@example.com",
+        reservee_phone="0123456789",
+        reservee_address_zip="00100",
+        municipality=MunicipalityChoice.HELSINKI.value,
+    )
+    session["reservation_prefill_info_fetched_at"] = (local_datetime() - datetime.timedelta(minutes=10)).isoformat()
+    session.save()
+
+    # when:
+    # - The user creates a reservation
+    data = get_create_data(reservation_unit)
+    response = graphql(CREATE_MUTATION, input_data=data)
+
+    # then:
+    # - The reservation is prefilled from the data in the session without calling Helsinki profile
+    assert response.has_errors is False, response.errors
+
+    reservation = Reservation.objects.get(pk=response.first_query_object["pk"])
+    assert reservation.reservee_first_name == "Example"
+    assert reservation.reservee_email == "user@example.com"
+    assert reservation.municipality == MunicipalityChoice.HELSINKI
+
+    assert HelsinkiProfileClient.get_reservation_prefill_info.call_count == 0
+
+
+def test_reservation__create__prefilled_with_profile_data__old_data_in_session(graphql, settings):
+    # given:
+    # - Prefill setting is on
+    # - There is a reservation unit in the system
+    # - A regular user who has logged in with Suomi.fi is using the system
+    # - Prefill data in the session was fetched from Helsinki profile too long ago
+    settings.PREFILL_RESERVATION_WITH_PROFILE_DATA = True
+    settings.PREFILL_INFO_MAX_AGE_SECONDS = 3600
+
+    reservation_unit = ReservationUnitFactory.create_reservable_now()
+    user = UserFactory.create(social_auth__extra_data__amr=ProfileLoginAMR.SUOMI_FI)
+    graphql.force_login(user)
+
+    session = graphql.session
+    session["reservation_prefill_info"] = ReservationPrefillInfo(
+        reservee_first_name="Old",
+        reservee_last_name="Name",
+        reservee_email="old@example.com",
+        reservee_phone=None,
+        reservee_address_zip=None,
+        municipality=None,
+    )
+    session["reservation_prefill_info_fetched_at"] = (local_datetime() - datetime.timedelta(hours=2)).isoformat()
+    session.save()
+
+    # when:
+    # - The user creates a reservation
+    data = get_create_data(reservation_unit)
+    with mock_profile_reader():
+        response = graphql(CREATE_MUTATION, input_data=data)
+
+    # then:
+    # - The reservation is prefilled from data fetched from Helsinki profile
+    # - The fetched data replaces the old data in the session
+    assert response.has_errors is False, response.errors
+
+    reservation = Reservation.objects.get(pk=response.first_query_object["pk"])
+    assert reservation.reservee_first_name == "Example"
+    assert reservation.reservee_email == "user@example.com"
+
+    assert graphql.session["reservation_prefill_info"]["reservee_first_name"] == "Example"
+
+
 @pytest.mark.parametrize("arm", ADLoginAMR)
 def test_reservation__create__prefilled_with_profile_data__ad_login(graphql, settings, arm: ADLoginAMR):
     # given:
@@ -1243,7 +1346,7 @@ def test_reservation__create__access_type__access_code__no_reservation_on_pindor
     assert Reservation.objects.exists() is False
 
 
-def test_reservation__create__two_overlapping_reservation_created_at_the_same_time(graphql):
+def test_reservation__create__overlapping_reservation_created_during_validation(graphql):
     reservation_unit = ReservationUnitFactory.create_reservable_now()
     graphql.login_with_regular_user()
     data = get_create_data(reservation_unit)
@@ -1251,6 +1354,7 @@ def test_reservation__create__two_overlapping_reservation_created_at_the_same_ti
     ReservationUnitHierarchy.refresh()
     reservation: Reservation | None = None
 
+    # Another request creates an overlapping reservation after this request has been validated.
     def callback(*args, **kwargs):
         nonlocal reservation
         reservation = ReservationFactory.create_for_reservation_unit(
@@ -1258,13 +1362,12 @@ def callback(*args, **kwargs):
             begins_at=datetime.datetime.fromisoformat(data["beginsAt"]),
             ends_at=datetime.datetime.fromisoformat(data["endsAt"]),
         )
-        return Reservation.objects.filter(pk=reservation.pk)
 
-    with patch_method(ReservationActions.overlapping_reservations, side_effect=callback):
+    with patch_method(ReservationUnitValidator.validate_reservation_begin_time, side_effect=callback):
         response = graphql(CREATE_MUTATION, input_data=data)
 
     assert response.error_message() == "Mutation was unsuccessful."
-    assert response.field_error_messages() == ["Overlapping reservations were created at the same time."]
+    assert response.field_error_messages() == ["Reservation overlaps with existing reservations."]
 
-    # The other reservation is retained, but might be deleted during its own endpoint
-    assert Reservation.objects.first() == reservation
+    # The overlap is found before the reservation is created, so nothing needs to be deleted.
+    assert list(Reservation.objects.all()) == [reservation]
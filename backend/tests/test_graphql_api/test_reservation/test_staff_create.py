@@ -18,7 +18,7 @@
 from tilavarauspalvelu.integrations.keyless_entry.exceptions import PindoraAPIError
 from tilavarauspalvelu.integrations.sentry import SentryLogger
 from tilavarauspalvelu.models import Reservation, ReservationUnitHierarchy
-from tilavarauspalvelu.models.reservation.actions import ReservationActions
+from tilavarauspalvelu.models.reservation_unit.validators import ReservationUnitValidator
 from utils.date_utils import DEFAULT_TIMEZONE, local_date, local_datetime, next_hour
 
 from tests.factories import (
@@ -584,7 +584,7 @@ def test_reservation__staff_create__access_type__access_code__pindora_failure(gr
     assert reservation.access_code_generated_at is None
 
 
-def test_reservation__staff_create__two_overlapping_reservation_created_at_the_same_time(graphql):
+def test_reservation__staff_create__overlapping_reservation_created_during_validation(graphql):
     reservation_unit = ReservationUnitFactory.create()
 
     data = get_staff_create_data(reservation_unit)
@@ -593,6 +593,7 @@ def test_reservation__staff_create__two_overlapping_reservation_created_at_the_s
     ReservationUnitHierarchy.refresh()
     reservation: Reservation | None = None
 
+    # Another request creates an overlapping reservation after this request has been validated.
     def callback(*args, **kwargs):
         nonlocal reservation
         reservation = ReservationFactory.create_for_reservation_unit(
@@ -600,13 +601,12 @@ def callback(*args, **kwargs):
             begins_at=datetime.datetime.fromisoformat(data["beginsAt"]),
             ends_at=datetime.datetime.fromisoformat(data["endsAt"]),
         )
-        return Reservation.objects.filter(pk=reservation.pk)
 
-    with patch_method(ReservationActions.overlapping_reservations, side_effect=callback):
+    with patch_method(ReservationUnitValidator.validate_reservation_begin_time_staff, side_effect=callback):
         response = graphql(CREATE_STAFF_MUTATION, input_data=data)
 
     assert response.error_message() == "Mutation was unsuccessful."
-    assert response.field_error_messages() == ["Overlapping reservations were created at the same time."]
+    assert response.field_error_messages() == ["Reservation overlaps with existing reservations."]
 
-    # The other reservation is retained, but might be deleted during its own endpoint
-    assert Reservation.objects.first() == reservation
+    # The overlap is found before the reservation is created, so nothing needs to be deleted.
+    assert list(Reservation.objects.all()) == [reservation]
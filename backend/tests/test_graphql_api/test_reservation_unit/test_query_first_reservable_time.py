@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 import datetime
-import json
 from dataclasses import asdict, dataclass
 from functools import partial
-from typing import TYPE_CHECKING, Any, NamedTuple
+from typing import TYPE_CHECKING, NamedTuple
+from unittest import mock
 
 import freezegun
 import pytest
@@ -18,9 +18,14 @@
     ReservationStateChoice,
     ReservationTypeChoice,
 )
-from tilavarauspalvelu.models import AffectingTimeSpan, ReservationUnitHierarchy
-from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_helper import CachedReservableTime
-from utils.date_utils import DEFAULT_TIMEZONE, local_datetime
+from tilavarauspalvelu.models import (
+    AffectingTimeSpan,
+    Reservation,
+    ReservationUnitFirstReservableTime,
+    ReservationUnitHierarchy,
+)
+from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_cache import FirstReservableTimeCache
+from utils.date_utils import DEFAULT_TIMEZONE, local_date, local_datetime
 
 from tests.factories import (
     ApplicationRoundFactory,
@@ -39,6 +44,7 @@
     from graphene_django_extensions.testing.client import GQLResponse
 
     from tilavarauspalvelu.models import ReservationUnit
+    from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_cache import CachedReservableTime
 
 # Applied to all tests
 pytestmark = [
@@ -241,6 +247,42 @@ def apply_reservation_unit_override_settings(
     reservation_unit.save()
 
 
+def cached_results(*pks: int, minimum_duration_minutes: int = 15) -> dict[int, CachedReservableTime]:
+    """Get valid cached first reservable times for the given reservation units with the default filters."""
+    today = local_date()
+    frt_cache = FirstReservableTimeCache(
+        now=local_datetime(),
+        filter_date_start=today,
+        filter_date_end=today + datetime.timedelta(days=731),
+        filter_time_start=None,
+        filter_time_end=None,
+        minimum_duration_minutes=minimum_duration_minutes,
+    )
+    return frt_cache.get_many(pks)
+
+
+def create_reservation_units_in_common_hierarchy(reservation_unit: ReservationUnit) -> ReservationUnit:
+    """Create a reservation unit named 'A', and rename the given reservation unit 'B', in a common hierarchy."""
+    common_space = SpaceFactory.create()
+
+    reservation_unit_2 = ReservationUnitFactory.create(name="A", spaces=[common_space], unit=reservation_unit.unit)
+
+    reservation_unit.name = "B"
+    reservation_unit.spaces.set([common_space])
+    reservation_unit.save()
+
+    ReservableTimeSpanFactory.create(
+        resource=reservation_unit.origin_hauki_resource,
+        start_datetime=_datetime(hour=10),
+        end_datetime=_datetime(hour=12),
+    )
+
+    ReservationUnitHierarchy.refresh()
+    AffectingTimeSpan.refresh()
+
+    return reservation_unit_2
+
+
 ########################################################################################################################
 
 
@@ -2521,27 +2563,9 @@ def test__reservation_unit__first_reservable_time__remove_not_reservable(graphql
 
 
 @freezegun.freeze_time(NOW)
-def test__reservation_unit__first_reservable_time__previous_page_cached(graphql, reservation_unit):
-    """Checks that the page results are cached so that pagination works correctly."""
-    common_space = SpaceFactory.create()
-
-    reservation_unit_2 = ReservationUnitFactory(name="A", spaces=[common_space], unit=reservation_unit.unit)
-
-    reservation_unit.name = "B"
-    reservation_unit.spaces.set([common_space])
-    reservation_unit.save()
-
-    ReservableTimeSpanFactory.create(
-        resource=reservation_unit.origin_hauki_resource,
-        start_datetime=_datetime(hour=10),
-        end_datetime=_datetime(hour=12),
-    )
-
-    ReservationUnitHierarchy.refresh()
-    AffectingTimeSpan.refresh()
-
-    # See "ReservationUnitFilterSet.get_filter_reservable" on how this is calculated
-    cache_key = "Y2FsY3VsYXRlX2ZpcnN0X3Jlc2VydmFibGVfdGltZT1UcnVlLG9yZGVyX2J5PVsnbmFtZV9maSdd"
+def test__reservation_unit__first_reservable_time__page_results_cached(graphql, reservation_unit):
+    """Checks that the results are cached for each reservation unit on the page."""
+    reservation_unit_2 = create_reservation_units_in_common_hierarchy(reservation_unit)
 
     query_1 = reservation_units_reservable_query(order_by="nameFiAsc", first=1)
     response_1 = graphql(query_1)
@@ -2551,11 +2575,11 @@ def test__reservation_unit__first_reservable_time__previous_page_cached(graphql,
     assert frt(response_1) is None
     assert is_closed(response_1) is True
 
-    # Check cache contents.
-    cached_value: dict[str, dict[str, Any]] = json.loads(cache.get(cache_key))
-    assert len(cached_value) == 1
-    assert cached_value[str(reservation_unit_2.pk)]["frt"] == "None"
-    assert cached_value[str(reservation_unit_2.pk)]["closed"] == "True"
+    # Only the results for the reservation units on the page are calculated and cached.
+    results = cached_results(reservation_unit_2.pk, reservation_unit.pk)
+    assert len(results) == 1
+    assert results[reservation_unit_2.pk].frt is None
+    assert results[reservation_unit_2.pk].closed is True
 
     query_2 = reservation_units_reservable_query(order_by="nameFiAsc", first=1, offset=1)
     response_2 = graphql(query_2)
@@ -2565,69 +2589,78 @@ def test__reservation_unit__first_reservable_time__previous_page_cached(graphql,
     assert frt(response_2) == dt(hour=10)
     assert is_closed(response_2) is False
 
-    # Check cache contents has been updated.
-    cached_value: dict[str, dict[str, Any]] = json.loads(cache.get(cache_key))
-    assert len(cached_value) == 2
-    assert cached_value[str(reservation_unit_2.pk)]["frt"] == "None"
-    assert cached_value[str(reservation_unit_2.pk)]["closed"] == "True"
-    assert cached_value[str(reservation_unit.pk)]["frt"] == dt(hour=10)
-    assert cached_value[str(reservation_unit.pk)]["closed"] == "False"
+    results = cached_results(reservation_unit_2.pk, reservation_unit.pk)
+    assert len(results) == 2
+    assert results[reservation_unit.pk].frt == _datetime(hour=10)
+    assert results[reservation_unit.pk].closed is False
 
-    # Check that there was no additional queries
-    response_2.assert_query_count(9)
-    # ...and that we were able to skip iterating through the previous pages due to cached results.
-    assert "OFFSET 1" in response_2.queries[1]
+    # Results for the previous page are not needed when not filtering by reservability.
+    # Make queries for:
+    #  1) Count reservation units for FRT calculation
+    #  2) Fetch reservation unit IDs on the page
+    #  3) Fetch reservation units for FRT calculation
+    #  4-7) Prefetch hauki resources, reservable time spans, application rounds and access types
+    #  8) Fetch affecting time spans
+    #  9) Count reservation units for response
+    #  10) Fetch reservation units for response
+    response_2.assert_query_count(10)
 
 
 ########################################################################################################################
 
 
 @freezegun.freeze_time(NOW)
-def test__reservation_unit__first_reservable_time__previous_page_not_cached(graphql, reservation_unit):
-    """
-    Check that when we query the second page first, we calculate the first page's results so that
-    pagination to work correctly for the second page.
-    """
-    common_space = SpaceFactory.create()
+def test__reservation_unit__first_reservable_time__use_cached_results(graphql, reservation_unit):
+    """Check that when we query the same page twice, we use the cached results on the second query."""
+    create_reservation_units_in_common_hierarchy(reservation_unit)
 
-    reservation_unit_2 = ReservationUnitFactory(name="A", spaces=[common_space], unit=reservation_unit.unit)
+    query = reservation_units_reservable_query(order_by="nameFiAsc", first=1, offset=1)
+    response_1 = graphql(query)
+    assert response_1.has_errors is False, response_1
 
-    reservation_unit.name = "B"
-    reservation_unit.spaces.set([common_space])
-    reservation_unit.save()
+    assert len(response_1) == 1
+    assert frt(response_1) == dt(hour=10)
+    assert is_closed(response_1) is False
 
-    ReservableTimeSpanFactory.create(
-        resource=reservation_unit.origin_hauki_resource,
-        start_datetime=_datetime(hour=10),
-        end_datetime=_datetime(hour=12),
-    )
+    response_2 = graphql(query)
+    assert response_2.has_errors is False, response_2
 
-    ReservationUnitHierarchy.refresh()
-    AffectingTimeSpan.refresh()
+    assert len(response_2) == 1
+    assert frt(response_2) == dt(hour=10)
+    assert is_closed(response_2) is False
 
-    # See "ReservationUnitFilterSet.get_filter_reservable" on how this is calculated
-    cache_key = "Y2FsY3VsYXRlX2ZpcnN0X3Jlc2VydmFibGVfdGltZT1UcnVlLG9yZGVyX2J5PVsnbmFtZV9maSdd"
+    # Since we used cached results, we didn't need to make database queries for the calculation.
+    # Only make queries for:
+    #  1) Count reservation units for FRT calculation
+    #  2) Fetch reservation unit IDs on the page
+    #  3) Count reservation units for response
+    #  4) Fetch reservation units for response
+    response_2.assert_query_count(4)
 
-    query = reservation_units_reservable_query(order_by="nameFiAsc", first=1, offset=1)
-    response = graphql(query)
-    assert response.has_errors is False, response
 
-    assert len(response) == 1
-    assert frt(response) == dt(hour=10)
-    assert is_closed(response) is False
+########################################################################################################################
+
+
+@freezegun.freeze_time(NOW)
+def test__reservation_unit__first_reservable_time__cached_results_shared_between_orderings(graphql, reservation_unit):
+    """Check that cached results are per reservation unit, so they can be used with any ordering or page."""
+    create_reservation_units_in_common_hierarchy(reservation_unit)
 
-    # Check cache contents has been updated.
-    cached_value: dict[str, dict[str, Any]] = json.loads(cache.get(cache_key))
-    assert len(cached_value) == 2
-    assert cached_value[str(reservation_unit_2.pk)]["frt"] == "None"
-    assert cached_value[str(reservation_unit_2.pk)]["closed"] == "True"
-    assert cached_value[str(reservation_unit.pk)]["frt"] == dt(hour=10)
-    assert cached_value[str(reservation_unit.pk)]["closed"] == "False"
+    query_1 = reservation_units_reservable_query(order_by="nameFiAsc", first=2)
+    response_1 = graphql(query_1)
+    assert response_1.has_errors is False, response_1
+
+    assert len(response_1) == 2
+
+    query_2 = reservation_units_reservable_query(order_by="nameFiDesc", first=1)
+    response_2 = graphql(query_2)
+    assert response_2.has_errors is False, response_2
+
+    assert len(response_2) == 1
+    assert frt(response_2) == dt(hour=10)
+    assert is_closed(response_2) is False
 
-    # Check that there was no additional queries
-    response.assert_query_count(9)
-    # We also cannot skip previous pages due to missing cached results.
-    assert "OFFSET 1" not in response.queries[1]
+    response_2.assert_query_count(4)
 
 
 ########################################################################################################################
@@ -2636,237 +2669,447 @@ def test__reservation_unit__first_reservable_time__previous_page_not_cached(grap
 @freezegun.freeze_time(NOW)
 def test__reservation_unit__first_reservable_time__different_filters_dont_share_cache(graphql, reservation_unit):
     """Checks that cached results based on different filters are not shared."""
-    common_space = SpaceFactory.create()
+    create_reservation_units_in_common_hierarchy(reservation_unit)
 
-    ReservationUnitFactory(name="A", spaces=[common_space], unit=reservation_unit.unit)
+    query_1 = reservation_units_reservable_query(order_by="nameFiDesc", first=1)
+    response_1 = graphql(query_1)
+    assert response_1.has_errors is False, response_1
 
-    reservation_unit.name = "B"
-    reservation_unit.spaces.set([common_space])
-    reservation_unit.save()
+    assert len(response_1) == 1
+    assert frt(response_1) == dt(hour=10)
 
-    ReservableTimeSpanFactory.create(
-        resource=reservation_unit.origin_hauki_resource,
-        start_datetime=_datetime(hour=10),
-        end_datetime=_datetime(hour=12),
+    assert len(cached_results(reservation_unit.pk)) == 1
+    assert len(cached_results(reservation_unit.pk, minimum_duration_minutes=180)) == 0
+
+    query_2 = reservation_units_reservable_query(
+        order_by="nameFiDesc",
+        first=1,
+        reservable_minimum_duration_minutes=180,
     )
+    response_2 = graphql(query_2)
+    assert response_2.has_errors is False, response_2
 
-    ReservationUnitHierarchy.refresh()
-    AffectingTimeSpan.refresh()
+    assert len(response_2) == 1
+    assert frt(response_2) is None
 
-    query_1 = reservation_units_reservable_query(order_by="nameFiAsc", first=1)
-    response_1 = graphql(query_1)
-    assert response_1.has_errors is False, response_1
+    # We couldn't use the cached results, so make database queries as usual.
+    response_2.assert_query_count(10)
+
+    # Cache for the previous request is still there.
+    assert len(cached_results(reservation_unit.pk)) == 1
+    assert len(cached_results(reservation_unit.pk, minimum_duration_minutes=180)) == 1
 
-    assert len(response_1) == 1
-    assert frt(response_1) is None
-    assert is_closed(response_1) is True
 
-    # See "ReservationUnitFilterSet.get_filter_reservable" on how this is calculated
-    cache_key_1 = "Y2FsY3VsYXRlX2ZpcnN0X3Jlc2VydmFibGVfdGltZT1UcnVlLG9yZGVyX2J5PVsnbmFtZV9maSdd"
+########################################################################################################################
 
-    # Check that we did cache the first page's results.
-    cached_value: dict[str, dict[str, Any]] = json.loads(cache.get(cache_key_1))
-    assert len(cached_value) == 1
 
-    # Use a different query. Note: even ordering affects results.
-    query_2 = reservation_units_reservable_query(order_by="nameFiDesc", first=1)
-    response_2 = graphql(query_2)
+@freezegun.freeze_time(NOW)
+def test__reservation_unit__first_reservable_time__show_only_reservable__previous_pages_cached(
+    graphql, reservation_unit
+):
+    """
+    Check that when 'show_only_reservable' is True, results for the previous pages are calculated,
+    so that pagination works correctly, and that they are cached for the next query.
+    """
+    create_reservation_units_in_common_hierarchy(reservation_unit)
+
+    query = reservation_units_reservable_query(order_by="nameFiAsc", show_only_reservable=True, first=1)
+    response_1 = graphql(query)
+    assert response_1.has_errors is False, response_1
+
+    assert len(response_1) == 1
+    assert frt(response_1) == dt(hour=10)
+
+    response_2 = graphql(query)
     assert response_2.has_errors is False, response_2
 
     assert len(response_2) == 1
     assert frt(response_2) == dt(hour=10)
-    assert is_closed(response_2) is False
 
-    cache_key_2 = "Y2FsY3VsYXRlX2ZpcnN0X3Jlc2VydmFibGVfdGltZT1UcnVlLG9yZGVyX2J5PVsnLW5hbWVfZmknXQ=="
+    response_2.assert_query_count(4)
 
-    # Check that we have a new cached value for the second filter's results.
-    cached_value: dict[str, dict[str, Any]] = json.loads(cache.get(cache_key_2))
-    assert len(cached_value) == 1
-    # Cache for the previous request is still there.
-    cached_value: dict[str, dict[str, Any]] = json.loads(cache.get(cache_key_1))
-    assert len(cached_value) == 1
 
-    # We couldn't use the cached results, so make database queries as usual.
-    response_2.assert_query_count(9)
+########################################################################################################################
+
+
+def test__reservation_unit__first_reservable_time__cached_results_not_valid_after_first_reservable_time(
+    graphql, reservation_unit
+):
+    """Check that cached results are not used anymore after the first reservable time has passed."""
+    create_reservation_units_in_common_hierarchy(reservation_unit)
+
+    query = reservation_units_reservable_query(order_by="nameFiDesc", first=1)
+
+    with freezegun.freeze_time(NOW):
+        response = graphql(query)
+
+    assert response.has_errors is False, response
+    assert frt(response) == dt(hour=10)
+
+    with freezegun.freeze_time(NOW + datetime.timedelta(hours=11)):
+        assert len(cached_results(reservation_unit.pk)) == 0
+
+        response = graphql(query)
+
+    assert response.has_errors is False, response
+    assert frt(response) == dt(hour=11)
 
 
 ########################################################################################################################
 
 
 @freezegun.freeze_time(NOW)
-def test__reservation_unit__first_reservable_time__use_cached_results(graphql, reservation_unit):
-    """Check that when we query the same page twice, we use the cached results on the second query."""
-    common_space = SpaceFactory.create()
+def test__reservation_unit__first_reservable_time__cache_invalidated__reservation_in_hierarchy(
+    graphql, reservation_unit
+):
+    """Check that reservations invalidate cached results for all reservation units in the same hierarchy."""
+    reservation_unit_2 = create_reservation_units_in_common_hierarchy(reservation_unit)
 
-    ReservationUnitFactory(name="A", spaces=[common_space], unit=reservation_unit.unit)
+    query = reservation_units_reservable_query(order_by="nameFiDesc", first=1)
+    response = graphql(query)
+    assert response.has_errors is False, response
+    assert frt(response) == dt(hour=10)
 
-    reservation_unit.name = "B"
-    reservation_unit.spaces.set([common_space])
-    reservation_unit.save()
+    assert len(cached_results(reservation_unit.pk)) == 1
 
-    ReservableTimeSpanFactory.create(
-        resource=reservation_unit.origin_hauki_resource,
-        start_datetime=_datetime(hour=10),
-        end_datetime=_datetime(hour=12),
+    # 1st Jan 10:00 - 11:00 (1h)
+    ReservationFactory.create_for_reservation_unit(
+        reservation_unit=reservation_unit_2,
+        begins_at=_datetime(hour=10),
+        ends_at=_datetime(hour=11),
     )
 
-    ReservationUnitHierarchy.refresh()
-    AffectingTimeSpan.refresh()
+    assert len(cached_results(reservation_unit.pk)) == 0
 
-    query_1 = reservation_units_reservable_query(order_by="nameFiAsc", first=1)
-    response_1 = graphql(query_1)
-    assert response_1.has_errors is False, response_1
+    response = graphql(query)
+    assert response.has_errors is False, response
+    assert frt(response) == dt(hour=11)
 
-    assert len(response_1) == 1
-    assert frt(response_1) is None
-    assert is_closed(response_1) is True
 
-    # See "ReservationUnitFilterSet.get_filter_reservable" on how this is calculated
-    cache_key_1 = "Y2FsY3VsYXRlX2ZpcnN0X3Jlc2VydmFibGVfdGltZT1UcnVlLG9yZGVyX2J5PVsnbmFtZV9maSdd"
-    # Check tha results were cached.
-    cached_value: dict[str, dict[str, Any]] = json.loads(cache.get(cache_key_1))
-    assert len(cached_value) == 1
+########################################################################################################################
 
-    query_2 = reservation_units_reservable_query(order_by="nameFiAsc", first=1)
-    response_2 = graphql(query_2)
-    assert response_2.has_errors is False, response_2
 
-    assert len(response_2) == 1
-    assert frt(response_2) is None
-    assert is_closed(response_2) is True
+@freezegun.freeze_time(NOW)
+def test__reservation_unit__first_reservable_time__cache_invalidated__reservation_time_changed(
+    graphql, reservation_unit
+):
+    """Check that changes to the reserved time of a reservation invalidate cached results in the same hierarchy."""
+    reservation_unit_2 = create_reservation_units_in_common_hierarchy(reservation_unit)
 
-    # Since we used cached results, we didn't need to make database queries.
-    # Only make queries for:
-    #  1) Count reservation units for FRT calculation
-    #  2) Count reservation units for response
-    #  3) Fetch reservation units for response
-    response_2.assert_query_count(3)
+    # 1st Jan 10:00 - 11:00 (1h)
+    reservation = ReservationFactory.create_for_reservation_unit(
+        reservation_unit=reservation_unit_2,
+        begins_at=_datetime(hour=10),
+        ends_at=_datetime(hour=11),
+    )
+
+    query = reservation_units_reservable_query(order_by="nameFiDesc", first=1)
+    response = graphql(query)
+    assert response.has_errors is False, response
+    assert frt(response) == dt(hour=11)
+
+    assert len(cached_results(reservation_unit.pk)) == 1
+
+    reservation = Reservation.objects.get(pk=reservation.pk)
+    reservation.ends_at = _datetime(hour=12)
+    reservation.save(update_fields=["ends_at"])
+
+    assert len(cached_results(reservation_unit.pk)) == 0
+
+    response = graphql(query)
+    assert response.has_errors is False, response
+    assert frt(response) is None
 
 
 ########################################################################################################################
 
 
 @freezegun.freeze_time(NOW)
-def test__reservation_unit__first_reservable_time__use_cached_results__not_first_page(graphql, reservation_unit):
-    """
-    Check that cached results are used for pages other than the first page if they exist
-    for both the first AND the second page.
-    """
-    common_space = SpaceFactory.create()
+def test__reservation_unit__first_reservable_time__cache_not_invalidated__reservation_other_fields_changed(
+    graphql, reservation_unit
+):
+    """Check that reservation changes that don't affect reserved times don't invalidate cached results."""
+    reservation_unit_2 = create_reservation_units_in_common_hierarchy(reservation_unit)
 
-    ReservationUnitFactory(name="A", spaces=[common_space], unit=reservation_unit.unit)
+    # 1st Jan 10:00 - 11:00 (1h)
+    reservation = ReservationFactory.create_for_reservation_unit(
+        reservation_unit=reservation_unit_2,
+        begins_at=_datetime(hour=10),
+        ends_at=_datetime(hour=11),
+    )
 
-    reservation_unit.name = "B"
-    reservation_unit.spaces.set([common_space])
+    query = reservation_units_reservable_query(order_by="nameFiDesc", first=1)
+    response = graphql(query)
+    assert response.has_errors is False, response
+    assert frt(response) == dt(hour=11)
+
+    assert len(cached_results(reservation_unit.pk)) == 1
+
+    reservation = Reservation.objects.get(pk=reservation.pk)
+    reservation.name = "Changed name"
+    reservation.save()
+
+    reservation.description = "Changed description"
+    reservation.save(update_fields=["description"])
+
+    # Saving the same reserved time again doesn't change anything either.
+    reservation.begins_at = _datetime(hour=10)
+    reservation.save(update_fields=["begins_at"])
+
+    assert len(cached_results(reservation_unit.pk)) == 1
+
+
+########################################################################################################################
+
+
+@freezegun.freeze_time(NOW)
+def test__reservation_unit__first_reservable_time__cache_invalidated__batched_per_transaction(
+    graphql,
+    reservation_unit,
+    settings,
+    django_capture_on_commit_callbacks,
+):
+    """Check that reservations saved in the same transaction invalidate cached results once, after the commit."""
+    reservation_unit_2 = create_reservation_units_in_common_hierarchy(reservation_unit)
+
+    query = reservation_units_reservable_query(order_by="nameFiDesc", first=1)
+    response = graphql(query)
+    assert response.has_errors is False, response
+    assert frt(response) == dt(hour=10)
+
+    settings.COALESCE_SIGNAL_TASKS = True
+
+    with (
+        mock.patch.object(
+            FirstReservableTimeCache, "invalidate", wraps=FirstReservableTimeCache.invalidate
+        ) as invalidate,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        # 1st Jan 10:00 - 11:00 (1h)
+        ReservationFactory.create_for_reservation_unit(
+            reservation_unit=reservation_unit_2,
+            begins_at=_datetime(hour=10),
+            ends_at=_datetime(hour=11),
+        )
+        # 1st Jan 11:00 - 11:30 (30min)
+        ReservationFactory.create_for_reservation_unit(
+            reservation_unit=reservation_unit,
+            begins_at=_datetime(hour=11),
+            ends_at=_datetime(hour=11, minute=30),
+        )
+
+        assert invalidate.call_count == 0
+        assert len(cached_results(reservation_unit.pk)) == 1
+
+    assert invalidate.call_count == 1
+    assert set(invalidate.call_args.args[0]) == {reservation_unit.pk, reservation_unit_2.pk}
+
+    assert len(cached_results(reservation_unit.pk)) == 0
+
+    response = graphql(query)
+    assert response.has_errors is False, response
+    assert frt(response) == dt(hour=11, minute=30)
+
+
+########################################################################################################################
+
+
+@freezegun.freeze_time(NOW)
+def test__reservation_unit__first_reservable_time__cache_invalidated__reservation_unit_updated(
+    graphql, reservation_unit
+):
+    """Check that changes to the reservation unit invalidate its cached results."""
+    create_reservation_units_in_common_hierarchy(reservation_unit)
+
+    query = reservation_units_reservable_query(order_by="nameFiDesc", first=1)
+    response = graphql(query)
+    assert response.has_errors is False, response
+    assert frt(response) == dt(hour=10)
+
+    assert len(cached_results(reservation_unit.pk)) == 1
+
+    reservation_unit.min_reservation_duration = datetime.timedelta(hours=3)
     reservation_unit.save()
 
-    ReservableTimeSpanFactory.create(
-        resource=reservation_unit.origin_hauki_resource,
-        start_datetime=_datetime(hour=10),
-        end_datetime=_datetime(hour=12),
+    assert len(cached_results(reservation_unit.pk)) == 0
+
+    response = graphql(query)
+    assert response.has_errors is False, response
+    assert frt(response) is None
+    assert is_closed(response) is False
+
+
+########################################################################################################################
+
+
+@freezegun.freeze_time(NOW)
+def test__reservation_unit__first_reservable_time__cache_invalidated__access_type_created(graphql, reservation_unit):
+    """Check that access type changes invalidate the reservation unit's cached results."""
+    create_reservation_units_in_common_hierarchy(reservation_unit)
+
+    query = reservation_units_reservable_query_access_type(order_by="nameFiDesc", first=1)
+    response = graphql(query)
+    assert response.has_errors is False, response
+    assert frt_access_type(response) is None
+
+    ReservationUnitAccessTypeFactory.create(
+        reservation_unit=reservation_unit,
+        access_type=AccessType.ACCESS_CODE,
+        begin_date=NOW,
     )
 
-    ReservationUnitHierarchy.refresh()
-    AffectingTimeSpan.refresh()
+    assert len(cached_results(reservation_unit.pk)) == 0
 
-    query_1 = reservation_units_reservable_query(order_by="nameFiAsc", first=1)
-    response_1 = graphql(query_1)
-    assert response_1.has_errors is False, response_1
+    response = graphql(query)
+    assert response.has_errors is False, response
+    assert frt(response) == dt(hour=10)
+    assert frt_access_type(response) == AccessType.ACCESS_CODE
 
-    assert len(response_1) == 1
-    assert frt(response_1) is None
-    assert is_closed(response_1) is True
 
-    query_2 = reservation_units_reservable_query(order_by="nameFiAsc", first=1, offset=1)
-    response_2 = graphql(query_2)
-    assert response_2.has_errors is False, response_2
+########################################################################################################################
 
-    assert len(response_2) == 1
-    assert frt(response_2) == dt(hour=10)
-    assert is_closed(response_2) is False
 
-    query_3 = reservation_units_reservable_query(order_by="nameFiAsc", first=1, offset=1)
-    response_3 = graphql(query_3)
-    assert response_3.has_errors is False, response_3
+@freezegun.freeze_time(NOW)
+def test__reservation_unit__first_reservable_time__precomputed_results_used(graphql, reservation_unit):
+    """Check that pre-calculated results are used with the default filters when all reservation units have them."""
+    reservation_unit_2 = create_reservation_units_in_common_hierarchy(reservation_unit)
+
+    ReservationUnitFirstReservableTime.refresh()
 
-    assert len(response_3) == 1
-    assert frt(response_3) == dt(hour=10)
-    assert is_closed(response_3) is False
+    query = reservation_units_reservable_query(order_by="nameFiAsc", show_only_reservable=True)
+    response = graphql(query)
+    assert response.has_errors is False, response
 
-    # Since we used cached results, we didn't need to make database queries.
-    # Only make queries for:
-    #  1) Count reservation units for FRT calculation
+    assert len(response) == 1
+    assert frt(response) == dt(hour=10)
+    assert is_closed(response) is False
+
+    # No calculation is needed. Only make queries for:
+    #  1) Check that all reservation units have valid pre-calculated results
     #  2) Count reservation units for response
     #  3) Fetch reservation units for response
-    response_3.assert_query_count(3)
+    response.assert_query_count(3)
+
+    query = reservation_units_reservable_query(order_by="nameFiAsc")
+    response = graphql(query)
+    assert response.has_errors is False, response
+
+    assert len(response) == 2
+    assert frt(response, node=0) is None
+    assert is_closed(response, node=0) is True
+    assert frt(response, node=1) == dt(hour=10)
+    assert is_closed(response, node=1) is False
+
+    assert ReservationUnitFirstReservableTime.objects.filter(reservation_unit=reservation_unit_2).exists()
 
 
 ########################################################################################################################
 
 
 @freezegun.freeze_time(NOW)
-def test__reservation_unit__first_reservable_time__cached_results_not_valid_anymore(graphql, reservation_unit):
-    """
-    Check that we correctly identify that one of the cached results is not valid anymore.
-    This triggers a re-calculation for all results up to the current page, since the results
-    might have changed in previous pages too.
-    """
-    common_space = SpaceFactory.create()
+def test__reservation_unit__first_reservable_time__precomputed_results_used__invalidated(graphql, reservation_unit):
+    """Check that only the results of reservation units whose pre-calculated results are invalidated are calculated."""
+    reservation_unit_2 = create_reservation_units_in_common_hierarchy(reservation_unit)
+    reservation_unit_3 = ReservationUnitFactory.create(name="C")
 
-    reservation_unit_2 = ReservationUnitFactory(name="A", spaces=[common_space], unit=reservation_unit.unit)
+    ReservationUnitFirstReservableTime.refresh()
 
-    reservation_unit.name = "B"
-    reservation_unit.spaces.set([common_space])
-    reservation_unit.save()
+    # Change the pre-calculated result of the reservation unit outside the hierarchy,
+    # so that we can see that it's used instead of calculating the result.
+    ReservationUnitFirstReservableTime.objects.filter(reservation_unit=reservation_unit_3).update(
+        first_reservable_datetime=_datetime(hour=15),
+        is_closed=False,
+    )
+
+    # 1st Jan 10:00 - 11:00 (1h)
+    ReservationFactory.create_for_reservation_unit(
+        reservation_unit=reservation_unit_2,
+        begins_at=_datetime(hour=10),
+        ends_at=_datetime(hour=11),
+    )
+
+    # Results of the reservation units in the hierarchy are marked as no longer valid, but not removed.
+    assert ReservationUnitFirstReservableTime.objects.count() == 3
+    assert ReservationUnitFirstReservableTime.objects.filter(valid_until__lte=NOW).count() == 2
+
+    query = reservation_units_reservable_query(order_by="nameFiAsc")
+    response = graphql(query)
+    assert response.has_errors is False, response
+
+    assert len(response) == 3
+    assert frt(response, node=0) is None
+    assert frt(response, node=1) == dt(hour=11)
+    assert frt(response, node=2) == dt(hour=15)
+
+    # Pre-calculated results are only updated by the background task.
+    assert ReservationUnitFirstReservableTime.objects.filter(valid_until__lte=NOW).count() == 2
 
+
+########################################################################################################################
+
+
+@freezegun.freeze_time(NOW)
+def test__reservation_unit__first_reservable_time__precomputed_results_not_used__non_default_filters(
+    graphql, reservation_unit
+):
+    """Check that pre-calculated results are not used if the filters are not the default ones."""
+    create_reservation_units_in_common_hierarchy(reservation_unit)
+
+    ReservationUnitFirstReservableTime.refresh()
+
+    query = reservation_units_reservable_query(
+        order_by="nameFiDesc",
+        first=1,
+        reservable_minimum_duration_minutes=180,
+    )
+    response = graphql(query)
+    assert response.has_errors is False, response
+
+    assert frt(response) is None
+    assert is_closed(response) is False
+
+
+########################################################################################################################
+
+
+@freezegun.freeze_time(NOW)
+def test__reservation_unit__first_reservable_time__reservations_loaded_in_windows(graphql, reservation_unit):
+    """
+    Check that reservations are loaded for later windows of the filter period
+    when the first reservable time is not found in the first window.
+    """
     ReservableTimeSpanFactory.create(
         resource=reservation_unit.origin_hauki_resource,
-        start_datetime=_datetime(hour=13),
-        end_datetime=_datetime(hour=14),
+        start_datetime=_datetime(hour=10),
+        end_datetime=_datetime(hour=12),
     )
-    ReservationUnitAccessTypeFactory.create(
+    ReservableTimeSpanFactory.create(
+        resource=reservation_unit.origin_hauki_resource,
+        start_datetime=_datetime(month=2, day=20, hour=10),
+        end_datetime=_datetime(month=2, day=20, hour=12),
+    )
+
+    # 1st Jan 10:00 - 12:00 (2h)
+    ReservationFactory.create_for_reservation_unit(
         reservation_unit=reservation_unit,
-        access_type=AccessType.ACCESS_CODE,
-        begin_date=NOW,
+        begins_at=_datetime(hour=10),
+        ends_at=_datetime(hour=12),
+    )
+    # 20th Feb 10:00 - 11:00 (1h)
+    ReservationFactory.create_for_reservation_unit(
+        reservation_unit=reservation_unit,
+        begins_at=_datetime(month=2, day=20, hour=10),
+        ends_at=_datetime(month=2, day=20, hour=11),
     )
 
     ReservationUnitHierarchy.refresh()
     AffectingTimeSpan.refresh()
 
-    # Set the cached results manually. Note that one of the results is not valid anymore!
-    cached_results = {
-        # First page
-        str(reservation_unit_2): CachedReservableTime(
-            frt=None,
-            closed=True,
-            access_type=None,
-            valid_until=local_datetime() - datetime.timedelta(minutes=1),  # invalid
-        ).to_dict(),
-        # Second page
-        str(reservation_unit): CachedReservableTime(
-            frt=datetime.datetime.fromisoformat("2025-01-01T10:00:00+02:00"),  # re-calculation will correct this value
-            closed=False,
-            access_type=None,  # re-calculation will correct this value
-            valid_until=local_datetime() + datetime.timedelta(minutes=1),  # valid
-        ).to_dict(),
-    }
-    cache_key = "Y2FsY3VsYXRlX2ZpcnN0X3Jlc2VydmFibGVfdGltZT1UcnVlLG9yZGVyX2J5PVsnbmFtZV9maSdd"
-    cache.set(cache_key, json.dumps(cached_results), timeout=120)
-
-    # Query the second page
-    query = reservation_units_reservable_query_access_type(order_by="nameFiAsc", first=1, offset=1)
-    response = graphql(query)
+    response = graphql(reservation_units_reservable_query())
     assert response.has_errors is False, response
 
-    assert len(response) == 1
-    assert frt(response) == dt(hour=13)
-    assert frt_access_type(response) == AccessType.ACCESS_CODE
+    assert frt(response) == dt(month=2, day=20, hour=11)
     assert is_closed(response) is False
-    assert response.node(0)["pk"] == reservation_unit.pk
-
-    # Since we couldn't use all the cached results,
-    # we needed to fetch data from the database for re-calculation.
-    response.assert_query_count(9)
 
 
 ########################################################################################################################
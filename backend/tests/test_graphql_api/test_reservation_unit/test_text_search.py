@@ -298,3 +298,50 @@ def test_reservation_unit__filter__by_text_search__unauthenticated_user(graphql)
     assert response.has_errors is False, response
     assert len(response.edges) == 1, response
     assert response.node(0) == {"pk": reservation_unit.pk}
+
+
+def test_reservation_unit__update_search_vectors__only_given_reservation_units(graphql):
+    reservation_unit_1 = ReservationUnitFactory.create(name="foo")
+    reservation_unit_2 = ReservationUnitFactory.create(name="foo")
+
+    ReservationUnit.objects.update_search_vectors(pks=[reservation_unit_1.pk])
+
+    graphql.login_with_superuser()
+    query = reservation_units_query(text_search="foo")
+    response = graphql(query)
+
+    assert response.has_errors is False, response
+    assert len(response.edges) == 1, response
+    assert response.node(0) == {"pk": reservation_unit_1.pk}
+
+    assert ReservationUnit.objects.get(pk=reservation_unit_2.pk).search_vector_fi == ""
+
+
+def test_reservation_unit__update_search_vectors__related_object_renamed(graphql):
+    reservation_unit_1 = ReservationUnitFactory.create(equipments__name="foo")
+    reservation_unit_2 = ReservationUnitFactory.create(name="foo")
+
+    ReservationUnit.objects.update_search_vectors()
+
+    equipment = reservation_unit_1.equipments.first()
+    equipment.name = "bar"
+    equipment.save()
+
+    ReservationUnit.objects.filter(equipments=equipment).update_search_vectors()
+
+    graphql.login_with_superuser()
+
+    query = reservation_units_query(text_search="bar")
+    response = graphql(query)
+
+    assert response.has_errors is False, response
+    assert len(response.edges) == 1, response
+    assert response.node(0) == {"pk": reservation_unit_1.pk}
+
+    # Search vectors of other reservation units are not affected.
+    query = reservation_units_query(text_search="foo")
+    response = graphql(query)
+
+    assert response.has_errors is False, response
+    assert len(response.edges) == 1, response
+    assert response.node(0) == {"pk": reservation_unit_2.pk}
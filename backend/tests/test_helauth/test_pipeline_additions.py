@@ -122,6 +122,11 @@ def test_update_user_from_profile__store_prefill_info_in_session_storage():
         "reservee_phone": "0123456789",
     }
 
+    # The time the prefill info was fetched is stored, so that it's not fetched again during reservation creation.
+    fetched_at_call = request.session.mock_calls[1].args
+    assert fetched_at_call[0] == "reservation_prefill_info_fetched_at"
+    assert isinstance(fetched_at_call[1], str)
+
 
 @patch_method(HelsinkiProfileClient.get_token, return_value=None)
 @patch_method(HelsinkiProfileClient.request, return_value=ResponseMock(json_data={}))
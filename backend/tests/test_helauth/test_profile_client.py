@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import datetime
 import re
 from typing import NamedTuple
 from unittest.mock import MagicMock
 
 import pytest
+from django.contrib.sessions.backends.cache import SessionStore
+from freezegun import freeze_time
 from graphene_django_extensions.testing import parametrize_helper
 
 from tilavarauspalvelu.enums import MunicipalityChoice
 from tilavarauspalvelu.integrations.helsinki_profile.clients import HelsinkiProfileClient
+from tilavarauspalvelu.integrations.helsinki_profile.typing import ReservationPrefillInfo
 from tilavarauspalvelu.integrations.sentry import SentryLogger
+from utils.date_utils import local_datetime
 from utils.external_service.errors import (
     ExternalServiceError,
     ExternalServiceParseJSONError,
@@ -376,3 +381,43 @@ def test_helsinki_profile_client__prefill_info__no_token():
     user = UserFactory.create()
     prefill_info = HelsinkiProfileClient.get_reservation_prefill_info(user=user, session={})
     assert prefill_info is None
+
+
+def test_helsinki_profile_client__stored_prefill_info__survives_session_save():
+    prefill_info = ReservationPrefillInfo(
+        reservee_first_name="Example",
+        reservee_last_name="User",
+        reservee_email="user@example.com",
+        reservee_phone="0123456789",
+        reservee_address_zip="00100",
+        municipality=MunicipalityChoice.HELSINKI.value,
+    )
+
+    session = SessionStore()
+    HelsinkiProfileClient.store_reservation_prefill_info(session=session, prefill_info=prefill_info)
+    session.save()
+
+    session = SessionStore(session_key=session.session_key)
+    max_age = datetime.timedelta(hours=1)
+    assert HelsinkiProfileClient.get_stored_reservation_prefill_info(session=session, max_age=max_age) == prefill_info
+
+
+def test_helsinki_profile_client__stored_prefill_info__too_old():
+    prefill_info = ReservationPrefillInfo(
+        reservee_first_name="Example",
+        reservee_last_name="User",
+        reservee_email="user@example.com",
+        reservee_phone=None,
+        reservee_address_zip=None,
+        municipality=None,
+    )
+
+    session = SessionStore()
+    with freeze_time(local_datetime() - datetime.timedelta(hours=2)):
+        HelsinkiProfileClient.store_reservation_prefill_info(session=session, prefill_info=prefill_info)
+    session.save()
+
+    session = SessionStore(session_key=session.session_key)
+    max_age = datetime.timedelta(hours=1)
+    assert HelsinkiProfileClient.get_stored_reservation_prefill_info(session=session, max_age=max_age) is None
+    assert HelsinkiProfileClient.get_stored_reservation_prefill_info(session=session) == prefill_info
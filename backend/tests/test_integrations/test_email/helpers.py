@@ -155,6 +155,7 @@ def get_application_details_urls(section: ApplicationSection) -> dict[str, str]:
 
 BASE_TEMPLATE_CONTEXT_EN = (
     {
+        "language": "en",
         "current_year": "2024",
         "font_src": "https://makasiini.hel.ninja/delivery/HelsinkiGrotesk/565d73a693abe0776c801607ac28f0bf.woff",
         "helsinki_city": "City of Helsinki",
@@ -172,6 +173,7 @@ def get_application_details_urls(section: ApplicationSection) -> dict[str, str]:
 )
 BASE_TEMPLATE_CONTEXT_FI = (
     {
+        "language": "fi",
         "current_year": "2024",
         "font_src": "https://makasiini.hel.ninja/delivery/HelsinkiGrotesk/565d73a693abe0776c801607ac28f0bf.woff",
         "helsinki_city": "Helsingin kaupunki",
@@ -189,6 +191,7 @@ def get_application_details_urls(section: ApplicationSection) -> dict[str, str]:
 )
 BASE_TEMPLATE_CONTEXT_SV = (
     {
+        "language": "sv",
         "current_year": "2024",
         "font_src": "https://makasiini.hel.ninja/delivery/HelsinkiGrotesk/565d73a693abe0776c801607ac28f0bf.woff",
         "helsinki_city": "Helsingfors stad",
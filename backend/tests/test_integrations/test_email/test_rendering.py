@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from unittest import mock
+
+import mjml
+import pytest
+from django.core.cache import cache
+from django.template.loader import get_template
+
+from tilavarauspalvelu.admin.email_template.utils import get_mock_data
+from tilavarauspalvelu.integrations.email import rendering
+from tilavarauspalvelu.integrations.email.rendering import compile_html_template, compile_mjml_layout, render_html
+from tilavarauspalvelu.integrations.email.typing import EmailType
+
+
+@pytest.fixture(autouse=True)
+def clear_compiled_html():
+    compile_html_template.cache_clear()
+    cache.clear()
+    yield
+    compile_html_template.cache_clear()
+    cache.clear()
+
+
+@pytest.mark.parametrize("email_type", EmailType.options, ids=lambda email_type: email_type.value)
+def test_render_html__same_as_compiling_rendered_mjml(email_type):
+    context = get_mock_data(email_type=email_type, language="fi")
+
+    html = render_html(email_type=email_type, context=context)
+    expected = mjml.mjml2html(get_template(email_type.html_path).render(context)).strip()
+
+    # Jinja statements in the compiled template can leave different whitespace than the compiler.
+    assert "".join(html.split()) == "".join(expected.split())
+
+
+def test_render_html__compiled_once_per_language():
+    email_type = EmailType.RESERVATION_CANCELLED
+    context_fi_1 = get_mock_data(email_type=email_type, language="fi", email_recipient_name="Matti")
+    context_fi_2 = get_mock_data(email_type=email_type, language="fi", email_recipient_name="Maija")
+    context_en = get_mock_data(email_type=email_type, language="en", email_recipient_name="Matti")
+
+    with mock.patch.object(rendering.mjml, "mjml2html", wraps=mjml.mjml2html) as compile_mock:
+        html_fi_1 = render_html(email_type=email_type, context=context_fi_1)
+        html_fi_2 = render_html(email_type=email_type, context=context_fi_2)
+        html_en = render_html(email_type=email_type, context=context_en)
+
+    assert compile_mock.call_count == 2
+
+    assert "Hei Matti" in html_fi_1
+    assert "Hei Maija" in html_fi_2
+    assert "Hi Matti" in html_en
+
+
+def test_render_html__compiled_template_in_shared_cache():
+    email_type = EmailType.RESERVATION_CANCELLED
+    context = get_mock_data(email_type=email_type, language="fi", email_recipient_name="Matti")
+
+    with (
+        mock.patch.object(rendering.mjml, "mjml2html", wraps=mjml.mjml2html) as compile_mock,
+        mock.patch.object(rendering, "cache", wraps=cache) as cache_mock,
+    ):
+        html_1 = render_html(email_type=email_type, context=context)
+
+        # Other processes use the shared cache
+        compile_html_template.cache_clear()
+        html_2 = render_html(email_type=email_type, context=context)
+
+    assert compile_mock.call_count == 1
+    assert html_1 == html_2
+    assert "Hei Matti" in html_1
+
+    # Compiled templates don't contain the data of the rendered emails
+    assert cache_mock.set.call_count == 1
+    compiled_html = cache_mock.set.call_args.args[1]
+    assert "{{ email_recipient_name | safe }}" in compiled_html
+    assert "Matti" not in compiled_html
+
+
+def test_compile_mjml_layout__jinja_tags_left_intact():
+    layout = (
+        "<mjml><mj-body><mj-section><mj-column>"
+        "{% if name %}<mj-text>{{ name }}</mj-text>{% endif %}"
+        "{% for item in items %}<mj-text>{% if item %}{{ item }}{% endif %}</mj-text>{% endfor %}"
+        "</mj-column></mj-section></mj-body></mjml>"
+    )
+
+    html = compile_mjml_layout(layout)
+
+    assert "{% if name %}<tr>" in html
+    assert "</tr>{% endif %}" in html
+    assert "{% for item in items %}<tr>" in html
+    assert "{% if item %}{{ item }}{% endif %}</div>" in html
+    assert "mj-raw" not in html
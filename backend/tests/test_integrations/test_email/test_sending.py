@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from unittest import mock
+
+from django.core.mail import get_connection
 from django.test import override_settings
 
 from tilavarauspalvelu.integrations.email.sending import (
@@ -71,6 +74,24 @@ def test_send_emails_in_batches_task__multiple_batches(outbox):
     assert outbox[1].alternatives == [("<html>content</html>", "text/html")]
 
 
+@override_settings(SEND_EMAILS=True, EMAIL_MAX_RECIPIENTS=1)
+def test_send_emails_in_batches_task__multiple_batches__same_connection(outbox):
+    path = "tilavarauspalvelu.integrations.email.sending.get_connection"
+    with mock.patch(path, wraps=get_connection) as connection_mock:
+        send_emails_in_batches_task(
+            EmailData(
+                recipients=["user1@example.com", "user2@example.com", "user3@example.com"],
+                subject="subject",
+                text_content="content",
+                html_content="<html>content</html>",
+                valid_until=local_datetime(),
+            )
+        )
+
+    assert len(outbox) == 3
+    assert connection_mock.call_count == 1
+
+
 @override_settings(SEND_EMAILS=True)
 def test_send_emails_in_batches_task__attachments(outbox):
     send_emails_in_batches_task(
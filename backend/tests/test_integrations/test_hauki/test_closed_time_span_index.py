@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import datetime
+import random
+from copy import copy
+
+import pytest
+
+from tilavarauspalvelu.integrations.opening_hours.time_span_element import TimeSpanElement
+from tilavarauspalvelu.integrations.opening_hours.time_span_element_array import TimeSpanElementArray
+from tilavarauspalvelu.integrations.opening_hours.time_span_element_utils import (
+    ClosedTimeSpanIndex,
+    override_reservable_with_closed_time_spans,
+)
+from utils.utils import with_indices
+
+from tests.test_integrations.test_hauki.test_reservable_time_spans_client import _get_date
+
+
+def _reference_override_reservable_with_closed_time_spans(
+    reservable_time_spans: list[TimeSpanElement],
+    closed_time_spans: list[TimeSpanElement],
+) -> list[TimeSpanElement]:
+    """The original O(n * m) implementation, used to check that the indexed implementation gives the same results."""
+    for closed_time_span in closed_time_spans:
+        for reservable_index, reservable_time_span in (gen := with_indices(reservable_time_spans)):
+            if not reservable_time_span.overlaps_with(closed_time_span):
+                continue
+
+            if reservable_time_span.fully_inside_of(closed_time_span):
+                gen.delete_item(reservable_index)
+                continue
+
+            if closed_time_span.fully_inside_of(reservable_time_span):
+                new_reservable_time_span = copy(reservable_time_span)
+                reservable_time_spans.append(new_reservable_time_span)
+                reservable_time_span.end_datetime = closed_time_span.buffered_start_datetime
+                new_reservable_time_span.start_datetime = closed_time_span.buffered_end_datetime
+
+            elif reservable_time_span.starts_inside_of(closed_time_span):
+                reservable_time_span.start_datetime = closed_time_span.buffered_end_datetime
+
+            elif reservable_time_span.ends_inside_of(closed_time_span):
+                reservable_time_span.end_datetime = closed_time_span.buffered_start_datetime
+
+            if reservable_time_span.start_datetime >= reservable_time_span.end_datetime:
+                gen.delete_item(reservable_index)
+                continue
+
+    reservable_time_spans[:] = sorted(
+        (ts for ts in reservable_time_spans if ts.start_datetime < ts.end_datetime),
+        key=lambda ts: ts.start_datetime,
+    )
+
+    return reservable_time_spans
+
+
+def _random_reservable_time_spans(rng: random.Random) -> list[TimeSpanElement]:
+    """Non-overlapping reservable time spans (in random order), like the ones given to the normalisation."""
+    time_spans: list[TimeSpanElement] = []
+    current = _get_date(day=1)
+    for _ in range(rng.randint(0, 15)):
+        current += datetime.timedelta(minutes=15 * rng.randint(0, 12))
+        end = current + datetime.timedelta(minutes=15 * rng.randint(1, 24))
+        time_spans.append(TimeSpanElement(start_datetime=current, end_datetime=end, is_reservable=True))
+        current = end
+
+    rng.shuffle(time_spans)
+    return time_spans
+
+
+def _random_closed_time_spans(rng: random.Random) -> list[TimeSpanElement]:
+    """Closed time spans (possibly with buffers or zero duration) that can overlap each other freely."""
+    time_spans: list[TimeSpanElement] = []
+    for _ in range(rng.randint(0, 30)):
+        start = _get_date(day=1) + datetime.timedelta(minutes=15 * rng.randint(-8, 200))
+        end = start + datetime.timedelta(minutes=15 * rng.randint(0, 16))
+        time_spans.append(
+            TimeSpanElement(
+                start_datetime=start,
+                end_datetime=end,
+                is_reservable=False,
+                buffer_time_before=datetime.timedelta(minutes=15 * rng.choice([0, 0, 1, 2])),
+                buffer_time_after=datetime.timedelta(minutes=15 * rng.choice([0, 0, 1, 2])),
+            )
+        )
+    return time_spans
+
+
+@pytest.mark.parametrize("seed", range(500))
+def test__closed_time_span_index__same_result_as_reference_implementation(seed):
+    rng = random.Random(seed)
+
+    reservable_time_spans = _random_reservable_time_spans(rng)
+    closed_time_spans = _random_closed_time_spans(rng)
+
+    expected = _reference_override_reservable_with_closed_time_spans(
+        reservable_time_spans=[copy(ts) for ts in reservable_time_spans],
+        closed_time_spans=[copy(ts) for ts in closed_time_spans],
+    )
+    result = override_reservable_with_closed_time_spans(
+        reservable_time_spans=[copy(ts) for ts in reservable_time_spans],
+        closed_time_spans=[copy(ts) for ts in closed_time_spans],
+    )
+
+    assert result == expected
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test__closed_time_span_index__index_can_be_reused(seed):
+    rng = random.Random(seed)
+
+    closed_time_spans = _random_closed_time_spans(rng)
+    index = ClosedTimeSpanIndex(closed_time_spans)
+
+    for _ in range(5):
+        reservable_time_spans = _random_reservable_time_spans(rng)
+
+        expected = _reference_override_reservable_with_closed_time_spans(
+            reservable_time_spans=[copy(ts) for ts in reservable_time_spans],
+            closed_time_spans=[copy(ts) for ts in closed_time_spans],
+        )
+        result = index.override_reservable_time_spans([copy(ts) for ts in reservable_time_spans])
+
+        assert result == expected
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test__closed_time_span_index__consecutive_overrides_same_as_combined(seed):
+    rng = random.Random(seed)
+
+    reservable_time_spans = _random_reservable_time_spans(rng)
+    first_closed_time_spans = _random_closed_time_spans(rng)
+    second_closed_time_spans = _random_closed_time_spans(rng)
+
+    expected = _reference_override_reservable_with_closed_time_spans(
+        reservable_time_spans=[copy(ts) for ts in reservable_time_spans],
+        closed_time_spans=[copy(ts) for ts in first_closed_time_spans + second_closed_time_spans],
+    )
+
+    result = ClosedTimeSpanIndex(first_closed_time_spans).override_reservable_time_spans(
+        [copy(ts) for ts in reservable_time_spans],
+    )
+    result = ClosedTimeSpanIndex(second_closed_time_spans).override_reservable_time_spans(result)
+
+    assert result == expected
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test__closed_time_span_index__time_span_element_arrays(seed):
+    rng = random.Random(seed)
+
+    reservable_time_spans = _random_reservable_time_spans(rng)
+    closed_time_spans = _random_closed_time_spans(rng)
+    first_array_time_spans = _random_closed_time_spans(rng)
+    second_array_time_spans = _random_closed_time_spans(rng)
+
+    expected = _reference_override_reservable_with_closed_time_spans(
+        reservable_time_spans=[copy(ts) for ts in reservable_time_spans],
+        closed_time_spans=[copy(ts) for ts in closed_time_spans + first_array_time_spans + second_array_time_spans],
+    )
+
+    index = ClosedTimeSpanIndex(
+        closed_time_spans,
+        TimeSpanElementArray.from_time_span_elements(first_array_time_spans),
+        TimeSpanElementArray.from_time_span_elements(second_array_time_spans),
+    )
+    result = index.override_reservable_time_spans([copy(ts) for ts in reservable_time_spans])
+
+    assert result == expected
+
+
+def test__closed_time_span_index__zero_duration_closed_time_span_splits_reservable_time_span():
+    reservable_time_spans = [
+        TimeSpanElement(
+            start_datetime=_get_date(day=1, hour=10),
+            end_datetime=_get_date(day=1, hour=14),
+            is_reservable=True,
+        ),
+    ]
+
+    closed_time_spans = [
+        TimeSpanElement(
+            start_datetime=_get_date(day=1, hour=12),
+            end_datetime=_get_date(day=1, hour=12),
+            is_reservable=False,
+        ),
+        # Zero duration time span at the edge of the reservable time span doesn't do anything.
+        TimeSpanElement(
+            start_datetime=_get_date(day=1, hour=14),
+            end_datetime=_get_date(day=1, hour=14),
+            is_reservable=False,
+        ),
+    ]
+
+    normalised_time_spans = override_reservable_with_closed_time_spans(reservable_time_spans, closed_time_spans)
+
+    assert normalised_time_spans == [
+        TimeSpanElement(
+            start_datetime=_get_date(day=1, hour=10),
+            end_datetime=_get_date(day=1, hour=12),
+            is_reservable=True,
+        ),
+        TimeSpanElement(
+            start_datetime=_get_date(day=1, hour=12),
+            end_datetime=_get_date(day=1, hour=14),
+            is_reservable=True,
+        ),
+    ]
+
+
+def test__closed_time_span_index__buffers_are_closed():
+    reservable_time_spans = [
+        TimeSpanElement(
+            start_datetime=_get_date(day=1, hour=10),
+            end_datetime=_get_date(day=1, hour=16),
+            is_reservable=True,
+        ),
+    ]
+
+    closed_time_spans = [
+        TimeSpanElement(
+            start_datetime=_get_date(day=1, hour=12),
+            end_datetime=_get_date(day=1, hour=13),
+            is_reservable=False,
+            buffer_time_before=datetime.timedelta(minutes=30),
+            buffer_time_after=datetime.timedelta(hours=1),
+        ),
+    ]
+
+    normalised_time_spans = override_reservable_with_closed_time_spans(reservable_time_spans, closed_time_spans)
+
+    assert normalised_time_spans == [
+        TimeSpanElement(
+            start_datetime=_get_date(day=1, hour=10),
+            end_datetime=_get_date(day=1, hour=11, minute=30),
+            is_reservable=True,
+        ),
+        TimeSpanElement(
+            start_datetime=_get_date(day=1, hour=14),
+            end_datetime=_get_date(day=1, hour=16),
+            is_reservable=True,
+        ),
+    ]
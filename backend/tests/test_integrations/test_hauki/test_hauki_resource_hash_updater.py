@@ -8,7 +8,15 @@
 from django.conf import settings
 
 from tilavarauspalvelu.constants import NEVER_ANY_OPENING_HOURS_HASH
+from tilavarauspalvelu.enums import HaukiResourceState
 from tilavarauspalvelu.integrations.opening_hours.hauki_api_client import HaukiAPIClient
+from tilavarauspalvelu.integrations.opening_hours.hauki_api_types import (
+    HaukiAPIOpeningHoursResponseDate,
+    HaukiAPIOpeningHoursResponseItem,
+    HaukiAPIOpeningHoursResponseResource,
+    HaukiAPIOpeningHoursResponseTime,
+    HaukiTranslatedField,
+)
 from tilavarauspalvelu.integrations.opening_hours.hauki_resource_hash_updater import HaukiResourceHashUpdater
 from tilavarauspalvelu.integrations.opening_hours.reservable_time_span_client import ReservableTimeSpanClient
 from tilavarauspalvelu.models import ReservableTimeSpan
@@ -48,6 +56,7 @@ def test__HaukiResourceHashUpdater__init__pass_empty_list():
 
 
 @patch_method(HaukiAPIClient._get_resources)
+@patch_method(ReservableTimeSpanClient.fetch_opening_hours)
 @patch_method(ReservableTimeSpanClient.run, return_value=[])
 def test__HaukiResourceHashUpdater__no_initial_hash():
     origin_hauki_resource: OriginHaukiResource = OriginHaukiResourceFactory.create(
@@ -69,6 +78,7 @@ def test__HaukiResourceHashUpdater__no_initial_hash():
 
 @freezegun.freeze_time("2020-01-01 08:00:00")
 @patch_method(HaukiAPIClient._get_resources)
+@patch_method(ReservableTimeSpanClient.fetch_opening_hours)
 @patch_method(ReservableTimeSpanClient.run, return_value=[])
 def test__HaukiResourceHashUpdater__handle_existing_reservable_time_spans():
     origin_hauki_resource: OriginHaukiResource = OriginHaukiResourceFactory.create(
@@ -123,6 +133,7 @@ def test__HaukiResourceHashUpdater__handle_existing_reservable_time_spans():
 
 @freezegun.freeze_time("2020-01-01")
 @patch_method(HaukiAPIClient._get_resources)
+@patch_method(ReservableTimeSpanClient.fetch_opening_hours)
 @patch_method(ReservableTimeSpanClient.run, return_value=[])
 def test__HaukiResourceHashUpdater__process_single_hauki_resource__hash_changed():
     hauki_resource = OriginHaukiResourceFactory.create(id=999, opening_hours_hash="OLD", latest_fetched_date=None)
@@ -139,6 +150,7 @@ def test__HaukiResourceHashUpdater__process_single_hauki_resource__hash_changed(
 
 @freezegun.freeze_time("2020-01-01")
 @patch_method(HaukiAPIClient._get_resources)
+@patch_method(ReservableTimeSpanClient.fetch_opening_hours)
 @patch_method(ReservableTimeSpanClient.run, return_value=[])
 def test__HaukiResourceHashUpdater__process_single_hauki_resource__hash_unchanged__no_latest_fetched_date():
     hauki_resource = OriginHaukiResourceFactory.create(id=999, opening_hours_hash="OLD", latest_fetched_date=None)
@@ -155,6 +167,7 @@ def test__HaukiResourceHashUpdater__process_single_hauki_resource__hash_unchange
 
 @freezegun.freeze_time("2020-01-01")
 @patch_method(HaukiAPIClient._get_resources)
+@patch_method(ReservableTimeSpanClient.fetch_opening_hours)
 @patch_method(ReservableTimeSpanClient.run, return_value=[])
 def test__HaukiResourceHashUpdater__process_single_hauki_resource__hash_unchanged__latest_fetched_date_is_stale():
     hauki_resource = OriginHaukiResourceFactory.create(
@@ -173,6 +186,7 @@ def test__HaukiResourceHashUpdater__process_single_hauki_resource__hash_unchange
 
 @freezegun.freeze_time("2020-01-01")
 @patch_method(HaukiAPIClient._get_resources)
+@patch_method(ReservableTimeSpanClient.fetch_opening_hours)
 @patch_method(ReservableTimeSpanClient.run, return_value=[])
 def test__HaukiResourceHashUpdater__process_single_hauki_resource__hash_unchanged__latest_fetched_date_is_up_to_date():
     cutoff_date = local_date() + datetime.timedelta(days=settings.HAUKI_DAYS_TO_FETCH + 1)  # Late enough to not update
@@ -191,6 +205,7 @@ def test__HaukiResourceHashUpdater__process_single_hauki_resource__hash_unchange
 
 @freezegun.freeze_time("2020-01-01")
 @patch_method(HaukiAPIClient._get_resources)
+@patch_method(ReservableTimeSpanClient.fetch_opening_hours)
 @patch_method(ReservableTimeSpanClient.run, return_value=[])
 def test__HaukiResourceHashUpdater__process_single_hauki_resource__hash_updated__never_any_opening_hours_hash():
     hauki_resource = OriginHaukiResourceFactory.create(id=999, opening_hours_hash="OLD", latest_fetched_date=None)
@@ -205,3 +220,65 @@ def test__HaukiResourceHashUpdater__process_single_hauki_resource__hash_updated_
 
     assert hash_updater.resources_updated == [hauki_resource]
     assert ReservableTimeSpanClient.run.call_count == 0  # Not called, due to hash being known to not have hours
+
+
+def _get_resource_opening_hours(*, hauki_resource_id: int, **kwargs) -> HaukiAPIOpeningHoursResponseItem:
+    """Resource is reservable on 2020-01-02 from 10:00 to 12:00."""
+    return HaukiAPIOpeningHoursResponseItem(
+        resource=HaukiAPIOpeningHoursResponseResource(
+            id=hauki_resource_id,
+            name=HaukiTranslatedField(fi="Test resource", sv=None, en=None),
+            timezone="Europe/Helsinki",
+            origins=[],
+        ),
+        opening_hours=[
+            HaukiAPIOpeningHoursResponseDate(
+                date="2020-01-02",
+                times=[
+                    HaukiAPIOpeningHoursResponseTime(
+                        name="",
+                        description="",
+                        start_time="10:00:00",
+                        end_time="12:00:00",
+                        end_time_on_next_day=False,
+                        full_day=False,
+                        resource_state=HaukiResourceState.OPEN_AND_RESERVABLE,
+                        periods=[1],
+                    ),
+                ],
+            ),
+        ],
+    )
+
+
+@freezegun.freeze_time("2020-01-01")
+@patch_method(HaukiAPIClient._get_resources)
+@patch_method(HaukiAPIClient.get_resource_opening_hours, side_effect=_get_resource_opening_hours)
+def test__HaukiResourceHashUpdater__multiple_resources_fetched_concurrently(settings):
+    settings.HAUKI_SYNC_WORKERS = 4
+
+    resources = [
+        OriginHaukiResourceFactory.create(id=resource_id, opening_hours_hash="OLD", latest_fetched_date=None)
+        for resource_id in range(1, 11)
+    ]
+
+    HaukiAPIClient._get_resources.return_value = {
+        "results": [{"id": resource.id, "date_periods_hash": "UPDATED"} for resource in resources]
+    }
+
+    hash_updater = HaukiResourceHashUpdater()
+    hash_updater.run()
+
+    assert sorted(resource.id for resource in hash_updater.resources_updated) == list(range(1, 11))
+    assert hash_updater.total_time_spans_created == 10
+    assert HaukiAPIClient.get_resource_opening_hours.call_count == 10
+
+    for resource in resources:
+        resource.refresh_from_db()
+        assert resource.opening_hours_hash == "UPDATED"
+        assert resource.latest_fetched_date is not None
+
+        time_spans = list(ReservableTimeSpan.objects.filter(resource=resource))
+        assert len(time_spans) == 1
+        assert time_spans[0].start_datetime == local_datetime(2020, 1, 2, 10)
+        assert time_spans[0].end_datetime == local_datetime(2020, 1, 2, 12)
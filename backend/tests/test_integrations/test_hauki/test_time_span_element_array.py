@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import datetime
+import random
+
+import pytest
+
+from tilavarauspalvelu.integrations.opening_hours.time_span_element import TimeSpanElement
+from tilavarauspalvelu.integrations.opening_hours.time_span_element_array import TimeSpanElementArray
+from tilavarauspalvelu.integrations.opening_hours.time_span_element_utils import merge_overlapping_time_span_elements
+
+from tests.test_integrations.test_hauki.test_reservable_time_spans_client import _get_date
+
+
+def _random_closed_time_spans(rng: random.Random) -> list[TimeSpanElement]:
+    time_spans: list[TimeSpanElement] = []
+    for _ in range(rng.randint(0, 30)):
+        start = _get_date(day=1) + datetime.timedelta(minutes=15 * rng.randint(0, 200))
+        end = start + datetime.timedelta(minutes=15 * rng.randint(1, 16))
+        time_spans.append(
+            TimeSpanElement(
+                start_datetime=start,
+                end_datetime=end,
+                is_reservable=False,
+                buffer_time_before=datetime.timedelta(minutes=15 * rng.choice([0, 0, 1, 2, 4])),
+                buffer_time_after=datetime.timedelta(minutes=15 * rng.choice([0, 0, 1, 2, 4])),
+            )
+        )
+    return time_spans
+
+
+def test__time_span_element_array__round_trip():
+    time_span_elements = [
+        TimeSpanElement(
+            start_datetime=_get_date(day=1, hour=10),
+            end_datetime=_get_date(day=1, hour=12, minute=30),
+            is_reservable=False,
+            buffer_time_before=datetime.timedelta(minutes=30),
+        ),
+        TimeSpanElement(
+            start_datetime=_get_date(day=2, hour=10),
+            end_datetime=_get_date(day=2, hour=12),
+            is_reservable=False,
+            buffer_time_after=datetime.timedelta(seconds=1, microseconds=1),
+        ),
+    ]
+
+    time_span_array = TimeSpanElementArray.from_time_span_elements(time_span_elements)
+
+    assert len(time_span_array) == 2
+    assert time_span_array.to_time_span_elements() == time_span_elements
+
+
+def test__time_span_element_array__extend():
+    first = TimeSpanElementArray()
+    first.append(start_datetime=_get_date(day=1, hour=10), end_datetime=_get_date(day=1, hour=12))
+    second = TimeSpanElementArray()
+    second.append(start_datetime=_get_date(day=1, hour=11), end_datetime=_get_date(day=1, hour=13))
+
+    first.extend(second)
+
+    assert first.merge_overlapping().to_time_span_elements() == [
+        TimeSpanElement(
+            start_datetime=_get_date(day=1, hour=10),
+            end_datetime=_get_date(day=1, hour=13),
+            is_reservable=False,
+        ),
+    ]
+
+
+@pytest.mark.parametrize("seed", range(500))
+def test__time_span_element_array__merge_overlapping__same_result_as_time_span_elements(seed):
+    rng = random.Random(seed)
+    time_span_elements = _random_closed_time_spans(rng)
+
+    time_span_array = TimeSpanElementArray.from_time_span_elements(time_span_elements)
+
+    merged = time_span_array.merge_overlapping().to_time_span_elements()
+
+    assert merged == merge_overlapping_time_span_elements(time_span_elements)
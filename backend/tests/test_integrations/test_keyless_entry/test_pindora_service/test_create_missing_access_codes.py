@@ -6,13 +6,21 @@
 import pytest
 
 from tilavarauspalvelu.enums import AccessType, ReservationStateChoice, ReservationTypeChoice
-from tilavarauspalvelu.integrations.keyless_entry import PindoraService
-from tilavarauspalvelu.integrations.keyless_entry.exceptions import PindoraConflictError
-from tilavarauspalvelu.integrations.keyless_entry.typing import PindoraAccessCodeModifyResponse
-from tilavarauspalvelu.typing import PindoraReservationInfoData
+from tilavarauspalvelu.integrations.keyless_entry import PindoraClient, PindoraService
+from tilavarauspalvelu.integrations.keyless_entry.exceptions import PindoraAPIError, PindoraConflictError
+from tilavarauspalvelu.integrations.keyless_entry.typing import (
+    PindoraAccessCodeModifyResponse,
+    PindoraReservationResponse,
+)
 from utils.date_utils import local_datetime
 
-from tests.factories import ApplicationSectionFactory, ReservationFactory, ReservationSeriesFactory, UserFactory
+from tests.factories import (
+    ApplicationSectionFactory,
+    ReservationFactory,
+    ReservationSeriesFactory,
+    ReservationUnitFactory,
+    UserFactory,
+)
 from tests.helpers import patch_method
 
 pytestmark = [
@@ -20,7 +28,13 @@
 ]
 
 
-@patch_method(PindoraService.create_access_code)
+@patch_method(
+    PindoraClient.create_reservation,
+    return_value=PindoraReservationResponse(
+        access_code_generated_at=local_datetime(2024, 1, 1),
+        access_code_is_active=True,
+    ),
+)
 @freezegun.freeze_time(local_datetime(2024, 1, 1))
 def test_create_missing_access_codes__reservation():
     reservation = ReservationFactory.create(
@@ -37,12 +51,22 @@ def test_create_missing_access_codes__reservation():
 
     PindoraService.create_missing_access_codes()
 
-    assert PindoraService.create_access_code.called is True
-    assert PindoraService.create_access_code.call_args.kwargs["obj"] == reservation
-    assert PindoraService.create_access_code.call_args.kwargs["is_active"] is True
+    assert PindoraClient.create_reservation.called is True
+    assert PindoraClient.create_reservation.call_args.args[0] == reservation
+    assert PindoraClient.create_reservation.call_args.kwargs["is_active"] is True
+
+    reservation.refresh_from_db()
+    assert reservation.access_code_generated_at == local_datetime(2024, 1, 1)
+    assert reservation.access_code_is_active is True
 
 
-@patch_method(PindoraService.create_access_code)
+@patch_method(
+    PindoraClient.create_reservation,
+    return_value=PindoraReservationResponse(
+        access_code_generated_at=local_datetime(2024, 1, 1),
+        access_code_is_active=False,
+    ),
+)
 @freezegun.freeze_time(local_datetime(2024, 1, 1))
 def test_create_missing_access_codes__reservation__as_inactive():
     reservation = ReservationFactory.create(
@@ -59,12 +83,16 @@ def test_create_missing_access_codes__reservation__as_inactive():
 
     PindoraService.create_missing_access_codes()
 
-    assert PindoraService.create_access_code.called is True
-    assert PindoraService.create_access_code.call_args.kwargs["obj"] == reservation
-    assert PindoraService.create_access_code.call_args.kwargs["is_active"] is False
+    assert PindoraClient.create_reservation.called is True
+    assert PindoraClient.create_reservation.call_args.args[0] == reservation
+    assert PindoraClient.create_reservation.call_args.kwargs["is_active"] is False
+
+    reservation.refresh_from_db()
+    assert reservation.access_code_generated_at == local_datetime(2024, 1, 1)
+    assert reservation.access_code_is_active is False
 
 
-@patch_method(PindoraService.create_access_code)
+@patch_method(PindoraClient.create_reservation)
 @freezegun.freeze_time(local_datetime(2024, 1, 1))
 def test_create_missing_access_codes__reservation__not_confirmed():
     ReservationFactory.create(
@@ -81,10 +109,10 @@ def test_create_missing_access_codes__reservation__not_confirmed():
 
     PindoraService.create_missing_access_codes()
 
-    assert PindoraService.create_access_code.called is False
+    assert PindoraClient.create_reservation.called is False
 
 
-@patch_method(PindoraService.create_access_code)
+@patch_method(PindoraClient.create_reservation)
 @freezegun.freeze_time(local_datetime(2024, 1, 1))
 def test_create_missing_access_codes__reservation__already_generated():
     ReservationFactory.create(
@@ -101,22 +129,15 @@ def test_create_missing_access_codes__reservation__already_generated():
 
     PindoraService.create_missing_access_codes()
 
-    assert PindoraService.create_access_code.called is False
+    assert PindoraClient.create_reservation.called is False
 
 
-@patch_method(PindoraService.create_access_code, side_effect=PindoraConflictError("conflict"))
+@patch_method(PindoraClient.create_reservation, side_effect=PindoraConflictError("conflict"))
 @patch_method(
-    PindoraService.get_access_code,
-    return_value=PindoraReservationInfoData(
-        access_code="1234",
+    PindoraClient.get_reservation,
+    return_value=PindoraReservationResponse(
         access_code_generated_at=local_datetime(2024, 1, 1),
         access_code_is_active=True,
-        access_code_keypad_url="1234",
-        access_code_phone_number="1234",
-        access_code_sms_number="1234",
-        access_code_sms_message="1234",
-        access_code_begins_at=local_datetime(2024, 1, 1, 12),
-        access_code_ends_at=local_datetime(2024, 1, 1, 13),
     ),
 )
 @freezegun.freeze_time(local_datetime(2024, 1, 1))
@@ -136,15 +157,50 @@ def test_create_missing_access_codes__reservation__get_if_exists():
 
     PindoraService.create_missing_access_codes()
 
-    assert PindoraService.create_access_code.called is True
-    assert PindoraService.get_access_code.called is True
-    assert PindoraService.get_access_code.call_args.kwargs["obj"] == reservation
+    assert PindoraClient.create_reservation.called is True
+    assert PindoraClient.get_reservation.called is True
+    assert PindoraClient.get_reservation.call_args.args[0] == reservation
 
     reservation.refresh_from_db()
     assert reservation.access_code_generated_at == local_datetime(2024, 1, 1)
     assert reservation.access_code_is_active is True
 
 
+@freezegun.freeze_time(local_datetime(2024, 1, 1))
+def test_create_missing_access_codes__reservation__multiple__error_does_not_stop_others():
+    reservation_unit = ReservationUnitFactory.create()
+    reservations = ReservationFactory.create_batch(
+        3,
+        reservation_unit=reservation_unit,
+        reservation_series=None,
+        begins_at=local_datetime(2024, 1, 1, 12),
+        ends_at=local_datetime(2024, 1, 1, 13),
+        access_type=AccessType.ACCESS_CODE,
+        state=ReservationStateChoice.CONFIRMED,
+        type=ReservationTypeChoice.BLOCKED,
+        access_code_is_active=False,
+        access_code_generated_at=None,
+    )
+    failing = reservations[1]
+
+    def create_reservation(reservation, *, is_active):
+        if reservation == failing:
+            raise PindoraAPIError
+        return PindoraReservationResponse(access_code_generated_at=local_datetime(), access_code_is_active=is_active)
+
+    with patch_method(PindoraClient.create_reservation, side_effect=create_reservation):
+        PindoraService.create_missing_access_codes()
+
+    assert PindoraClient.create_reservation.call_count == 3
+
+    for reservation in reservations:
+        reservation.refresh_from_db()
+
+    assert reservations[0].access_code_generated_at == local_datetime(2024, 1, 1)
+    assert reservations[1].access_code_generated_at is None
+    assert reservations[2].access_code_generated_at == local_datetime(2024, 1, 1)
+
+
 @patch_method(PindoraService.create_access_code)
 @freezegun.freeze_time(local_datetime(2024, 1, 1))
 def test_create_missing_access_codes__series():
@@ -6,7 +6,7 @@
 import pytest
 
 from tilavarauspalvelu.enums import AccessType, ReservationStateChoice, ReservationTypeChoice
-from tilavarauspalvelu.integrations.keyless_entry import PindoraService
+from tilavarauspalvelu.integrations.keyless_entry import PindoraClient, PindoraService
 from tilavarauspalvelu.integrations.keyless_entry.exceptions import PindoraNotFoundError
 from tilavarauspalvelu.integrations.keyless_entry.typing import PindoraAccessCodeModifyResponse
 from utils.date_utils import local_datetime
@@ -19,8 +19,8 @@
 ]
 
 
-@patch_method(PindoraService.activate_access_code)
-@patch_method(PindoraService.deactivate_access_code)
+@patch_method(PindoraClient.activate_reservation_access_code)
+@patch_method(PindoraClient.deactivate_reservation_access_code)
 @freezegun.freeze_time(local_datetime(2024, 1, 1))
 def test_update_access_code_is_active__reservation__active_when_should_be_inactive():
     reservation = ReservationFactory.create(
@@ -37,13 +37,17 @@ def test_update_access_code_is_active__reservation__active_when_should_be_inacti
 
     PindoraService.update_access_code_is_active()
 
-    assert PindoraService.activate_access_code.called is False
-    assert PindoraService.deactivate_access_code.called is True
-    assert PindoraService.deactivate_access_code.call_args.kwargs["obj"] == reservation
+    assert PindoraClient.activate_reservation_access_code.called is False
+    assert PindoraClient.deactivate_reservation_access_code.called is True
+    assert PindoraClient.deactivate_reservation_access_code.call_args.args[0] == reservation
 
+    reservation.refresh_from_db()
+    assert reservation.access_code_is_active is False
+    assert reservation.access_code_generated_at == local_datetime(2024, 1, 1)
 
-@patch_method(PindoraService.activate_access_code)
-@patch_method(PindoraService.deactivate_access_code)
+
+@patch_method(PindoraClient.activate_reservation_access_code)
+@patch_method(PindoraClient.deactivate_reservation_access_code)
 @freezegun.freeze_time(local_datetime(2024, 1, 1))
 def test_update_access_code_is_active__reservation__active_when_should_be_active():
     ReservationFactory.create(
@@ -60,12 +64,12 @@ def test_update_access_code_is_active__reservation__active_when_should_be_active
 
     PindoraService.update_access_code_is_active()
 
-    assert PindoraService.activate_access_code.called is False
-    assert PindoraService.deactivate_access_code.called is False
+    assert PindoraClient.activate_reservation_access_code.called is False
+    assert PindoraClient.deactivate_reservation_access_code.called is False
 
 
-@patch_method(PindoraService.activate_access_code)
-@patch_method(PindoraService.deactivate_access_code)
+@patch_method(PindoraClient.activate_reservation_access_code)
+@patch_method(PindoraClient.deactivate_reservation_access_code)
 @freezegun.freeze_time(local_datetime(2024, 1, 1))
 def test_update_access_code_is_active__reservation__inactive_when_should_be_active():
     reservation = ReservationFactory.create(
@@ -82,13 +86,16 @@ def test_update_access_code_is_active__reservation__inactive_when_should_be_acti
 
     PindoraService.update_access_code_is_active()
 
-    assert PindoraService.activate_access_code.called is True
-    assert PindoraService.activate_access_code.call_args.kwargs["obj"] == reservation
-    assert PindoraService.deactivate_access_code.called is False
+    assert PindoraClient.activate_reservation_access_code.called is True
+    assert PindoraClient.activate_reservation_access_code.call_args.args[0] == reservation
+    assert PindoraClient.deactivate_reservation_access_code.called is False
+
+    reservation.refresh_from_db()
+    assert reservation.access_code_is_active is True
 
 
-@patch_method(PindoraService.activate_access_code)
-@patch_method(PindoraService.deactivate_access_code)
+@patch_method(PindoraClient.activate_reservation_access_code)
+@patch_method(PindoraClient.deactivate_reservation_access_code)
 @freezegun.freeze_time(local_datetime(2024, 1, 1))
 def test_update_access_code_is_active__reservation__inactive_when_should_be_inactive():
     ReservationFactory.create(
@@ -105,12 +112,12 @@ def test_update_access_code_is_active__reservation__inactive_when_should_be_inac
 
     PindoraService.update_access_code_is_active()
 
-    assert PindoraService.activate_access_code.called is False
-    assert PindoraService.deactivate_access_code.called is False
+    assert PindoraClient.activate_reservation_access_code.called is False
+    assert PindoraClient.deactivate_reservation_access_code.called is False
 
 
-@patch_method(PindoraService.activate_access_code, side_effect=PindoraNotFoundError("not found"))
-@patch_method(PindoraService.deactivate_access_code, side_effect=PindoraNotFoundError("not found"))
+@patch_method(PindoraClient.activate_reservation_access_code, side_effect=PindoraNotFoundError("not found"))
+@patch_method(PindoraClient.deactivate_reservation_access_code, side_effect=PindoraNotFoundError("not found"))
 @freezegun.freeze_time(local_datetime(2024, 1, 1))
 def test_update_access_code_is_active__reservation__not_found():
     reservation = ReservationFactory.create(
@@ -127,9 +134,9 @@ def test_update_access_code_is_active__reservation__not_found():
 
     PindoraService.update_access_code_is_active()
 
-    assert PindoraService.activate_access_code.called is False
-    assert PindoraService.deactivate_access_code.called is True
-    assert PindoraService.deactivate_access_code.call_args.kwargs["obj"] == reservation
+    assert PindoraClient.activate_reservation_access_code.called is False
+    assert PindoraClient.deactivate_reservation_access_code.called is True
+    assert PindoraClient.deactivate_reservation_access_code.call_args.args[0] == reservation
 
     reservation.refresh_from_db()
     assert reservation.access_code_is_active is False
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import datetime
+
+import pytest
+
+from tilavarauspalvelu.enums import ReservationStateChoice, ReservationTypeChoice
+from tilavarauspalvelu.models import AffectingTimeSpan, Reservation, ReservationUnitHierarchy
+from utils.date_utils import local_datetime
+
+from tests.factories import ReservationFactory, ReservationUnitFactory, SpaceFactory
+
+# Applied to all tests
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+def _create_reservation(**kwargs) -> Reservation:
+    space = SpaceFactory.create()
+    reservation_unit_1 = ReservationUnitFactory.create(spaces=[space])
+    ReservationUnitFactory.create(spaces=[space])
+
+    ReservationUnitHierarchy.refresh()
+
+    begin = local_datetime().replace(minute=0, second=0, microsecond=0) + datetime.timedelta(days=1)
+    return ReservationFactory.create(
+        reservation_unit=reservation_unit_1,
+        begins_at=begin,
+        ends_at=begin + datetime.timedelta(hours=1),
+        state=ReservationStateChoice.CONFIRMED,
+        type=ReservationTypeChoice.NORMAL,
+        **kwargs,
+    )
+
+
+def test_affecting_time_span__created_with_reservation():
+    reservation = _create_reservation(buffer_time_before=datetime.timedelta(minutes=30))
+
+    time_span = AffectingTimeSpan.objects.get(reservation=reservation)
+
+    assert time_span.buffered_start_datetime == reservation.begins_at - datetime.timedelta(minutes=30)
+    assert time_span.buffered_end_datetime == reservation.ends_at
+    assert time_span.is_blocking is False
+    assert len(time_span.affected_reservation_unit_ids) == 2
+
+
+def test_affecting_time_span__updated_with_reservation():
+    reservation = _create_reservation()
+
+    reservation.ends_at += datetime.timedelta(hours=1)
+    reservation.save()
+
+    time_span = AffectingTimeSpan.objects.get(reservation=reservation)
+    assert time_span.buffered_end_datetime == reservation.ends_at
+
+
+def test_affecting_time_span__updated_with_queryset_update():
+    reservation = _create_reservation()
+
+    Reservation.objects.filter(pk=reservation.pk).update(type=ReservationTypeChoice.BLOCKED)
+
+    time_span = AffectingTimeSpan.objects.get(reservation=reservation)
+    assert time_span.is_blocking is True
+
+
+def test_affecting_time_span__removed_when_reservation_cancelled():
+    reservation = _create_reservation()
+
+    reservation.state = ReservationStateChoice.CANCELLED
+    reservation.save()
+
+    assert AffectingTimeSpan.objects.filter(reservation=reservation).exists() is False
+
+
+def test_affecting_time_span__removed_when_reservation_deleted():
+    reservation = _create_reservation()
+    pk = reservation.pk
+
+    reservation.delete()
+
+    assert AffectingTimeSpan.objects.filter(reservation_id=pk).exists() is False
+
+
+def test_affecting_time_span__hierarchy_refresh_updates_affected_reservation_units(settings):
+    settings.UPDATE_AFFECTING_TIME_SPANS = True
+
+    reservation = _create_reservation()
+    space = reservation.reservation_unit.spaces.first()
+
+    reservation_unit = ReservationUnitFactory.create(spaces=[space])
+
+    time_span = AffectingTimeSpan.objects.get(reservation=reservation)
+    assert reservation_unit.pk not in time_span.affected_reservation_unit_ids
+
+    ReservationUnitHierarchy.refresh()
+
+    time_span = AffectingTimeSpan.objects.get(reservation=reservation)
+    assert reservation_unit.pk in time_span.affected_reservation_unit_ids
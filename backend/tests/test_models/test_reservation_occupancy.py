@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING
+
+import pytest
+from rest_framework.exceptions import ValidationError
+
+from tilavarauspalvelu.enums import ReservationStateChoice, ReservationTypeChoice
+from tilavarauspalvelu.models import Reservation, ReservationOccupancy
+from tilavarauspalvelu.typing import error_codes
+from utils.date_utils import local_datetime
+
+from tests.factories import ReservationFactory, ReservationUnitFactory, SpaceFactory
+
+if TYPE_CHECKING:
+    from tilavarauspalvelu.models import ReservationUnit
+
+# Applied to all tests
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+def _create_reservation(
+    reservation_unit: ReservationUnit,
+    offset: datetime.timedelta = datetime.timedelta(),
+    duration: datetime.timedelta = datetime.timedelta(hours=1),
+    **kwargs,
+) -> Reservation:
+    begin = local_datetime().replace(minute=0, second=0, microsecond=0) + datetime.timedelta(days=1) + offset
+    kwargs.setdefault("state", ReservationStateChoice.CONFIRMED)
+    kwargs.setdefault("type", ReservationTypeChoice.NORMAL)
+    return ReservationFactory.create(
+        reservation_unit=reservation_unit,
+        begins_at=begin,
+        ends_at=begin + duration,
+        **kwargs,
+    )
+
+
+def test_reservation_occupancy__created_with_reservation():
+    parent = SpaceFactory.create()
+    space = SpaceFactory.create(parent=parent)
+    reservation_unit = ReservationUnitFactory.create(spaces=[space])
+
+    reservation = _create_reservation(reservation_unit, buffer_time_after=datetime.timedelta(minutes=30))
+
+    occupancies = list(ReservationOccupancy.objects.filter(reservation=reservation).order_by("space_id", "is_buffer"))
+    assert [(item.space_id, item.is_shared, item.is_buffer) for item in occupancies] == [
+        (parent.pk, True, False),
+        (parent.pk, True, True),
+        (space.pk, False, False),
+        (space.pk, False, True),
+    ]
+
+    assert occupancies[0].during.lower == reservation.begins_at
+    assert occupancies[0].during.upper == reservation.ends_at
+    assert occupancies[1].during.upper == reservation.ends_at + datetime.timedelta(minutes=30)
+
+
+def test_reservation_occupancy__removed_when_reservation_cancelled():
+    reservation_unit = ReservationUnitFactory.create(spaces=[SpaceFactory.create()])
+    reservation = _create_reservation(reservation_unit)
+
+    reservation.state = ReservationStateChoice.CANCELLED
+    reservation.save()
+
+    assert ReservationOccupancy.objects.filter(reservation=reservation).exists() is False
+
+
+def test_reservation_occupancy__prevent_overlaps():
+    space = SpaceFactory.create()
+    reservation_unit_1 = ReservationUnitFactory.create(spaces=[space])
+    reservation_unit_2 = ReservationUnitFactory.create(spaces=[space])
+
+    _create_reservation(reservation_unit_1)
+
+    with pytest.raises(ValidationError) as error, ReservationOccupancy.prevent_overlaps():
+        _create_reservation(reservation_unit_2)
+
+    assert error.value.detail[0].code == error_codes.OVERLAPPING_RESERVATIONS
+    assert Reservation.objects.count() == 1
+
+
+def test_reservation_occupancy__prevent_overlaps__parent_space():
+    parent = SpaceFactory.create()
+    space = SpaceFactory.create(parent=parent)
+    reservation_unit_1 = ReservationUnitFactory.create(spaces=[parent])
+    reservation_unit_2 = ReservationUnitFactory.create(spaces=[space])
+
+    _create_reservation(reservation_unit_2)
+
+    with pytest.raises(ValidationError), ReservationOccupancy.prevent_overlaps():
+        _create_reservation(reservation_unit_1)
+
+
+def test_reservation_occupancy__prevent_overlaps__sibling_spaces():
+    parent = SpaceFactory.create()
+    space_1 = SpaceFactory.create(parent=parent)
+    space_2 = SpaceFactory.create(parent=parent)
+    reservation_unit_1 = ReservationUnitFactory.create(spaces=[space_1])
+    reservation_unit_2 = ReservationUnitFactory.create(spaces=[space_2])
+
+    _create_reservation(reservation_unit_1)
+
+    with ReservationOccupancy.prevent_overlaps():
+        _create_reservation(reservation_unit_2)
+
+    assert Reservation.objects.count() == 2
+
+
+def test_reservation_occupancy__prevent_overlaps__buffers():
+    space = SpaceFactory.create()
+    reservation_unit = ReservationUnitFactory.create(spaces=[space])
+    half_hour = datetime.timedelta(minutes=30)
+
+    # 00:00-01:00, buffer until 01:30
+    _create_reservation(reservation_unit, buffer_time_after=half_hour)
+
+    with ReservationOccupancy.prevent_overlaps():
+        # Buffers can overlap with each other: 01:30-02:30, buffer from 01:00
+        _create_reservation(reservation_unit, offset=3 * half_hour, buffer_time_before=half_hour)
+        # Blocking reservations can overlap with buffers: 01:00-01:30
+        _create_reservation(
+            reservation_unit, offset=2 * half_hour, duration=half_hour, type=ReservationTypeChoice.BLOCKED
+        )
+
+    # Buffers cannot overlap with other reservations: 02:30-03:30, buffer from 02:00
+    with pytest.raises(ValidationError), ReservationOccupancy.prevent_overlaps():
+        _create_reservation(reservation_unit, offset=5 * half_hour, buffer_time_before=half_hour)
+
+
+def test_reservation_occupancy__overlaps_allowed_outside_of_prevent_overlaps():
+    space = SpaceFactory.create()
+    reservation_unit = ReservationUnitFactory.create(spaces=[space])
+
+    _create_reservation(reservation_unit)
+    reservation = _create_reservation(reservation_unit)
+
+    # Overlapping reservation doesn't occupy the space.
+    assert ReservationOccupancy.objects.filter(reservation=reservation).exists() is False
+
+
+def test_reservation_occupancy__refresh():
+    reservation_unit = ReservationUnitFactory.create(spaces=[SpaceFactory.create()])
+    reservation = _create_reservation(reservation_unit)
+
+    ReservationOccupancy.objects.all().delete()
+
+    ReservationOccupancy.refresh()
+
+    assert ReservationOccupancy.objects.filter(reservation=reservation).count() == 1
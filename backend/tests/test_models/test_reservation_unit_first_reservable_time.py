@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import datetime
+
+import freezegun
+import pytest
+
+from tilavarauspalvelu.models import ReservationUnitFirstReservableTime
+from utils.date_utils import DEFAULT_TIMEZONE, local_start_of_day
+
+from tests.factories import OriginHaukiResourceFactory, ReservableTimeSpanFactory, ReservationUnitFactory
+
+# Applied to all tests
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+NOW = datetime.datetime(datetime.date.today().year + 1, 1, 1, tzinfo=DEFAULT_TIMEZONE)
+
+
+def _create_reservable_reservation_unit():
+    reservation_unit = ReservationUnitFactory.create(
+        origin_hauki_resource=OriginHaukiResourceFactory.create(),
+        reservation_begins_at=None,
+        reservation_ends_at=None,
+        reservations_min_days_before=None,
+        reservations_max_days_before=None,
+        min_reservation_duration=None,
+        max_reservation_duration=None,
+    )
+    ReservableTimeSpanFactory.create(
+        resource=reservation_unit.origin_hauki_resource,
+        start_datetime=NOW.replace(hour=10),
+        end_datetime=NOW.replace(hour=12),
+    )
+    return reservation_unit
+
+
+@freezegun.freeze_time(NOW)
+def test_reservation_unit_first_reservable_time__refresh():
+    reservation_unit_1 = _create_reservable_reservation_unit()
+    reservation_unit_2 = ReservationUnitFactory.create()
+
+    ReservationUnitFirstReservableTime.refresh()
+
+    row_1 = ReservationUnitFirstReservableTime.objects.get(reservation_unit=reservation_unit_1)
+    assert row_1.first_reservable_datetime == NOW.replace(hour=10)
+    assert row_1.is_closed is False
+    assert row_1.valid_until == NOW.replace(hour=10)
+
+    row_2 = ReservationUnitFirstReservableTime.objects.get(reservation_unit=reservation_unit_2)
+    assert row_2.first_reservable_datetime is None
+    assert row_2.is_closed is True
+    assert row_2.valid_until == local_start_of_day(NOW) + datetime.timedelta(days=1)
+
+
+def test_reservation_unit_first_reservable_time__refresh__only_missing_or_expired():
+    reservation_unit_1 = _create_reservable_reservation_unit()
+    reservation_unit_2 = ReservationUnitFactory.create()
+
+    with freezegun.freeze_time(NOW):
+        ReservationUnitFirstReservableTime.refresh()
+
+    # Make the result of the other reservation unit stale to check that it's not recalculated.
+    ReservationUnitFirstReservableTime.objects.filter(reservation_unit=reservation_unit_2).update(is_closed=False)
+
+    # First reservable time of the first reservation unit has passed, so it's recalculated.
+    with freezegun.freeze_time(NOW.replace(hour=11)):
+        ReservationUnitFirstReservableTime.refresh()
+
+    row_1 = ReservationUnitFirstReservableTime.objects.get(reservation_unit=reservation_unit_1)
+    assert row_1.first_reservable_datetime == NOW.replace(hour=11)
+
+    row_2 = ReservationUnitFirstReservableTime.objects.get(reservation_unit=reservation_unit_2)
+    assert row_2.is_closed is False
+
+
+@freezegun.freeze_time(NOW)
+def test_reservation_unit_first_reservable_time__invalidated_when_reservation_unit_changes():
+    reservation_unit = _create_reservable_reservation_unit()
+
+    ReservationUnitFirstReservableTime.refresh()
+
+    row = ReservationUnitFirstReservableTime.objects.get(reservation_unit=reservation_unit)
+    assert row.valid_until == NOW.replace(hour=10)
+
+    reservation_unit.min_reservation_duration = datetime.timedelta(hours=3)
+    reservation_unit.save()
+
+    row.refresh_from_db()
+    assert row.valid_until == NOW
+    assert row.updated_at == NOW
+
+
+def test_reservation_unit_first_reservable_time__refresh__does_not_overwrite_newer_invalidation():
+    reservation_unit = _create_reservable_reservation_unit()
+
+    with freezegun.freeze_time(NOW):
+        ReservationUnitFirstReservableTime.refresh()
+
+    # The row is invalidated after a refresh that finishes later has started.
+    invalidated_at = NOW + datetime.timedelta(minutes=10)
+    ReservationUnitFirstReservableTime.objects.filter(reservation_unit=reservation_unit).update(
+        valid_until=invalidated_at,
+        updated_at=invalidated_at,
+    )
+
+    with freezegun.freeze_time(NOW + datetime.timedelta(minutes=5)):
+        ReservationUnitFirstReservableTime.refresh(reservation_unit_ids=[reservation_unit.pk])
+
+    row = ReservationUnitFirstReservableTime.objects.get(reservation_unit=reservation_unit)
+    assert row.valid_until == invalidated_at
+    assert row.updated_at == invalidated_at
+
+    # A refresh started after the invalidation updates the row.
+    with freezegun.freeze_time(NOW + datetime.timedelta(minutes=15)):
+        ReservationUnitFirstReservableTime.refresh(reservation_unit_ids=[reservation_unit.pk])
+
+    row.refresh_from_db()
+    assert row.valid_until == NOW.replace(hour=10)
+    assert row.updated_at == NOW + datetime.timedelta(minutes=15)
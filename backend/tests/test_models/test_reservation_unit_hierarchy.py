@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import pytest
+from django.db import connection
+
+from tilavarauspalvelu.models import ReservationUnitHierarchy
+from tilavarauspalvelu.models.reservation_unit_hierarchy.model import RESERVATION_UNIT_LOCK_NAMESPACE
+
+from tests.factories import ReservationUnitFactory, ResourceFactory, SpaceFactory
+
+# Applied to all tests
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+def _related_ids(reservation_unit_id: int) -> list[int]:
+    return ReservationUnitHierarchy.objects.get(reservation_unit_id=reservation_unit_id).related_reservation_unit_ids
+
+
+def test_reservation_unit_hierarchy__refresh__full():
+    parent = SpaceFactory.create()
+    child = SpaceFactory.create(parent=parent)
+    other = SpaceFactory.create()
+
+    reservation_unit_1 = ReservationUnitFactory.create(spaces=[parent])
+    reservation_unit_2 = ReservationUnitFactory.create(spaces=[child])
+    reservation_unit_3 = ReservationUnitFactory.create(spaces=[other])
+
+    ReservationUnitHierarchy.refresh()
+
+    assert _related_ids(reservation_unit_1.pk) == [reservation_unit_1.pk, reservation_unit_2.pk]
+    assert _related_ids(reservation_unit_2.pk) == [reservation_unit_1.pk, reservation_unit_2.pk]
+    assert _related_ids(reservation_unit_3.pk) == [reservation_unit_3.pk]
+
+
+def test_reservation_unit_hierarchy__refresh__reservation_unit_space_added():
+    parent = SpaceFactory.create()
+    child = SpaceFactory.create(parent=parent)
+
+    reservation_unit_1 = ReservationUnitFactory.create(spaces=[parent])
+    reservation_unit_2 = ReservationUnitFactory.create()
+
+    ReservationUnitHierarchy.refresh()
+
+    reservation_unit_2.spaces.add(child)
+
+    ReservationUnitHierarchy.refresh(reservation_unit_ids=[reservation_unit_2.pk])
+
+    assert _related_ids(reservation_unit_1.pk) == [reservation_unit_1.pk, reservation_unit_2.pk]
+    assert _related_ids(reservation_unit_2.pk) == [reservation_unit_1.pk, reservation_unit_2.pk]
+
+
+def test_reservation_unit_hierarchy__refresh__reservation_unit_space_removed():
+    parent = SpaceFactory.create()
+    child = SpaceFactory.create(parent=parent)
+
+    reservation_unit_1 = ReservationUnitFactory.create(spaces=[parent])
+    reservation_unit_2 = ReservationUnitFactory.create(spaces=[child])
+
+    ReservationUnitHierarchy.refresh()
+
+    reservation_unit_2.spaces.clear()
+
+    ReservationUnitHierarchy.refresh(reservation_unit_ids=[reservation_unit_2.pk])
+
+    assert _related_ids(reservation_unit_1.pk) == [reservation_unit_1.pk]
+    assert _related_ids(reservation_unit_2.pk) == [reservation_unit_2.pk]
+
+
+def test_reservation_unit_hierarchy__refresh__reservation_unit_resource_added():
+    resource = ResourceFactory.create()
+
+    reservation_unit_1 = ReservationUnitFactory.create(resources=[resource])
+    reservation_unit_2 = ReservationUnitFactory.create()
+
+    ReservationUnitHierarchy.refresh()
+
+    reservation_unit_2.resources.add(resource)
+
+    ReservationUnitHierarchy.refresh(reservation_unit_ids=[reservation_unit_2.pk])
+
+    assert _related_ids(reservation_unit_1.pk) == [reservation_unit_1.pk, reservation_unit_2.pk]
+    assert _related_ids(reservation_unit_2.pk) == [reservation_unit_1.pk, reservation_unit_2.pk]
+
+
+def test_reservation_unit_hierarchy__refresh__space_moved():
+    parent_1 = SpaceFactory.create()
+    parent_2 = SpaceFactory.create()
+    child = SpaceFactory.create(parent=parent_1)
+
+    reservation_unit_1 = ReservationUnitFactory.create(spaces=[parent_1])
+    reservation_unit_2 = ReservationUnitFactory.create(spaces=[parent_2])
+    reservation_unit_3 = ReservationUnitFactory.create(spaces=[child])
+
+    ReservationUnitHierarchy.refresh()
+
+    child.parent = parent_2
+    child.save()
+
+    ReservationUnitHierarchy.refresh(space_ids=[child.pk])
+
+    assert _related_ids(reservation_unit_1.pk) == [reservation_unit_1.pk]
+    assert _related_ids(reservation_unit_2.pk) == [reservation_unit_2.pk, reservation_unit_3.pk]
+    assert _related_ids(reservation_unit_3.pk) == [reservation_unit_2.pk, reservation_unit_3.pk]
+
+
+def test_reservation_unit_hierarchy__refresh__reservation_unit_deleted():
+    space = SpaceFactory.create()
+
+    reservation_unit_1 = ReservationUnitFactory.create(spaces=[space])
+    reservation_unit_2 = ReservationUnitFactory.create(spaces=[space])
+
+    ReservationUnitHierarchy.refresh()
+
+    pk = reservation_unit_2.pk
+    reservation_unit_2.delete()
+
+    ReservationUnitHierarchy.refresh(reservation_unit_ids=[pk])
+
+    assert _related_ids(reservation_unit_1.pk) == [reservation_unit_1.pk]
+    assert ReservationUnitHierarchy.objects.filter(reservation_unit_id=pk).exists() is False
+
+
+def test_reservation_unit_hierarchy__refresh__unrelated_reservation_units_not_updated():
+    space_1 = SpaceFactory.create()
+    space_2 = SpaceFactory.create()
+
+    reservation_unit_1 = ReservationUnitFactory.create(spaces=[space_1])
+    reservation_unit_2 = ReservationUnitFactory.create(spaces=[space_2])
+
+    ReservationUnitHierarchy.refresh()
+
+    # Make the hierarchy of the unrelated reservation unit stale to check that it's not recomputed.
+    ReservationUnitHierarchy.objects.filter(reservation_unit=reservation_unit_2).update(related_reservation_unit_ids=[])
+
+    ReservationUnitHierarchy.refresh(reservation_unit_ids=[reservation_unit_1.pk])
+
+    assert _related_ids(reservation_unit_1.pk) == [reservation_unit_1.pk]
+    assert _related_ids(reservation_unit_2.pk) == []
+
+
+def _locked_ids() -> list[int]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT objid
+            FROM pg_locks
+            WHERE locktype = 'advisory'
+              AND classid = %s
+              AND objsubid = 2
+              AND pid = pg_backend_pid()
+            ORDER BY objid
+            """,
+            [RESERVATION_UNIT_LOCK_NAMESPACE],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def test_reservation_unit_hierarchy__lock():
+    parent = SpaceFactory.create()
+    child = SpaceFactory.create(parent=parent)
+    other = SpaceFactory.create()
+
+    reservation_unit_1 = ReservationUnitFactory.create(spaces=[parent])
+    reservation_unit_2 = ReservationUnitFactory.create(spaces=[child])
+    ReservationUnitFactory.create(spaces=[other])
+
+    ReservationUnitHierarchy.refresh()
+
+    ReservationUnitHierarchy.lock([reservation_unit_2.pk])
+
+    # Related reservation units are locked, unrelated ones are not.
+    assert _locked_ids() == [reservation_unit_1.pk, reservation_unit_2.pk]
+
+
+def test_reservation_unit_hierarchy__lock__not_in_hierarchy():
+    reservation_unit = ReservationUnitFactory.create()
+
+    ReservationUnitHierarchy.objects.all().delete()
+
+    ReservationUnitHierarchy.lock([reservation_unit.pk])
+
+    assert _locked_ids() == [reservation_unit.pk]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import pytest
+from django.contrib.postgres.search import SearchQuery
+
+from tilavarauspalvelu.models import Application, ApplicationSection, Reservation
+
+from tests.factories import ApplicationFactory, ApplicationSectionFactory, ReservationFactory
+
+# Applied to all tests
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+def _search(text: str) -> SearchQuery:
+    return SearchQuery(value=f"'{text}':*", config="finnish", search_type="raw")
+
+
+def test_search_vector__reservation__created():
+    reservation = ReservationFactory.create(name="foo", reservee_first_name="bar", user__last_name="baz")
+
+    assert list(Reservation.objects.filter(search_vector=_search("foo"))) == [reservation]
+    assert list(Reservation.objects.filter(search_vector=_search("bar"))) == [reservation]
+    assert list(Reservation.objects.filter(search_vector=_search("baz"))) == [reservation]
+    assert list(Reservation.objects.filter(search_vector=_search(str(reservation.pk)))) == [reservation]
+
+
+def test_search_vector__reservation__updated():
+    reservation = ReservationFactory.create(reservee_organisation_name="foo")
+
+    reservation.reservee_organisation_name = "bar"
+    reservation.save()
+
+    assert list(Reservation.objects.filter(search_vector=_search("foo"))) == []
+    assert list(Reservation.objects.filter(search_vector=_search("bar"))) == [reservation]
+
+
+def test_search_vector__reservation__user_updated():
+    reservation = ReservationFactory.create(user__email="foo@example.com", user__first_name="foo")
+
+    reservation.user.email = "bar@example.com"
+    reservation.user.first_name = "bar"
+    reservation.user.save()
+
+    assert list(Reservation.objects.filter(search_vector=_search("foo"))) == []
+    assert list(Reservation.objects.filter(search_vector=_search("bar@example.com"))) == [reservation]
+    assert list(Reservation.objects.filter(search_vector=_search("bar"))) == [reservation]
+
+
+def test_search_vector__reservation__reservation_series_updated():
+    reservation = ReservationFactory.create(reservation_series__name="foo")
+
+    reservation.reservation_series.name = "bar"
+    reservation.reservation_series.save()
+
+    assert list(Reservation.objects.filter(search_vector=_search("foo"))) == []
+    assert list(Reservation.objects.filter(search_vector=_search("bar"))) == [reservation]
+
+
+def test_search_vector__application__section_added_updated_and_deleted():
+    application = ApplicationFactory.create(organisation_name="foo")
+
+    section = ApplicationSectionFactory.create(application=application, name="bar")
+    assert list(Application.objects.filter(search_vector=_search("bar"))) == [application]
+
+    section.name = "baz"
+    section.save()
+    assert list(Application.objects.filter(search_vector=_search("bar"))) == []
+    assert list(Application.objects.filter(search_vector=_search("baz"))) == [application]
+
+    section.delete()
+    assert list(Application.objects.filter(search_vector=_search("baz"))) == []
+    assert list(Application.objects.filter(search_vector=_search("foo"))) == [application]
+
+
+def test_search_vector__application_section__applicant_updated():
+    application = ApplicationFactory.create(organisation_name="foo")
+    section = ApplicationSectionFactory.create(application=application, name="bar")
+
+    application.organisation_name = "baz"
+    application.save()
+
+    assert list(Application.objects.filter(search_vector=_search("baz"))) == [application]
+    assert list(ApplicationSection.objects.filter(search_vector=_search("foo"))) == []
+    assert list(ApplicationSection.objects.filter(search_vector=_search("baz"))) == [section]
+
+
+def test_search_vector__application_section__user_updated():
+    application = ApplicationFactory.create(
+        organisation_name="",
+        contact_person_first_name="",
+        contact_person_last_name="",
+        user__first_name="foo",
+        user__last_name="bar",
+    )
+    section = ApplicationSectionFactory.create(application=application)
+
+    application.user.first_name = "baz"
+    application.user.save()
+
+    assert list(Application.objects.filter(search_vector=_search("baz"))) == [application]
+    assert list(ApplicationSection.objects.filter(search_vector=_search("foo"))) == []
+    assert list(ApplicationSection.objects.filter(search_vector=_search("baz"))) == [section]
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import json
+
 import pytest
 from django.urls import reverse
 
@@ -233,3 +235,117 @@ def test_reservable_time_spans_export__before(api_client, settings):
     data = response.json()
     assert len(data) == 1
     assert data[0]["resource"] == reservable_time_span.resource.id
+
+
+def test_reservable_time_spans_export__after_id(api_client, settings):
+    reservable_time_span_1 = ReservableTimeSpanFactory.create(
+        resource__id=1,
+        start_datetime=local_datetime(2024, 1, 1, 12),
+        end_datetime=local_datetime(2024, 1, 1, 13),
+    )
+    reservable_time_span_2 = ReservableTimeSpanFactory.create(
+        resource__id=2,
+        start_datetime=local_datetime(2024, 1, 2, 13),
+        end_datetime=local_datetime(2024, 1, 2, 14),
+    )
+    reservable_time_span_3 = ReservableTimeSpanFactory.create(
+        resource__id=3,
+        start_datetime=local_datetime(2024, 1, 3, 14),
+        end_datetime=local_datetime(2024, 1, 3, 15),
+    )
+
+    url = reverse("reservable_time_spans_export") + f"?after_id={reservable_time_span_1.pk}&stop=1"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200, response.json()
+
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["resource"] == reservable_time_span_2.resource.id
+
+    # Total count is not calculated for keyset pagination
+    assert "Varaamo-Pagination-Total-Count" not in response.headers
+    assert response.headers["Varaamo-Pagination-Next-After-Id"] == str(reservable_time_span_2.pk)
+
+    url = reverse("reservable_time_spans_export") + f"?after_id={reservable_time_span_2.pk}&stop=1"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200, response.json()
+
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["resource"] == reservable_time_span_3.resource.id
+    assert response.headers["Varaamo-Pagination-Next-After-Id"] == str(reservable_time_span_3.pk)
+
+    url = reverse("reservable_time_spans_export") + f"?after_id={reservable_time_span_3.pk}&stop=1"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200, response.json()
+    assert response.json() == []
+    assert "Varaamo-Pagination-Next-After-Id" not in response.headers
+
+
+def test_reservable_time_spans_export__ndjson(api_client, settings):
+    reservable_time_span_1 = ReservableTimeSpanFactory.create(
+        resource__id=1,
+        start_datetime=local_datetime(2024, 1, 1, 12),
+        end_datetime=local_datetime(2024, 1, 1, 13),
+    )
+    reservable_time_span_2 = ReservableTimeSpanFactory.create(
+        resource__id=2,
+        start_datetime=local_datetime(2024, 1, 2, 13),
+        end_datetime=local_datetime(2024, 1, 2, 14),
+    )
+
+    url = reverse("reservable_time_spans_export")
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+    data = response.json()
+
+    url = reverse("reservable_time_spans_export") + "?format=ndjson"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson"
+
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    rows = [json.loads(line) for line in lines]
+
+    assert rows == data
+    assert [row["resource"] for row in rows] == [
+        reservable_time_span_1.resource.id,
+        reservable_time_span_2.resource.id,
+    ]
+
+
+def test_reservable_time_spans_export__ndjson__after_id(api_client, settings):
+    reservable_time_span_1 = ReservableTimeSpanFactory.create(
+        resource__id=1,
+        start_datetime=local_datetime(2024, 1, 1, 12),
+        end_datetime=local_datetime(2024, 1, 1, 13),
+    )
+    reservable_time_span_2 = ReservableTimeSpanFactory.create(
+        resource__id=2,
+        start_datetime=local_datetime(2024, 1, 2, 13),
+        end_datetime=local_datetime(2024, 1, 2, 14),
+    )
+
+    url = reverse("reservable_time_spans_export") + f"?format=ndjson&after_id={reservable_time_span_1.pk}"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200
+
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert [json.loads(line)["resource"] for line in lines] == [reservable_time_span_2.resource.id]
+
+    url = reverse("reservable_time_spans_export") + f"?format=ndjson&after_id={reservable_time_span_2.pk}"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == b""
+
+
+def test_reservable_time_spans_export__invalid_format(api_client, settings):
+    url = reverse("reservable_time_spans_export") + "?format=xml"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 400, response.json()
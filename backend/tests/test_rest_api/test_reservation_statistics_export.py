@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import datetime
+import json
 
 import freezegun
 import pytest
 from django.urls import reverse
 
+from tilavarauspalvelu.models import ReservationStatistic
 from utils.date_utils import local_datetime
 
 from tests.factories import ReservationFactory
@@ -238,6 +240,80 @@ def test_reservation_statistics_export__stop(api_client, settings):
     assert data[0]["reservation_uuid"] == str(reservation.ext_uuid)
 
 
+def test_reservation_statistics_export__after_id(api_client, settings):
+    settings.SAVE_RESERVATION_STATISTICS = True
+
+    reservation_1 = ReservationFactory.create()
+    reservation_2 = ReservationFactory.create()
+    reservation_3 = ReservationFactory.create()
+
+    statistic_1 = ReservationStatistic.objects.get(reservation=reservation_1)
+
+    url = reverse("reservation_statistics_export") + f"?after_id={statistic_1.pk}&stop=1"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200, response.json()
+
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["reservation_uuid"] == str(reservation_2.ext_uuid)
+
+    # Total count is not calculated for keyset pagination
+    assert "Varaamo-Pagination-Total-Count" not in response.headers
+
+    statistic_2 = ReservationStatistic.objects.get(reservation=reservation_2)
+    assert response.headers["Varaamo-Pagination-Next-After-Id"] == str(statistic_2.pk)
+
+    url = reverse("reservation_statistics_export") + f"?after_id={statistic_2.pk}&stop=1"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200, response.json()
+
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["reservation_uuid"] == str(reservation_3.ext_uuid)
+
+    statistic_3 = ReservationStatistic.objects.get(reservation=reservation_3)
+    assert response.headers["Varaamo-Pagination-Next-After-Id"] == str(statistic_3.pk)
+
+    url = reverse("reservation_statistics_export") + f"?after_id={statistic_3.pk}&stop=1"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200, response.json()
+    assert response.json() == []
+    assert "Varaamo-Pagination-Next-After-Id" not in response.headers
+
+
+def test_reservation_statistics_export__ndjson(api_client, settings):
+    settings.SAVE_RESERVATION_STATISTICS = True
+
+    reservation_1 = ReservationFactory.create()
+    reservation_2 = ReservationFactory.create()
+
+    url = reverse("reservation_statistics_export")
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+    data = response.json()
+
+    url = reverse("reservation_statistics_export") + "?format=ndjson"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson"
+
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    rows = [json.loads(line) for line in lines]
+
+    assert rows == data
+    assert [row["reservation_uuid"] for row in rows] == [str(reservation_1.ext_uuid), str(reservation_2.ext_uuid)]
+
+
+def test_reservation_statistics_export__invalid_format(api_client, settings):
+    url = reverse("reservation_statistics_export") + "?format=xml"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 400, response.json()
+
+
 @freezegun.freeze_time(local_datetime(2024, 1, 1, 12))
 def test_reservation_statistics_export__updated_after(api_client, settings):
     settings.SAVE_RESERVATION_STATISTICS = True
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import json
+
 import freezegun
 import pytest
 from django.urls import reverse
@@ -210,6 +212,89 @@ def test_reservation_unit_export__stop(api_client, settings):
     assert data[0]["reservation_unit_id"] == reservation_unit.pk
 
 
+def test_reservation_unit_export__after_id(api_client, settings):
+    reservation_unit_1 = ReservationUnitFactory.create()
+    reservation_unit_2 = ReservationUnitFactory.create()
+    reservation_unit_3 = ReservationUnitFactory.create()
+
+    url = reverse("reservation_unit_export") + f"?after_id={reservation_unit_1.pk}&stop=1"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200, response.json()
+
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["reservation_unit_id"] == reservation_unit_2.pk
+
+    # Total count is not calculated for keyset pagination
+    assert "Varaamo-Pagination-Total-Count" not in response.headers
+    assert response.headers["Varaamo-Pagination-Next-After-Id"] == str(reservation_unit_2.pk)
+
+    url = reverse("reservation_unit_export") + f"?after_id={reservation_unit_2.pk}&stop=1"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200, response.json()
+
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["reservation_unit_id"] == reservation_unit_3.pk
+    assert response.headers["Varaamo-Pagination-Next-After-Id"] == str(reservation_unit_3.pk)
+
+    url = reverse("reservation_unit_export") + f"?after_id={reservation_unit_3.pk}&stop=1"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200, response.json()
+    assert response.json() == []
+    assert "Varaamo-Pagination-Next-After-Id" not in response.headers
+
+
+def test_reservation_unit_export__ndjson(api_client, settings):
+    reservation_unit_1 = ReservationUnitFactory.create()
+    reservation_unit_2 = ReservationUnitFactory.create()
+
+    url = reverse("reservation_unit_export")
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+    data = response.json()
+
+    url = reverse("reservation_unit_export") + "?format=ndjson"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson"
+
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    rows = [json.loads(line) for line in lines]
+
+    assert rows == data
+    assert [row["reservation_unit_id"] for row in rows] == [reservation_unit_1.pk, reservation_unit_2.pk]
+
+
+def test_reservation_unit_export__ndjson__after_id(api_client, settings):
+    reservation_unit_1 = ReservationUnitFactory.create()
+    reservation_unit_2 = ReservationUnitFactory.create()
+
+    url = reverse("reservation_unit_export") + f"?format=ndjson&after_id={reservation_unit_1.pk}"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200
+
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert [json.loads(line)["reservation_unit_id"] for line in lines] == [reservation_unit_2.pk]
+
+    url = reverse("reservation_unit_export") + f"?format=ndjson&after_id={reservation_unit_2.pk}"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == b""
+
+
+def test_reservation_unit_export__invalid_format(api_client, settings):
+    url = reverse("reservation_unit_export") + "?format=xml"
+    response = api_client.get(url, headers={"Authorization": settings.EXPORT_AUTHORIZATION_TOKEN})
+
+    assert response.status_code == 400, response.json()
+
+
 @freezegun.freeze_time(local_datetime(2024, 1, 1, 12))
 def test_reservation_unit_export__updated_after(api_client, settings):
     reservation_unit = ReservationUnitFactory.create()
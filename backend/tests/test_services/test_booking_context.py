@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from freezegun import freeze_time
+
+from tilavarauspalvelu.enums import AccessType, ReservationStateChoice, ReservationTypeChoice
+from tilavarauspalvelu.services.booking_context import BookingContext
+from utils.date_utils import DEFAULT_TIMEZONE, local_date, local_datetime
+
+from tests.factories import (
+    ApplicationRoundFactory,
+    ReservationFactory,
+    ReservationUnitAccessTypeFactory,
+    ReservationUnitFactory,
+    ReservationUnitPricingFactory,
+    UserFactory,
+)
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+@freeze_time(local_datetime(2024, 1, 1, 12))
+def test_booking_context__load():
+    reservation_unit = ReservationUnitFactory.create_reservable_now(max_reservations_per_user=2)
+    user = UserFactory.create()
+
+    ReservationUnitPricingFactory.create(
+        reservation_unit=reservation_unit,
+        begins=local_date(2024, 1, 2),
+        highest_price=Decimal(20),
+        is_activated_on_begins=False,
+    )
+    ReservationUnitAccessTypeFactory.create(
+        reservation_unit=reservation_unit,
+        begin_date=local_date(2024, 1, 2),
+        access_type=AccessType.ACCESS_CODE,
+    )
+    ReservationFactory.create(
+        reservation_unit=reservation_unit,
+        user=user,
+        state=ReservationStateChoice.CONFIRMED,
+        type=ReservationTypeChoice.NORMAL,
+        begins_at=local_datetime(2024, 1, 3, 12),
+        ends_at=local_datetime(2024, 1, 3, 13),
+    )
+
+    begins_at = local_datetime(2024, 1, 2, 12)
+    ends_at = local_datetime(2024, 1, 2, 13)
+
+    with CaptureQueriesContext(connection) as queries:
+        context = BookingContext.load(reservation_unit, begins_at, ends_at, user=user)
+
+    assert len(queries) == 3
+
+    assert context.reservation_unit == reservation_unit
+    assert context.pricing is not None
+    assert context.pricing.highest_price == Decimal(20)
+    assert context.access_type == AccessType.ACCESS_CODE
+    assert context.in_open_application_round is False
+    assert context.num_active_user_reservations == 1
+    assert len(context.reservable_time_spans) == 1
+    assert context.is_open is True
+
+
+@freeze_time(local_datetime(2024, 1, 1, 12))
+def test_booking_context__load__nothing_active():
+    reservation_unit = ReservationUnitFactory.create()
+
+    begins_at = local_datetime(2024, 1, 2, 12)
+    ends_at = local_datetime(2024, 1, 2, 13)
+
+    context = BookingContext.load(reservation_unit.pk, begins_at, ends_at)
+
+    assert context.pricing is None
+    assert context.access_type is None
+    assert context.num_active_user_reservations == 0
+    assert context.reservable_time_spans == []
+    assert context.is_open is False
+
+
+@freeze_time(local_datetime(2024, 1, 1, 12))
+def test_booking_context__load__not_open_for_whole_reservation():
+    reservation_unit = ReservationUnitFactory.create_reservable_now()
+
+    # Reservable time spans of `create_reservable_now` end after four days.
+    begins_at = local_datetime(2024, 1, 4, 23)
+    ends_at = begins_at + datetime.timedelta(hours=2)
+
+    context = BookingContext.load(reservation_unit, begins_at, ends_at)
+
+    assert context.is_open is False
+
+
+def test_booking_context__load__in_open_application_round():
+    reservation_unit = ReservationUnitFactory.create()
+    application_round = ApplicationRoundFactory.create_in_status_open(reservation_units=[reservation_unit])
+
+    begins_at = datetime.datetime.combine(
+        application_round.reservation_period_begin_date,
+        datetime.time(hour=12),
+        tzinfo=DEFAULT_TIMEZONE,
+    )
+
+    context = BookingContext.load(reservation_unit, begins_at, begins_at + datetime.timedelta(hours=1))
+
+    assert context.in_open_application_round is True
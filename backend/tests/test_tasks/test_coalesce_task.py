@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+
+from tilavarauspalvelu.models.reservation_unit.queryset import ReservationUnitQuerySet
+from tilavarauspalvelu.tasks import (
+    coalesce_task,
+    run_coalesced_task,
+    update_reservation_unit_hierarchy_task,
+    update_reservation_unit_search_vectors_task,
+)
+
+from tests.helpers import patch_method
+
+# Applied to all tests
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+@pytest.fixture(autouse=True)
+def coalesce_settings(settings):
+    settings.COALESCE_SIGNAL_TASKS = True
+    settings.COALESCE_SIGNAL_TASKS_WINDOW_SECONDS = 0
+    cache.clear()
+
+
+@patch_method(ReservationUnitQuerySet.update_search_vectors)
+def test_coalesce_task__run_after_commit(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [1]})
+
+        assert ReservationUnitQuerySet.update_search_vectors.call_count == 0
+
+    assert ReservationUnitQuerySet.update_search_vectors.call_count == 1
+    assert ReservationUnitQuerySet.update_search_vectors.call_args.kwargs == {"pks": [1]}
+
+
+@patch_method(ReservationUnitQuerySet.update_search_vectors)
+def test_coalesce_task__list_arguments_combined(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [3, 1]})
+        coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [2]})
+        coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [1]})
+
+    assert len(callbacks) == 1
+
+    assert ReservationUnitQuerySet.update_search_vectors.call_count == 1
+    assert ReservationUnitQuerySet.update_search_vectors.call_args.kwargs == {"pks": [1, 2, 3]}
+
+
+@patch_method(ReservationUnitQuerySet.update_search_vectors)
+def test_coalesce_task__call_without_list_arguments_absorbs_others(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [1]})
+        coalesce_task(update_reservation_unit_search_vectors_task, {})
+        coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [2]})
+
+    assert ReservationUnitQuerySet.update_search_vectors.call_count == 1
+    assert ReservationUnitQuerySet.update_search_vectors.call_args.kwargs == {"pks": None}
+
+
+def test_coalesce_task__different_arguments_not_combined(django_capture_on_commit_callbacks):
+    with (
+        mock.patch.object(update_reservation_unit_hierarchy_task, "apply_async") as apply_async,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        coalesce_task(update_reservation_unit_hierarchy_task, {"using": "default", "space_ids": [1]})
+        coalesce_task(update_reservation_unit_hierarchy_task, {"using": "other", "space_ids": [2]})
+        coalesce_task(update_reservation_unit_hierarchy_task, {"using": "default", "reservation_unit_ids": [3]})
+
+    assert apply_async.call_count == 2
+    assert apply_async.call_args_list[0].kwargs == {
+        "kwargs": {"using": "default", "space_ids": [1], "reservation_unit_ids": [3]},
+    }
+    assert apply_async.call_args_list[1].kwargs == {
+        "kwargs": {"using": "other", "space_ids": [2]},
+    }
+
+
+@patch_method(ReservationUnitQuerySet.update_search_vectors)
+def test_coalesce_task__rolled_back_calls_not_run(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        try:
+            with transaction.atomic():
+                coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [1]})
+                raise ValueError  # noqa: TRY301
+        except ValueError:
+            pass
+
+        coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [2]})
+
+    assert ReservationUnitQuerySet.update_search_vectors.call_count == 1
+    assert ReservationUnitQuerySet.update_search_vectors.call_args.kwargs == {"pks": [2]}
+
+
+def test_coalesce_task__disabled(settings):
+    settings.COALESCE_SIGNAL_TASKS = False
+
+    with mock.patch.object(update_reservation_unit_search_vectors_task, "apply_async") as apply_async:
+        coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [1]})
+        coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [2]})
+
+    assert apply_async.call_count == 2
+
+
+@patch_method(ReservationUnitQuerySet.update_search_vectors)
+def test_coalesce_task__time_window(settings, django_capture_on_commit_callbacks):
+    settings.COALESCE_SIGNAL_TASKS_WINDOW_SECONDS = 5
+
+    with mock.patch.object(run_coalesced_task, "apply_async") as apply_async:
+        with django_capture_on_commit_callbacks(execute=True):
+            coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [1]})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [2]})
+
+    # Only the first call in the time window schedules a task.
+    assert apply_async.call_count == 1
+    assert apply_async.call_args.kwargs["countdown"] == 6
+
+    run_coalesced_task(**apply_async.call_args.kwargs["kwargs"])
+
+    assert ReservationUnitQuerySet.update_search_vectors.call_count == 1
+    assert ReservationUnitQuerySet.update_search_vectors.call_args.kwargs == {"pks": [1, 2]}
+
+    # Calls are only run once.
+    run_coalesced_task(**apply_async.call_args.kwargs["kwargs"])
+
+    assert ReservationUnitQuerySet.update_search_vectors.call_count == 1
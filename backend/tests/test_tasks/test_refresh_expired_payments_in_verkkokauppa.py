@@ -247,6 +247,50 @@ def test_refresh_expired_payments_in_verkkokauppa__direct_payment__refresh_error
     assert SentryLogger.log_message.call_count == 1
 
 
+@patch_method(SentryLogger.log_message)
+@patch_method(VerkkokauppaAPIClient.get_payment)
+@freeze_time(local_datetime(2024, 1, 1, 12))
+def test_refresh_expired_payments_in_verkkokauppa__direct_payment__multiple__errors_dont_stop_others(settings):
+    settings.VERKKOKAUPPA_ORDER_EXPIRATION_MINUTES = 5
+    settings.VERKKOKAUPPA_SYNC_WORKERS = 1  # Claim the payment orders in batches of two
+
+    payment_orders = [
+        PaymentOrderFactory.create_at(
+            reservation=ReservationFactory.create(state=ReservationStateChoice.WAITING_FOR_PAYMENT),
+            status=OrderStatus.DRAFT,
+            created_at=local_datetime(2024, 1, 1, 11, 55),
+        )
+        for _ in range(3)
+    ]
+    failing = payment_orders[1]
+
+    def get_payment(*, order_uuid):
+        if order_uuid == failing.remote_id:
+            msg = "mock-error"
+            raise GetPaymentError(msg)
+        return PaymentFactory.create(
+            status=WebShopPaymentStatus.CANCELLED,
+            timestamp=local_datetime(2024, 1, 1, 11, 55),
+        )
+
+    VerkkokauppaAPIClient.get_payment.side_effect = get_payment
+
+    refresh_expired_payments_in_verkkokauppa_task()
+
+    for payment_order in payment_orders:
+        payment_order.refresh_from_db()
+
+    assert [payment_order.status for payment_order in payment_orders] == [
+        OrderStatus.CANCELLED,
+        OrderStatus.DRAFT,
+        OrderStatus.CANCELLED,
+    ]
+
+    # Each payment is fetched only once, even if its status could not be updated.
+    assert VerkkokauppaAPIClient.get_payment.call_count == 3
+    assert SentryLogger.log_message.call_count == 1
+
+
 @patch_method(VerkkokauppaAPIClient.get_payment)
 @freeze_time(local_datetime(2024, 1, 1, 12))
 def test_refresh_expired_payments_in_verkkokauppa__direct_payment__expiration_from_verkkokauppa_timestamp(settings):
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import pytest
+
+from utils.external_service.session import get_connection_pool_stats, get_session
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep connections alive
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.send_header("Set-Cookie", "foo=bar")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args, **kwargs) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_get_session__same_session_for_service():
+    assert get_session("Test service 1") is get_session("Test service 1")
+    assert get_session("Test service 1") is not get_session("Test service 2")
+
+
+def test_get_session__new_session_in_forked_process():
+    session = get_session("Test service 3")
+
+    with mock.patch("utils.external_service.session.os.getpid", return_value=-1):
+        assert get_session("Test service 3") is not session
+
+
+def test_get_session__connections_reused(server_url):
+    session = get_session("Test service 4")
+
+    for _ in range(3):
+        response = session.get(server_url, timeout=5)
+        assert response.status_code == 200
+
+    stats = get_connection_pool_stats("Test service 4")
+    assert stats.requests == 3
+    assert stats.connections == 1
+    assert stats.reused_connections == 2
+
+
+def test_get_session__cookies_not_stored(server_url):
+    session = get_session("Test service 5")
+
+    response = session.get(server_url, timeout=5)
+    assert response.status_code == 200
+
+    assert len(session.cookies) == 0
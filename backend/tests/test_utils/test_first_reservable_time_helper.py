@@ -11,6 +11,11 @@
 from tilavarauspalvelu.enums import ReservationStartInterval
 from tilavarauspalvelu.integrations.opening_hours.time_span_element import TimeSpanElement
 from tilavarauspalvelu.models import ReservationUnit
+from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_calculation import (
+    FirstReservableTimeWorkerPool,
+    ReservationUnitCalculationData,
+    calculate_first_reservable_times,
+)
 from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_helper import FirstReservableTimeHelper
 from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_reservable_time_span_helper import (
     ReservableTimeSpanFirstReservableTimeHelper,
@@ -239,9 +244,12 @@ def test__find_first_reservable_time_span_for_reservation_unit__different_buffer
         ),
     ]
 
-    parent = SimpleNamespace(reservation_unit=reservation_unit, minimum_duration_minutes=30)
+    parent = SimpleNamespace(
+        reservation_unit=ReservationUnitCalculationData.from_reservation_unit(reservation_unit),
+        minimum_duration_minutes=30,
+    )
     parent = cast("ReservationUnitFirstReservableTimeHelper", parent)
-    helper = ReservableTimeSpanFirstReservableTimeHelper(parent, original_reservable_time_span)
+    helper = ReservableTimeSpanFirstReservableTimeHelper(parent, original_reservable_time_span.as_time_span_element())
     result = helper._find_first_reservable_time_span(
         normalised_reservable_time_spans=reservable_time_spans,
         reservation_time_spans=reservation_time_spans,
@@ -292,9 +300,12 @@ def test__find_first_reservable_time_span_for_reservation_unit__buffer_goes_thro
         ),
     ]
 
-    parent = SimpleNamespace(reservation_unit=reservation_unit, minimum_duration_minutes=30)
+    parent = SimpleNamespace(
+        reservation_unit=ReservationUnitCalculationData.from_reservation_unit(reservation_unit),
+        minimum_duration_minutes=30,
+    )
     parent = cast("ReservationUnitFirstReservableTimeHelper", parent)
-    helper = ReservableTimeSpanFirstReservableTimeHelper(parent, original_reservable_time_span)
+    helper = ReservableTimeSpanFirstReservableTimeHelper(parent, original_reservable_time_span.as_time_span_element())
     result = helper._find_first_reservable_time_span(
         normalised_reservable_time_spans=reservable_time_spans,
         reservation_time_spans=reservation_time_spans,
@@ -333,10 +344,11 @@ def test__find_first_reservable_time_span_for_reservation_unit__interval_is_long
     ]
 
     helper = FirstReservableTimeHelper(ReservationUnit.objects.none())
-    reservation_unit_helper = ReservationUnitFirstReservableTimeHelper(helper, reservation_unit)
+    reservation_unit_data = ReservationUnitCalculationData.from_reservation_unit(reservation_unit)
+    reservation_unit_helper = ReservationUnitFirstReservableTimeHelper(helper, reservation_unit_data)
     reservable_time_span_helper = ReservableTimeSpanFirstReservableTimeHelper(
         reservation_unit_helper,
-        original_reservable_time_span,
+        original_reservable_time_span.as_time_span_element(),
     )
     result = reservable_time_span_helper._find_first_reservable_time_span(
         normalised_reservable_time_spans=reservable_time_spans,
@@ -363,7 +375,8 @@ def test__find_first_reservable_time_span_for_reservation_unit__max_duration_is_
     reservation_unit.affected_time_spans = []
 
     helper = FirstReservableTimeHelper(ReservationUnit.objects.none())
-    reservation_unit_helper = ReservationUnitFirstReservableTimeHelper(helper, reservation_unit)
+    reservation_unit_data = ReservationUnitCalculationData.from_reservation_unit(reservation_unit)
+    reservation_unit_helper = ReservationUnitFirstReservableTimeHelper(helper, reservation_unit_data)
 
     # Minimum duration is longer than interval, so it is kept as-is
     assert reservation_unit_helper.minimum_duration_minutes == 140
@@ -371,3 +384,72 @@ def test__find_first_reservable_time_span_for_reservation_unit__max_duration_is_
     # Maximum is not a multiple of interval, so it is rounded down to the last multiple of the interval, which is 120
     # causing the maximum duration to be less than the minimum duration
     assert reservation_unit_helper.is_reservation_unit_max_duration_too_short is True
+
+
+def test__first_reservable_time_helper__calculate_first_reservable_times__results_in_order():
+    next_year = datetime.date.today().year + 1
+
+    pks: list[int] = []
+    for i in range(20):
+        origin_hauki_resource = OriginHaukiResourceFactory.create()
+        reservation_unit = ReservationUnitFactory.create(
+            origin_hauki_resource=origin_hauki_resource,
+            reservation_begins_at=None,
+            reservation_ends_at=None,
+            reservations_min_days_before=None,
+            reservations_max_days_before=None,
+            min_reservation_duration=datetime.timedelta(hours=i % 3 + 1),
+            max_reservation_duration=None,
+        )
+        ReservableTimeSpanFactory.create(
+            resource=origin_hauki_resource,
+            start_datetime=datetime.datetime(next_year, 1, 1, 8, tzinfo=DEFAULT_TIMEZONE),
+            end_datetime=datetime.datetime(next_year, 1, 1, 9 + i % 4, tzinfo=DEFAULT_TIMEZONE),
+        )
+        pks.append(reservation_unit.pk)
+
+    helper = FirstReservableTimeHelper(ReservationUnit.objects.order_by("pk"))
+    reservation_units = helper.fetch_reservation_units(pks)
+    helper.load_affecting_time_spans(pks, after=None, until=helper.filter_date_end)
+    context = helper.get_calculation_context(loaded_until=helper.filter_date_end)
+
+    results = calculate_first_reservable_times(context, reservation_units)
+
+    assert [pk for pk, *_ in results] == pks
+    assert {frt for _, _, frt, _ in results} == {None, datetime.datetime(next_year, 1, 1, 8, tzinfo=DEFAULT_TIMEZONE)}
+
+
+def test__first_reservable_time_helper__calculate_first_reservable_times__worker_pool():
+    next_year = datetime.date.today().year + 1
+
+    pks: list[int] = []
+    for i in range(20):
+        origin_hauki_resource = OriginHaukiResourceFactory.create()
+        reservation_unit = ReservationUnitFactory.create(
+            origin_hauki_resource=origin_hauki_resource,
+            reservation_begins_at=None,
+            reservation_ends_at=None,
+            reservations_min_days_before=None,
+            reservations_max_days_before=None,
+            min_reservation_duration=datetime.timedelta(hours=i % 3 + 1),
+            max_reservation_duration=None,
+        )
+        ReservableTimeSpanFactory.create(
+            resource=origin_hauki_resource,
+            start_datetime=datetime.datetime(next_year, 1, 1, 8, tzinfo=DEFAULT_TIMEZONE),
+            end_datetime=datetime.datetime(next_year, 1, 1, 9 + i % 4, tzinfo=DEFAULT_TIMEZONE),
+        )
+        pks.append(reservation_unit.pk)
+
+    helper = FirstReservableTimeHelper(ReservationUnit.objects.order_by("pk"))
+    reservation_units = helper.fetch_reservation_units(pks)
+    helper.load_affecting_time_spans(pks, after=None, until=helper.filter_date_end)
+    context = helper.get_calculation_context(loaded_until=helper.filter_date_end)
+
+    expected = calculate_first_reservable_times(context, reservation_units)
+
+    # Results from the workers are merged in primary key order, regardless of the order of the given units.
+    with FirstReservableTimeWorkerPool(workers=2) as pool:
+        results = pool.calculate_first_reservable_times(context, list(reversed(reservation_units)))
+
+    assert results == expected
@@ -35,24 +35,25 @@ def test_image_cache_purge__error_if_cache_purge_key_missing():  # NOSONAR pytho
 
 @override_settings(IMAGE_CACHE_ENABLED=True)
 @patch_method(SentryLogger.log_message)
-@mock.patch("tilavarauspalvelu.integrations.image_cache.request")
-def test_image_cache_purge__makes_correct_request(request):
+@mock.patch("tilavarauspalvelu.integrations.image_cache.get_session")
+def test_image_cache_purge__makes_correct_request(get_session, settings):
+    request = get_session.return_value.request
     request.return_value = mock.MagicMock(status_code=200)
     image_cache.purge("foo/bar.jpg")
     request.assert_called_with(
         "PURGE",
         "https://fake.test.url/foo/bar.jpg",
         headers={"X-VC-Purge-Key": "test-purge-key", "Host": "test.tilavaraus.url"},
-        timeout=60,
+        timeout=(settings.EXTERNAL_SERVICE_CONNECT_TIMEOUT_SECONDS, 60),
     )
     assert SentryLogger.log_message.called is False
 
 
 @override_settings(IMAGE_CACHE_ENABLED=True)
 @patch_method(SentryLogger.log_message)
-@mock.patch("tilavarauspalvelu.integrations.image_cache.request")
-def test_image_cache_purge__logs_failed_requests(request):
-    request.return_value = mock.MagicMock(status_code=400)
+@mock.patch("tilavarauspalvelu.integrations.image_cache.get_session")
+def test_image_cache_purge__logs_failed_requests(get_session):
+    get_session.return_value.request.return_value = mock.MagicMock(status_code=400)
 
     image_cache.purge("foo/bar.jpg")
     assert SentryLogger.log_message.call_count == 1
@@ -19,7 +19,7 @@
 
 if TYPE_CHECKING:
     from django.db.models import QuerySet
-    from django.http import FileResponse
+    from django.http import StreamingHttpResponse
 
     from tilavarauspalvelu.typing import WSGIRequest
 
@@ -105,7 +105,7 @@ def status(self, obj: ApplicationRound) -> str:
         return obj.status
 
     @button(label="Export applications to CSV", change_form=True)
-    def export_applications_to_csv(self, request: WSGIRequest, pk: int) -> FileResponse | None:
+    def export_applications_to_csv(self, request: WSGIRequest, pk: int) -> StreamingHttpResponse | None:
         try:
             exporter = ApplicationRoundApplicationsCSVExporter(application_round_id=pk)
             response = exporter.to_file_response()
@@ -117,7 +117,7 @@ def export_applications_to_csv(self, request: WSGIRequest, pk: int) -> FileRespo
         return response
 
     @button(label="Export results to CSV", change_form=True)
-    def export_results_to_csv(self, request: WSGIRequest, pk: int) -> FileResponse | None:
+    def export_results_to_csv(self, request: WSGIRequest, pk: int) -> StreamingHttpResponse | None:
         try:
             exporter = ApplicationRoundResultCSVExporter(application_round_id=pk)
             response = exporter.to_file_response()
@@ -14,6 +14,7 @@
 from tilavarauspalvelu.enums import OrderStatus, ReservationStateChoice
 from tilavarauspalvelu.integrations.email.main import EmailService
 from tilavarauspalvelu.models import Reservation, ReservationDenyReason
+from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_cache import FirstReservableTimeCache
 from tilavarauspalvelu.tasks import cancel_payment_order_for_invoice_task, refund_payment_order_for_webshop_task
 from utils.date_utils import local_date, local_datetime
 
@@ -277,14 +278,17 @@ def _deny_reservations_action_confirmation_page(
 
     def _deny_reservations_action_set_denied(self, request: WSGIRequest, queryset: QuerySet[Reservation]) -> None:
         deny_reason = request.POST.get("deny_reason")
-        queryset.filter(
+        reservations = queryset.filter(
             state__in=ReservationStateChoice.states_that_can_change_to_deny,
             ends_at__gte=local_datetime(),
-        ).update(
+        )
+        reservation_unit_ids = set(reservations.values_list("reservation_unit", flat=True))
+        reservations.update(
             state=ReservationStateChoice.DENIED,
             handled_at=local_datetime(),
             deny_reason=deny_reason,
         )
+        FirstReservableTimeCache.invalidate(reservation_unit_ids, include_related=True)
 
         msg = _("Selected reservations have been denied.")
         self.message_user(request, msg, level=messages.INFO)
@@ -23,7 +23,7 @@
     from django import forms
     from django.db import models
     from django.db.models import QuerySet
-    from django.http import FileResponse
+    from django.http import StreamingHttpResponse
 
     from tilavarauspalvelu.models.reservation_unit.queryset import ReservationUnitQuerySet
     from tilavarauspalvelu.typing import WSGIRequest
@@ -252,7 +252,7 @@ def get_search_results(
         return queryset, may_have_duplicates
 
     @admin.action(description="Export selected reservation units to CSV")
-    def export_to_csv(self, request: WSGIRequest, queryset: ReservationUnitQuerySet) -> FileResponse | None:
+    def export_to_csv(self, request: WSGIRequest, queryset: ReservationUnitQuerySet) -> StreamingHttpResponse | None:
         try:
             exporter = ReservationUnitExporter(queryset=queryset)
             response = exporter.to_file_response()
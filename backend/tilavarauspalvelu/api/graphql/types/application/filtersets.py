@@ -3,10 +3,8 @@
 from typing import TYPE_CHECKING
 
 import django_filters
-from django.contrib.postgres.aggregates import ArrayAgg
 from graphene_django_extensions import ModelFilterSet
 from graphene_django_extensions.filters import EnumMultipleChoiceFilter, IntChoiceFilter, IntMultipleChoiceFilter
-from lookup_property import L
 
 from tilavarauspalvelu.enums import ApplicationStatusChoice, ReserveeType
 from tilavarauspalvelu.models import Application
@@ -51,14 +49,9 @@ class Meta:
 
     @staticmethod
     def filter_by_text_search(qs: ApplicationQuerySet, name: str, value: str) -> models.QuerySet:
-        fields = ("id", "application_sections_ids", "application_sections_names", "applicant")
-        qs = qs.alias(
-            applicant=L("applicant"),
-            application_sections_ids=ArrayAgg("application_sections__id"),
-            application_sections_names=ArrayAgg("application_sections__name"),
-        )
+        fields = ("id", "application_sections__id", "application_sections__name", "applicant")
         log_text_search(where="applications", text=value)
-        return text_search(qs=qs, fields=fields, text=value)
+        return text_search(qs=qs, fields=fields, text=value, search_vector="search_vector")
 
     @staticmethod
     def filter_by_status(qs: ApplicationQuerySet, name: str, value: list[str]) -> QuerySet:
@@ -100,10 +100,9 @@ def filter_include_preferred_order(qs: ApplicationSectionQuerySet, name: str, va
 
     @staticmethod
     def filter_text_search(qs: ApplicationSectionQuerySet, name: str, value: str) -> QuerySet:
-        fields = ("application__id", "id", "name", "applicant")
-        qs = qs.alias(applicant=L("application__applicant"))
+        fields = ("application__id", "id", "name", "application__applicant")
         log_text_search(where="application_section", text=value)
-        return text_search(qs=qs, fields=fields, text=value)
+        return text_search(qs=qs, fields=fields, text=value, search_vector="search_vector")
 
     def filter_has_allocations(self, queryset: ApplicationSectionQuerySet, name: str, value: bool) -> QuerySet:
         if value:
@@ -23,6 +23,7 @@
 from tilavarauspalvelu.integrations.email.main import EmailService
 from tilavarauspalvelu.integrations.keyless_entry import PindoraService
 from tilavarauspalvelu.models import AllocatedTimeSlot, Application, ApplicationRound, ApplicationSection, Reservation
+from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_cache import FirstReservableTimeCache
 from tilavarauspalvelu.typing import error_codes
 from utils.date_utils import local_datetime
 from utils.db import Now
@@ -284,11 +285,13 @@ def save(self, **kwargs: Any) -> CancellationOutput:
             actual_cancellations=cancellable_reservations_count,
         )
 
+        reservation_unit_ids = set(cancellable_reservations.values_list("reservation_unit", flat=True))
         cancellable_reservations.update(
             state=ReservationStateChoice.CANCELLED,
             cancel_reason=self.validated_data["cancel_reason"],
             cancel_details=self.validated_data.get("cancel_details", ""),
         )
+        FirstReservableTimeCache.invalidate(reservation_unit_ids, include_related=True)
 
         if cancellable_reservations_count:
             EmailService.send_seasonal_booking_cancelled_all_email(application_section=self.instance)
@@ -177,9 +177,17 @@ def filter_by_text_search(self, qs: QuerySet, name: str, value: str) -> QuerySet
 
         log_text_search(where="reservations", text=value)
 
-        # Shortcut for searching only emails
+        # Shortcut for searching only emails.
+        # Emails are searched in separate queries so that both can use the trigram indexes on the email columns.
         if EMAIL_DOMAIN_PATTERN.match(value):
-            return qs.filter(Q(user__email__icontains=value) | Q(reservee_email__icontains=value))
+            matches = (
+                Reservation.objects
+                .filter(reservee_email__icontains=value)
+                .order_by()
+                .values("pk")
+                .union(Reservation.objects.filter(user__email__icontains=value).order_by().values("pk"))
+            )
+            return qs.filter(pk__in=matches)
 
         min_search_text_length = 3
         if len(value) >= min_search_text_length:
@@ -196,7 +204,7 @@ def filter_by_text_search(self, qs: QuerySet, name: str, value: str) -> QuerySet
                 "user__last_name",
                 "reservation_series__name",
             )
-            return text_search(qs=qs, fields=fields, text=value)
+            return text_search(qs=qs, fields=fields, text=value, search_vector="search_vector")
 
         if value.isnumeric():
             return qs.filter(pk=int(value))
@@ -8,7 +8,8 @@
 from tilavarauspalvelu.enums import AccessType, ReservationStateChoice
 from tilavarauspalvelu.integrations.email.main import EmailService
 from tilavarauspalvelu.integrations.keyless_entry import PindoraService
-from tilavarauspalvelu.models import Reservation
+from tilavarauspalvelu.models import Reservation, ReservationOccupancy
+from tilavarauspalvelu.services.booking_context import BookingContext
 from tilavarauspalvelu.typing import ReservationAdjustTimeData, error_codes
 from utils.date_utils import DEFAULT_TIMEZONE
 from utils.external_service.errors import ExternalServiceError
@@ -54,7 +55,8 @@ def validate(self, data: ReservationAdjustTimeData) -> ReservationAdjustTimeData
 
         current_begin = self.instance.begins_at.astimezone(DEFAULT_TIMEZONE)
 
-        reservation_unit = self.instance.reservation_unit
+        context = BookingContext.load(self.instance.reservation_unit_id, begins_at, ends_at)
+        reservation_unit = context.reservation_unit
 
         reservation_unit.validators.validate_reservation_unit_is_direct_bookable()
         reservation_unit.validators.validate_reservation_unit_is_published()
@@ -62,11 +64,15 @@ def validate(self, data: ReservationAdjustTimeData) -> ReservationAdjustTimeData
         reservation_unit.validators.validate_begin_before_end(begin=begins_at, end=ends_at)
         reservation_unit.validators.validate_duration_is_allowed(duration=ends_at - begins_at)
         reservation_unit.validators.validate_reservation_days_before(begin=begins_at)
-        reservation_unit.validators.validate_reservation_unit_is_open(begin=begins_at, end=ends_at)
-        reservation_unit.validators.validate_not_rescheduled_to_paid_date(begin=begins_at)
+        reservation_unit.validators.validate_reservation_unit_is_open(begin=begins_at, end=ends_at, context=context)
+        reservation_unit.validators.validate_not_rescheduled_to_paid_date(begin=begins_at, context=context)
         reservation_unit.validators.validate_cancellation_rule(begin=current_begin)
-        reservation_unit.validators.validate_not_in_open_application_round(begin=begins_at.date(), end=ends_at.date())
-        reservation_unit.validators.validate_reservation_begin_time(begin=begins_at)
+        reservation_unit.validators.validate_not_in_open_application_round(
+            begin=begins_at.date(),
+            end=ends_at.date(),
+            context=context,
+        )
+        reservation_unit.validators.validate_reservation_begin_time(begin=begins_at, context=context)
         reservation_unit.validators.validate_no_overlapping_reservations(
             begins_at=begins_at, ends_at=ends_at, ignore_ids=[self.instance.pk]
         )
@@ -76,7 +82,7 @@ def validate(self, data: ReservationAdjustTimeData) -> ReservationAdjustTimeData
 
         data["buffer_time_before"] = reservation_unit.actions.get_actual_before_buffer(begins_at)
         data["buffer_time_after"] = reservation_unit.actions.get_actual_after_buffer(ends_at)
-        data["access_type"] = reservation_unit.actions.get_access_type_at(begins_at, default=AccessType.UNRESTRICTED)
+        data["access_type"] = context.access_type or AccessType.UNRESTRICTED
 
         return data
 
@@ -91,7 +97,9 @@ def update(self, instance: Reservation, validated_data: ReservationAdjustTimeDat
         )
 
         had_access_code = instance.access_type == AccessType.ACCESS_CODE
-        instance: Reservation = super().update(instance=instance, validated_data=validated_data)
+        # Overlapping reservations in the same spaces or resources are also prevented by the database.
+        with ReservationOccupancy.prevent_overlaps():
+            instance: Reservation = super().update(instance=instance, validated_data=validated_data)
         has_access_code = instance.access_type == AccessType.ACCESS_CODE
 
         # After rescheduling the reservation, check for overlapping reservations again.
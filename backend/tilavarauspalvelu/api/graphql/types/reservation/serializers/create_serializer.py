@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import datetime
 from typing import TYPE_CHECKING
 
 from django.conf import settings
@@ -13,7 +14,8 @@
 from tilavarauspalvelu.integrations.helsinki_profile.typing import ReservationPrefillInfo
 from tilavarauspalvelu.integrations.keyless_entry import PindoraService
 from tilavarauspalvelu.integrations.sentry import SentryLogger
-from tilavarauspalvelu.models import Reservation, ReservationUnit
+from tilavarauspalvelu.models import Reservation, ReservationOccupancy, ReservationUnit, ReservationUnitHierarchy
+from tilavarauspalvelu.services.booking_context import BookingContext
 from tilavarauspalvelu.typing import error_codes
 from utils.date_utils import DEFAULT_TIMEZONE
 from utils.external_service.errors import ExternalServiceError
@@ -48,29 +50,34 @@ class Meta:
         ]
 
     def validate(self, data: ReservationCreateData) -> ReservationCreateData:
-        reservation_unit = data["reservation_unit"]
         begins_at = data["begins_at"].astimezone(DEFAULT_TIMEZONE)
         ends_at = data["ends_at"].astimezone(DEFAULT_TIMEZONE)
 
         # Endpoint requires users to be logged in
         user: User = self.context["request"].user
 
+        context = BookingContext.load(data["reservation_unit"], begins_at, ends_at, user=user)
+        reservation_unit = data["reservation_unit"] = context.reservation_unit
+
         user.validators.validate_is_internal_user_if_ad_user()
 
         reservation_unit.validators.validate_reservation_unit_is_direct_bookable()
         reservation_unit.validators.validate_reservation_unit_is_published()
         reservation_unit.validators.validate_reservation_unit_is_reservable_at(begin=begins_at)
         reservation_unit.validators.validate_user_is_adult_if_required(user=user)
-        reservation_unit.validators.validate_user_has_not_exceeded_max_reservations(user=user)
+        reservation_unit.validators.validate_user_has_not_exceeded_max_reservations(user=user, context=context)
         reservation_unit.validators.validate_begin_before_end(begin=begins_at, end=ends_at)
         reservation_unit.validators.validate_duration_is_allowed(duration=ends_at - begins_at)
         reservation_unit.validators.validate_reservation_days_before(begin=begins_at)
-        reservation_unit.validators.validate_reservation_unit_is_open(begin=begins_at, end=ends_at)
-        reservation_unit.validators.validate_not_in_open_application_round(begin=begins_at.date(), end=ends_at.date())
-        reservation_unit.validators.validate_reservation_begin_time(begin=begins_at)
-        reservation_unit.validators.validate_no_overlapping_reservations(begins_at=begins_at, ends_at=ends_at)
+        reservation_unit.validators.validate_reservation_unit_is_open(begin=begins_at, end=ends_at, context=context)
+        reservation_unit.validators.validate_not_in_open_application_round(
+            begin=begins_at.date(),
+            end=ends_at.date(),
+            context=context,
+        )
+        reservation_unit.validators.validate_reservation_begin_time(begin=begins_at, context=context)
 
-        pricing = reservation_unit.actions.get_active_pricing(by_date=begins_at.date())
+        pricing = context.pricing
 
         if pricing is None:
             msg = "No pricing found for the given date."
@@ -91,7 +98,7 @@ def validate(self, data: ReservationCreateData) -> ReservationCreateData:
         data["unit_price"] = pricing.highest_price
         data["tax_percentage_value"] = pricing.tax_percentage.value
         data["non_subsidised_price"] = data["price"]
-        data["access_type"] = reservation_unit.actions.get_access_type_at(begins_at, default=AccessType.UNRESTRICTED)
+        data["access_type"] = context.access_type or AccessType.UNRESTRICTED
 
         if settings.PREFILL_RESERVATION_WITH_PROFILE_DATA:
             self.prefill_reservation_from_profile(data)
@@ -108,18 +115,33 @@ def prefill_reservation_from_profile(self, data: ReservationCreateData) -> None:
         if id_token is None or id_token.is_ad_login:
             return
 
-        try:
-            prefill_info = HelsinkiProfileClient.get_reservation_prefill_info(user=user, session=request.session)
-        except ExternalServiceError:
-            prefill_info = None
-        except Exception as error:  # noqa: BLE001
-            msg = "Unexpected error reading profile data"
-            SentryLogger.log_exception(error, details=msg, user=user.pk)
-            return
+        # Use the prefill info stored in the session (e.g. during login) if it was fetched recently enough,
+        # so that the reservation doesn't need to wait for a request to Helsinki profile.
+        max_age = datetime.timedelta(seconds=settings.PREFILL_INFO_MAX_AGE_SECONDS)
+        reservation_prefill_info = HelsinkiProfileClient.get_stored_reservation_prefill_info(
+            session=request.session,
+            max_age=max_age,
+        )
+
+        if reservation_prefill_info is None:
+            try:
+                prefill_info = HelsinkiProfileClient.get_reservation_prefill_info(user=user, session=request.session)
+            except ExternalServiceError:
+                prefill_info = None
+            except Exception as error:  # noqa: BLE001
+                msg = "Unexpected error reading profile data"
+                SentryLogger.log_exception(error, details=msg, user=user.pk)
+                return
+
+            if prefill_info is not None:
+                HelsinkiProfileClient.store_reservation_prefill_info(session=request.session, prefill_info=prefill_info)
+
+            # Primarily use the prefill info directly from the profile, but if it is not available,
+            # use the prefill info stored in the session, even if it's not recent.
+            reservation_prefill_info = prefill_info or HelsinkiProfileClient.get_stored_reservation_prefill_info(
+                session=request.session,
+            )
 
-        # Primarily use the prefill info directly from the profile, but if it is not available,
-        # use the prefill info stored in the session.
-        reservation_prefill_info = prefill_info or request.session.get("reservation_prefill_info")
         if reservation_prefill_info is not None:
             # Validate cached keys before updating the data, in case the data has keys from older incompatible version.
             prefill_valid_keys = list(ReservationPrefillInfo.__annotations__)
@@ -130,20 +152,23 @@ def prefill_reservation_from_profile(self, data: ReservationCreateData) -> None:
             })
 
     def create(self, validated_data: ReservationCreateData) -> Reservation:
-        reservation: Reservation = super().create(validated_data)
+        reservation_unit = validated_data["reservation_unit"]
+
+        # Overlapping reservations in the same spaces or resources are also prevented by the database.
+        with ReservationOccupancy.prevent_overlaps():
+            # Reservations in the same space-resource hierarchy are created one at a time,
+            # so that two reservations created at almost the same time cannot both pass the
+            # overlapping reservations check before either of them has been saved.
+            ReservationUnitHierarchy.lock([reservation_unit.pk])
+
+            reservation_unit.validators.validate_no_overlapping_reservations(
+                begins_at=validated_data["begins_at"],
+                ends_at=validated_data["ends_at"],
+            )
 
-        # After creating the reservation, check again if there are any overlapping reservations.
-        # This can fail if two reservations are created for reservation units in the same
-        # space-resource hierarchy at almost the same time, meaning when we check for overlapping
-        # reservations during validation, neither of the reservations are yet created.
-        if reservation.actions.overlapping_reservations().exists():
-            reservation.delete()
-            msg = "Overlapping reservations were created at the same time."
-            raise ValidationError(msg, code=error_codes.OVERLAPPING_RESERVATIONS)
+            reservation: Reservation = super().create(validated_data)
 
         # Pindora request must succeed, otherwise the reservation is removed.
-        # Do this after the second overlapping reservation check, so that we don't need to
-        # remove the access code in Pindora from the removed reservation.
         if reservation.access_type == AccessType.ACCESS_CODE:
             try:
                 PindoraService.create_access_code(obj=reservation)
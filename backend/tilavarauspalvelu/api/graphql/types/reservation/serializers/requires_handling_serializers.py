@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import contextlib
 from typing import TYPE_CHECKING, Any, NotRequired, TypedDict
 
 from graphene_django_extensions import NestingModelSerializer
@@ -11,7 +12,7 @@
 from tilavarauspalvelu.integrations.email.main import EmailService
 from tilavarauspalvelu.integrations.keyless_entry import PindoraService
 from tilavarauspalvelu.integrations.sentry import SentryLogger
-from tilavarauspalvelu.models import Reservation
+from tilavarauspalvelu.models import Reservation, ReservationOccupancy
 from tilavarauspalvelu.typing import error_codes
 from utils.date_utils import DEFAULT_TIMEZONE
 from utils.external_service.errors import ExternalServiceError
@@ -71,16 +72,17 @@ def update(self, instance: Reservation, validated_data: dict[str, Any]) -> Reser
             if payment_order.actions.has_no_payment_through_webshop():
                 payment_order.actions.cancel_together_with_verkkokauppa(cancel_on_error=True)
 
-        instance = super().update(instance=instance, validated_data=validated_data)
+        # Overlapping reservations in the same spaces or resources are also prevented by the database
+        # for reservations that are going to happen again.
+        is_going_to_occur_again = previous_state not in ReservationStateChoice.states_going_to_occur
+        with ReservationOccupancy.prevent_overlaps() if is_going_to_occur_again else contextlib.nullcontext():
+            instance = super().update(instance=instance, validated_data=validated_data)
 
         # If the reservation was changed from 'DENIED' to 'REQUIRES_HANDLING' in this mutation,
         # it means that the reservation is going to happen again. This is analogous to creating a new reservation,
         # so we must check for overlapping reservations again. This can fail if another reservation
         # is created (or "un-denied") for the same reservation unit at almost the same time.
-        if (
-            previous_state not in ReservationStateChoice.states_going_to_occur
-            and instance.actions.overlapping_reservations().exists()
-        ):
+        if is_going_to_occur_again and instance.actions.overlapping_reservations().exists():
             instance.state = previous_state
             instance.save(update_fields=["state"])
             msg = "Overlapping reservations were created at the same time."
@@ -8,7 +8,7 @@
 from tilavarauspalvelu.enums import AccessType, ReservationStateChoice
 from tilavarauspalvelu.integrations.email.main import EmailService
 from tilavarauspalvelu.integrations.keyless_entry import PindoraService
-from tilavarauspalvelu.models import Reservation
+from tilavarauspalvelu.models import Reservation, ReservationOccupancy
 from tilavarauspalvelu.typing import StaffReservationAdjustTimeData, error_codes
 from utils.date_utils import DEFAULT_TIMEZONE
 from utils.external_service.errors import ExternalServiceError
@@ -73,7 +73,9 @@ def update(self, instance: Reservation, validated_data: StaffReservationAdjustTi
         )
 
         had_access_code = instance.access_type == AccessType.ACCESS_CODE
-        instance: Reservation = super().update(instance=instance, validated_data=validated_data)
+        # Overlapping reservations in the same spaces or resources are also prevented by the database.
+        with ReservationOccupancy.prevent_overlaps():
+            instance: Reservation = super().update(instance=instance, validated_data=validated_data)
         has_access_codes = instance.access_type == AccessType.ACCESS_CODE
 
         if instance.actions.overlapping_reservations().exists():
@@ -5,7 +5,6 @@
 
 from graphene_django_extensions import NestingModelSerializer
 from graphene_django_extensions.fields import EnumFriendlyChoiceField, IntegerPrimaryKeyField
-from rest_framework.exceptions import ValidationError
 from rest_framework.fields import IntegerField
 
 from tilavarauspalvelu.enums import (
@@ -17,8 +16,14 @@
 )
 from tilavarauspalvelu.integrations.keyless_entry import PindoraService
 from tilavarauspalvelu.integrations.sentry import SentryLogger
-from tilavarauspalvelu.models import AgeGroup, Reservation, ReservationPurpose, ReservationUnit
-from tilavarauspalvelu.typing import error_codes
+from tilavarauspalvelu.models import (
+    AgeGroup,
+    Reservation,
+    ReservationOccupancy,
+    ReservationPurpose,
+    ReservationUnit,
+    ReservationUnitHierarchy,
+)
 from utils.date_utils import DEFAULT_TIMEZONE, local_datetime
 from utils.external_service.errors import ExternalServiceError
 
@@ -124,23 +129,8 @@ def validate(self, data: StaffCreateReservationData) -> StaffCreateReservationDa
 
         reservation_type = data.get("type")
         reservation_unit.validators.validate_can_create_reservation_type(reservation_type=reservation_type)
-
-        # For blocking reservations, buffer times can overlap existing reservations.
-        if reservation_type == ReservationTypeChoice.BLOCKED:
-            buffer_time_before = datetime.timedelta()
-            buffer_time_after = datetime.timedelta()
-        else:
-            buffer_time_before = data.get("buffer_time_before")
-            buffer_time_after = data.get("buffer_time_after")
-
         reservation_unit.validators.validate_begin_before_end(begin=begins_at, end=ends_at)
         reservation_unit.validators.validate_reservation_begin_time_staff(begin=begins_at)
-        reservation_unit.validators.validate_no_overlapping_reservations(
-            begins_at=begins_at,
-            ends_at=ends_at,
-            new_buffer_time_before=buffer_time_before,
-            new_buffer_time_after=buffer_time_after,
-        )
 
         now = local_datetime()
         id_token = user.id_token
@@ -155,16 +145,18 @@ def validate(self, data: StaffCreateReservationData) -> StaffCreateReservationDa
         return data
 
     def create(self, validated_data: StaffCreateReservationData) -> Reservation:
-        reservation: Reservation = super().create(validated_data)
+        reservation_unit: ReservationUnit = validated_data["reservation_unit"]
+
+        # Overlapping reservations in the same spaces or resources are also prevented by the database.
+        with ReservationOccupancy.prevent_overlaps():
+            # Reservations in the same space-resource hierarchy are created one at a time,
+            # so that two reservations created at almost the same time cannot both pass the
+            # overlapping reservations check before either of them has been saved.
+            ReservationUnitHierarchy.lock([reservation_unit.pk])
+
+            self.validate_no_overlapping_reservations(validated_data)
 
-        # After creating the reservation, check again if there are any overlapping reservations.
-        # This can fail if two reservations are created for reservation units in the same
-        # space-resource hierarchy at almost the same time, meaning when we check for overlapping
-        # reservations during validation, neither of the reservations are yet created.
-        if reservation.actions.overlapping_reservations().exists():
-            reservation.delete()
-            msg = "Overlapping reservations were created at the same time."
-            raise ValidationError(msg, code=error_codes.OVERLAPPING_RESERVATIONS)
+            reservation: Reservation = super().create(validated_data)
 
         if reservation.access_type == AccessType.ACCESS_CODE:
             is_active = reservation.type != ReservationTypeChoice.BLOCKED
@@ -175,3 +167,21 @@ def create(self, validated_data: StaffCreateReservationData) -> Reservation:
                 SentryLogger.log_exception(error, details=f"Reservation: {reservation.pk}")
 
         return reservation
+
+    def validate_no_overlapping_reservations(self, data: StaffCreateReservationData) -> None:
+        reservation_unit: ReservationUnit = data["reservation_unit"]
+
+        # For blocking reservations, buffer times can overlap existing reservations.
+        if data.get("type") == ReservationTypeChoice.BLOCKED:
+            buffer_time_before = datetime.timedelta()
+            buffer_time_after = datetime.timedelta()
+        else:
+            buffer_time_before = data.get("buffer_time_before")
+            buffer_time_after = data.get("buffer_time_after")
+
+        reservation_unit.validators.validate_no_overlapping_reservations(
+            begins_at=data["begins_at"],
+            ends_at=data["ends_at"],
+            new_buffer_time_before=buffer_time_before,
+            new_buffer_time_after=buffer_time_after,
+        )
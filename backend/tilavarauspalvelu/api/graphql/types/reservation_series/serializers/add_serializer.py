@@ -11,7 +11,7 @@
 from tilavarauspalvelu.integrations.keyless_entry import PindoraService
 from tilavarauspalvelu.integrations.keyless_entry.exceptions import PindoraNotFoundError
 from tilavarauspalvelu.integrations.sentry import SentryLogger
-from tilavarauspalvelu.models import ReservationSeries
+from tilavarauspalvelu.models import ReservationOccupancy, ReservationSeries
 from utils.date_utils import DEFAULT_TIMEZONE, local_datetime
 from utils.external_service.errors import ExternalServiceError
 
@@ -115,7 +115,9 @@ def update(self, instance: ReservationSeries, validated_data: ReservationSeriesA
         reservation.handling_details = ""
         reservation.cancel_details = ""
 
-        reservation.save()
+        # Overlapping reservations in the same spaces or resources are prevented by the database.
+        with ReservationOccupancy.prevent_overlaps():
+            reservation.save()
 
         # Reschedule Pindora series or seasonal booking if new reservation uses access code
         if validated_data["access_type"] == AccessType.ACCESS_CODE:
@@ -199,12 +199,6 @@ def create(self, validated_data: ReservationSeriesCreateData) -> ReservationSeri
             except ExternalServiceError as error:
                 SentryLogger.log_exception(error, details=f"Reservation series: {instance.pk}")
 
-        # Must refresh the materialized view since new reservations are created.
-        # TODO: Disabled for now, since it might contribute to timeouts in production.
-        #  Refresh still happens on a background task every 2 minutes.
-        #  if settings.UPDATE_AFFECTING_TIME_SPANS:  # noqa: ERA001,RUF100
-        #      update_affecting_time_spans_task.delay()  # noqa: ERA001,RUF100
-
         if settings.SAVE_RESERVATION_STATISTICS:
             create_statistics_for_reservations_task.delay(
                 reservation_pks=[reservation.pk for reservation in reservations],
@@ -14,6 +14,7 @@
 from tilavarauspalvelu.integrations.keyless_entry import PindoraService
 from tilavarauspalvelu.integrations.keyless_entry.exceptions import PindoraNotFoundError
 from tilavarauspalvelu.models import ReservationDenyReason, ReservationSeries
+from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_cache import FirstReservableTimeCache
 from tilavarauspalvelu.tasks import create_statistics_for_reservations_task
 from tilavarauspalvelu.typing import error_codes
 from utils.date_utils import local_datetime
@@ -70,6 +71,7 @@ def update(self, instance: ReservationSeries, validated_data: dict[str, Any]) ->
                 handling_details=validated_data.get("handling_details", ""),
                 handled_at=now,
             )
+            FirstReservableTimeCache.invalidate([instance.reservation_unit_id], include_related=True)
 
             # If any reservations had access codes, reschedule the series to remove all denied reservations.
             # This might leave an empty series, which is fine.
@@ -80,12 +82,6 @@ def update(self, instance: ReservationSeries, validated_data: dict[str, Any]) ->
                 ):
                     PindoraService.reschedule_access_code(instance)
 
-        # Must refresh the materialized view since reservations state changed to 'DENIED'
-        # TODO: Disabled for now, since it might contribute to timeouts in production.
-        #  Refresh still happens on a background task every 2 minutes.
-        #  if settings.UPDATE_AFFECTING_TIME_SPANS:  # noqa: ERA001,RUF100
-        #      update_affecting_time_spans_task.delay()  # noqa: ERA001,RUF100
-
         if settings.SAVE_RESERVATION_STATISTICS:
             create_statistics_for_reservations_task.delay(
                 reservation_pks=[reservation.pk for reservation in reservations],
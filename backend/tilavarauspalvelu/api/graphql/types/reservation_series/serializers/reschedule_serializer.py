@@ -138,12 +138,6 @@ def update(
                 with external_service_errors_as_validation_errors(code=error_codes.PINDORA_ERROR):
                     PindoraService.sync_access_code(obj=instance)
 
-        # Must refresh the materialized view since reservations changed time.
-        # TODO: Disabled for now, since it might contribute to timeouts in production.
-        #  Refresh still happens on a background task every 2 minutes.
-        #  if settings.UPDATE_AFFECTING_TIME_SPANS:  # noqa: ERA001,RUF100
-        #      update_affecting_time_spans_task.delay()  # noqa: ERA001,RUF100
-
         if settings.SAVE_RESERVATION_STATISTICS:
             create_statistics_for_reservations_task.delay(
                 reservation_pks=[reservation.pk for reservation in reservations],
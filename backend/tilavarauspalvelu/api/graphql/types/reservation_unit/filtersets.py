@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import base64
 from typing import TYPE_CHECKING, Any
 
 import django_filters
@@ -24,6 +23,7 @@
     UserRoleChoice,
 )
 from tilavarauspalvelu.models import ReservationUnit
+from utils.date_utils import local_date
 from utils.db import build_search
 from utils.fields.filters import TranslatedCharFilter
 from utils.utils import get_text_search_language
@@ -287,12 +287,6 @@ def get_filter_reservable(self, qs: ReservationUnitQuerySet, name: str, value: d
         if not calculate_first_reservable_time:
             return qs
 
-        # Calculate a cache key caching results for pagination.
-        # Pagination arguments do not affect the calculated results (note: ordering does!).
-        unaffecting = {"first", "last", "offset", "after", "before"}
-        args = sorted(f"{key}={value}" for key, value in self.data.items() if key not in unaffecting)
-        cache_key: str = base64.b64encode(",".join(args).encode()).decode()
-
         # Fetch the pagination information from the request.
         # This is set by the 'DjangoConnectionField' for each connection field in the request.
         # In this case, we want the 'reservation_units' entrypoints connection field pagination args,
@@ -307,6 +301,21 @@ def get_filter_reservable(self, qs: ReservationUnitQuerySet, name: str, value: d
         minimum_duration_minutes: Decimal | None = value["reservable_minimum_duration_minutes"]
         show_only_reservable = bool(value.get("show_only_reservable"))
 
+        # With the default filters, use the pre-calculated results. If they are available for all reservation units,
+        # the results can be read directly in the queryset. Otherwise, only the missing results are calculated.
+        uses_default_filters = (
+            date_start in {None, local_date()}
+            and date_end is None
+            and time_start is None
+            and time_end is None
+            and minimum_duration_minutes in {None, 15}
+        )
+        if uses_default_filters and qs.has_precomputed_first_reservable_times():
+            qs = qs.with_precomputed_first_reservable_time()
+            if not show_only_reservable:
+                return qs
+            return qs.exclude(first_reservable_datetime=None)
+
         # Annotate all ReservationUnits with `first_reservable_datetime` since we need the info in the GraphQL object.
         # If the GQL field is not selected for the query, then this is unnecessary, but if we do not annotate the info
         # here, the object type we would need to fetch this info one item at a time, which is inefficient.
@@ -318,7 +327,7 @@ def get_filter_reservable(self, qs: ReservationUnitQuerySet, name: str, value: d
             minimum_duration_minutes=minimum_duration_minutes,
             show_only_reservable=show_only_reservable,
             pagination_args=pagination_args,
-            cache_key=cache_key,
+            use_precomputed=uses_default_filters,
         )
 
         if not show_only_reservable:
@@ -2,6 +2,7 @@
 
 import dataclasses
 import datetime
+import json
 import uuid
 from functools import cache, wraps
 from http import HTTPStatus
@@ -10,9 +11,10 @@
 
 from django.conf import settings
 from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import URLValidator
-from django.http import HttpRequest, HttpResponseRedirect, JsonResponse
-from import_export.admin import ExportMixin
+from django.http import HttpRequest, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+from django.utils.encoding import force_str
 from import_export.declarative import ModelDeclarativeMetaclass
 from import_export.resources import ModelResource
 from import_export.widgets import BooleanWidget, DateTimeWidget, DurationWidget, IntegerWidget, TimeWidget
@@ -21,16 +23,20 @@
 from utils.utils import update_query_params
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterable, Iterator, Sequence
 
+    from django.db import models
     from import_export.fields import Field as ImportExportField
 
     from tilavarauspalvelu.typing import WSGIRequest
 
 
 __all__ = [
+    "ExportPagination",
     "ReservationUnitParams",
     "StatisticsParams",
+    "export_resource_rows",
+    "ndjson_response",
     "validate_pagination",
     "validation_error_as_response",
 ]
@@ -205,6 +211,69 @@ def validate_pagination(request: WSGIRequest) -> tuple[int, int]:
     return start, stop
 
 
+@dataclasses.dataclass
+class ExportPagination:
+    """
+    Pagination for the export endpoints.
+
+    Pages are selected with 'start' and 'stop' (offset pagination), optionally after the row with the given
+    'after_id' (keyset pagination). Keyset pagination is ordered by primary key, and doesn't count the total
+    number of rows, so its cost doesn't grow when paging deeper into the results.
+
+    With 'format=ndjson', all rows after the given 'after_id' are streamed as newline delimited JSON.
+    """
+
+    start: int
+    stop: int
+    after_id: int | None
+    stream: bool
+
+    @classmethod
+    def from_request(cls, request: WSGIRequest) -> ExportPagination:
+        after_id = parse_optional_int(request, "after_id")
+        response_format = str(request.GET.get("format", "json"))
+
+        if response_format not in {"json", "ndjson"}:
+            msg = "'format' should be either 'json' or 'ndjson'."
+            raise ValidationError(msg)
+
+        stream = response_format == "ndjson"
+        start, stop = (0, 0) if stream else validate_pagination(request)
+
+        return cls(start=start, stop=stop, after_id=after_id, stream=stream)
+
+    @property
+    def is_keyset(self) -> bool:
+        return self.after_id is not None
+
+    def paginate[Q: models.QuerySet](self, queryset: Q) -> Q:
+        if self.is_keyset:
+            queryset = queryset.filter(pk__gt=self.after_id).order_by("pk")
+        if self.stream:
+            return queryset
+        return queryset[self.start : self.stop]
+
+    def get_headers(self, queryset: models.QuerySet, instances: Sequence[models.Model]) -> dict[str, str]:
+        if not self.is_keyset:
+            return {
+                "Varaamo-Pagination-Total-Count": str(queryset.count()),
+                "Varaamo-Pagination-Start": str(self.start),
+                "Varaamo-Pagination-Stop": str(self.stop),
+            }
+
+        headers: dict[str, str] = {}
+        # If the page is full, there might be more rows after it.
+        if len(instances) == self.stop - self.start:
+            headers["Varaamo-Pagination-Next-After-Id"] = str(instances[-1].pk)
+        return headers
+
+
+def ndjson_response(rows: Iterable[dict[str, Any]]) -> StreamingHttpResponse:
+    """Stream the given rows as newline delimited JSON."""
+    lines = (json.dumps(row, cls=DjangoJSONEncoder, sort_keys=True) + "\n" for row in rows)
+    return StreamingHttpResponse(lines, status=200, content_type="application/x-ndjson")
+
+
 def parse_int(request: WSGIRequest, param: str, *, default: int) -> int:
     try:
         return int(request.GET.get(param, default))
@@ -213,6 +282,12 @@ def parse_int(request: WSGIRequest, param: str, *, default: int) -> int:
         raise ValidationError(msg) from error
 
 
+def parse_optional_int(request: WSGIRequest, param: str) -> int | None:
+    if request.GET.get(param) in {None, ""}:
+        return None
+    return parse_int(request, param, default=0)
+
+
 def parse_list_of_pks(request: WSGIRequest, param: str) -> list[int]:
     try:
         return [int(pk) for pk in request.GET.get(param, "").split(",") if pk]
@@ -245,33 +320,38 @@ def parse_datetime(request: WSGIRequest, param: str) -> datetime.datetime | None
 
 
 @cache
-def create_statistics_exporter() -> ExportMixin:
+def create_statistics_resource() -> type[ModelResource]:
     class ReservationStatisticResource(ModelResource, metaclass=ModelDeclarativeMetaclass):
         class Meta:
             model = ReservationStatistic
             exclude = ["id", "reservation"]
 
     fix_field_datetime_formats(ReservationStatisticResource)
-
-    exporter = ExportMixin()
-    exporter.model = ReservationStatistic
-    exporter.resource_classes = [ReservationStatisticResource]
-    return exporter
+    return ReservationStatisticResource
 
 
 @cache
-def create_reservable_time_spans_exporter() -> ExportMixin:
+def create_reservable_time_spans_resource() -> type[ModelResource]:
     class ReservableTimeSpanResource(ModelResource, metaclass=ModelDeclarativeMetaclass):
         class Meta:
             model = ReservableTimeSpan
             exclude = ["id"]
 
     fix_field_datetime_formats(ReservableTimeSpanResource)
+    return ReservableTimeSpanResource
+
 
-    exporter = ExportMixin()
-    exporter.model = ReservableTimeSpan
-    exporter.resource_classes = [ReservableTimeSpanResource]
-    return exporter
+def export_resource_rows(resource: ModelResource, instances: Iterable[models.Model]) -> Iterator[dict[str, Any]]:
+    """
+    Export the given model instances to JSON encodable dicts using the given import-export resource.
+
+    Values are rendered the same way as when exporting to a dataset, but without
+    writing the whole dataset to a JSON string first.
+    """
+    fields = resource.get_export_fields()
+    headers = [force_str(field.column_name) for field in fields]
+    for instance in instances:
+        yield dict(zip(headers, (resource.export_field(field, instance) for field in fields), strict=True))
 
 
 class MinutesDurationWidget(DurationWidget):
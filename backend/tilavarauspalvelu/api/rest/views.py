@@ -3,7 +3,6 @@
 import datetime
 import hmac
 import io
-import json
 from http import HTTPStatus
 from typing import TYPE_CHECKING, Any
 from urllib.parse import urlparse
@@ -18,7 +17,6 @@
 from django.views.csrf import csrf_failure
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET, require_POST
-from import_export.formats.base_formats import JSON
 from rest_framework.exceptions import ValidationError as DRFValidationError
 
 from tilavarauspalvelu.enums import OrderStatus, PaymentType, ReservationStateChoice
@@ -31,15 +29,17 @@
 from utils.utils import comma_sep_str, ical_hmac_signature, update_query_params
 
 from .utils import (
+    ExportPagination,
     ReservableTimeSpansParams,
     ReservationUnitParams,
     StatisticsParams,
-    create_reservable_time_spans_exporter,
-    create_statistics_exporter,
+    create_reservable_time_spans_resource,
+    create_statistics_resource,
+    export_resource_rows,
     is_valid_url,
+    ndjson_response,
     parse_list_of_pks,
     redirect_back_on_error,
-    validate_pagination,
     validation_error_as_response,
 )
 
@@ -63,6 +63,9 @@
     "terms_of_use_pdf",
 ]
 
+# Number of rows fetched from the database at a time when streaming exports.
+EXPORT_CHUNK_SIZE = 2_000
+
 
 @require_GET
 def reservation_ical(request: WSGIRequest, pk: int) -> FileResponse | JsonResponse:
@@ -221,7 +224,7 @@ def reservation_unit_export(request: WSGIRequest) -> HttpResponse:
 
     # --- Pagination -------------------------------------------------------------------------------------------------
 
-    start, stop = validate_pagination(request)
+    pagination = ExportPagination.from_request(request)
 
     # --- Filtering --------------------------------------------------------------------------------------------------
 
@@ -236,27 +239,25 @@ def reservation_unit_export(request: WSGIRequest) -> HttpResponse:
     if params.updated_before:
         queryset = queryset.filter(updated_at__lt=params.updated_before)
 
-    total_count = queryset.count()
-    queryset = queryset[start:stop]
+    page = pagination.paginate(queryset)
 
     # --- Export -----------------------------------------------------------------------------------------------------
 
-    exporter = ReservationUnitExporter(queryset=queryset, datetime_format="ISO")
-    data = exporter.write_json()
+    exporter = ReservationUnitExporter(queryset=page, datetime_format="ISO")
 
-    # --- Response ---------------------------------------------------------------------------------------------------
+    if pagination.stream:
+        return ndjson_response(exporter.iter_json(chunk_size=EXPORT_CHUNK_SIZE))
 
-    headers: dict[str, str] = {
-        "Varaamo-Pagination-Total-Count": str(total_count),
-        "Varaamo-Pagination-Start": str(queryset.query.low_mark),
-        "Varaamo-Pagination-Stop": str(queryset.query.high_mark),
-    }
+    instances = list(exporter.queryset)
+    data = list(exporter.iter_json(instances=instances))
+
+    # --- Response ---------------------------------------------------------------------------------------------------
 
     return JsonResponse(
         data,
         safe=False,
         status=200,
-        headers=headers,
+        headers=pagination.get_headers(queryset, instances),
         json_dumps_params={"sort_keys": True},
     )
 
@@ -279,7 +280,7 @@ def reservation_statistics_export(request: WSGIRequest) -> HttpResponse:
 
     # --- Pagination -------------------------------------------------------------------------------------------------
 
-    start, stop = validate_pagination(request)
+    pagination = ExportPagination.from_request(request)
 
     # --- Filtering --------------------------------------------------------------------------------------------------
 
@@ -298,28 +299,25 @@ def reservation_statistics_export(request: WSGIRequest) -> HttpResponse:
     if params.updated_before:
         queryset = queryset.filter(updated_at__lt=params.updated_before)
 
-    total_count = queryset.count()
-    queryset = queryset[start:stop]
+    page = pagination.paginate(queryset)
 
     # --- Export -----------------------------------------------------------------------------------------------------
 
-    exporter = create_statistics_exporter()
-    data_for_export = exporter.get_data_for_export(request, queryset)
-    export_data: str = JSON().export_data(data_for_export)
+    resource = create_statistics_resource()()
 
-    # --- Response ---------------------------------------------------------------------------------------------------
+    if pagination.stream:
+        return ndjson_response(export_resource_rows(resource, page.iterator(chunk_size=EXPORT_CHUNK_SIZE)))
 
-    headers: dict[str, str] = {
-        "Varaamo-Pagination-Total-Count": str(total_count),
-        "Varaamo-Pagination-Start": str(queryset.query.low_mark),
-        "Varaamo-Pagination-Stop": str(queryset.query.high_mark),
-    }
+    instances = list(page)
+    data = list(export_resource_rows(resource, instances))
+
+    # --- Response ---------------------------------------------------------------------------------------------------
 
     return JsonResponse(
-        json.loads(export_data),
+        data,
         safe=False,
         status=200,
-        headers=headers,
+        headers=pagination.get_headers(queryset, instances),
         json_dumps_params={"sort_keys": True},
     )
 
@@ -342,7 +340,7 @@ def reservable_time_spans_export(request: WSGIRequest) -> HttpResponse:
 
     # --- Pagination -------------------------------------------------------------------------------------------------
 
-    start, stop = validate_pagination(request)
+    pagination = ExportPagination.from_request(request)
 
     # --- Filtering --------------------------------------------------------------------------------------------------
 
@@ -359,28 +357,25 @@ def reservable_time_spans_export(request: WSGIRequest) -> HttpResponse:
     if params.before:
         queryset = queryset.filter(start_datetime__lte=params.before)
 
-    total_count = queryset.count()
-    queryset = queryset[start:stop]
+    page = pagination.paginate(queryset.select_related("resource"))
 
     # --- Export -----------------------------------------------------------------------------------------------------
 
-    exporter = create_reservable_time_spans_exporter()
-    data_for_export = exporter.get_data_for_export(request, queryset)
-    export_data: str = JSON().export_data(data_for_export)
+    resource = create_reservable_time_spans_resource()()
 
-    # --- Response ---------------------------------------------------------------------------------------------------
+    if pagination.stream:
+        return ndjson_response(export_resource_rows(resource, page.iterator(chunk_size=EXPORT_CHUNK_SIZE)))
 
-    headers: dict[str, str] = {
-        "Varaamo-Pagination-Total-Count": str(total_count),
-        "Varaamo-Pagination-Start": str(queryset.query.low_mark),
-        "Varaamo-Pagination-Stop": str(queryset.query.high_mark),
-    }
+    instances = list(page)
+    data = list(export_resource_rows(resource, instances))
+
+    # --- Response ---------------------------------------------------------------------------------------------------
 
     return JsonResponse(
-        json.loads(export_data),
+        data,
         safe=False,
         status=200,
-        headers=headers,
+        headers=pagination.get_headers(queryset, instances),
         json_dumps_params={"sort_keys": True},
     )
 
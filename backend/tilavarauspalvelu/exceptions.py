@@ -11,6 +11,10 @@ class ApplicationRoundResetError(Exception):
     """Error when resetting application round"""
 
 
+class EmailTemplateCompilationError(Exception):
+    """Error when compiling the MJML layout of an email template to HTML"""
+
+
 class FirstReservableTimeError(Exception):
     """Error when calculating first reservable time"""
 
@@ -26,6 +26,8 @@
 from .typing import EmailData, EmailType
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     from tilavarauspalvelu.models import ApplicationSection, Reservation, ReservationSeries
     from tilavarauspalvelu.typing import Lang
 
@@ -86,11 +88,41 @@ def send_reservation_access_type_changed_email(reservation: Reservation, *, lang
             EmailService.send_seasonal_booking_access_type_changed_email(section)
             return
 
+        email = EmailService._build_reservation_access_type_changed_email(reservation, language=language)
+        if email is not None:
+            send_emails_in_batches_task.delay(email_data=email)
+
+    @staticmethod
+    def send_reservation_access_type_changed_emails(reservations: Iterable[Reservation]) -> None:
+        """
+        Sends emails to the users when the access types of multiple reservations have been changed.
+        Emails are queued to be sent in a single task.
+        """
+        emails: list[EmailData] = []
+
+        for reservation in reservations:
+            if reservation.type == ReservationTypeChoice.SEASONAL:
+                EmailService.send_reservation_access_type_changed_email(reservation)
+                continue
+
+            email = EmailService._build_reservation_access_type_changed_email(reservation)
+            if email is not None:
+                emails.append(email)
+
+        if emails:
+            send_multiple_emails_in_batches_task.delay(emails=emails)
+
+    @staticmethod
+    def _build_reservation_access_type_changed_email(
+        reservation: Reservation,
+        *,
+        language: Lang | None = None,
+    ) -> EmailData | None:
         if reservation.type not in ReservationTypeChoice.types_created_by_the_reservee:
-            return
+            return None
 
         if reservation.ends_at.astimezone(DEFAULT_TIMEZONE) <= local_datetime():
-            return
+            return None
 
         recipients = get_reservation_email_recipients(reservation=reservation)
         if not recipients:
@@ -98,7 +130,7 @@ def send_reservation_access_type_changed_email(reservation: Reservation, *, lang
                 "No recipients for the 'reservation access type changed' email",
                 details={"reservation": reservation.pk},
             )
-            return
+            return None
 
         if language is None:
             language = get_reservation_email_language(reservation=reservation)
@@ -106,14 +138,13 @@ def send_reservation_access_type_changed_email(reservation: Reservation, *, lang
         email_type = EmailType.RESERVATION_ACCESS_TYPE_CHANGED
         context = email_type.get_email_context(reservation, language=language)
         attachment = get_reservation_ical_attachment(reservation)
-        email = EmailData.build(
+        return EmailData.build(
             recipients,
             context,
             email_type,
             valid_until=reservation.ends_at,
             attachment=attachment,
         )
-        send_emails_in_batches_task.delay(email_data=email)
 
     @staticmethod
     def send_reservation_cancelled_email(reservation: Reservation, *, language: Lang | None = None) -> None:
@@ -1,23 +1,66 @@
 from __future__ import annotations
 
+import hashlib
+import re
+from functools import lru_cache
+from importlib.metadata import version
 from typing import TYPE_CHECKING
 
 import mjml
+from django.conf import settings
+from django.core.cache import cache
 from django.template.loader import get_template
+from django.utils.translation import get_language, override
+from django_jinja.backend import Template
+from jinja2 import BaseLoader
+
+from tilavarauspalvelu.exceptions import EmailTemplateCompilationError
 
 if TYPE_CHECKING:
-    from django_jinja.backend import Template
+    from collections.abc import Callable
+
+    from jinja2 import Environment
 
     from tilavarauspalvelu.integrations.email.typing import EmailTemplateType
     from tilavarauspalvelu.typing import EmailContext
 
 
 __all__ = [
+    "compile_html_template",
     "render_html",
     "render_text",
 ]
 
 
+# Compiled HTML depends on the MJML compiler version, so it's part of the cache key.
+MJML_VERSION = version("mjml-python")
+
+# Jinja tags that define the layout of a template. These are rendered before the layout is compiled to HTML.
+LAYOUT_STATEMENTS = frozenset(("extends", "block", "endblock", "include"))
+
+JINJA_TAG_PATTERN = re.compile(r"\{\{.*?\}\}|\{%-?\s*(?P<statement>\w+).*?%\}", flags=re.DOTALL)
+
+# MJML components whose content is HTML instead of other components.
+# Jinja statements inside them can be left as they are when compiling.
+ENDING_TAG_PATTERN = (
+    r"mj-text|mj-button|mj-table|mj-raw|mj-title|mj-preview|mj-style"
+    r"|mj-navbar-link|mj-accordion-title|mj-accordion-text|mj-social-element"
+)
+
+COMPILATION_PATTERN = re.compile(
+    rf"(?P<ending_tag><(?P<closing>/?)(?:{ENDING_TAG_PATTERN})\b[^>]*?(?P<self_closing>/?)>)"
+    r"|(?P<jinja_tag>\{\{.*?\}\}|\{%.*?%\})",
+    flags=re.DOTALL,
+)
+
+PLACEHOLDER_PATTERN = re.compile(r"jinja-placeholder-(?P<index>\d+)")
+
+# The compiler wraps `<mj-raw>` components inside a column into a table row of their own.
+WRAPPED_PLACEHOLDER_PATTERN = re.compile(
+    r"<tr>\s*<td[^>]*>\s*(?P<placeholder>jinja-placeholder-\d+)\s*</td>\s*</tr>",
+)
+
+
 def render_text(*, email_type: EmailTemplateType, context: EmailContext) -> str:
     template_text: Template = get_template(email_type.text_path)
     return template_text.render(context).strip()
@@ -25,6 +68,108 @@ def render_text(*, email_type: EmailTemplateType, context: EmailContext) -> str:
 
 def render_html(*, email_type: EmailTemplateType, context: EmailContext) -> str:
     # Assumes that all email HTML templates are written in MJML (as they should be to be compatible with Outlook)
-    template_html: Template = get_template(email_type.html_path)
-    mjml_content = template_html.render(context)
-    return mjml.mjml2html(mjml_content).strip()
+    # Contexts contain the language of the email, but it's not necessarily the active language when rendering.
+    language = context.get("language") or get_language() or settings.LANGUAGE_CODE
+    template_html = compile_html_template(email_type.html_path, language=language)
+    return template_html.render(context).strip()
+
+
+@lru_cache(maxsize=256)
+def compile_html_template(html_path: str, *, language: str) -> Template:
+    """
+    Get the HTML template compiled from the MJML template in the given path for the given language.
+
+    Compiling MJML is the most expensive part of rendering an email, so only the layout of the template
+    is compiled, with its Jinja expressions and statements left intact. The compiled template is then
+    rendered with the context of each email. This way, the compiled templates contain no personal data,
+    and can be cached in the current process and in the shared cache, keyed by the hash of the layout.
+    Use the `warm_email_html_cache` command to compile all templates to the shared cache on deploy.
+    """
+    template: Template = get_template(html_path)
+    environment: Environment = template.backend.env
+
+    with override(language):
+        layout = render_mjml_layout(environment, html_path)
+
+    digest = hashlib.sha256(layout.encode()).hexdigest()
+    cache_key = f"email_html_template:{MJML_VERSION}:{language}:{digest}"
+
+    compiled_html: str | None = cache.get(cache_key)
+    if compiled_html is None:
+        compiled_html = compile_mjml_layout(layout)
+        cache.set(cache_key, compiled_html, timeout=settings.EMAIL_HTML_TEMPLATE_CACHE_TIMEOUT_SECONDS)
+
+    return Template(environment.from_string(compiled_html), template.backend)
+
+
+def render_mjml_layout(environment: Environment, html_path: str) -> str:
+    """
+    Render the layout of the MJML template in the given path: the templates it extends and includes are
+    rendered, but all other Jinja expressions and statements are left in the result as they are.
+    """
+    layout_environment = environment.overlay(loader=MJMLLayoutLoader(environment.loader), cache_size=0)
+    return layout_environment.get_template(html_path).render()
+
+
+def compile_mjml_layout(layout: str) -> str:
+    """
+    Compile the given MJML layout to HTML, so that the Jinja expressions and statements in it are left intact.
+
+    Jinja tags are replaced with placeholders for compilation. Statements between MJML components
+    (e.g. an `{% if %}` around a `<mj-text>`) are wrapped in `<mj-raw>`, so that the compiler
+    keeps them around the HTML of the components they contain. Such statements should only be used
+    inside `<mj-column>`, since the compiler would lay out an `<mj-raw>` in a section like a column.
+    """
+    jinja_tags: list[str] = []
+    ending_tag_depth: int = 0
+
+    def replace(match: re.Match[str]) -> str:
+        nonlocal ending_tag_depth
+
+        if match["ending_tag"] is not None:
+            if match["closing"]:
+                ending_tag_depth -= 1
+            elif not match["self_closing"]:
+                ending_tag_depth += 1
+            return match["ending_tag"]
+
+        jinja_tag = match["jinja_tag"]
+        placeholder = f"jinja-placeholder-{len(jinja_tags)}"
+        jinja_tags.append(jinja_tag)
+
+        if jinja_tag.startswith("{%") and ending_tag_depth == 0:
+            return f"<mj-raw>{placeholder}</mj-raw>"
+        return placeholder
+
+    html = mjml.mjml2html(COMPILATION_PATTERN.sub(replace, layout)).strip()
+    html = WRAPPED_PLACEHOLDER_PATTERN.sub(r"\g<placeholder>", html)
+
+    # Compiled HTML is used as a Jinja template, so any Jinja delimiters added by the compiler must be escaped.
+    html = re.sub(r"\{[{%#]", lambda match: f"{{{{ {match[0]!r} }}}}", html)
+
+    indexes = [int(match["index"]) for match in PLACEHOLDER_PATTERN.finditer(html)]
+    if sorted(set(indexes)) != list(range(len(jinja_tags))):
+        msg = "Jinja tags were lost when compiling the MJML layout to HTML."
+        raise EmailTemplateCompilationError(msg)
+
+    return PLACEHOLDER_PATTERN.sub(lambda match: jinja_tags[int(match["index"])], html)
+
+
+class MJMLLayoutLoader(BaseLoader):
+    """
+    Template loader that escapes all Jinja expressions and statements in the loaded templates
+    except the ones that define their layout, so that they are left intact when the layout is rendered.
+    """
+
+    def __init__(self, loader: BaseLoader) -> None:
+        self.loader = loader
+
+    def get_source(self, environment: Environment, template: str) -> tuple[str, str | None, Callable[[], bool] | None]:
+        source, filename, uptodate = self.loader.get_source(environment, template)
+        return JINJA_TAG_PATTERN.sub(self._escape_tag, source), filename, uptodate
+
+    @staticmethod
+    def _escape_tag(match: re.Match[str]) -> str:
+        if match["statement"] in LAYOUT_STATEMENTS:
+            return match[0]
+        return f"{{% raw %}}{match[0]}{{% endraw %}}"
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import logging
+import time
+from contextlib import suppress
 from copy import copy
 from itertools import batched
 from smtplib import SMTPException
@@ -7,7 +10,7 @@
 
 from django.conf import settings
 from django.core.cache import cache
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
 
 from config.celery import app
 from tilavarauspalvelu.integrations.email.typing import EmailData
@@ -24,9 +27,17 @@
 ]
 
 
-@app.task(name="send_emails_in_batches")
+logger = logging.getLogger(__name__)
+
+
+@app.task(name="send_emails_in_batches", rate_limit=settings.EMAIL_TASK_RATE_LIMIT or None)
 def send_emails_in_batches_task(email_data: EmailData) -> None:
-    """Sends an email message in batches."""
+    """
+    Sends an email message in batches.
+
+    All batches are sent using the same connection to the email server,
+    so that a new connection doesn't need to be opened for every batch.
+    """
     if not settings.SEND_EMAILS:
         return
 
@@ -34,46 +45,66 @@ def send_emails_in_batches_task(email_data: EmailData) -> None:
     if isinstance(email_data, dict):
         email_data = EmailData(**email_data)
 
+    connection = get_connection(fail_silently=False)
+
     email_message = EmailMultiAlternatives(
         subject=email_data.subject,
         body=email_data.text_content,
         from_email=settings.DEFAULT_FROM_EMAIL,
         alternatives=[(email_data.html_content, "text/html")],
+        connection=connection,
     )
     for attachment in email_data.attachments:
         email_message.attach(**attachment)
 
     db_email_message: EmailMessage | None = None
 
-    for batch in batched(email_data.recipients, settings.EMAIL_MAX_RECIPIENTS, strict=False):
-        if db_email_message is not None:
-            db_email_message.recipients.extend(batch)
-            continue
-
-        email_message_copy = copy(email_message)
-        email_message_copy.bcc = list(batch)
-
-        try:
-            email_message_copy.send(fail_silently=False)
-
-        except Exception as error:  # noqa: BLE001
-            #
-            # 'builtins.TimeoutError' is raised if the connection to the SMTP server times out.
-            # 'smtplib.SMTPException' is raised if the SMTP server returns an error.
-            # Any other exception is logged to Sentry so we can investigate the issue.
-            if not isinstance(error, (TimeoutError, SMTPException)):
-                SentryLogger.log_exception(error, details="Failed to send email message")
-
-            db_email_message = EmailMessage(
-                recipients=list(batch),
-                subject=email_data.subject,
-                text_content=email_data.text_content,
-                html_content=email_data.html_content,
-                attachments=email_data.attachments,
-                valid_until=email_data.valid_until,
-                created_at=email_data.created_at,
+    try:
+        for batch in batched(email_data.recipients, settings.EMAIL_MAX_RECIPIENTS, strict=False):
+            if db_email_message is not None:
+                db_email_message.recipients.extend(batch)
+                continue
+
+            email_message_copy = copy(email_message)
+            email_message_copy.bcc = list(batch)
+
+            started = time.perf_counter()
+
+            try:
+                # Open the connection for the first batch, and keep it open for the rest of the batches.
+                connection.open()
+                email_message_copy.send(fail_silently=False)
+
+            except Exception as error:  # noqa: BLE001
+                #
+                # 'builtins.TimeoutError' is raised if the connection to the SMTP server times out.
+                # 'smtplib.SMTPException' is raised if the SMTP server returns an error.
+                # Any other exception is logged to Sentry so we can investigate the issue.
+                if not isinstance(error, (TimeoutError, SMTPException)):
+                    SentryLogger.log_exception(error, details="Failed to send email message")
+
+                db_email_message = EmailMessage(
+                    recipients=list(batch),
+                    subject=email_data.subject,
+                    text_content=email_data.text_content,
+                    html_content=email_data.html_content,
+                    attachments=email_data.attachments,
+                    valid_until=email_data.valid_until,
+                    created_at=email_data.created_at,
+                )
+                continue
+
+            logger.info(
+                "Sent email batch of %s recipients in %.3f seconds.",
+                len(batch),
+                time.perf_counter() - started,
             )
 
+    finally:
+        # Messages have already been sent or saved, so errors while closing the connection can be ignored.
+        with suppress(SMTPException):
+            connection.close()
+
     if db_email_message is not None:
         db_email_message.save()
 
@@ -96,5 +127,6 @@ def send_emails_in_batches_task(email_data: EmailData) -> None:
 
 @app.task(name="send_multiple_emails_in_batches")
 def send_multiple_emails_in_batches_task(*, emails: Iterable[EmailData]) -> None:
+    """Sends multiple email messages (e.g. the same message in different languages) in separate tasks."""
     for email_data in emails:
-        send_emails_in_batches_task(email_data)
+        send_emails_in_batches_task.delay(email_data=email_data)
@@ -28,6 +28,7 @@
 
 def get_context_for_translations(*, language: Lang, email_recipient_name: str | None) -> EmailContext:
     return {
+        "language": language,
         "email_recipient_name": email_recipient_name,
         "current_year": str(local_datetime().year),
         "service_name": pgettext("Email", "Varaamo"),
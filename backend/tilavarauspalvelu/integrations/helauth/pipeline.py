@@ -78,14 +78,17 @@ def update_user_from_profile(request: WSGIRequest, *, user: User | None = None)
             user.date_of_birth = after_login_additional_info["birthday"]
         user.save()
 
-    # In case the user HelsinkiProfile authentication has expired, the profile info can not be fetched
-    # from during the reservation creation. In that case, we need to store the profile info in the session
-    # so that it can be used later when creating the reservation.
+    # Store the profile info in the session, so that reservations can be prefilled without fetching
+    # the info from Helsinki profile again. This is also needed in case the user's Helsinki profile
+    # authentication has expired, since then the profile info can not be fetched during reservation creation.
     # Extract only the prefill info from the response and store it in the session
-    request.session["reservation_prefill_info"] = ReservationPrefillInfo(**{
-        k: after_login_additional_info[k]  # type: ignore
-        for k in list(ReservationPrefillInfo.__annotations__)
-    })
+    HelsinkiProfileClient.store_reservation_prefill_info(
+        session=request.session,
+        prefill_info=ReservationPrefillInfo(**{
+            k: after_login_additional_info[k]  # type: ignore
+            for k in list(ReservationPrefillInfo.__annotations__)
+        }),
+    )
 
 
 def migrate_user_from_tunnistamo_to_keycloak(**kwargs: Unpack[PipelineArgs]) -> dict[str, Any]:
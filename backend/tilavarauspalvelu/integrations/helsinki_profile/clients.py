@@ -5,6 +5,7 @@
 from typing import TYPE_CHECKING, Any
 
 from django.conf import settings
+from django.utils.dateparse import parse_datetime
 from django.utils.functional import classproperty
 from graphene_django_extensions.utils import get_nested
 from requests import HTTPError
@@ -51,6 +52,37 @@ def get_reservation_prefill_info(cls, *, user: AnyUser, session: SessionMapping)
             return None
         return ProfileDataParser(my_profile_data).parse_reservation_prefill_data()
 
+    @classmethod
+    def get_stored_reservation_prefill_info(
+        cls,
+        *,
+        session: SessionMapping,
+        max_age: datetime.timedelta | None = None,
+    ) -> ReservationPrefillInfo | None:
+        """
+        Get reservation prefill info stored in the user's session.
+
+        :param max_age: If given, only return the info if it was fetched from Helsinki Profile
+                        at most this long ago. Info stored without a fetch time is never considered recent.
+        """
+        prefill_info: ReservationPrefillInfo | None = session.get("reservation_prefill_info")
+        if prefill_info is None or max_age is None:
+            return prefill_info
+
+        # Stored as an ISO string, since the session serializer can only handle JSON.
+        fetched_at: str | None = session.get("reservation_prefill_info_fetched_at")
+        fetched_at_datetime = parse_datetime(fetched_at) if isinstance(fetched_at, str) else None
+        if fetched_at_datetime is None or fetched_at_datetime.astimezone(DEFAULT_TIMEZONE) < local_datetime() - max_age:
+            return None
+
+        return prefill_info
+
+    @classmethod
+    def store_reservation_prefill_info(cls, *, session: SessionMapping, prefill_info: ReservationPrefillInfo) -> None:
+        """Store reservation prefill info in the user's session, so that it can be used without fetching it again."""
+        session["reservation_prefill_info"] = prefill_info
+        session["reservation_prefill_info_fetched_at"] = local_datetime().isoformat()
+
     @classmethod
     def get_after_login_additional_info(
         cls, *, user: AnyUser, session: SessionMapping
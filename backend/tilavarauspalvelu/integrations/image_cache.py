@@ -3,10 +3,10 @@
 from urllib.parse import urljoin
 
 from django.conf import settings
-from requests import request
 from rest_framework.status import HTTP_200_OK
 
 from tilavarauspalvelu.integrations.sentry import SentryLogger
+from utils.external_service.session import get_session
 
 
 class ImageCacheConfigurationError(Exception):
@@ -26,14 +26,14 @@ def purge(path: str) -> None:
 
     full_url = urljoin(settings.IMAGE_CACHE_VARNISH_HOST, path)
 
-    response = request(
+    response = get_session("Image cache").request(
         "PURGE",
         full_url,
         headers={
             "X-VC-Purge-Key": settings.IMAGE_CACHE_PURGE_KEY,
             "Host": settings.IMAGE_CACHE_HOST_HEADER,
         },
-        timeout=60,
+        timeout=(settings.EXTERNAL_SERVICE_CONNECT_TIMEOUT_SECONDS, 60),
     )
 
     if response.status_code != HTTP_200_OK:
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
 from typing import TYPE_CHECKING, overload
 
+from django.conf import settings
+
 from tilavarauspalvelu.enums import AccessType, ReservationStateChoice
 from tilavarauspalvelu.integrations.email.main import EmailService
 from tilavarauspalvelu.integrations.sentry import SentryLogger
@@ -23,7 +26,7 @@
 
 if TYPE_CHECKING:
     import uuid
-    from collections.abc import Iterable
+    from collections.abc import Callable, Iterable
 
     from .typing import (
         PindoraAccessCodeValidity,
@@ -438,32 +441,45 @@ def _create_missing_access_codes_for_reservations(cls) -> None:
         Create access codes for reservations that are missing them.
         Do not include reservations in series or seasonal bookings.
         """
-        reservations: Iterable[Reservation] = Reservation.objects.requiring_access_code().filter(
-            reservation_series__isnull=True
+        reservations: list[Reservation] = list(
+            Reservation.objects
+            .requiring_access_code()
+            .filter(reservation_series__isnull=True)
+            .select_related("reservation_unit")
         )
+        should_be_active = {reservation.pk: reservation.access_code_should_be_active for reservation in reservations}
 
-        for reservation in reservations:
-            should_be_active = reservation.access_code_should_be_active
-
+        def create_access_code(reservation: Reservation) -> PindoraAccessCodeModifyResponse:
             try:
-                try:
-                    cls.create_access_code(obj=reservation, is_active=should_be_active)
+                response = PindoraClient.create_reservation(reservation, is_active=should_be_active[reservation.pk])
 
-                # If reservation already exists, fetch it and update instead.
-                except PindoraConflictError:
-                    response = cls.get_access_code(obj=reservation)
+            # If reservation already exists, fetch it and update instead.
+            except PindoraConflictError:
+                response = PindoraClient.get_reservation(reservation)
 
-                    reservation.access_code_generated_at = response.access_code_generated_at
-                    reservation.access_code_is_active = response.access_code_is_active
-                    reservation.save(update_fields=["access_code_generated_at", "access_code_is_active"])
+            return PindoraAccessCodeModifyResponse(
+                access_code_generated_at=response["access_code_generated_at"],
+                access_code_is_active=response["access_code_is_active"],
+            )
 
-                # User needs to be informed that their reservation now has an access code,
-                # since we previously thought there was no access code.
-                if should_be_active:
-                    EmailService.send_reservation_access_type_changed_email(reservation=reservation)
+        updated: list[Reservation] = []
 
-            except ExternalServiceError as error:
-                SentryLogger.log_exception(error, details=f"Reservation: {reservation.pk}")
+        for reservation, result in cls._run_concurrently(create_access_code, reservations):
+            if isinstance(result, ExternalServiceError):
+                SentryLogger.log_exception(result, details=f"Reservation: {reservation.pk}")
+                continue
+
+            reservation.access_code_generated_at = result["access_code_generated_at"]
+            reservation.access_code_is_active = result["access_code_is_active"]
+            updated.append(reservation)
+
+        Reservation.objects.bulk_update(updated, fields=["access_code_generated_at", "access_code_is_active"])
+
+        # Users need to be informed that their reservations now have access codes,
+        # since we previously thought there were no access codes.
+        EmailService.send_reservation_access_type_changed_emails(
+            reservations=[reservation for reservation in updated if should_be_active[reservation.pk]],
+        )
 
     @classmethod
     def _create_missing_access_codes_for_series(cls) -> None:
@@ -527,34 +543,45 @@ def _create_missing_access_codes_for_seasonal_bookings(cls) -> None:
 
     @classmethod
     def _update_access_code_is_active_for_reservations(cls) -> None:
-        reservations: Iterable[Reservation] = (
+        reservations: list[Reservation] = list(
             Reservation.objects.all().has_incorrect_access_code_is_active().filter(reservation_series__isnull=True)
         )
+        should_be_active = {reservation.pk: reservation.access_code_should_be_active for reservation in reservations}
 
-        for reservation in reservations:
-            should_be_active = reservation.access_code_should_be_active
-
+        def update_access_code_is_active(reservation: Reservation) -> bool:
+            """Returns whether the access code was found in Pindora."""
             try:
-                try:
-                    if should_be_active:
-                        cls.activate_access_code(obj=reservation)
+                if should_be_active[reservation.pk]:
+                    PindoraClient.activate_reservation_access_code(reservation)
+                else:
+                    PindoraClient.deactivate_reservation_access_code(reservation)
 
-                        # User needs to be informed that their reservation now has an access code,
-                        # since inactive access codes are not shown to users.
-                        EmailService.send_reservation_access_type_changed_email(reservation=reservation)
+            # If we think an access code has been generated, but it's not found in Pindora,
+            # set access code as not generated. New access code will be created by a background task.
+            except PindoraNotFoundError:
+                return False
 
-                    else:
-                        cls.deactivate_access_code(obj=reservation)
+            return True
 
-                # If we think an access code has been generated, but it's not found in Pindora,
-                # set access code as not generated. New access code will be created by a background task.
-                except PindoraNotFoundError:
-                    reservation.access_code_generated_at = None
-                    reservation.access_code_is_active = False
-                    reservation.save(update_fields=["access_code_generated_at", "access_code_is_active"])
+        updated: list[Reservation] = []
 
-            except ExternalServiceError as error:
-                SentryLogger.log_exception(error, details=f"Reservation: {reservation.pk}")
+        for reservation, result in cls._run_concurrently(update_access_code_is_active, reservations):
+            if isinstance(result, ExternalServiceError):
+                SentryLogger.log_exception(result, details=f"Reservation: {reservation.pk}")
+                continue
+
+            if not result:
+                reservation.access_code_generated_at = None
+            reservation.access_code_is_active = result and should_be_active[reservation.pk]
+            updated.append(reservation)
+
+        Reservation.objects.bulk_update(updated, fields=["access_code_generated_at", "access_code_is_active"])
+
+        # Users need to be informed that their reservations now have access codes,
+        # since inactive access codes are not shown to users.
+        EmailService.send_reservation_access_type_changed_emails(
+            reservations=[reservation for reservation in updated if reservation.access_code_is_active],
+        )
 
     @classmethod
     def _update_access_code_is_active_for_series(cls) -> None:
@@ -629,6 +656,33 @@ def _update_access_code_is_active_for_seasonal_bookings(cls) -> None:
             except ExternalServiceError as error:
                 SentryLogger.log_exception(error, details=f"Application section: {section.pk}")
 
+    @classmethod
+    def _run_concurrently[T, R](
+        cls,
+        func: Callable[[T], R],
+        items: list[T],
+    ) -> list[tuple[T, R | ExternalServiceError]]:
+        """
+        Call the given function for all items concurrently with a bounded number of threads,
+        and return the results in the same order as the items. Errors from external services
+        are returned as results, so that a failure for one item doesn't stop the others.
+
+        The function should only make requests to Pindora. Database updates should be made
+        from the results afterwards, since each thread would use a separate database connection.
+        """
+        if not items:
+            return []
+
+        def call(item: T) -> R | ExternalServiceError:
+            try:
+                return func(item)
+            except ExternalServiceError as error:
+                return error
+
+        workers = max(1, min(settings.PINDORA_SYNC_WORKERS, len(items)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(zip(items, executor.map(call, items), strict=True))
+
     @classmethod
     def _sync_reservation_access_code(cls, reservation: Reservation) -> None:
         # Delete access code from reservation if it shouldn't have one.
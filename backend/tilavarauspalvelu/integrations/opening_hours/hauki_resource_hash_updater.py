@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import dataclasses
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import TYPE_CHECKING
 
+from django.conf import settings
 from django.db import transaction
 
 from tilavarauspalvelu.exceptions import ReservableTimeSpanClientNothingToDoError, ReservableTimeSpanClientValueError
@@ -11,7 +14,10 @@
 from tilavarauspalvelu.models import OriginHaukiResource
 
 if TYPE_CHECKING:
-    from tilavarauspalvelu.integrations.opening_hours.hauki_api_types import HaukiAPIResource
+    from tilavarauspalvelu.integrations.opening_hours.hauki_api_types import (
+        HaukiAPIOpeningHoursResponseItem,
+        HaukiAPIResource,
+    )
 
 logger = logging.getLogger(__name__)
 
@@ -40,8 +46,9 @@ def run(self, *, force_refetch: bool = False) -> None:
         if not fetched_hauki_resources:
             return
 
-        for resource in fetched_hauki_resources:
-            self._process_single_hauki_resource(resource, force_refetch=force_refetch)
+        resource_updates = self._get_resource_updates(fetched_hauki_resources, force_refetch=force_refetch)
+        if resource_updates:
+            self._process_resource_updates(resource_updates)
 
         self._log_results()
 
@@ -56,36 +63,105 @@ def _log_results(self) -> None:
         else:
             logger.info("No reservable time spans created.")
 
-    def _process_single_hauki_resource(self, resource: HaukiAPIResource, *, force_refetch: bool = False) -> None:
-        origin_hauki_resource = OriginHaukiResource.objects.filter(id=resource["id"]).first()
-        if origin_hauki_resource is None:
-            logger.warning(f"OriginHaukiResource with ID '{resource['id']}' was not found.")
-            return
-
-        should_update_resource = (
-            force_refetch  #
-            or origin_hauki_resource.actions.should_update_opening_hours(resource["date_periods_hash"])
-        )
-        if not should_update_resource:
-            return
-
-        logger.debug(f"Updating 'Opening Hours Hash' for resource '{resource['id']}'.")
+    def _get_resource_updates(
+        self,
+        resources: list[HaukiAPIResource],
+        *,
+        force_refetch: bool = False,
+    ) -> list[HaukiResourceUpdate]:
+        origin_hauki_resources = OriginHaukiResource.objects.in_bulk([resource["id"] for resource in resources])
+
+        resource_updates: list[HaukiResourceUpdate] = []
+        for resource in resources:
+            origin_hauki_resource = origin_hauki_resources.get(resource["id"])
+            if origin_hauki_resource is None:
+                logger.warning(f"OriginHaukiResource with ID '{resource['id']}' was not found.")
+                continue
+
+            should_update_resource = (
+                force_refetch  #
+                or origin_hauki_resource.actions.should_update_opening_hours(resource["date_periods_hash"])
+            )
+            if not should_update_resource:
+                continue
+
+            logger.debug(f"Updating 'Opening Hours Hash' for resource '{resource['id']}'.")
+
+            resource_updates.append(HaukiResourceUpdate.create(origin_hauki_resource, resource["date_periods_hash"]))
+
+        return resource_updates
+
+    def _process_resource_updates(self, resource_updates: list[HaukiResourceUpdate]) -> None:
+        """
+        Fetch opening hours for the resources concurrently from Hauki API,
+        and save the reservable time spans for each resource as soon as its opening hours have been fetched.
+        """
+        workers = max(1, min(settings.HAUKI_SYNC_WORKERS, len(resource_updates)))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(resource_update.fetch_opening_hours): resource_update
+                for resource_update in resource_updates
+            }
+            try:
+                for future in as_completed(futures):
+                    resource_update = futures[future]
+                    self._save_resource_update(resource_update, future.result())
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def _save_resource_update(
+        self,
+        resource_update: HaukiResourceUpdate,
+        opening_hours_response: HaukiAPIOpeningHoursResponseItem | None,
+    ) -> None:
+        origin_hauki_resource = resource_update.origin_hauki_resource
 
         with transaction.atomic():
-            if origin_hauki_resource.opening_hours_hash != resource["date_periods_hash"]:
-                origin_hauki_resource.actions.update_opening_hours_hash(resource["date_periods_hash"])
+            if resource_update.hash_changed:
+                origin_hauki_resource.actions.update_opening_hours_hash(origin_hauki_resource.opening_hours_hash)
+
+            if resource_update.client is not None and opening_hours_response is not None:
+                num_created_time_spans = len(resource_update.client.run(opening_hours_response))
 
-            self._create_reservable_time_spans(origin_hauki_resource)
+                logger.info(
+                    f"Created {num_created_time_spans} reservable time spans for resource {origin_hauki_resource.id}."
+                )
+                self.total_time_spans_created += num_created_time_spans
 
         self.resources_updated.append(origin_hauki_resource)
 
-    def _create_reservable_time_spans(self, origin_hauki_resource: OriginHaukiResource) -> None:
+
+@dataclasses.dataclass(slots=True)
+class HaukiResourceUpdate:
+    origin_hauki_resource: OriginHaukiResource
+    hash_changed: bool
+    # None if there are no reservable time spans to create for the resource.
+    client: ReservableTimeSpanClient | None
+
+    @classmethod
+    def create(cls, origin_hauki_resource: OriginHaukiResource, date_periods_hash: str) -> HaukiResourceUpdate:
+        hash_changed = origin_hauki_resource.opening_hours_hash != date_periods_hash
+        if hash_changed:
+            # Opening hours are fetched for the new hash from the start, but the changes
+            # are saved only after they have been fetched (see `update_opening_hours_hash`).
+            origin_hauki_resource.opening_hours_hash = date_periods_hash
+            origin_hauki_resource.latest_fetched_date = None
+
         try:
             client = ReservableTimeSpanClient(origin_hauki_resource)
-            num_created_time_spans = len(client.run())
         except (ReservableTimeSpanClientValueError, ReservableTimeSpanClientNothingToDoError):
-            return
+            client = None
 
-        logger.info(f"Created {num_created_time_spans} reservable time spans for resource {origin_hauki_resource.id}.")
+        return cls(origin_hauki_resource=origin_hauki_resource, hash_changed=hash_changed, client=client)
 
-        self.total_time_spans_created += num_created_time_spans
+    def fetch_opening_hours(self) -> HaukiAPIOpeningHoursResponseItem | None:
+        """Fetch the opening hours for the resource. Called in a worker thread, so must not access the database."""
+        if self.client is None:
+            return None
+        try:
+            return self.client.fetch_opening_hours()
+        except ReservableTimeSpanClientNothingToDoError:
+            return None
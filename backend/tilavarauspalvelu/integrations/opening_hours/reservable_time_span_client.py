@@ -40,11 +40,14 @@ def __init__(self, origin_hauki_resource: OriginHaukiResource) -> None:
             msg = f"{self.origin_hauki_resource} never has any opening hours."
             raise ReservableTimeSpanClientNothingToDoError(msg)
 
-    def run(self) -> list[ReservableTimeSpan]:
-        self._init_date_range()
+    def run(self, opening_hours_response: HaukiAPIOpeningHoursResponseItem | None = None) -> list[ReservableTimeSpan]:
+        """
+        Create reservable time spans for the resource from its opening hours in Hauki API.
 
-        # Get the opening hours from Hauki API.
-        opening_hours_response = self._get_opening_hours_from_hauki_api()
+        If the opening hours have already been fetched with `fetch_opening_hours`, they can be given here.
+        """
+        if opening_hours_response is None:
+            opening_hours_response = self.fetch_opening_hours()
 
         # Parse the returned data.
         parsed_time_spans: list[TimeSpanElement] = self._parse_opening_hours(opening_hours_response)
@@ -61,8 +64,19 @@ def run(self) -> list[ReservableTimeSpan]:
         self.origin_hauki_resource.latest_fetched_date = self.end_date
         self.origin_hauki_resource.save()
 
+        self.origin_hauki_resource.actions.invalidate_first_reservable_times()
+
         return created_reservable_time_spans
 
+    def fetch_opening_hours(self) -> HaukiAPIOpeningHoursResponseItem:
+        """
+        Get the opening hours that haven't been fetched yet for the resource from Hauki API.
+
+        Doesn't access the database, so opening hours for multiple resources can be fetched concurrently.
+        """
+        self._init_date_range()
+        return self._get_opening_hours_from_hauki_api()
+
     def _init_date_range(self) -> None:
         today = local_date()
         if self.origin_hauki_resource.latest_fetched_date is not None:
@@ -14,7 +14,7 @@
     from tilavarauspalvelu.integrations.opening_hours.hauki_api_types import HaukiAPIOpeningHoursResponseTime
 
 
-@dataclass(order=True, frozen=False)
+@dataclass(order=True, frozen=False, slots=True)
 class TimeSpanElement:
     start_datetime: datetime.datetime
     end_datetime: datetime.datetime
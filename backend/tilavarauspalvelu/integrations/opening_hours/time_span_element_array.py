@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import datetime
+from array import array
+from typing import TYPE_CHECKING
+
+from tilavarauspalvelu.integrations.opening_hours.time_span_element import TimeSpanElement
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.UTC)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def _to_microseconds(value: datetime.timedelta | None) -> int:
+    if not value:
+        return 0
+    return value // _MICROSECOND
+
+
+def microseconds_to_datetime(microseconds: int) -> datetime.datetime:
+    """Convert microseconds since the epoch, as stored in a TimeSpanElementArray, to a datetime in UTC."""
+    return _EPOCH + datetime.timedelta(microseconds=microseconds)
+
+
+class TimeSpanElementArray:
+    """
+    Columnar representation of closed TimeSpanElements for bulk interval math.
+
+    Start and end times are stored as microseconds since the epoch, and buffers as microseconds,
+    each in its own `array('q')`. This avoids allocating a TimeSpanElement (and its datetimes and timedeltas)
+    for every time span when there are lots of them, e.g. when reading the AffectingTimeSpans of many
+    ReservationUnits for calculating their first reservable times. The time spans can be converted
+    to TimeSpanElements when they are actually needed.
+
+    Times are stored with microsecond precision so that the conversion is lossless.
+    Converted TimeSpanElements are in UTC, like the datetimes fetched from the database.
+    """
+
+    __slots__ = ("buffer_after", "buffer_before", "end", "start")
+
+    def __init__(self) -> None:
+        self.start: array[int] = array("q")
+        self.end: array[int] = array("q")
+        self.buffer_before: array[int] = array("q")
+        self.buffer_after: array[int] = array("q")
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}({len(self)} time spans)>"
+
+    @classmethod
+    def from_time_span_elements(cls, time_span_elements: Iterable[TimeSpanElement]) -> TimeSpanElementArray:
+        time_span_array = cls()
+        for time_span_element in time_span_elements:
+            time_span_array.append(
+                start_datetime=time_span_element.start_datetime,
+                end_datetime=time_span_element.end_datetime,
+                buffer_time_before=time_span_element.buffer_time_before,
+                buffer_time_after=time_span_element.buffer_time_after,
+            )
+        return time_span_array
+
+    def append(
+        self,
+        *,
+        start_datetime: datetime.datetime,
+        end_datetime: datetime.datetime,
+        buffer_time_before: datetime.timedelta | None = None,
+        buffer_time_after: datetime.timedelta | None = None,
+    ) -> None:
+        self.start.append((start_datetime - _EPOCH) // _MICROSECOND)
+        self.end.append((end_datetime - _EPOCH) // _MICROSECOND)
+        self.buffer_before.append(_to_microseconds(buffer_time_before))
+        self.buffer_after.append(_to_microseconds(buffer_time_after))
+
+    def extend(self, other: TimeSpanElementArray) -> None:
+        self.start.extend(other.start)
+        self.end.extend(other.end)
+        self.buffer_before.extend(other.buffer_before)
+        self.buffer_after.extend(other.buffer_after)
+
+    def merge_overlapping(self) -> TimeSpanElementArray:
+        """
+        Merge overlapping time spans into a single time span.
+
+        Works exactly like `merge_overlapping_time_span_elements`, see its comments for the different cases.
+        A new array is returned and this array is left unchanged.
+        """
+        merged = TimeSpanElementArray()
+
+        # Sort the time spans chronologically, without accounting for buffers.
+        # Sort is stable, so time spans with the same start time keep their order.
+        for i in sorted(range(len(self)), key=self.start.__getitem__):
+            start = self.start[i]
+            end = self.end[i]
+            buffer_before = self.buffer_before[i]
+            buffer_after = self.buffer_after[i]
+
+            if not merged:
+                merged._append(start, end, buffer_before, buffer_after)
+                continue
+
+            previous_start = merged.start[-1]
+            previous_end = merged.end[-1]
+            previous_buffered_end = previous_end + merged.buffer_after[-1]
+
+            # Overlapping (or next to each other) without buffers -> merge with the previous time span.
+            if previous_end >= start:
+                if buffer_before:
+                    min_buffered_start = min(previous_start - merged.buffer_before[-1], start - buffer_before)
+                    merged.buffer_before[-1] = previous_start - min_buffered_start
+
+                new_end = max(previous_end, end)
+                merged.end[-1] = new_end
+                merged.buffer_after[-1] = max(previous_buffered_end, end + buffer_after) - new_end
+                continue
+
+            # Previous time span shortens current time span's buffer.
+            if previous_end > start - buffer_before >= previous_start:
+                buffer_before = start - previous_end
+
+            # Current time span shortens previous time span's buffer.
+            if start < previous_buffered_end <= end:
+                merged.buffer_after[-1] = start - previous_end
+
+            merged._append(start, end, buffer_before, buffer_after)
+
+        return merged
+
+    def buffered_ranges(self) -> Iterator[tuple[int, int]]:
+        """Buffered start and end of each time span, as microseconds since the epoch."""
+        for start, end, buffer_before, buffer_after in zip(
+            self.start,
+            self.end,
+            self.buffer_before,
+            self.buffer_after,
+            strict=True,
+        ):
+            yield start - buffer_before, end + buffer_after
+
+    def to_time_span_elements(self) -> list[TimeSpanElement]:
+        return [
+            TimeSpanElement(
+                start_datetime=microseconds_to_datetime(start),
+                end_datetime=microseconds_to_datetime(end),
+                is_reservable=False,
+                buffer_time_before=datetime.timedelta(microseconds=buffer_before),
+                buffer_time_after=datetime.timedelta(microseconds=buffer_after),
+            )
+            for start, end, buffer_before, buffer_after in zip(
+                self.start,
+                self.end,
+                self.buffer_before,
+                self.buffer_after,
+                strict=True,
+            )
+        ]
+
+    def _append(self, start: int, end: int, buffer_before: int, buffer_after: int) -> None:
+        self.start.append(start)
+        self.end.append(end)
+        self.buffer_before.append(buffer_before)
+        self.buffer_after.append(buffer_after)
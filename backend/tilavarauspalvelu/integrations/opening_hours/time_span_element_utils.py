@@ -1,15 +1,18 @@
 from __future__ import annotations
 
+import bisect
 from copy import copy
 from itertools import chain
 from typing import TYPE_CHECKING
 
-from utils.utils import with_indices
+from tilavarauspalvelu.integrations.opening_hours.time_span_element_array import microseconds_to_datetime
 
 if TYPE_CHECKING:
+    import datetime
     from collections.abc import Iterable
 
     from tilavarauspalvelu.integrations.opening_hours.time_span_element import TimeSpanElement
+    from tilavarauspalvelu.integrations.opening_hours.time_span_element_array import TimeSpanElementArray
 
 
 def merge_overlapping_time_span_elements(*time_span_lists: Iterable[TimeSpanElement]) -> list[TimeSpanElement]:
@@ -111,7 +114,7 @@ def merge_overlapping_time_span_elements(*time_span_lists: Iterable[TimeSpanElem
 
 def override_reservable_with_closed_time_spans(
     reservable_time_spans: list[TimeSpanElement],
-    closed_time_spans: list[TimeSpanElement],
+    closed_time_spans: Iterable[TimeSpanElement],
 ) -> list[TimeSpanElement]:
     """
     Normalize the given reservable timespans by shortening/splitting/removing them depending on if and how they
@@ -124,81 +127,179 @@ def override_reservable_with_closed_time_spans(
     The reservable time spans should not have any overlapping timespans at this stage.
 
     Returned reservable timespans are in chronological order.
+
+    If the same closed time spans are used to normalise multiple lists of reservable time spans,
+    build a `ClosedTimeSpanIndex` once and use it directly instead.
     """
-    for closed_time_span in closed_time_spans:
-        for reservable_index, reservable_time_span in (gen := with_indices(reservable_time_spans)):
-            if reservable_time_span is None:
-                continue
+    return ClosedTimeSpanIndex(closed_time_spans).override_reservable_time_spans(reservable_time_spans)
 
-            # Skip the closed time spans that are fully outside the reservable time span.
-            if not reservable_time_span.overlaps_with(closed_time_span):
-                continue
 
-            # The reservable time span is fully inside the closed time span, remove it.
-            if reservable_time_span.fully_inside_of(closed_time_span):
-                gen.delete_item(reservable_index)
-                continue
+class ClosedTimeSpanIndex:
+    """
+    Sorted index of the closed time spans' buffered ranges for overriding reservable time spans.
+
+    Overlapping and adjacent closed ranges are merged on creation, so that each reservable time span
+    can be normalised by binary searching the first closed range it overlaps with, and then sweeping
+    forward until the end of the reservable time span. This makes normalising `n` reservable time spans
+    with `m` closed time spans `O((n + m) log m)` instead of `O(n * m)`.
+
+    Closed time spans with zero duration cannot remove anything from a reservable time span,
+    but they still split reservable time spans that they are strictly inside of.
+
+    Closed time spans can also be given as TimeSpanElementArrays. Their ranges are merged
+    before they are converted to datetimes, so that datetimes are only created for each merged range
+    instead of every time span in the arrays.
+    """
+
+    # Start and end of the merged closed ranges, in chronological order.
+    # Ranges never overlap, so both lists are sorted.
+    starts: list[datetime.datetime]
+    ends: list[datetime.datetime]
 
-            # Closed time span is fully inside the reservable time span, split the reservable time span
-            # ┌────────────────────────────────────────────────────────────────────┐
-            # │ █ = Closed Time Span                                               │
-            # │ ▁ = Reservable Time Span                                           │
-            # ├────────────────────┬───────────────────────────────────────────────┤
-            # │ ▁▁▁▁▁▁▁ -> ▁▁   ▁▁ │ Closed time span inside reservable time span. │
-            # │   ███   ->   ███   │ Reservable time span is split in two          │
-            # ├────────────────────┼───────────────────────────────────────────────┤
-            # │ ▁▁▁▁▁▁▁ -> ▁  ▁  ▁ │ Multiple closed time spans overlap            │
-            # │  ██     ->  ██     │ reservable time span is split in three.       │
-            # │     ██  ->     ██  │ (in different loops)                          │
-            # └────────────────────┴───────────────────────────────────────────────┘
-            if closed_time_span.fully_inside_of(reservable_time_span):
-                new_reservable_time_span = copy(reservable_time_span)
-                reservable_time_spans.append(new_reservable_time_span)
-                # Split the reservable time span in two
-                reservable_time_span.end_datetime = closed_time_span.buffered_start_datetime
-                new_reservable_time_span.start_datetime = closed_time_span.buffered_end_datetime
-
-            # Reservable time span starts inside the closed time span.
-            # Shorten the reservable time span from the beginning
-            # ┌──────────────────────────┬───────────────────────────────────┐
-            # │     ▁▁▁▁   ->       ▁▁   │                                   │
-            # │   ████     ->   ████     │ Reservable time span is shortened │
-            # ├──────────────────────────┼───────────────────────────────────┤
-            # │     ▁▁▁▁   ->     ▁▁▁▁   │ Not overlapping (or start == end) │
-            # │ ████       -> ████       │ Untouched                         │
-            # ├──────────────────────────┼───────────────────────────────────┤
-            # │     ▁▁▁▁   ->     ▁▁▁▁   │ Overlapping from the beginning    │
-            # │       ████ ->       ████ │ Handled later in the next step    │
-            # └──────────────────────────┴───────────────────────────────────┘
-            elif reservable_time_span.starts_inside_of(closed_time_span):
-                reservable_time_span.start_datetime = closed_time_span.buffered_end_datetime
-
-            # Reservable time span ends inside the closed time span.
-            # Shorten the reservable time span from the end
-            # ┌──────────────────────────┬───────────────────────────────────┐
-            # │   ▁▁▁▁     ->   ▁▁       │                                   │
-            # │     ████   ->     ████   │ Reservable time span is shortened │
-            # ├──────────────────────────┼───────────────────────────────────┤
-            # │   ▁▁▁▁     ->   ▁▁▁▁     │ Not overlapping (or end == start) │
-            # │       ████ ->       ████ │ Untouched                         │
-            # ├──────────────────────────┼───────────────────────────────────┤
-            # │   ▁▁▁▁     ->   ▁▁▁▁     │ Overlapping from the beginning    │
-            # │ ████       -> ████       │ Already handled in last step      │
-            # └──────────────────────────┴───────────────────────────────────┘
-            elif reservable_time_span.ends_inside_of(closed_time_span):
-                reservable_time_span.end_datetime = closed_time_span.buffered_start_datetime
-
-            # If the duration of the reservable time span is negative or zero after adjustments
-            # (buffered time is ignored here), remove it.
-            if reservable_time_span.start_datetime >= reservable_time_span.end_datetime:
-                gen.delete_item(reservable_index)
+    # Points where reservable time spans should be split, in chronological order.
+    split_points: list[datetime.datetime]
+
+    def __init__(
+        self,
+        closed_time_spans: Iterable[TimeSpanElement],
+        *closed_time_span_arrays: TimeSpanElementArray,
+    ) -> None:
+        closed_ranges: list[tuple[datetime.datetime, datetime.datetime]] = [
+            (closed_time_span.buffered_start_datetime, closed_time_span.buffered_end_datetime)
+            for closed_time_span in closed_time_spans
+        ]
+
+        if closed_time_span_arrays:
+            starts, ends, split_points = _merge_closed_ranges(
+                chain.from_iterable(time_span_array.buffered_ranges() for time_span_array in closed_time_span_arrays)
+            )
+            closed_ranges.extend(
+                (microseconds_to_datetime(start), microseconds_to_datetime(end))
+                for start, end in zip(starts, ends, strict=True)
+            )
+            closed_ranges.extend(
+                (split_point, split_point) for split_point in map(microseconds_to_datetime, split_points)
+            )
+
+        self.starts, self.ends, self.split_points = _merge_closed_ranges(closed_ranges)
+
+    def __bool__(self) -> bool:
+        return bool(self.starts or self.split_points)
+
+    def override_reservable_time_spans(self, reservable_time_spans: list[TimeSpanElement]) -> list[TimeSpanElement]:
+        """
+        Normalize the given reservable time spans by removing the parts that overlap with the indexed closed ranges.
+        See `override_reservable_with_closed_time_spans` for more details.
+
+        Like before, the given list is updated in place, and the first remaining part of each reservable time span
+        reuses the original TimeSpanElement. Additional parts created by splitting are copies of it.
+        """
+        normalised_time_spans: list[TimeSpanElement] = []
+
+        for reservable_time_span in reservable_time_spans:
+            start = reservable_time_span.start_datetime
+            end = reservable_time_span.end_datetime
+            if start >= end:
                 continue
 
-    # Sort the time spans once more to ensure they are in chronological order.
-    # Remove any timespans that have a duration of zero (or less).
-    reservable_time_spans[:] = sorted(
-        (ts for ts in reservable_time_spans if ts.start_datetime < ts.end_datetime),
-        key=lambda ts: ts.start_datetime,
-    )
+            remaining_ranges = self._subtract_closed_ranges(start, end)
+
+            for i, (range_start, range_end) in enumerate(remaining_ranges):
+                time_span = reservable_time_span if i == 0 else copy(reservable_time_span)
+                time_span.start_datetime = range_start
+                time_span.end_datetime = range_end
+                normalised_time_spans.append(time_span)
+
+        # Sort the time spans once more to ensure they are in chronological order.
+        reservable_time_spans[:] = sorted(normalised_time_spans, key=lambda ts: ts.start_datetime)
+        return reservable_time_spans
+
+    def _subtract_closed_ranges(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+    ) -> list[tuple[datetime.datetime, datetime.datetime]]:
+        """Return the parts of the given range that are left after removing the closed ranges from it."""
+        remaining_ranges: list[tuple[datetime.datetime, datetime.datetime]] = []
+
+        # ┌──────────────────────────────────────────────────────────────────────┐
+        # │ █ = Closed Time Span                                                 │
+        # │ ▁ = Reservable Time Span                                             │
+        # ├──────────────────────┬───────────────────────────────────────────────┤
+        # │     ▁▁▁▁   ->   ▁▁   │ Reservable time span is shortened.            │
+        # │   ████     ->        │                                               │
+        # ├──────────────────────┼───────────────────────────────────────────────┤
+        # │ ▁▁▁▁▁▁▁▁▁▁ -> ▁▁  ▁▁ │ Closed time span inside reservable time span. │
+        # │   ██  ██   ->        │ Reservable time span is split in three.       │
+        # ├──────────────────────┼───────────────────────────────────────────────┤
+        # │   ▁▁▁▁     ->        │ Reservable time span is fully inside          │
+        # │ ████████   ->        │ the closed time span, it is removed.          │
+        # └──────────────────────┴───────────────────────────────────────────────┘
+
+        # Find the first closed range that ends after the reservable range starts,
+        # and go through all the closed ranges that start before the reservable range ends.
+        cursor = start
+        index = bisect.bisect_right(self.ends, start)
+        while index < len(self.starts) and self.starts[index] < end:
+            if cursor < self.starts[index]:
+                remaining_ranges.extend(self._split(cursor, self.starts[index]))
+            cursor = max(cursor, self.ends[index])
+            index += 1
+
+        if cursor < end:
+            remaining_ranges.extend(self._split(cursor, end))
+
+        return remaining_ranges
+
+    def _split(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+    ) -> list[tuple[datetime.datetime, datetime.datetime]]:
+        """Split the given range at the split points that are strictly inside it."""
+        if not self.split_points:
+            return [(start, end)]
+
+        ranges: list[tuple[datetime.datetime, datetime.datetime]] = []
+
+        index = bisect.bisect_right(self.split_points, start)
+        while index < len(self.split_points) and self.split_points[index] < end:
+            ranges.append((start, self.split_points[index]))
+            start = self.split_points[index]
+            index += 1
+
+        ranges.append((start, end))
+        return ranges
+
+
+def _merge_closed_ranges[T: (int, datetime.datetime)](
+    closed_ranges: Iterable[tuple[T, T]],
+) -> tuple[list[T], list[T], list[T]]:
+    """
+    Merge overlapping and adjacent closed ranges.
+
+    Returns the starts and ends of the merged ranges, and the split points from the zero duration ranges,
+    all in chronological order.
+    """
+    starts: list[T] = []
+    ends: list[T] = []
+    split_points: set[T] = set()
+
+    for start, end in sorted(closed_ranges):
+        if start == end:
+            split_points.add(start)
+            continue
+
+        # Invalid time spans cannot close anything.
+        if start > end:
+            continue
+
+        # Overlaps with (or is next to) the previous closed range, extend it if needed.
+        if ends and start <= ends[-1]:
+            ends[-1] = max(ends[-1], end)
+            continue
+
+        starts.append(start)
+        ends.append(end)
 
-    return reservable_time_spans
+    return starts, ends, sorted(split_points)
@@ -0,0 +1,207 @@
+# ruff: noqa: T201, RUF100
+from __future__ import annotations
+
+import datetime
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Any, Literal
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.exceptions import ValidationError
+
+from tilavarauspalvelu.enums import ReservationStateChoice
+from tilavarauspalvelu.models import Reservation, ReservationOccupancy, ReservationUnit, ReservationUnitHierarchy, User
+from utils.date_utils import local_datetime
+
+from .benchmark_first_reservable_time import timed
+
+if TYPE_CHECKING:
+    from django.core.management.base import CommandParser
+
+type Mode = Literal["lock", "check-delete"]
+type Outcome = Literal["created", "rejected", "discarded"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark creating reservations to the same time slot of a reservation unit concurrently, "
+        "serialised by the reservation unit hierarchy lock, and by creating the reservations first "
+        "and deleting them if an overlapping reservation was created at the same time."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--reservation-unit",
+            type=int,
+            default=None,
+            help="Primary key of the reservation unit to make reservations to. Defaults to the first one.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=20,
+            help="Number of reservations to create concurrently.",
+        )
+        parser.add_argument(
+            "--rounds",
+            type=int,
+            default=3,
+            help="Number of times to run each benchmark. The fastest run is reported.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        requests: int = options["requests"]
+        rounds: int = options["rounds"]
+
+        reservation_units = ReservationUnit.objects.order_by("pk")
+        if options["reservation_unit"] is not None:
+            reservation_units = reservation_units.filter(pk=options["reservation_unit"])
+
+        reservation_unit = reservation_units.first()
+        user = User.objects.order_by("pk").first()
+        if reservation_unit is None or user is None:
+            msg = "No reservation units or users in the database. Create some with the 'create_test_data' command."
+            raise CommandError(msg)
+
+        ReservationUnitHierarchy.refresh()
+
+        # Far enough in the future that no real reservations should overlap with the benchmark reservations.
+        begins_at = local_datetime().replace(minute=0, second=0, microsecond=0) + datetime.timedelta(days=3650)
+        ends_at = begins_at + datetime.timedelta(hours=1)
+        if reservation_unit.actions.has_overlapping_reservations(start_datetime=begins_at, end_datetime=ends_at):
+            msg = f"Reservation unit {reservation_unit.pk} already has reservations at {begins_at.isoformat()}."
+            raise CommandError(msg)
+
+        print(f"Creating {requests} concurrent reservations to '{reservation_unit}' at {begins_at.isoformat()}...")
+
+        for mode in ("check-delete", "lock"):
+            run = partial(
+                create_concurrently,
+                mode=mode,
+                reservation_unit=reservation_unit,
+                user=user,
+                begins_at=begins_at,
+                ends_at=ends_at,
+                requests=requests,
+            )
+            duration, outcomes = timed(run, rounds=rounds)
+
+            inserted = outcomes["created"] + outcomes["discarded"]
+            print(
+                f"{mode:<12} {duration:.3f} s | "
+                f"created: {outcomes['created']}, "
+                f"rejected: {outcomes['rejected']}, "
+                f"inserted: {inserted}, "
+                f"discarded: {outcomes['discarded']}"
+            )
+
+
+def create_concurrently(
+    *,
+    mode: Mode,
+    reservation_unit: ReservationUnit,
+    user: User,
+    begins_at: datetime.datetime,
+    ends_at: datetime.datetime,
+    requests: int,
+) -> Counter[Outcome]:
+    barrier = threading.Barrier(requests)
+    create = partial(
+        create_reservation,
+        mode=mode,
+        reservation_unit=reservation_unit,
+        user=user,
+        begins_at=begins_at,
+        ends_at=ends_at,
+        barrier=barrier,
+    )
+
+    with ThreadPoolExecutor(max_workers=requests) as executor:
+        results = list(executor.map(lambda _: create(), range(requests)))
+
+    Reservation.objects.filter(pk__in=[pk for _, pk in results if pk is not None]).delete()
+    return Counter(outcome for outcome, _ in results)
+
+
+def create_reservation(
+    *,
+    mode: Mode,
+    reservation_unit: ReservationUnit,
+    user: User,
+    begins_at: datetime.datetime,
+    ends_at: datetime.datetime,
+    barrier: threading.Barrier,
+) -> tuple[Outcome, int | None]:
+    # Wait until all threads are ready, so that the reservations are created at the same time.
+    barrier.wait()
+
+    try:
+        if mode == "lock":
+            return create_with_lock(reservation_unit, user, begins_at, ends_at)
+        return create_and_delete_on_overlap(reservation_unit, user, begins_at, ends_at)
+    finally:
+        # Each thread uses its own database connection.
+        connection.close()
+
+
+def create_with_lock(
+    reservation_unit: ReservationUnit,
+    user: User,
+    begins_at: datetime.datetime,
+    ends_at: datetime.datetime,
+) -> tuple[Outcome, int | None]:
+    try:
+        with ReservationOccupancy.prevent_overlaps():
+            ReservationUnitHierarchy.lock([reservation_unit.pk])
+            reservation_unit.validators.validate_no_overlapping_reservations(begins_at=begins_at, ends_at=ends_at)
+            reservation = new_reservation(reservation_unit, user, begins_at, ends_at)
+
+    except ValidationError:
+        return "rejected", None
+
+    return "created", reservation.pk
+
+
+def create_and_delete_on_overlap(
+    reservation_unit: ReservationUnit,
+    user: User,
+    begins_at: datetime.datetime,
+    ends_at: datetime.datetime,
+) -> tuple[Outcome, int | None]:
+    try:
+        reservation_unit.validators.validate_no_overlapping_reservations(begins_at=begins_at, ends_at=ends_at)
+    except ValidationError:
+        return "rejected", None
+
+    try:
+        with ReservationOccupancy.prevent_overlaps():
+            reservation = new_reservation(reservation_unit, user, begins_at, ends_at)
+
+    # Overlap was noticed by the database after the reservation was inserted.
+    except ValidationError:
+        return "discarded", None
+
+    if reservation.actions.overlapping_reservations().exists():
+        reservation.delete()
+        return "discarded", None
+
+    return "created", reservation.pk
+
+
+def new_reservation(
+    reservation_unit: ReservationUnit,
+    user: User,
+    begins_at: datetime.datetime,
+    ends_at: datetime.datetime,
+) -> Reservation:
+    return Reservation.objects.create(
+        name="Benchmark reservation",
+        reservation_unit=reservation_unit,
+        user=user,
+        begins_at=begins_at,
+        ends_at=ends_at,
+        state=ReservationStateChoice.CONFIRMED,
+    )
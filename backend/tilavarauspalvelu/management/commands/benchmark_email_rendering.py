@@ -0,0 +1,100 @@
+# ruff: noqa: T201, RUF100
+from __future__ import annotations
+
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+import mjml
+from django.core.management import BaseCommand, CommandError
+from django.template.loader import get_template
+from django.utils.translation import override
+
+from tilavarauspalvelu.admin.email_template.utils import get_mock_data
+from tilavarauspalvelu.enums import Language
+from tilavarauspalvelu.integrations.email.rendering import compile_mjml_layout, render_html, render_mjml_layout
+from tilavarauspalvelu.integrations.email.typing import EmailType
+
+from .benchmark_first_reservable_time import timed
+
+if TYPE_CHECKING:
+    from django.core.management.base import CommandParser
+
+    from tilavarauspalvelu.integrations.email.typing import EmailTemplateType
+    from tilavarauspalvelu.typing import EmailContext
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark rendering the HTML of every email type with the mock data of the email tester, "
+        "by compiling the MJML of each rendered email (old) and by rendering the compiled HTML template (new)."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--language",
+            type=str,
+            choices=Language.values,
+            default=Language.FI.value,
+            help="Language to render the emails in.",
+        )
+        parser.add_argument(
+            "--rounds",
+            type=int,
+            default=5,
+            help="Number of times to render each email type. The fastest run is reported.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        language: str = options["language"]
+        rounds: int = options["rounds"]
+
+        total_old: float = 0
+        total_new: float = 0
+        total_compile: float = 0
+
+        print(f"{'Email type':<60} {'Old':>10} {'New':>10} {'Speedup':>8} {'Compile':>10}")
+
+        with override(language):
+            for email_type in EmailType.options:
+                context = get_mock_data(email_type=email_type, language=language)
+
+                # Compiling the template is timed separately, since it only happens once per language.
+                compiled, _ = timed(partial(compile_html_template_uncached, email_type), rounds=rounds)
+                old, old_html = timed(partial(render_html_with_mjml, email_type, context), rounds=rounds)
+                new, new_html = timed(partial(render_html, email_type=email_type, context=context), rounds=rounds)
+
+                if html_to_compare(old_html) != html_to_compare(new_html):
+                    msg = f"HTML rendered from the compiled template differs for '{email_type.value}'."
+                    raise CommandError(msg)
+
+                total_old += old
+                total_new += new
+                total_compile += compiled
+
+                print(
+                    f"{email_type.value:<60} {old * 1000:>8.2f}ms {new * 1000:>8.2f}ms "
+                    f"{old / new:>7.1f}x {compiled * 1000:>8.2f}ms"
+                )
+
+        print(
+            f"{'Total':<60} {total_old * 1000:>8.2f}ms {total_new * 1000:>8.2f}ms "
+            f"{total_old / total_new:>7.1f}x {total_compile * 1000:>8.2f}ms"
+        )
+
+
+def render_html_with_mjml(email_type: EmailTemplateType, context: EmailContext) -> str:
+    """Render the email HTML by compiling the MJML of the rendered email, like before compiled templates."""
+    mjml_content = get_template(email_type.html_path).render(context)
+    return mjml.mjml2html(mjml_content).strip()
+
+
+def compile_html_template_uncached(email_type: EmailTemplateType) -> str:
+    """Compile the HTML template of the email type without using the cached templates."""
+    template = get_template(email_type.html_path)
+    layout = render_mjml_layout(template.backend.env, email_type.html_path)
+    return compile_mjml_layout(layout)
+
+
+def html_to_compare(html: str) -> str:
+    """Whitespace left by Jinja statements in the compiled templates can differ from what the compiler left."""
+    return "".join(html.split())
@@ -0,0 +1,102 @@
+# ruff: noqa: T201, RUF100
+from __future__ import annotations
+
+import time
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from django.core.management import BaseCommand, CommandError
+
+from tilavarauspalvelu.models import ReservationUnit
+from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_calculation import (
+    FirstReservableTimeWorkerPool,
+    calculate_first_reservable_times,
+)
+from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_helper import FirstReservableTimeHelper
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from django.core.management.base import CommandParser
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark calculating first reservable times for the reservation units in the database, "
+        "sequentially and in the worker pool used when refreshing the pre-calculated results."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--units",
+            type=int,
+            default=500,
+            help="Number of reservation units to calculate first reservable times for.",
+        )
+        parser.add_argument(
+            "--rounds",
+            type=int,
+            default=3,
+            help="Number of times to run the calculation. The fastest run is reported.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of worker processes in the worker pool.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        units: int = options["units"]
+        rounds: int = options["rounds"]
+        workers: int = options["workers"]
+
+        if workers < 2:  # noqa: PLR2004
+            msg = "At least two workers are needed to compare the worker pool with the sequential calculation."
+            raise CommandError(msg)
+
+        pks = list(ReservationUnit.objects.order_by("pk").values_list("pk", flat=True)[:units])
+        if not pks:
+            msg = "No reservation units in the database. Create some with the 'create_test_data' command."
+            raise CommandError(msg)
+
+        print(f"Fetching data for {len(pks)} reservation units...")
+        helper = FirstReservableTimeHelper(ReservationUnit.objects.filter(pk__in=pks).order_by("pk"))
+        reservation_units = helper.fetch_reservation_units(pks)
+        helper.load_affecting_time_spans(pks, after=None, until=helper.filter_date_end)
+        context = helper.get_calculation_context(loaded_until=helper.filter_date_end)
+
+        print(f"Calculating sequentially {rounds} times...")
+        sequential, expected = timed(
+            partial(calculate_first_reservable_times, context, reservation_units), rounds=rounds
+        )
+        print(f"Sequential: {sequential:.3f} s ({sequential / len(pks) * 1000:.3f} ms per reservation unit)")
+
+        print(f"Starting a worker pool with {workers} workers...")
+        started = time.perf_counter()
+        with FirstReservableTimeWorkerPool(workers=workers) as pool:
+            # The workers are started and Django is set up in them on the first calculation,
+            # so it's timed separately, like it happens only once per refresh.
+            pool.calculate_first_reservable_times(context, reservation_units)
+            print(f"Pool startup and first calculation: {time.perf_counter() - started:.3f} s")
+
+            print(f"Calculating in the worker pool {rounds} times...")
+            calculate = partial(pool.calculate_first_reservable_times, context, reservation_units)
+            pooled, results = timed(calculate, rounds=rounds)
+
+        print(f"Pooled: {pooled:.3f} s ({pooled / len(pks) * 1000:.3f} ms per reservation unit)")
+        print(f"Speedup: {sequential / pooled:.2f}x")
+
+        if results != sorted(expected, key=lambda result: result[0]):
+            msg = "Worker pool results differ from the sequential results."
+            raise CommandError(msg)
+
+
+def timed[T](func: Callable[[], T], *, rounds: int) -> tuple[float, T]:
+    """Run the given function the given number of times. Return the fastest time and the last result."""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
@@ -0,0 +1,158 @@
+# ruff: noqa: T201, RUF100
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from django.contrib.postgres.search import SearchVector
+from django.core.management import BaseCommand, CommandError
+from django.db import models
+
+from tilavarauspalvelu.models import Equipment, ReservationUnit
+from utils.db import CoalesceEmpty
+
+from .benchmark_first_reservable_time import timed
+
+if TYPE_CHECKING:
+    from django.core.management.base import CommandParser
+
+    from tilavarauspalvelu.models.reservation_unit.queryset import ReservationUnitQuerySet
+
+LANGUAGES = (("fi", "finnish"), ("en", "english"), ("sv", "swedish"))
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark updating the search vectors of all reservation units with a single UPDATE "
+        "against building them for each reservation unit in Python, and updating only the "
+        "reservation units that use the equipment that is used by the most reservation units."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--rounds",
+            type=int,
+            default=3,
+            help="Number of times to run each benchmark. The fastest run is reported.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        rounds: int = options["rounds"]
+
+        count = ReservationUnit.objects.count()
+        if count == 0:
+            msg = "No reservation units in the database. Create some with the 'create_test_data' command."
+            raise CommandError(msg)
+
+        print(f"Updating search vectors of {count} reservation units...")
+
+        python, _ = timed(lambda: update_search_vectors_in_python(ReservationUnit.objects.all()), rounds=rounds)
+        python_vectors = stripped_search_vectors()
+
+        set_based, _ = timed(lambda: ReservationUnit.objects.all().update_search_vectors(), rounds=rounds)
+        set_based_vectors = stripped_search_vectors()
+
+        print(f"{'Python':<12} {python:.3f} s")
+        print(f"{'Set-based':<12} {set_based:.3f} s ({python / set_based:.1f}x)")
+
+        differing = sum(1 for pk, vectors in python_vectors.items() if set_based_vectors.get(pk) != vectors)
+        if differing:
+            print(f"Search vectors of {differing} reservation units differ between the implementations!")
+
+        equipment = (
+            Equipment.objects
+            .annotate(num_reservation_units=models.Count("reservation_units"))
+            .filter(num_reservation_units__gt=0)
+            .order_by("-num_reservation_units")
+            .first()
+        )
+        if equipment is None:
+            return
+
+        affected = ReservationUnit.objects.filter(equipments=equipment)
+        incremental, _ = timed(affected.update_search_vectors, rounds=rounds)
+        print(
+            f"{'Incremental':<12} {incremental:.3f} s "
+            f"({equipment.num_reservation_units} reservation units using equipment '{equipment}')"
+        )
+
+
+def stripped_search_vectors() -> dict[int, tuple[str, str, str]]:
+    """Search vectors of all reservation units without positions, which depend on the order of related objects."""
+    qs = ReservationUnit.objects.annotate(**{
+        f"stripped_{lang}": models.Func(
+            models.F(f"search_vector_{lang}"),
+            function="STRIP",
+            output_field=models.TextField(),
+        )
+        for lang, _ in LANGUAGES
+    })
+    return {
+        pk: (vector_fi, vector_en, vector_sv)
+        for pk, vector_fi, vector_en, vector_sv in qs.values_list("pk", "stripped_fi", "stripped_en", "stripped_sv")
+    }
+
+
+def update_search_vectors_in_python(qs: ReservationUnitQuerySet) -> None:
+    """Previous implementation of `ReservationUnitQuerySet.update_search_vectors`."""
+    reservation_units: list[ReservationUnit] = list(
+        qs.select_related(
+            "unit",
+            "reservation_unit_type",
+        ).prefetch_related(
+            "spaces",
+            "resources",
+            "intended_uses",
+            "equipments",
+        )
+    )
+
+    for reservation_unit in reservation_units:
+        for lang, config in LANGUAGES:
+            related_names = [
+                " ".join(name for inst in related.all() if (name := _get_vector_translation_fallback(inst, lang)))
+                for related in (
+                    reservation_unit.spaces,
+                    reservation_unit.resources,
+                    reservation_unit.intended_uses,
+                    reservation_unit.equipments,
+                )
+            ]
+
+            setattr(
+                reservation_unit,
+                f"search_vector_{lang}",
+                SearchVector(
+                    models.F("pk"),
+                    CoalesceEmpty(
+                        models.F(f"name_{lang}"),
+                        models.F("name_fi"),
+                        output_field=models.CharField(),
+                    ),
+                    CoalesceEmpty(
+                        models.F(f"description_{lang}"),
+                        models.F("description_fi"),
+                        output_field=models.CharField(),
+                    ),
+                    models.Value(" ".join(reservation_unit.search_terms), output_field=models.CharField()),
+                    models.Value(" ".join(reservation_unit.unit.search_terms), output_field=models.CharField()),
+                    models.Value(
+                        _get_vector_translation_fallback(reservation_unit.unit, lang),
+                        output_field=models.CharField(),
+                    ),
+                    models.Value(
+                        _get_vector_translation_fallback(reservation_unit.reservation_unit_type, lang),
+                        output_field=models.CharField(),
+                    ),
+                    *(models.Value(names, output_field=models.CharField()) for names in related_names),
+                    config=config,
+                ),
+            )
+
+    ReservationUnit.objects.bulk_update(
+        reservation_units,
+        ["search_vector_fi", "search_vector_en", "search_vector_sv"],
+    )
+
+
+def _get_vector_translation_fallback(obj: models.Model | None, lang: str) -> str:
+    return getattr(obj, f"name_{lang}", "") or getattr(obj, "name_fi", "")
@@ -0,0 +1,38 @@
+# ruff: noqa: T201, RUF100
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from django.core.management import BaseCommand
+
+from tilavarauspalvelu.enums import Language
+from tilavarauspalvelu.integrations.email.rendering import compile_html_template
+from tilavarauspalvelu.integrations.email.typing import EmailType
+
+if TYPE_CHECKING:
+    from django.core.management.base import CommandParser
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile the MJML templates of all email types in all languages to HTML templates in the shared cache, "
+        "so that email sending tasks don't need to compile them after a deploy."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--language",
+            type=str,
+            choices=Language.values,
+            default=None,
+            help="Only compile the templates for the given language.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        languages: list[str] = [options["language"]] if options["language"] else Language.values
+
+        for email_type in EmailType.options:
+            for language in languages:
+                compile_html_template(email_type.html_path, language=language)
+
+        print(f"Compiled HTML templates for {len(EmailType.options)} email types in {len(languages)} languages.")
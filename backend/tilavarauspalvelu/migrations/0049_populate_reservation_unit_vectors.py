@@ -4,14 +4,11 @@
 from django.db import migrations
 
 
-def gen_vectors(apps, schema_editor) -> None:
-    ReservationUnit = apps.get_model("tilavarauspalvelu", "ReservationUnit")
-    ReservationUnit.objects.update_search_vectors()
-
-
 class Migration(migrations.Migration):
     dependencies = [
         ("tilavarauspalvelu", "0048_reservationunit_search_terms"),
     ]
 
-    operations = [migrations.RunPython(gen_vectors, migrations.RunPython.noop)]
+    # Search vectors used to be populated here with the current models, which don't match the database
+    # when migrating from scratch. They are now populated in '0184_rebuild_reservation_unit_search_vectors'.
+    operations = [migrations.RunPython(migrations.RunPython.noop, migrations.RunPython.noop)]
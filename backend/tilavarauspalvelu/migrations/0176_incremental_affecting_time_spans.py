@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+from inspect import cleandoc
+
+from django.conf import settings
+from django.db import migrations
+
+
+def remove_affecting_reservations_view() -> str:
+    return cleandoc(
+        """
+        DROP INDEX IF EXISTS idx_buffered_end_datetime;
+        DROP INDEX IF EXISTS idx_buffered_start_datetime;
+        DROP INDEX IF EXISTS idx_affected_reservation_unit_ids;
+        DROP INDEX IF EXISTS idx_reservation_id;
+        DROP MATERIALIZED VIEW IF EXISTS affecting_time_spans;
+        """
+    )
+
+
+def create_affecting_time_spans_table() -> str:
+    # "SELECT 1;" for syntax highlighting
+    return cleandoc(
+        """
+        SELECT 1;
+
+        CREATE TABLE affecting_time_spans (
+            reservation_id integer PRIMARY KEY,
+            affected_reservation_unit_ids integer[] NOT NULL,
+            buffered_start_datetime timestamp with time zone NOT NULL,
+            buffered_end_datetime timestamp with time zone NOT NULL,
+            buffer_time_before interval,
+            buffer_time_after interval,
+            is_blocking boolean NOT NULL
+        );
+
+        CREATE INDEX idx_affected_reservation_unit_ids on affecting_time_spans USING GIN (
+            affected_reservation_unit_ids gin__int_ops
+        );
+        CREATE INDEX idx_buffered_start_datetime ON affecting_time_spans (buffered_start_datetime);
+        CREATE INDEX idx_buffered_end_datetime ON affecting_time_spans (buffered_end_datetime);
+        """
+    )
+
+
+def create_update_affecting_time_spans_function() -> str:
+    now_func = "NOW_TT()" if settings.ENABLE_NOW_TT else "STATEMENT_TIMESTAMP()"
+
+    # "SELECT 1;" for syntax highlighting
+    return cleandoc(
+        f"""
+        SELECT 1;
+
+        -- Updates the affecting time spans for the given reservations.
+        -- If no reservations are given, all affecting time spans are updated.
+        CREATE OR REPLACE FUNCTION update_affecting_time_spans(reservation_ids integer[] DEFAULT NULL)
+        RETURNS void
+        AS
+        $$
+        BEGIN
+            IF reservation_ids IS NOT NULL AND cardinality(reservation_ids) = 0 THEN
+                RETURN;
+            END IF;
+
+            WITH computed AS (
+                SELECT
+                    res.reservation_id,
+                    array_agg(res.ru_id ORDER BY res.ru_id) AS affected_reservation_unit_ids,
+                    res.buffered_start_datetime,
+                    res.buffered_end_datetime,
+                    res.buffer_time_before,
+                    res.buffer_time_after,
+                    res.is_blocking
+                FROM (
+                    SELECT DISTINCT
+                        r.id as reservation_id,
+                        unnest(ruh.related_reservation_unit_ids) as ru_id,
+                        (r.begins_at - r.buffer_time_before) as buffered_start_datetime,
+                        (r.ends_at + r.buffer_time_after) as buffered_end_datetime,
+                        r.buffer_time_before as buffer_time_before,
+                        r.buffer_time_after as buffer_time_after,
+                        (CASE WHEN UPPER(r."type") = 'BLOCKED' THEN true ELSE false END) as is_blocking
+                    FROM reservation r
+                    INNER JOIN "reservation_unit_hierarchy" ruh ON r.reservation_unit_id = ruh.reservation_unit_id
+                    WHERE (
+                        -- Make use of reservation's index on 'ends_at', even if this fetches some past reservations
+                        r.ends_at >= DATE_TRUNC('day', {now_func} - interval '1 day')
+                        AND UPPER(r.state) IN ('CREATED', 'CONFIRMED', 'WAITING_FOR_PAYMENT', 'REQUIRES_HANDLING')
+                        AND (reservation_ids IS NULL OR r.id = ANY(reservation_ids))
+                    )
+                ) res
+                GROUP BY
+                    res.reservation_id,
+                    res.buffered_start_datetime,
+                    res.buffered_end_datetime,
+                    res.buffer_time_before,
+                    res.buffer_time_after,
+                    res.is_blocking
+            ),
+            -- Remove time spans for reservations that no longer affect first reservable times,
+            -- e.g. deleted, cancelled or past reservations.
+            removed AS (
+                DELETE FROM affecting_time_spans ats
+                WHERE (
+                    (reservation_ids IS NULL OR ats.reservation_id = ANY(reservation_ids))
+                    AND NOT EXISTS (SELECT 1 FROM computed c WHERE c.reservation_id = ats.reservation_id)
+                )
+            )
+            INSERT INTO affecting_time_spans (
+                reservation_id,
+                affected_reservation_unit_ids,
+                buffered_start_datetime,
+                buffered_end_datetime,
+                buffer_time_before,
+                buffer_time_after,
+                is_blocking
+            )
+            SELECT
+                c.reservation_id,
+                c.affected_reservation_unit_ids,
+                c.buffered_start_datetime,
+                c.buffered_end_datetime,
+                c.buffer_time_before,
+                c.buffer_time_after,
+                c.is_blocking
+            FROM computed c
+            ON CONFLICT (reservation_id) DO UPDATE SET
+                affected_reservation_unit_ids = EXCLUDED.affected_reservation_unit_ids,
+                buffered_start_datetime = EXCLUDED.buffered_start_datetime,
+                buffered_end_datetime = EXCLUDED.buffered_end_datetime,
+                buffer_time_before = EXCLUDED.buffer_time_before,
+                buffer_time_after = EXCLUDED.buffer_time_after,
+                is_blocking = EXCLUDED.is_blocking
+            -- Don't write rows that haven't changed.
+            WHERE (
+                affecting_time_spans.affected_reservation_unit_ids,
+                affecting_time_spans.buffered_start_datetime,
+                affecting_time_spans.buffered_end_datetime,
+                affecting_time_spans.buffer_time_before,
+                affecting_time_spans.buffer_time_after,
+                affecting_time_spans.is_blocking
+            ) IS DISTINCT FROM (
+                EXCLUDED.affected_reservation_unit_ids,
+                EXCLUDED.buffered_start_datetime,
+                EXCLUDED.buffered_end_datetime,
+                EXCLUDED.buffer_time_before,
+                EXCLUDED.buffer_time_after,
+                EXCLUDED.is_blocking
+            );
+        END;
+        $$
+        LANGUAGE plpgsql;
+        """  # noqa: S608
+    )
+
+
+def create_reservation_triggers() -> str:
+    # "SELECT 1;" for syntax highlighting
+    return cleandoc(
+        """
+        SELECT 1;
+
+        CREATE OR REPLACE FUNCTION reservation_update_affecting_time_spans()
+        RETURNS trigger
+        AS
+        $$
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                DELETE FROM affecting_time_spans;
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM update_affecting_time_spans(ARRAY(SELECT id FROM old_rows));
+            ELSE
+                PERFORM update_affecting_time_spans(ARRAY(SELECT id FROM new_rows));
+            END IF;
+            RETURN NULL;
+        END;
+        $$
+        LANGUAGE plpgsql;
+
+        -- Statement level triggers, so that bulk operations update all their rows at once.
+        CREATE TRIGGER reservation_affecting_time_spans_insert
+            AFTER INSERT ON reservation
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION reservation_update_affecting_time_spans();
+
+        CREATE TRIGGER reservation_affecting_time_spans_update
+            AFTER UPDATE ON reservation
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION reservation_update_affecting_time_spans();
+
+        CREATE TRIGGER reservation_affecting_time_spans_delete
+            AFTER DELETE ON reservation
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION reservation_update_affecting_time_spans();
+
+        CREATE TRIGGER reservation_affecting_time_spans_truncate
+            AFTER TRUNCATE ON reservation
+            FOR EACH STATEMENT EXECUTE FUNCTION reservation_update_affecting_time_spans();
+
+        SELECT update_affecting_time_spans();
+        """
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tilavarauspalvelu", "0175_remove_allow_reservations_without_opening_hours"),
+    ]
+
+    operations = [
+        # Replace the materialized view with a table that is kept up to date incrementally
+        migrations.RunSQL(sql=remove_affecting_reservations_view(), reverse_sql=None),
+        migrations.RunSQL(sql=create_affecting_time_spans_table(), reverse_sql=None),
+        migrations.RunSQL(sql=create_update_affecting_time_spans_function(), reverse_sql=None),
+        migrations.RunSQL(sql=create_reservation_triggers(), reverse_sql=None),
+    ]
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from inspect import cleandoc
+
+from django.conf import settings
+from django.db import migrations
+
+
+def create_update_reservation_unit_hierarchy_function() -> str:
+    now_func = "NOW_TT()" if settings.ENABLE_NOW_TT else "STATEMENT_TIMESTAMP()"
+
+    # "SELECT 1;" for syntax highlighting
+    return cleandoc(
+        f"""
+        SELECT 1;
+
+        -- Updates the reservation unit hierarchy for reservation units affected by changes to
+        -- the given reservation units (or their spaces and resources) or the given spaces.
+        -- If neither reservation units nor spaces are given, the whole hierarchy is updated.
+        --
+        -- Affected reservation units are:
+        --   1) The given reservation units.
+        --   2) Reservation units that have a space in the same space tree as any of the given spaces,
+        --      or any of the spaces of the given reservation units.
+        --   3) Reservation units that share a resource with any of the given reservation units.
+        --   4) Reservation units that were related to any of the above before the change.
+        --
+        -- Affecting time spans are updated for the reservations of reservation units whose hierarchy changed.
+        -- Returns the IDs of the reservation units whose hierarchy changed.
+        DROP FUNCTION IF EXISTS update_reservation_unit_hierarchy(integer[], integer[]);
+
+        CREATE FUNCTION update_reservation_unit_hierarchy(
+            reservation_unit_ids integer[] DEFAULT NULL,
+            space_ids integer[] DEFAULT NULL
+        )
+        RETURNS integer[]
+        AS
+        $$
+        DECLARE
+            scope_ids integer[] := NULL;
+            changed_ids integer[];
+        BEGIN
+            IF reservation_unit_ids IS NOT NULL OR space_ids IS NOT NULL THEN
+                WITH seed_trees AS (
+                    SELECT s.tree_id
+                    FROM "space" s
+                    WHERE s.id = ANY(space_ids)
+                    UNION
+                    SELECT s.tree_id
+                    FROM "space" s
+                    INNER JOIN reservation_unit_spaces rus ON s.id = rus.space_id
+                    WHERE rus.reservationunit_id = ANY(reservation_unit_ids)
+                ),
+                seed_resources AS (
+                    SELECT rur.resource_id
+                    FROM reservation_unit_resources rur
+                    WHERE rur.reservationunit_id = ANY(reservation_unit_ids)
+                ),
+                seeds AS (
+                    SELECT UNNEST(reservation_unit_ids) AS id
+                    UNION
+                    SELECT rus.reservationunit_id
+                    FROM reservation_unit_spaces rus
+                    INNER JOIN "space" s ON s.id = rus.space_id
+                    WHERE s.tree_id IN (SELECT seed_trees.tree_id FROM seed_trees)
+                    UNION
+                    SELECT rur.reservationunit_id
+                    FROM reservation_unit_resources rur
+                    WHERE rur.resource_id IN (SELECT seed_resources.resource_id FROM seed_resources)
+                )
+                SELECT ARRAY(
+                    SELECT seeds.id FROM seeds
+                    UNION
+                    SELECT UNNEST(ruh.related_reservation_unit_ids)
+                    FROM reservation_unit_hierarchy ruh
+                    WHERE ruh.reservation_unit_id IN (SELECT seeds.id FROM seeds)
+                ) INTO scope_ids;
+
+                IF cardinality(scope_ids) = 0 THEN
+                    RETURN ARRAY[]::integer[];
+                END IF;
+            END IF;
+
+            WITH computed AS (
+                SELECT
+                    target_reservation_unit.id as reservation_unit_id,
+                    (
+                        SELECT
+                            ARRAY_AGG(DISTINCT reservation_ids.id)
+                        FROM (
+                            SELECT
+                                agg_res_unit.id
+                            FROM "reservation_unit" agg_res_unit
+                            LEFT OUTER JOIN reservation_unit_spaces res_space ON (
+                                agg_res_unit.id = res_space.reservationunit_id
+                            )
+                            LEFT OUTER JOIN reservation_unit_resources res_resource ON (
+                                agg_res_unit.id = res_resource.reservationunit_id
+                            )
+                            WHERE (
+                                agg_res_unit.id = target_reservation_unit.id
+                                OR res_space.space_id IN (
+                                    SELECT
+                                        family_space.id
+                                    FROM "space" target_space
+                                    INNER JOIN reservation_unit_spaces target_rus ON (
+                                        target_space.id = target_rus.space_id
+                                    )
+                                    INNER JOIN "space" family_space ON (
+                                        family_space.tree_id = target_space.tree_id
+                                        AND (
+                                            (
+                                                family_space.lft <= target_space.lft
+                                                AND family_space.rght >= target_space.rght
+                                            )
+                                            OR (
+                                                family_space.lft >= target_space.lft
+                                                AND family_space.rght <= target_space.rght
+                                            )
+                                        )
+                                    )
+                                    WHERE target_rus.reservationunit_id = target_reservation_unit.id
+                                )
+                                OR res_resource.resource_id IN (
+                                    SELECT
+                                        target_rur.resource_id
+                                    FROM reservation_unit_resources target_rur
+                                    WHERE target_rur.reservationunit_id = target_reservation_unit.id
+                                )
+                            )
+                        ) reservation_ids
+                    ) AS related_reservation_unit_ids
+                FROM "reservation_unit" target_reservation_unit
+                WHERE (scope_ids IS NULL OR target_reservation_unit.id = ANY(scope_ids))
+            ),
+            -- Remove rows for reservation units that have been deleted.
+            removed AS (
+                DELETE FROM reservation_unit_hierarchy ruh
+                WHERE (
+                    (scope_ids IS NULL OR ruh.reservation_unit_id = ANY(scope_ids))
+                    AND NOT EXISTS (SELECT 1 FROM computed c WHERE c.reservation_unit_id = ruh.reservation_unit_id)
+                )
+            ),
+            upserted AS (
+                INSERT INTO reservation_unit_hierarchy (reservation_unit_id, related_reservation_unit_ids)
+                SELECT c.reservation_unit_id, c.related_reservation_unit_ids
+                FROM computed c
+                ON CONFLICT (reservation_unit_id) DO UPDATE SET
+                    related_reservation_unit_ids = EXCLUDED.related_reservation_unit_ids
+                -- Don't write rows that haven't changed.
+                WHERE (
+                    reservation_unit_hierarchy.related_reservation_unit_ids
+                    IS DISTINCT FROM EXCLUDED.related_reservation_unit_ids
+                )
+                RETURNING reservation_unit_hierarchy.reservation_unit_id
+            )
+            SELECT ARRAY(SELECT upserted.reservation_unit_id FROM upserted) INTO changed_ids;
+
+            -- Affecting time spans contain the related reservation units from the hierarchy,
+            -- so they need to be re-expanded for reservation units whose hierarchy changed.
+            PERFORM update_affecting_time_spans(ARRAY(
+                SELECT r.id
+                FROM reservation r
+                WHERE (
+                    r.reservation_unit_id = ANY(changed_ids)
+                    AND r.ends_at >= DATE_TRUNC('day', {now_func} - interval '1 day')
+                )
+            ));
+
+            RETURN changed_ids;
+        END;
+        $$
+        LANGUAGE plpgsql;
+        """  # noqa: S608
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tilavarauspalvelu", "0177_incremental_reservation_unit_hierarchy"),
+    ]
+
+    operations = [
+        # Return the reservation units whose hierarchy changed so that their cached results can be invalidated
+        migrations.RunSQL(sql=create_update_reservation_unit_hierarchy_function(), reverse_sql=None),
+    ]
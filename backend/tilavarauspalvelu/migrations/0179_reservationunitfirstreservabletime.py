@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import tilavarauspalvelu.enums
+import utils.fields.model
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tilavarauspalvelu", "0178_reservation_unit_hierarchy_changed_ids"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReservationUnitFirstReservableTime",
+            fields=[
+                (
+                    "reservation_unit",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="precomputed_first_reservable_time",
+                        serialize=False,
+                        to="tilavarauspalvelu.reservationunit",
+                    ),
+                ),
+                ("first_reservable_datetime", models.DateTimeField(blank=True, null=True)),
+                ("is_closed", models.BooleanField()),
+                (
+                    "effective_access_type",
+                    utils.fields.model.TextChoicesField(
+                        blank=True,
+                        choices=[
+                            ("ACCESS_CODE", "door code"),
+                            ("OPENED_BY_STAFF", "staff"),
+                            ("PHYSICAL_KEY", "key"),
+                            ("UNRESTRICTED", "direct access"),
+                        ],
+                        enum=tilavarauspalvelu.enums.AccessType,
+                        max_length=15,
+                        null=True,
+                    ),
+                ),
+                ("valid_until", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "reservation unit first reservable time",
+                "verbose_name_plural": "reservation unit first reservable times",
+                "db_table": "reservation_unit_first_reservable_time",
+                "ordering": ["reservation_unit"],
+                "base_manager_name": "objects",
+            },
+        ),
+    ]
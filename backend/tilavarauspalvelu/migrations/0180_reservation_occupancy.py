@@ -0,0 +1,418 @@
+from __future__ import annotations
+
+from inspect import cleandoc
+
+import django.contrib.postgres.fields.ranges
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+# Range that overlaps with the given ranges of other rows only in the cases where they should be exclusive.
+#
+# Lock range: Spaces (and their sub-spaces) of the reservation unit are occupied exclusively,
+# while the parent spaces are only occupied partially, i.e. shared with sibling spaces.
+# Shared rows use a range unique to the reservation, so that they don't overlap with each other.
+LOCK_RANGE = "(CASE WHEN is_shared THEN int8range(reservation_id, reservation_id, '[]') ELSE int8range(NULL, NULL) END)"
+#
+# Kind range: Reservations should not overlap with each other, and buffers of reservations
+# should not overlap with other non-blocking reservations. Buffers can overlap with each other,
+# and blocking reservations can overlap with the buffers of other reservations.
+KIND_RANGE = (
+    "(CASE "
+    "WHEN is_buffer THEN int8range(reservation_id, reservation_id, '[]') "
+    "WHEN is_blocking THEN int8range(NULL, 0) "
+    "ELSE int8range(NULL, NULL) "
+    "END)"
+)
+
+
+def create_reservation_occupancy_table() -> str:
+    # "SELECT 1;" for syntax highlighting
+    return cleandoc(
+        f"""
+        SELECT 1;
+
+        CREATE TABLE reservation_occupancy (
+            id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            reservation_id integer NOT NULL,
+            space_id integer,
+            resource_id integer,
+            is_shared boolean NOT NULL,
+            is_buffer boolean NOT NULL,
+            is_blocking boolean NOT NULL,
+            during tstzrange NOT NULL
+        );
+
+        CREATE INDEX idx_reservation_occupancy_reservation_id ON reservation_occupancy (reservation_id);
+
+        ALTER TABLE reservation_occupancy ADD CONSTRAINT reservation_occupancy_space_no_overlaps
+            EXCLUDE USING gist (
+                space_id WITH =,
+                reservation_id WITH <>,
+                {LOCK_RANGE} WITH &&,
+                {KIND_RANGE} WITH &&,
+                during WITH &&
+            )
+            WHERE (space_id IS NOT NULL);
+
+        ALTER TABLE reservation_occupancy ADD CONSTRAINT reservation_occupancy_resource_no_overlaps
+            EXCLUDE USING gist (
+                resource_id WITH =,
+                reservation_id WITH <>,
+                {KIND_RANGE} WITH &&,
+                during WITH &&
+            )
+            WHERE (resource_id IS NOT NULL);
+        """
+    )
+
+
+def create_update_reservation_occupancy_function() -> str:
+    now_func = "NOW_TT()" if settings.ENABLE_NOW_TT else "STATEMENT_TIMESTAMP()"
+
+    # "SELECT 1;" for syntax highlighting
+    return cleandoc(
+        f"""
+        SELECT 1;
+
+        -- Updates the occupancy of the given reservations.
+        -- If no reservations are given, the occupancy of all reservations is updated.
+        --
+        -- If `strict` is true, raises an exclusion violation if any of the reservations would overlap
+        -- with other reservations in the reservation unit hierarchy. Otherwise, the overlapping
+        -- occupancy rows are left out, so that existing overlapping reservations don't cause errors.
+        CREATE OR REPLACE FUNCTION update_reservation_occupancy(
+            reservation_ids integer[] DEFAULT NULL,
+            strict boolean DEFAULT false
+        )
+        RETURNS void
+        AS
+        $$
+        DECLARE
+            expected_count integer;
+            inserted_count integer;
+        BEGIN
+            IF reservation_ids IS NOT NULL AND cardinality(reservation_ids) = 0 THEN
+                RETURN;
+            END IF;
+
+            DELETE FROM reservation_occupancy ro
+            WHERE (reservation_ids IS NULL OR ro.reservation_id = ANY(reservation_ids));
+
+            WITH res AS (
+                SELECT
+                    r.id,
+                    r.reservation_unit_id,
+                    r.begins_at,
+                    r.ends_at,
+                    r.buffer_time_before,
+                    r.buffer_time_after,
+                    (CASE WHEN UPPER(r."type") = 'BLOCKED' THEN true ELSE false END) as is_blocking
+                FROM reservation r
+                WHERE (
+                    -- Make use of reservation's index on 'ends_at', even if this fetches some past reservations
+                    r.ends_at >= DATE_TRUNC('day', {now_func} - interval '1 day')
+                    AND UPPER(r.state) IN ('CREATED', 'CONFIRMED', 'WAITING_FOR_PAYMENT', 'REQUIRES_HANDLING')
+                    AND (reservation_ids IS NULL OR r.id = ANY(reservation_ids))
+                )
+            ),
+            targets AS (
+                SELECT
+                    t.reservation_id,
+                    t.space_id,
+                    t.resource_id,
+                    -- A space is only shared if it's not also occupied exclusively by the same reservation.
+                    BOOL_AND(t.is_shared) as is_shared
+                FROM (
+                    -- Spaces of the reservation unit and their sub-spaces are occupied exclusively.
+                    SELECT
+                        res.id as reservation_id,
+                        family_space.id as space_id,
+                        NULL::integer as resource_id,
+                        false as is_shared
+                    FROM res
+                    INNER JOIN reservation_unit_spaces rus ON res.reservation_unit_id = rus.reservationunit_id
+                    INNER JOIN "space" s ON rus.space_id = s.id
+                    INNER JOIN "space" family_space ON (
+                        family_space.tree_id = s.tree_id
+                        AND family_space.lft >= s.lft
+                        AND family_space.rght <= s.rght
+                    )
+                    UNION ALL
+                    -- Parent spaces of the reservation unit's spaces are shared with their other sub-spaces.
+                    SELECT
+                        res.id as reservation_id,
+                        family_space.id as space_id,
+                        NULL::integer as resource_id,
+                        true as is_shared
+                    FROM res
+                    INNER JOIN reservation_unit_spaces rus ON res.reservation_unit_id = rus.reservationunit_id
+                    INNER JOIN "space" s ON rus.space_id = s.id
+                    INNER JOIN "space" family_space ON (
+                        family_space.tree_id = s.tree_id
+                        AND family_space.lft < s.lft
+                        AND family_space.rght > s.rght
+                    )
+                    UNION ALL
+                    -- Resources of the reservation unit are occupied exclusively.
+                    SELECT
+                        res.id as reservation_id,
+                        NULL::integer as space_id,
+                        rur.resource_id as resource_id,
+                        false as is_shared
+                    FROM res
+                    INNER JOIN reservation_unit_resources rur ON res.reservation_unit_id = rur.reservationunit_id
+                ) t
+                GROUP BY
+                    t.reservation_id,
+                    t.space_id,
+                    t.resource_id
+            ),
+            computed AS (
+                SELECT
+                    targets.reservation_id,
+                    targets.space_id,
+                    targets.resource_id,
+                    targets.is_shared,
+                    false as is_buffer,
+                    res.is_blocking,
+                    TSTZRANGE(res.begins_at, res.ends_at) as during
+                FROM targets
+                INNER JOIN res ON targets.reservation_id = res.id
+                UNION ALL
+                -- Buffers are ignored for blocking reservations even if set.
+                SELECT
+                    targets.reservation_id,
+                    targets.space_id,
+                    targets.resource_id,
+                    targets.is_shared,
+                    true as is_buffer,
+                    res.is_blocking,
+                    TSTZRANGE(res.begins_at - res.buffer_time_before, res.ends_at + res.buffer_time_after) as during
+                FROM targets
+                INNER JOIN res ON targets.reservation_id = res.id
+                WHERE (
+                    NOT res.is_blocking
+                    AND (res.buffer_time_before > interval '0' OR res.buffer_time_after > interval '0')
+                )
+            ),
+            inserted AS (
+                INSERT INTO reservation_occupancy (
+                    reservation_id,
+                    space_id,
+                    resource_id,
+                    is_shared,
+                    is_buffer,
+                    is_blocking,
+                    during
+                )
+                SELECT
+                    c.reservation_id,
+                    c.space_id,
+                    c.resource_id,
+                    c.is_shared,
+                    c.is_buffer,
+                    c.is_blocking,
+                    c.during
+                FROM computed c
+                -- Waits for concurrent transactions inserting overlapping rows to finish.
+                ON CONFLICT DO NOTHING
+                RETURNING 1
+            )
+            SELECT
+                (SELECT COUNT(*) FROM computed),
+                (SELECT COUNT(*) FROM inserted)
+            INTO expected_count, inserted_count;
+
+            IF strict AND inserted_count < expected_count THEN
+                RAISE EXCEPTION 'Reservation overlaps with other reservations in the reservation unit hierarchy.'
+                USING ERRCODE = 'exclusion_violation', CONSTRAINT = 'reservation_occupancy_no_overlaps';
+            END IF;
+        END;
+        $$
+        LANGUAGE plpgsql;
+        """  # noqa: S608
+    )
+
+
+def create_reservation_triggers() -> str:
+    # "SELECT 1;" for syntax highlighting
+    return cleandoc(
+        """
+        SELECT 1;
+
+        -- Overlaps are only enforced when the `tilavarauspalvelu.strict_reservation_occupancy` setting
+        -- is set for the current transaction, see `ReservationOccupancy.prevent_overlaps()`.
+        CREATE OR REPLACE FUNCTION reservation_update_occupancy()
+        RETURNS trigger
+        AS
+        $$
+        DECLARE
+            strict boolean := COALESCE(current_setting('tilavarauspalvelu.strict_reservation_occupancy', true), '') = 'on';
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                DELETE FROM reservation_occupancy;
+            ELSIF TG_OP = 'DELETE' THEN
+                DELETE FROM reservation_occupancy ro WHERE ro.reservation_id IN (SELECT id FROM old_rows);
+            ELSIF TG_OP = 'INSERT' THEN
+                PERFORM update_reservation_occupancy(ARRAY(SELECT id FROM new_rows), strict);
+            ELSE
+                -- Only update the occupancy of reservations whose occupancy could have changed.
+                PERFORM update_reservation_occupancy(
+                    ARRAY(
+                        SELECT new_rows.id
+                        FROM new_rows
+                        INNER JOIN old_rows ON new_rows.id = old_rows.id
+                        WHERE (
+                            new_rows.reservation_unit_id,
+                            new_rows.begins_at,
+                            new_rows.ends_at,
+                            new_rows.buffer_time_before,
+                            new_rows.buffer_time_after,
+                            new_rows.state,
+                            new_rows."type"
+                        ) IS DISTINCT FROM (
+                            old_rows.reservation_unit_id,
+                            old_rows.begins_at,
+                            old_rows.ends_at,
+                            old_rows.buffer_time_before,
+                            old_rows.buffer_time_after,
+                            old_rows.state,
+                            old_rows."type"
+                        )
+                    ),
+                    strict
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$
+        LANGUAGE plpgsql;
+
+        -- Statement level triggers, so that bulk operations update all their rows at once.
+        CREATE TRIGGER reservation_occupancy_insert
+            AFTER INSERT ON reservation
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION reservation_update_occupancy();
+
+        CREATE TRIGGER reservation_occupancy_update
+            AFTER UPDATE ON reservation
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION reservation_update_occupancy();
+
+        CREATE TRIGGER reservation_occupancy_delete
+            AFTER DELETE ON reservation
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION reservation_update_occupancy();
+
+        CREATE TRIGGER reservation_occupancy_truncate
+            AFTER TRUNCATE ON reservation
+            FOR EACH STATEMENT EXECUTE FUNCTION reservation_update_occupancy();
+        """
+    )
+
+
+def create_reservation_unit_hierarchy_triggers() -> str:
+    now_func = "NOW_TT()" if settings.ENABLE_NOW_TT else "STATEMENT_TIMESTAMP()"
+
+    # "SELECT 1;" for syntax highlighting
+    return cleandoc(
+        f"""
+        SELECT 1;
+
+        -- The spaces and resources occupied by a reservation can only change
+        -- if the hierarchy of its reservation unit changes.
+        CREATE OR REPLACE FUNCTION reservation_unit_hierarchy_update_occupancy()
+        RETURNS trigger
+        AS
+        $$
+        BEGIN
+            PERFORM update_reservation_occupancy(ARRAY(
+                SELECT r.id
+                FROM reservation r
+                WHERE (
+                    r.reservation_unit_id IN (SELECT reservation_unit_id FROM new_rows)
+                    AND r.ends_at >= DATE_TRUNC('day', {now_func} - interval '1 day')
+                )
+            ));
+            RETURN NULL;
+        END;
+        $$
+        LANGUAGE plpgsql;
+
+        CREATE TRIGGER reservation_unit_hierarchy_occupancy_insert
+            AFTER INSERT ON reservation_unit_hierarchy
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION reservation_unit_hierarchy_update_occupancy();
+
+        CREATE TRIGGER reservation_unit_hierarchy_occupancy_update
+            AFTER UPDATE ON reservation_unit_hierarchy
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION reservation_unit_hierarchy_update_occupancy();
+
+        SELECT update_reservation_occupancy();
+        """  # noqa: S608
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tilavarauspalvelu", "0179_reservationunitfirstreservabletime"),
+    ]
+
+    operations = [
+        # Allows using '=' and '<>' operators for integers in exclusion constraints
+        BtreeGistExtension(),
+        migrations.RunSQL(sql=create_reservation_occupancy_table(), reverse_sql=None),
+        migrations.RunSQL(sql=create_update_reservation_occupancy_function(), reverse_sql=None),
+        migrations.RunSQL(sql=create_reservation_triggers(), reverse_sql=None),
+        migrations.RunSQL(sql=create_reservation_unit_hierarchy_triggers(), reverse_sql=None),
+        migrations.CreateModel(
+            name="ReservationOccupancy",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("is_shared", models.BooleanField()),
+                ("is_buffer", models.BooleanField()),
+                ("is_blocking", models.BooleanField()),
+                ("during", django.contrib.postgres.fields.ranges.DateTimeRangeField()),
+                (
+                    "reservation",
+                    models.ForeignKey(
+                        db_column="reservation_id",
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="occupancies",
+                        to="tilavarauspalvelu.reservation",
+                    ),
+                ),
+                (
+                    "resource",
+                    models.ForeignKey(
+                        db_column="resource_id",
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="reservation_occupancies",
+                        to="tilavarauspalvelu.resource",
+                    ),
+                ),
+                (
+                    "space",
+                    models.ForeignKey(
+                        db_column="space_id",
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="reservation_occupancies",
+                        to="tilavarauspalvelu.space",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "reservation occupancy",
+                "verbose_name_plural": "reservation occupancies",
+                "db_table": "reservation_occupancy",
+                "ordering": ["reservation_id", "id"],
+                "managed": False,
+                "base_manager_name": "objects",
+            },
+        ),
+    ]
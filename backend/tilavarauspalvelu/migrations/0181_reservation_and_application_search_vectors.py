@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+from inspect import cleandoc
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+def create_search_vector_functions() -> str:
+    # "SELECT 1;" for syntax highlighting
+    return cleandoc(
+        """
+        SELECT 1;
+
+        -- Same as the 'Application.applicant' lookup property.
+        CREATE OR REPLACE FUNCTION application_applicant(a application)
+        RETURNS text
+        AS
+        $$
+            SELECT CASE
+                WHEN a.organisation_name <> '' THEN a.organisation_name
+                WHEN a.contact_person_first_name <> '' AND a.contact_person_last_name <> ''
+                    THEN a.contact_person_first_name || ' ' || a.contact_person_last_name
+                ELSE (
+                    SELECT u.first_name || ' ' || u.last_name
+                    FROM "user" u
+                    WHERE u.id = a.user_id AND u.first_name <> '' AND u.last_name <> ''
+                )
+            END;
+        $$
+        LANGUAGE sql
+        STABLE;
+
+        CREATE OR REPLACE FUNCTION reservation_search_vector(r reservation)
+        RETURNS tsvector
+        AS
+        $$
+            SELECT to_tsvector(
+                'finnish'::regconfig,
+                concat_ws(
+                    ' ',
+                    r.id,
+                    r.name,
+                    r.reservee_identifier,
+                    r.reservee_email,
+                    r.reservee_first_name,
+                    r.reservee_last_name,
+                    r.reservee_organisation_name,
+                    (SELECT concat_ws(' ', u.email, u.first_name, u.last_name) FROM "user" u WHERE u.id = r.user_id),
+                    (SELECT rs.name FROM reservation_series rs WHERE rs.id = r.reservation_series_id)
+                )
+            );
+        $$
+        LANGUAGE sql
+        STABLE;
+
+        CREATE OR REPLACE FUNCTION application_search_vector(a application)
+        RETURNS tsvector
+        AS
+        $$
+            SELECT to_tsvector(
+                'finnish'::regconfig,
+                concat_ws(
+                    ' ',
+                    a.id,
+                    application_applicant(a),
+                    (
+                        SELECT string_agg(concat_ws(' ', s.id, s.name), ' ' ORDER BY s.id)
+                        FROM application_section s
+                        WHERE s.application_id = a.id
+                    )
+                )
+            );
+        $$
+        LANGUAGE sql
+        STABLE;
+
+        CREATE OR REPLACE FUNCTION application_section_search_vector(s application_section)
+        RETURNS tsvector
+        AS
+        $$
+            SELECT to_tsvector(
+                'finnish'::regconfig,
+                concat_ws(
+                    ' ',
+                    s.application_id,
+                    s.id,
+                    s.name,
+                    (SELECT application_applicant(a) FROM application a WHERE a.id = s.application_id)
+                )
+            );
+        $$
+        LANGUAGE sql
+        STABLE;
+        """
+    )
+
+
+def create_own_row_triggers() -> str:
+    # "SELECT 1;" for syntax highlighting
+    return cleandoc(
+        """
+        SELECT 1;
+
+        -- Compute the search vector when a row is saved with changes to the columns the vector is built from.
+        -- These don't fire for the updates below that only set the search vector.
+
+        CREATE OR REPLACE FUNCTION reservation_set_search_vector()
+        RETURNS trigger
+        AS
+        $$
+        BEGIN
+            NEW.search_vector := reservation_search_vector(NEW);
+            RETURN NEW;
+        END;
+        $$
+        LANGUAGE plpgsql;
+
+        CREATE TRIGGER reservation_search_vector
+            BEFORE INSERT OR UPDATE OF
+                name,
+                reservee_identifier,
+                reservee_email,
+                reservee_first_name,
+                reservee_last_name,
+                reservee_organisation_name,
+                user_id,
+                reservation_series_id
+            ON reservation
+            FOR EACH ROW EXECUTE FUNCTION reservation_set_search_vector();
+
+        CREATE OR REPLACE FUNCTION application_set_search_vector()
+        RETURNS trigger
+        AS
+        $$
+        BEGIN
+            NEW.search_vector := application_search_vector(NEW);
+            RETURN NEW;
+        END;
+        $$
+        LANGUAGE plpgsql;
+
+        CREATE TRIGGER application_search_vector
+            BEFORE INSERT OR UPDATE OF
+                organisation_name,
+                contact_person_first_name,
+                contact_person_last_name,
+                user_id
+            ON application
+            FOR EACH ROW EXECUTE FUNCTION application_set_search_vector();
+
+        CREATE OR REPLACE FUNCTION application_section_set_search_vector()
+        RETURNS trigger
+        AS
+        $$
+        BEGIN
+            NEW.search_vector := application_section_search_vector(NEW);
+            RETURN NEW;
+        END;
+        $$
+        LANGUAGE plpgsql;
+
+        CREATE TRIGGER application_section_search_vector
+            BEFORE INSERT OR UPDATE OF
+                name,
+                application_id
+            ON application_section
+            FOR EACH ROW EXECUTE FUNCTION application_section_set_search_vector();
+        """
+    )
+
+
+def create_related_row_triggers() -> str:
+    # "SELECT 1;" for syntax highlighting
+    return cleandoc(
+        """
+        SELECT 1;
+
+        -- Update the search vectors of rows whose vectors contain data from a changed related row.
+
+        CREATE OR REPLACE FUNCTION user_update_search_vectors()
+        RETURNS trigger
+        AS
+        $$
+        BEGIN
+            UPDATE reservation r
+            SET search_vector = reservation_search_vector(r)
+            WHERE r.user_id = NEW.id;
+
+            UPDATE application a
+            SET search_vector = application_search_vector(a)
+            WHERE a.user_id = NEW.id;
+
+            UPDATE application_section s
+            SET search_vector = application_section_search_vector(s)
+            FROM application a
+            WHERE s.application_id = a.id AND a.user_id = NEW.id;
+
+            RETURN NULL;
+        END;
+        $$
+        LANGUAGE plpgsql;
+
+        CREATE TRIGGER user_update_search_vectors
+            AFTER UPDATE OF email, first_name, last_name ON "user"
+            FOR EACH ROW
+            WHEN (
+                (OLD.email, OLD.first_name, OLD.last_name) IS DISTINCT FROM (NEW.email, NEW.first_name, NEW.last_name)
+            )
+            EXECUTE FUNCTION user_update_search_vectors();
+
+        CREATE OR REPLACE FUNCTION reservation_series_update_search_vectors()
+        RETURNS trigger
+        AS
+        $$
+        BEGIN
+            UPDATE reservation r
+            SET search_vector = reservation_search_vector(r)
+            WHERE r.reservation_series_id = NEW.id;
+
+            RETURN NULL;
+        END;
+        $$
+        LANGUAGE plpgsql;
+
+        CREATE TRIGGER reservation_series_update_search_vectors
+            AFTER UPDATE OF name ON reservation_series
+            FOR EACH ROW
+            WHEN (OLD.name IS DISTINCT FROM NEW.name)
+            EXECUTE FUNCTION reservation_series_update_search_vectors();
+
+        CREATE OR REPLACE FUNCTION application_update_section_search_vectors()
+        RETURNS trigger
+        AS
+        $$
+        BEGIN
+            UPDATE application_section s
+            SET search_vector = application_section_search_vector(s)
+            WHERE s.application_id = NEW.id;
+
+            RETURN NULL;
+        END;
+        $$
+        LANGUAGE plpgsql;
+
+        CREATE TRIGGER application_update_section_search_vectors
+            AFTER UPDATE OF organisation_name, contact_person_first_name, contact_person_last_name, user_id
+            ON application
+            FOR EACH ROW
+            WHEN (application_applicant(OLD) IS DISTINCT FROM application_applicant(NEW))
+            EXECUTE FUNCTION application_update_section_search_vectors();
+
+        CREATE OR REPLACE FUNCTION application_section_update_application_search_vectors()
+        RETURNS trigger
+        AS
+        $$
+        DECLARE
+            application_ids integer[];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                application_ids := ARRAY[NEW.application_id];
+            ELSIF TG_OP = 'DELETE' THEN
+                application_ids := ARRAY[OLD.application_id];
+            ELSIF (OLD.name, OLD.application_id) IS DISTINCT FROM (NEW.name, NEW.application_id) THEN
+                application_ids := ARRAY[OLD.application_id, NEW.application_id];
+            ELSE
+                RETURN NULL;
+            END IF;
+
+            UPDATE application a
+            SET search_vector = application_search_vector(a)
+            WHERE a.id = ANY(application_ids);
+
+            RETURN NULL;
+        END;
+        $$
+        LANGUAGE plpgsql;
+
+        CREATE TRIGGER application_section_update_application_search_vectors
+            AFTER INSERT OR DELETE OR UPDATE OF name, application_id ON application_section
+            FOR EACH ROW EXECUTE FUNCTION application_section_update_application_search_vectors();
+        """
+    )
+
+
+def populate_search_vectors() -> str:
+    # "SELECT 1;" for syntax highlighting
+    return cleandoc(
+        """
+        SELECT 1;
+
+        -- Only the search vectors change, so the statement level triggers that update
+        -- the affecting time spans and occupancy of all reservations are not needed.
+        ALTER TABLE reservation DISABLE TRIGGER reservation_affecting_time_spans_update;
+        ALTER TABLE reservation DISABLE TRIGGER reservation_occupancy_update;
+
+        UPDATE reservation r SET search_vector = reservation_search_vector(r);
+
+        ALTER TABLE reservation ENABLE TRIGGER reservation_affecting_time_spans_update;
+        ALTER TABLE reservation ENABLE TRIGGER reservation_occupancy_update;
+
+        UPDATE application a SET search_vector = application_search_vector(a);
+        UPDATE application_section s SET search_vector = application_section_search_vector(s);
+        """
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tilavarauspalvelu", "0180_reservation_occupancy"),
+    ]
+
+    operations = [
+        # Allows trigram indexes for 'LIKE' queries
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="reservation",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="application",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="applicationsection",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, default=""),
+        ),
+        migrations.RunSQL(sql=create_search_vector_functions(), reverse_sql=None),
+        migrations.RunSQL(sql=create_own_row_triggers(), reverse_sql=None),
+        migrations.RunSQL(sql=create_related_row_triggers(), reverse_sql=None),
+        migrations.RunSQL(sql=populate_search_vectors(), reverse_sql=None),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"],
+                name="reservation_search_vector_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("reservee_email"),
+                    name="gin_trgm_ops",
+                ),
+                name="reservation_email_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("email"),
+                    name="gin_trgm_ops",
+                ),
+                name="user_email_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"],
+                name="application_search_vector_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="applicationsection",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"],
+                name="app_section_search_vector_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+
+import utils.date_utils
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tilavarauspalvelu", "0181_reservation_and_application_search_vectors"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reservationunitfirstreservabletime",
+            name="updated_at",
+            field=models.DateTimeField(default=utils.date_utils.local_datetime),
+            preserve_default=False,
+        ),
+    ]
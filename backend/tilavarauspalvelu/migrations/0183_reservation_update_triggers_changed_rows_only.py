@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from inspect import cleandoc
+
+from django.db import migrations
+
+
+def update_reservation_affecting_time_spans_triggers() -> str:
+    # "SELECT 1;" for syntax highlighting
+    return cleandoc(
+        """
+        SELECT 1;
+
+        CREATE OR REPLACE FUNCTION reservation_update_affecting_time_spans()
+        RETURNS trigger
+        AS
+        $$
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                DELETE FROM affecting_time_spans;
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM update_affecting_time_spans(ARRAY(SELECT id FROM old_rows));
+            ELSIF TG_OP = 'INSERT' THEN
+                PERFORM update_affecting_time_spans(ARRAY(SELECT id FROM new_rows));
+            ELSE
+                -- Only update the affecting time spans of reservations whose time spans could have changed,
+                -- so that updates to other columns (e.g. search vectors) don't need to recompute them.
+                PERFORM update_affecting_time_spans(
+                    ARRAY(
+                        SELECT new_rows.id
+                        FROM new_rows
+                        INNER JOIN old_rows ON new_rows.id = old_rows.id
+                        WHERE (
+                            new_rows.reservation_unit_id,
+                            new_rows.begins_at,
+                            new_rows.ends_at,
+                            new_rows.buffer_time_before,
+                            new_rows.buffer_time_after,
+                            new_rows.state,
+                            new_rows."type"
+                        ) IS DISTINCT FROM (
+                            old_rows.reservation_unit_id,
+                            old_rows.begins_at,
+                            old_rows.ends_at,
+                            old_rows.buffer_time_before,
+                            old_rows.buffer_time_after,
+                            old_rows.state,
+                            old_rows."type"
+                        )
+                    )
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$
+        LANGUAGE plpgsql;
+
+        -- Triggers with transition tables cannot be limited to specific columns with 'UPDATE OF',
+        -- so the changed rows are compared in the trigger function instead.
+        DROP TRIGGER IF EXISTS reservation_affecting_time_spans_update ON reservation;
+
+        CREATE TRIGGER reservation_affecting_time_spans_update
+            AFTER UPDATE ON reservation
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION reservation_update_affecting_time_spans();
+        """
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tilavarauspalvelu", "0182_reservationunitfirstreservabletime_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=update_reservation_affecting_time_spans_triggers(), reverse_sql=None),
+    ]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from inspect import cleandoc
+
+from django.db import migrations
+
+
+def rebuild_search_vectors(lang: str, config: str) -> str:
+    # Same as 'ReservationUnitQuerySet.update_search_vectors', but written in SQL
+    # so that the migration doesn't depend on the current models.
+    # "SELECT 1;" for syntax highlighting
+    return cleandoc(
+        f"""
+        SELECT 1;
+
+        UPDATE reservation_unit ru
+        SET search_vector_{lang} = TO_TSVECTOR(
+            '{config}'::regconfig,
+            CONCAT_WS(
+                ' ',
+                ru.id,
+                COALESCE(NULLIF(ru.name_{lang}, ''), NULLIF(ru.name_fi, '')),
+                COALESCE(NULLIF(ru.description_{lang}, ''), NULLIF(ru.description_fi, '')),
+                ARRAY_TO_STRING(ru.search_terms, ' '),
+                (
+                    SELECT ARRAY_TO_STRING(u.search_terms, ' ')
+                    FROM unit u
+                    WHERE u.id = ru.unit_id
+                ),
+                (
+                    SELECT COALESCE(NULLIF(u.name_{lang}, ''), NULLIF(u.name_fi, ''))
+                    FROM unit u
+                    WHERE u.id = ru.unit_id
+                ),
+                (
+                    SELECT COALESCE(NULLIF(t.name_{lang}, ''), NULLIF(t.name_fi, ''))
+                    FROM reservation_unit_type t
+                    WHERE t.id = ru.reservation_unit_type_id
+                ),
+                (
+                    SELECT STRING_AGG(COALESCE(NULLIF(s.name_{lang}, ''), NULLIF(s.name_fi, '')), ' ')
+                    FROM space s
+                    INNER JOIN reservation_unit_spaces rs ON rs.space_id = s.id
+                    WHERE rs.reservationunit_id = ru.id
+                ),
+                (
+                    SELECT STRING_AGG(COALESCE(NULLIF(r.name_{lang}, ''), NULLIF(r.name_fi, '')), ' ')
+                    FROM resource r
+                    INNER JOIN reservation_unit_resources rr ON rr.resource_id = r.id
+                    WHERE rr.reservationunit_id = ru.id
+                ),
+                (
+                    SELECT STRING_AGG(COALESCE(NULLIF(i.name_{lang}, ''), NULLIF(i.name_fi, '')), ' ')
+                    FROM intended_use i
+                    INNER JOIN reservation_unit_intended_uses ri ON ri.intendeduse_id = i.id
+                    WHERE ri.reservationunit_id = ru.id
+                ),
+                (
+                    SELECT STRING_AGG(COALESCE(NULLIF(e.name_{lang}, ''), NULLIF(e.name_fi, '')), ' ')
+                    FROM equipment e
+                    INNER JOIN reservation_unit_equipments re ON re.equipment_id = e.id
+                    WHERE re.reservationunit_id = ru.id
+                )
+            )
+        );
+        """  # noqa: S608
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tilavarauspalvelu", "0183_reservation_update_triggers_changed_rows_only"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=rebuild_search_vectors("fi", "finnish"), reverse_sql=migrations.RunSQL.noop),
+        migrations.RunSQL(sql=rebuild_search_vectors("en", "english"), reverse_sql=migrations.RunSQL.noop),
+        migrations.RunSQL(sql=rebuild_search_vectors("sv", "swedish"), reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -23,12 +23,14 @@
 from .reservable_time_span.model import ReservableTimeSpan
 from .reservation.model import Reservation
 from .reservation_deny_reason.model import ReservationDenyReason
+from .reservation_occupancy.model import ReservationOccupancy
 from .reservation_purpose.model import ReservationPurpose
 from .reservation_series.model import ReservationSeries
 from .reservation_statistic.model import ReservationStatistic
 from .reservation_unit.model import ReservationUnit
 from .reservation_unit_access_type.model import ReservationUnitAccessType
 from .reservation_unit_cancellation_rule.model import ReservationUnitCancellationRule
+from .reservation_unit_first_reservable_time.model import ReservationUnitFirstReservableTime
 from .reservation_unit_hierarchy.model import ReservationUnitHierarchy
 from .reservation_unit_image.model import ReservationUnitImage
 from .reservation_unit_option.model import ReservationUnitOption
@@ -69,12 +71,14 @@
     "ReservableTimeSpan",
     "Reservation",
     "ReservationDenyReason",
+    "ReservationOccupancy",
     "ReservationPurpose",
     "ReservationSeries",
     "ReservationStatistic",
     "ReservationUnit",
     "ReservationUnitAccessType",
     "ReservationUnitCancellationRule",
+    "ReservationUnitFirstReservableTime",
     "ReservationUnitHierarchy",
     "ReservationUnitImage",
     "ReservationUnitOption",
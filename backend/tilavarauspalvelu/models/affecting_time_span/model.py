@@ -25,16 +25,16 @@
 
 class AffectingTimeSpan(models.Model):
     """
-    A PostgreSQL materialized view that is used to cache reservations as time spans
+    A PostgreSQL table that is used to cache reservations as time spans
     for first reservable time calculation. Only future reservations are cached,
     and only reservations that are actually going to occur.
 
     NOTE: SHOULD ONLY BE USED FOR FIRST RESERVABLE TIME CALCULATIONS, NOT FOR RESERVATION OVERLAP CHECKS!!!
-    The view gets stale quite often, since it's dependent on current time and reservations.
-    Calculating it is somewhat expensive, so it cannot be kept as up to date as is needed for overlap checks.
-    Therefore, this is used as a sort of cache, which is updated by a scheduled task.
+    The table is kept up to date by database triggers on the reservation table, which only update the rows
+    of the changed reservations. Rows affected by changes to the reservation unit hierarchy are updated
+    when the hierarchy is refreshed. Past reservations are removed by a scheduled task.
 
-    View contains an array of reservation unit ids that the time span affects, so it is possible
+    Table contains an array of reservation unit ids that the time span affects, so it is possible
     to query things like "Give me all time spans that affect reservation units X, Y, and Z".
     """
 
@@ -93,18 +93,21 @@ def __repr__(self) -> str:
     @classmethod
     def refresh(cls, using: str | None = None) -> None:
         """
-        Called to refresh the contents of the materialized view.
+        Called to refresh the contents of the whole table.
 
+        Changes to individual reservations are handled by database triggers, and changes to the reservation
+        unit hierarchy when it is refreshed, so this is only needed to remove time spans for reservations
+        that are now in the past.
         This is called automatically by a scheduled task, but can also be called manually if needed.
         """
         try:
             with get_connection(using).cursor() as cursor:
-                cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY affecting_time_spans")
+                cursor.execute("SELECT update_affecting_time_spans()")
         except Exception as error:
             # Only raise error in local development, otherwise log to Sentry
             if settings.RAISE_ERROR_ON_REFRESH_FAILURE:
                 raise
-            SentryLogger.log_exception(error, details="Failed to refresh materialized view.")
+            SentryLogger.log_exception(error, details="Failed to refresh affecting time spans.")
 
     def as_time_span_element(self) -> TimeSpanElement:
         from tilavarauspalvelu.integrations.opening_hours.time_span_element import TimeSpanElement
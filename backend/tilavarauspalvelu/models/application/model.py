@@ -2,6 +2,8 @@
 
 from typing import TYPE_CHECKING, ClassVar
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.db.models.functions import Concat
 from django.utils.translation import gettext_lazy as _
@@ -94,6 +96,10 @@ class Application(SerializableModelMixin, models.Model):
         on_delete=models.PROTECT,
     )
 
+    # Pre-calculated search vector for text search, kept up to date by database triggers.
+
+    search_vector = SearchVectorField(blank=True, default="")
+
     objects: ClassVar[ApplicationManager] = LazyModelManager.new()
     actions: ApplicationActions = LazyModelAttribute.new()
     validators: ApplicationValidator = LazyModelAttribute.new()
@@ -106,6 +112,9 @@ class Meta:
         verbose_name = _("application")
         verbose_name_plural = _("applications")
         ordering = ["pk"]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="application_search_vector_idx"),
+        ]
 
     # For GDPR API
     serialize_fields = (
@@ -2,10 +2,13 @@
 
 import dataclasses
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
+from functools import partial
 from typing import TYPE_CHECKING
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 from lookup_property import L
@@ -30,12 +33,14 @@
     ReservationSeries,
     ReservationUnitOption,
 )
+from tilavarauspalvelu.services.reservation_overlap_planner import ReservationOverlapPlanner
 from tilavarauspalvelu.tasks import create_statistics_for_reservations_task
 from tilavarauspalvelu.translation import translate_for_user
 from tilavarauspalvelu.typing import ReservationDetails
-from utils.date_utils import local_end_of_day, local_start_of_day
+from utils.date_utils import DEFAULT_TIMEZONE, local_datetime, local_end_of_day, local_start_of_day
 
 if TYPE_CHECKING:
+    from tilavarauspalvelu.integrations.opening_hours.hauki_api_types import HaukiAPIDatePeriod
     from tilavarauspalvelu.models import ApplicationRound
 
 
@@ -94,6 +99,7 @@ def reset_application_round_allocation(self) -> None:
                 raise ApplicationRoundResetError(msg)
 
     def generate_reservations_from_allocations(self) -> None:
+        """Generate reservation series and their reservations for all allocations in the application round."""
         allocations = AllocatedTimeSlot.objects.filter(
             reservation_unit_option__application_section__application__application_round=self.application_round.pk,
         ).select_related(
@@ -101,7 +107,9 @@ def generate_reservations_from_allocations(self) -> None:
             "reservation_unit_option__application_section__application__application_round",
         )
 
-        closed_time_spans: dict[int, list[TimeSpanElement]] = self._get_series_override_closed_time_spans(allocations)
+        # Fetch closed opening hours from Hauki before starting the transaction,
+        # so that the transaction is not kept open during the requests.
+        closed_time_spans = self.get_series_override_closed_time_spans()
 
         reservation_series: list[ReservationSeries] = [
             ReservationSeries(
@@ -128,6 +136,7 @@ def generate_reservations_from_allocations(self) -> None:
 
         with transaction.atomic():
             reservation_series = ReservationSeries.objects.bulk_create(reservation_series)
+            overlap_planner = self._get_overlap_planner(reservation_series)
 
             for series in reservation_series:
                 reservation_details = self._get_reservation_series_details(series)
@@ -136,6 +145,7 @@ def generate_reservations_from_allocations(self) -> None:
                 slots = series.actions.pre_calculate_slots(
                     check_start_interval=True,
                     closed_hours=closed_time_spans.get(hauki_resource_id, []),
+                    overlap_planner=overlap_planner,
                 )
 
                 reservations = series.actions.bulk_create_reservation_for_periods(
@@ -144,47 +154,62 @@ def generate_reservations_from_allocations(self) -> None:
                 )
                 reservation_pks.update(reservation.pk for reservation in reservations)
 
+                # Reservations of later series must not overlap with the ones created for this series.
+                overlap_planner.add_reservations(reservations)
+
                 series.actions.bulk_create_rejected_occurrences_for_periods(
                     overlapping=slots.overlapping,
                     not_reservable=slots.not_reservable,
                     invalid_start_interval=slots.invalid_start_interval,
                 )
 
-        # Must refresh the materialized view after the reservation is created.
-        # TODO: Disabled for now, since it might contribute to timeouts in production.
-        #  Refresh still happens on a background task every 2 minutes.
-        #  if settings.UPDATE_AFFECTING_TIME_SPANS:  # noqa: ERA001,RUF100
-        #      update_affecting_time_spans_task.delay()  # noqa: ERA001,RUF100
-
         if settings.SAVE_RESERVATION_STATISTICS:
             create_statistics_for_reservations_task.delay(reservation_pks=list(reservation_pks))
 
-    def _get_series_override_closed_time_spans(
-        self, allocations: list[AllocatedTimeSlot]
-    ) -> dict[int, list[TimeSpanElement]]:
+    @staticmethod
+    def _get_overlap_planner(reservation_series: list[ReservationSeries]) -> ReservationOverlapPlanner:
+        """Load the reservations that could overlap with any of the given reservation series at once."""
+        periods: list[tuple[datetime.datetime, datetime.datetime]] = []
+        for series in reservation_series:
+            begin = datetime.datetime.combine(series.begin_date, series.begin_time, tzinfo=DEFAULT_TIMEZONE)
+            end = datetime.datetime.combine(series.end_date, series.end_time, tzinfo=DEFAULT_TIMEZONE)
+
+            # Reservations can also overlap with the buffers of the first and last reservations of the series.
+            periods.append((
+                begin - series.reservation_unit.actions.get_actual_before_buffer(begin),
+                end + series.reservation_unit.actions.get_actual_after_buffer(end),
+            ))
+
+        begin = min((begin for begin, _ in periods), default=local_datetime())
+        end = max((end for _, end in periods), default=begin)
+        return ReservationOverlapPlanner(
+            reservation_units=[series.reservation_unit for series in reservation_series],
+            begin=begin,
+            end=end,
+        )
+
+    def get_series_override_closed_time_spans(self) -> dict[int, list[TimeSpanElement]]:
         """
         Find all closed opening hours for all reservation units where allocations were made.
         Check against these and not fully normalized opening hours since allocations can be made
         outside opening hours (as this system defines them), but should not be on explicitly
         closed hours, like holidays.
         """
-        closed_time_spans: dict[int, list[TimeSpanElement]] = {}
-        for allocation in allocations:
-            resource = allocation.reservation_unit_option.reservation_unit.origin_hauki_resource
-            if resource is None or resource.id in closed_time_spans:
-                continue  # Skip if already fetched
-
-            application_round = allocation.reservation_unit_option.application_section.application.application_round
-
-            # Fetch periods from Hauki API
-            date_periods = HaukiAPIClient.get_date_periods(
-                hauki_resource_id=resource.id,
-                start_date_lte=application_round.reservation_period_end_date.isoformat(),  # Starts before period ends
-                end_date_gte=application_round.reservation_period_begin_date.isoformat(),  # Ends after period begins
+        hauki_resource_ids: list[int] = list(
+            AllocatedTimeSlot.objects
+            .filter(
+                reservation_unit_option__application_section__application__application_round=self.application_round.pk,
+                reservation_unit_option__reservation_unit__origin_hauki_resource__isnull=False,
             )
+            .values_list("reservation_unit_option__reservation_unit__origin_hauki_resource", flat=True)
+            .distinct()
+        )
+
+        date_periods_by_resource = self._get_hauki_date_periods(hauki_resource_ids)
 
-            # Convert periods to TimeSpanElements
-            closed_time_spans[resource.id] = [
+        # Convert periods to TimeSpanElements
+        return {
+            hauki_resource_id: [
                 TimeSpanElement(
                     start_datetime=local_start_of_day(datetime.date.fromisoformat(period["start_date"])),
                     end_datetime=local_end_of_day(datetime.date.fromisoformat(period["end_date"])),
@@ -194,8 +219,47 @@ def _get_series_override_closed_time_spans(
                 # Overriding closed date periods are exceptions to the normal opening hours
                 if period["override"] and period["resource_state"] == HaukiResourceState.CLOSED.value
             ]
+            for hauki_resource_id, date_periods in date_periods_by_resource.items()
+        }
+
+    def _get_hauki_date_periods(self, hauki_resource_ids: list[int]) -> dict[int, list[HaukiAPIDatePeriod]]:
+        """
+        Get the date periods of the given hauki resources during the application round's reservation period.
+
+        Date periods are cached for a while, so that repeated attempts to generate reservations
+        don't need to fetch them again. Date periods not in the cache are fetched from Hauki API concurrently.
+        """
+        begin_date = self.application_round.reservation_period_begin_date.isoformat()
+        end_date = self.application_round.reservation_period_end_date.isoformat()
+
+        cache_keys = {
+            hauki_resource_id: f"hauki_date_periods:{hauki_resource_id}:{begin_date}:{end_date}"
+            for hauki_resource_id in hauki_resource_ids
+        }
+        timeout = settings.HAUKI_DATE_PERIODS_CACHE_TIMEOUT_SECONDS
+
+        cached: dict[str, list[HaukiAPIDatePeriod]] = cache.get_many(cache_keys.values()) if timeout else {}
+        date_periods = {pk: cached[key] for pk, key in cache_keys.items() if key in cached}
+
+        missing = [pk for pk in hauki_resource_ids if pk not in date_periods]
+        if not missing:
+            return date_periods
+
+        fetch_date_periods = partial(
+            HaukiAPIClient.get_date_periods,
+            start_date_lte=end_date,  # Starts before period ends
+            end_date_gte=begin_date,  # Ends after period begins
+        )
+
+        workers = max(1, min(settings.HAUKI_SYNC_WORKERS, len(missing)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(lambda pk: fetch_date_periods(hauki_resource_id=pk), missing)
+            fetched = dict(zip(missing, results, strict=True))
+
+        if timeout:
+            cache.set_many({cache_keys[pk]: periods for pk, periods in fetched.items()}, timeout=timeout)
 
-        return closed_time_spans
+        return date_periods | fetched
 
     def _get_reservation_series_details(self, series: ReservationSeries) -> ReservationDetails:
         application_section = series.allocated_time_slot.reservation_unit_option.application_section
@@ -4,6 +4,8 @@
 import uuid
 from typing import TYPE_CHECKING, ClassVar
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.db.models import Exists, OrderBy
 from django.db.models.functions import Coalesce
@@ -77,6 +79,10 @@ class ApplicationSection(SerializableModelMixin, models.Model):
         null=True,
     )
 
+    # Pre-calculated search vector for text search, kept up to date by database triggers.
+
+    search_vector = SearchVectorField(blank=True, default="")
+
     objects: ClassVar[ApplicationSectionManager] = LazyModelManager.new()
     actions: ApplicationSectionActions = LazyModelAttribute.new()
     validators: ApplicationSectionValidator = LazyModelAttribute.new()
@@ -122,6 +128,9 @@ class Meta:
                 ),
             ),
         ]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="app_section_search_vector_idx"),
+        ]
 
     # For GDPR API
     serialize_fields = ({"name": "name"},)
@@ -6,6 +6,7 @@
 
 from django.conf import settings
 
+from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_cache import FirstReservableTimeCache
 from utils.date_utils import local_date, local_start_of_day
 
 if TYPE_CHECKING:
@@ -49,6 +50,13 @@ def update_opening_hours_hash(self, new_date_periods_hash: str) -> None:
         # This way we can keep past data intact, and have the new data start from the cutoff date.
         ohr.reservable_time_spans.filter(end_datetime__gte=cutoff_date).update(end_datetime=local_start_of_day())
 
+        self.invalidate_first_reservable_times()
+
+    def invalidate_first_reservable_times(self) -> None:
+        """Invalidate cached first reservable times of reservation units using this resource's opening hours."""
+        pks = self.origin_hauki_resource.reservation_units.values_list("pk", flat=True)
+        FirstReservableTimeCache.invalidate(pks)
+
     def should_update_opening_hours(self, new_date_periods_hash: str) -> bool:
         """Return True if the opening hours should be updated from Hauki API."""
         ohr = self.origin_hauki_resource
@@ -36,15 +36,23 @@ class PaymentOrderActions:
 
     def refresh_order_status_from_webshop(self) -> None:
         """Fetches the payment status from the webshop and updates the PaymentOrder status accordingly."""
-        if (
+        if not self.can_refresh_order_status_from_webshop():
+            return
+
+        webshop_payment = self.fetch_webshop_payment()
+        self.update_order_status_from_webshop_payment(webshop_payment)
+
+    def can_refresh_order_status_from_webshop(self) -> bool:
+        return not (
             settings.MOCK_VERKKOKAUPPA_API_ENABLED
             or self.payment_order.remote_id is None
             or self.payment_order.status in OrderStatus.finalized
-        ):
-            return
+        )
 
+    def fetch_webshop_payment(self) -> Payment | None:
+        """Fetches the payment from the webshop. Doesn't make any changes to the database."""
         try:
-            webshop_payment = VerkkokauppaAPIClient.get_payment(order_uuid=self.payment_order.remote_id)
+            return VerkkokauppaAPIClient.get_payment(order_uuid=self.payment_order.remote_id)
         except GetPaymentError as error:
             msg = "Verkkokauppa: Failed to fetch payment status from webshop"
             details = {
@@ -54,6 +62,8 @@ def refresh_order_status_from_webshop(self) -> None:
             SentryLogger.log_message(msg, details=details)
             raise
 
+    def update_order_status_from_webshop_payment(self, webshop_payment: Payment | None) -> None:
+        """Updates the PaymentOrder status according to the payment fetched from the webshop."""
         if webshop_payment is None:
             new_status = self.get_order_status_if_no_webshop_payment()
             payment_id: str = ""
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
-from typing import Self
+from typing import TYPE_CHECKING, Self
 
 from django.conf import settings
 from django.db import models, transaction
@@ -14,6 +15,9 @@
 from tilavarauspalvelu.models._base import ModelManager, ModelQuerySet
 from utils.date_utils import local_datetime
 
+if TYPE_CHECKING:
+    from tilavarauspalvelu.integrations.verkkokauppa.payment.types import Payment
+
 __all__ = [
     "PaymentOrderManager",
     "PaymentOrderQuerySet",
@@ -48,19 +52,73 @@ def expired_handled_payments(self) -> Self:
 
 class PaymentOrderManager(ModelManager[PaymentOrder, PaymentOrderQuerySet]):
     def refresh_expired_payments_from_verkkokauppa(self) -> None:
-        for payment_order in self.all().expired_direct_payments():
+        """
+        Refresh the statuses of expired payment orders from Verkkokauppa.
+
+        Payment orders are claimed in batches by locking them, skipping payment orders locked by another process
+        (e.g., another worker running this task, or a request handling the same payment order). Payments for
+        the claimed batch are then fetched from Verkkokauppa concurrently, and the payment orders are updated
+        before the locks are released. This way, several workers can share the work after a Verkkokauppa outage
+        without fetching the same payments. Skipped payment orders are refreshed on the next run.
+        """
+        # Payment never attempted, so no need to check from Verkkokauppa.
+        with transaction.atomic():
+            never_attempted = (
+                self
+                .all()
+                .expired_handled_payments()
+                .filter(remote_id__isnull=True)
+                .select_for_update(skip_locked=True)
+                .values_list("pk", flat=True)
+            )
+            self.filter(pk__in=list(never_attempted)).update(
+                status=OrderStatus.EXPIRED,
+                processed_at=local_datetime(),
+            )
+
+        expired = self.all().expired_direct_payments() | self.all().expired_handled_payments().filter(
+            remote_id__isnull=False,
+        )
+
+        # Locks are held while the payments are fetched, so keep the batches small.
+        batch_size = settings.VERKKOKAUPPA_SYNC_WORKERS * 2
+        claimed_pks: set[int] = set()
+
+        while True:
+            with transaction.atomic():
+                payment_orders: list[PaymentOrder] = list(
+                    expired.exclude(pk__in=claimed_pks).order_by("pk").select_for_update(skip_locked=True)[:batch_size]
+                )
+                if not payment_orders:
+                    return
+
+                claimed_pks.update(payment_order.pk for payment_order in payment_orders)
+                self._refresh_payment_orders_from_verkkokauppa(payment_orders)
+
+    def _refresh_payment_orders_from_verkkokauppa(self, payment_orders: list[PaymentOrder]) -> None:
+        """Fetch the payments of the given locked payment orders concurrently, and update the payment orders."""
+        payment_orders = [
+            payment_order
+            for payment_order in payment_orders
+            if payment_order.actions.can_refresh_order_status_from_webshop()
+        ]
+        if not payment_orders:
+            return
+
+        def fetch_webshop_payment(payment_order: PaymentOrder) -> Payment | GetPaymentError | None:
+            try:
+                return payment_order.actions.fetch_webshop_payment()
+            except GetPaymentError as error:
+                return error
+
+        workers = max(1, min(settings.VERKKOKAUPPA_SYNC_WORKERS, len(payment_orders)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            webshop_payments = list(executor.map(fetch_webshop_payment, payment_orders))
+
+        for payment_order, webshop_payment in zip(payment_orders, webshop_payments, strict=True):
             # Do not update PaymentOrder status if an error occurs
-            with suppress(GetPaymentError, CancelOrderError), transaction.atomic():
-                payment_order.actions.refresh_order_status_from_webshop()
-
-        for payment_order in self.all().expired_handled_payments():
-            # Payment never attempted
-            if payment_order.remote_id is None:
-                payment_order.status = OrderStatus.EXPIRED
-                payment_order.processed_at = local_datetime()
-                payment_order.save(update_fields=["status", "processed_at"])
+            if isinstance(webshop_payment, GetPaymentError):
                 continue
 
-            # Do not update PaymentOrder status if an error occurs
-            with suppress(GetPaymentError, CancelOrderError), transaction.atomic():
-                payment_order.actions.refresh_order_status_from_webshop()
+            with suppress(CancelOrderError), transaction.atomic():
+                payment_order.actions.update_order_status_from_webshop_payment(webshop_payment)
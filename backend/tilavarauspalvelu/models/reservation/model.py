@@ -3,10 +3,12 @@
 import datetime
 import uuid
 from decimal import Decimal
-from typing import TYPE_CHECKING, ClassVar
+from typing import TYPE_CHECKING, Any, ClassVar, Self
 
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
-from django.db.models.functions import Concat, Trim
+from django.db.models.functions import Concat, Trim, Upper
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django_nh3.models import Nh3TextField
@@ -28,6 +30,8 @@
 from utils.mixins import SerializableModelMixin
 
 if TYPE_CHECKING:
+    from collections.abc import Collection
+
     from tilavarauspalvelu.integrations.opening_hours.time_span_element import TimeSpanElement
     from tilavarauspalvelu.models import (
         AffectingTimeSpan,
@@ -161,6 +165,10 @@ class Reservation(SerializableModelMixin, models.Model):
         null=True,
     )
 
+    # Pre-calculated search vector for text search, kept up to date by database triggers.
+
+    search_vector = SearchVectorField(blank=True, default="")
+
     objects: ClassVar[ReservationManager] = LazyModelManager.new()
     actions: ReservationActions = LazyModelAttribute.new()
     validators: ReservationValidator = LazyModelAttribute.new()
@@ -169,6 +177,21 @@ class Reservation(SerializableModelMixin, models.Model):
     reservation_statistic: ReservationStatistic | None  # Can be missing
     affecting_time_span: AffectingTimeSpan | None  # Can be missing
 
+    # Fields that affect the first reservable times of the reservation units in the reservation unit's hierarchy.
+    first_reservable_time_fields: ClassVar[frozenset[str]] = frozenset({
+        "reservation_unit",
+        "begins_at",
+        "ends_at",
+        "buffer_time_before",
+        "buffer_time_after",
+        "state",
+        "type",
+    })
+
+    # Values of the `first_reservable_time_fields` when the reservation was loaded or last saved,
+    # keyed by attribute name. Used to check if they changed without re-fetching the reservation.
+    loaded_first_reservable_time_values: dict[str, Any]
+
     class Meta:
         db_table = "reservation"
         base_manager_name = "objects"
@@ -182,6 +205,11 @@ class Meta:
                 violation_error_message=_("Reservation cannot have active door code if one is not generated"),
             ),
         ]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="reservation_search_vector_idx"),
+            # For 'reservee_email__icontains' lookups
+            GinIndex(OpClass(Upper("reservee_email"), name="gin_trgm_ops"), name="reservation_email_trgm_idx"),
+        ]
 
     # For GDPR API
     serialize_fields = (
@@ -207,6 +235,15 @@ def __repr__(self) -> str:
         dt_range = datetime_range_as_string(start_datetime=self.begins_at, end_datetime=self.ends_at)
         return f"<Reservation {self.name} ({dt_range})>"
 
+    @classmethod
+    def from_db(cls, db: str | None, field_names: Collection[str], values: Collection[Any]) -> Self:
+        instance = super().from_db(db, field_names, values)
+        attnames = (cls._meta.get_field(name).attname for name in cls.first_reservable_time_fields)
+        instance.loaded_first_reservable_time_values = {
+            attname: instance.__dict__[attname] for attname in attnames if attname in instance.__dict__
+        }
+        return instance
+
     @property
     def price_net(self) -> Decimal:
         """Return the net price of the reservation. (Price without VAT)"""
@@ -365,10 +402,11 @@ def as_time_span_element(self) -> TimeSpanElement:
 
 AuditLogger.register(
     Reservation,
-    # Exclude lookup properties, since they are calculated values.
+    # Exclude lookup properties and search vectors, since they are calculated values.
     exclude_fields=[
         "_reservee_name",
         "_access_code_should_be_active",
         "_is_access_code_is_active_correct",
+        "search_vector",
     ],
 )
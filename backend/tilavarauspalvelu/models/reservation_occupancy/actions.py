@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .model import ReservationOccupancy
+
+
+__all__ = [
+    "ReservationOccupancyActions",
+]
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class ReservationOccupancyActions:
+    reservation_occupancy: ReservationOccupancy
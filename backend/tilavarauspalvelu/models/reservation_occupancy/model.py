@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import contextlib
+from typing import TYPE_CHECKING, ClassVar
+
+from django.conf import settings
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.db import IntegrityError, models, transaction
+from django.db.transaction import get_connection
+from django.utils.translation import gettext_lazy as _
+from lazy_managers import LazyModelAttribute, LazyModelManager
+from rest_framework.exceptions import ValidationError
+
+from tilavarauspalvelu.integrations.sentry import SentryLogger
+from tilavarauspalvelu.typing import error_codes
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+
+    from tilavarauspalvelu.models import Reservation, Resource, Space
+
+    from .actions import ReservationOccupancyActions
+    from .queryset import ReservationOccupancyManager
+    from .validators import ReservationOccupancyValidator
+
+
+STRICT_OCCUPANCY_SETTING = "tilavarauspalvelu.strict_reservation_occupancy"
+
+
+class ReservationOccupancy(models.Model):
+    """
+    A PostgreSQL table that contains the time ranges the spaces and resources are occupied by reservations.
+    Only future reservations are included, and only reservations that are actually going to occur.
+
+    The table is kept up to date by database triggers on the reservation and reservation unit hierarchy tables.
+    Exclusion constraints on the table prevent reservations from overlapping in the same space or resource,
+    but overlaps are only enforced inside `ReservationOccupancy.prevent_overlaps()`. Otherwise, the rows
+    of overlapping reservations are left out, so that existing overlapping reservations don't cause errors.
+
+    Spaces of a reservation's reservation unit (and their sub-spaces) are occupied exclusively,
+    while their parent spaces are shared with other sub-spaces of the parent space. Buffers are
+    stored as separate rows, which can overlap with other buffers and blocking reservations.
+    """
+
+    reservation: Reservation = models.ForeignKey(
+        "tilavarauspalvelu.Reservation",
+        related_name="occupancies",
+        on_delete=models.DO_NOTHING,
+        db_column="reservation_id",
+    )
+    space: Space | None = models.ForeignKey(
+        "tilavarauspalvelu.Space",
+        related_name="reservation_occupancies",
+        on_delete=models.DO_NOTHING,
+        null=True,
+        db_column="space_id",
+    )
+    resource: Resource | None = models.ForeignKey(
+        "tilavarauspalvelu.Resource",
+        related_name="reservation_occupancies",
+        on_delete=models.DO_NOTHING,
+        null=True,
+        db_column="resource_id",
+    )
+
+    id: int = models.BigAutoField(primary_key=True)
+    is_shared: bool = models.BooleanField()
+    is_buffer: bool = models.BooleanField()
+    is_blocking: bool = models.BooleanField()
+    during: DateTimeTZRange = DateTimeRangeField()
+
+    objects: ClassVar[ReservationOccupancyManager] = LazyModelManager.new()
+    actions: ReservationOccupancyActions = LazyModelAttribute.new()
+    validators: ReservationOccupancyValidator = LazyModelAttribute.new()
+
+    class Meta:
+        managed = False
+        db_table = "reservation_occupancy"
+        verbose_name = _("reservation occupancy")
+        verbose_name_plural = _("reservation occupancies")
+        base_manager_name = "objects"
+        ordering = [
+            "reservation_id",
+            "id",
+        ]
+
+    def __str__(self) -> str:
+        target = f"space={self.space_id}" if self.space_id is not None else f"resource={self.resource_id}"
+        return f"<ReservationOccupancy(reservation={self.reservation_id}, {target})>"
+
+    @classmethod
+    def refresh(cls, using: str | None = None) -> None:
+        """
+        Called to refresh the contents of the whole table.
+
+        Changes to individual reservations and the reservation unit hierarchy are handled by database triggers,
+        so this is only needed to remove rows for reservations that are now in the past.
+        This is called automatically by a scheduled task, but can also be called manually if needed.
+        """
+        try:
+            with get_connection(using).cursor() as cursor:
+                cursor.execute("SELECT update_reservation_occupancy()")
+        except Exception as error:
+            # Only raise error in local development, otherwise log to Sentry
+            if settings.RAISE_ERROR_ON_REFRESH_FAILURE:
+                raise
+            SentryLogger.log_exception(error, details="Failed to refresh reservation occupancy.")
+
+    @classmethod
+    @contextlib.contextmanager
+    def prevent_overlaps(cls, using: str | None = None) -> Generator[None]:
+        """
+        Raise a validation error if reservations created or updated inside this context
+        would overlap with other reservations in the same spaces or resources.
+
+        The check is made by the database when the reservations are saved, so unlike the checks
+        made before saving, it cannot be bypassed by concurrent requests.
+        """
+        try:
+            with transaction.atomic(using=using):
+                with get_connection(using).cursor() as cursor:
+                    cursor.execute("SELECT set_config(%s, 'on', true)", [STRICT_OCCUPANCY_SETTING])
+
+                yield
+
+                with get_connection(using).cursor() as cursor:
+                    cursor.execute("SELECT set_config(%s, 'off', true)", [STRICT_OCCUPANCY_SETTING])
+
+        except IntegrityError as error:
+            constraint_name = getattr(getattr(error.__cause__, "diag", None), "constraint_name", None) or ""
+            if not constraint_name.startswith("reservation_occupancy"):
+                raise
+
+            msg = "Reservation overlaps with existing reservations."
+            raise ValidationError(msg, code=error_codes.OVERLAPPING_RESERVATIONS) from error
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from tilavarauspalvelu.models import ReservationOccupancy
+from tilavarauspalvelu.models._base import ModelManager, ModelQuerySet
+
+__all__ = [
+    "ReservationOccupancyManager",
+    "ReservationOccupancyQuerySet",
+]
+
+
+class ReservationOccupancyQuerySet(ModelQuerySet[ReservationOccupancy]): ...
+
+
+class ReservationOccupancyManager(ModelManager[ReservationOccupancy, ReservationOccupancyQuerySet]): ...
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from tilavarauspalvelu.models import ReservationOccupancy
+
+
+__all__ = [
+    "ReservationOccupancyValidator",
+]
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class ReservationOccupancyValidator:
+    reservation_occupancy: ReservationOccupancy
@@ -10,6 +10,7 @@
 from tilavarauspalvelu.enums import AccessType, RejectionReadinessChoice, Weekday
 from tilavarauspalvelu.integrations.opening_hours.time_span_element import TimeSpanElement
 from tilavarauspalvelu.models import ApplicationSection, RejectedOccurrence, Reservation
+from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_cache import FirstReservableTimeCache
 from tilavarauspalvelu.typing import ReservationPeriod
 from utils.date_utils import DEFAULT_TIMEZONE, get_periods_between, local_datetime
 
@@ -18,6 +19,7 @@
 
     from tilavarauspalvelu.models import ReservationSeries
     from tilavarauspalvelu.models.reservable_time_span.queryset import ReservableTimeSpanQuerySet
+    from tilavarauspalvelu.services.reservation_overlap_planner import ReservationOverlapPlanner
     from tilavarauspalvelu.typing import ReservationDetails
 
 
@@ -41,6 +43,7 @@ def pre_calculate_slots(
         buffer_time_before: datetime.timedelta | None = None,
         buffer_time_after: datetime.timedelta | None = None,
         ignore_reservations: Collection[int] = (),
+        overlap_planner: ReservationOverlapPlanner | None = None,
     ) -> ReservationSeriesCalculationResults:
         """
         Pre-calculate slots for reservations for the reservation series.
@@ -53,6 +56,8 @@ def pre_calculate_slots(
         :param buffer_time_before: Used buffer time before the reservation.
         :param buffer_time_after: Used buffer time after the reservation.
         :param ignore_reservations: Reservations to ignore when calculating slots, e.g., for rescheduling.
+        :param overlap_planner: Planner to find overlapping reservations from, instead of querying them
+                                for this reservation series. Cannot be used with `ignore_reservations`.
         """
         begin_date = self.reservation_series.begin_date
         end_date = self.reservation_series.end_date
@@ -65,17 +70,17 @@ def pre_calculate_slots(
 
         reservation_unit = self.reservation_series.reservation_unit
 
-        reservations = Reservation.objects.all().overlapping_reservations(
-            reservation_unit=reservation_unit,
-            begin=begin_datetime,
-            end=end_datetime,
-            buffer_time_before=buffer_time_before,
-            buffer_time_after=buffer_time_after,
+        timespans: list[TimeSpanElement] = (
+            self.get_overlapping_reservation_timespans(
+                begin=begin_datetime,
+                end=end_datetime,
+                buffer_time_before=buffer_time_before,
+                buffer_time_after=buffer_time_after,
+                ignore_reservations=ignore_reservations,
+            )
+            if overlap_planner is None
+            else []
         )
-        if ignore_reservations:
-            reservations = reservations.exclude(pk__in=ignore_reservations)
-
-        timespans = [timespan.as_time_span_element() for timespan in reservations]
 
         reservable_timespans = self.get_reservable_timespans() if check_opening_hours else []
 
@@ -123,6 +128,15 @@ def pre_calculate_slots(
                     ),
                 )
 
+                if overlap_planner is not None:
+                    timespans = list(
+                        overlap_planner.overlapping_time_spans(
+                            reservation_unit=reservation_unit,
+                            begin=reservation_timespan.buffered_start_datetime,
+                            end=reservation_timespan.buffered_end_datetime,
+                        )
+                    )
+
                 # Would the reservation timespan overlap with any closing timespans
                 # that exist due to existing reservations? Checks for:
                 # 1) Unbuffered reservation timespan overlapping with any buffered closed timespan
@@ -158,6 +172,27 @@ def pre_calculate_slots(
 
         return results
 
+    def get_overlapping_reservation_timespans(
+        self,
+        *,
+        begin: datetime.datetime,
+        end: datetime.datetime,
+        buffer_time_before: datetime.timedelta | None = None,
+        buffer_time_after: datetime.timedelta | None = None,
+        ignore_reservations: Collection[int] = (),
+    ) -> list[TimeSpanElement]:
+        reservations = Reservation.objects.all().overlapping_reservations(
+            reservation_unit=self.reservation_series.reservation_unit,
+            begin=begin,
+            end=end,
+            buffer_time_before=buffer_time_before,
+            buffer_time_after=buffer_time_after,
+        )
+        if ignore_reservations:
+            reservations = reservations.exclude(pk__in=ignore_reservations)
+
+        return [timespan.as_time_span_element() for timespan in reservations]
+
     def get_reservable_timespans(self) -> list[TimeSpanElement]:
         hauki_resource = self.reservation_series.reservation_unit.origin_hauki_resource
         if hauki_resource is None:
@@ -217,7 +252,12 @@ def bulk_create_reservation_for_periods(
             )
             reservations.append(reservation)
 
-        return Reservation.objects.bulk_create(reservations)
+        created = Reservation.objects.bulk_create(reservations)
+
+        # Bulk create doesn't send signals, so first reservable times must be invalidated here.
+        FirstReservableTimeCache.invalidate([reservation_unit.pk], include_related=True)
+
+        return created
 
     def bulk_create_rejected_occurrences_for_periods(
         self,
@@ -300,19 +300,31 @@ def reservation_units_with_common_hierarchy(self) -> models.QuerySet:
 
         return ReservationUnit.objects.filter(pk=self.reservation_unit.pk).reservation_units_with_common_hierarchy()
 
-    def get_possible_start_times(self, on_date: datetime.date) -> set[datetime.time]:
-        if self.reservation_unit.origin_hauki_resource is None:
-            return set()
+    def get_possible_start_times(
+        self,
+        on_date: datetime.date,
+        *,
+        time_spans: list[TimeSpan] | None = None,
+    ) -> set[datetime.time]:
+        """
+        Get the times the reservation unit's reservations can start at on the given date.
 
-        time_spans: list[TimeSpan] = list(
-            self.reservation_unit.origin_hauki_resource.reservable_time_spans
-            .filter(
-                start_datetime__date__lte=on_date,
-                end_datetime__date__gte=on_date,
+        Reservable time spans on the given date can be given if they have already been fetched
+        (e.g., in a `BookingContext`), otherwise they are fetched from the database.
+        """
+        if time_spans is None:
+            if self.reservation_unit.origin_hauki_resource is None:
+                return set()
+
+            time_spans = list(
+                self.reservation_unit.origin_hauki_resource.reservable_time_spans
+                .filter(
+                    start_datetime__date__lte=on_date,
+                    end_datetime__date__gte=on_date,
+                )
+                .order_by("start_datetime")
+                .values("start_datetime", "end_datetime")
             )
-            .order_by("start_datetime")
-            .values("start_datetime", "end_datetime")
-        )
 
         min_duration = self.reservation_unit.min_reservation_duration or datetime.timedelta()
         interval_minutes = self.reservation_unit.actions.start_interval_minutes
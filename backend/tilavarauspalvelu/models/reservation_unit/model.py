@@ -44,6 +44,7 @@
         ReservationSeries,
         ReservationUnitAccessType,
         ReservationUnitCancellationRule,
+        ReservationUnitFirstReservableTime,
         ReservationUnitHierarchy,
         ReservationUnitImage,
         ReservationUnitOption,
@@ -324,6 +325,7 @@ class ReservationUnit(models.Model):
     validators: ReservationUnitValidator = LazyModelAttribute.new()
 
     reservation_unit_hierarchy: ReservationUnitHierarchy | None  # Can be missing
+    precomputed_first_reservable_time: ReservationUnitFirstReservableTime | None  # Can be missing
     pricings: OneToManyRelatedManager[ReservationUnitPricing, ReservationUnitPricingQuerySet]
     reservation_unit_options: OneToManyRelatedManager[ReservationUnitOption, ReservationUnitOptionQuerySet]
     images: OneToManyRelatedManager[ReservationUnitImage, ReservationUnitImageQuerySet]
@@ -9,11 +9,20 @@
 from django.db.models import Q, prefetch_related_objects
 from lookup_property import L
 
-from tilavarauspalvelu.models import ReservationUnit, ReservationUnitAccessType
+from tilavarauspalvelu.models import (
+    Equipment,
+    IntendedUse,
+    ReservationUnit,
+    ReservationUnitAccessType,
+    ReservationUnitType,
+    Resource,
+    Space,
+    Unit,
+)
 from tilavarauspalvelu.models._base import ModelManager, TranslatedModelQuerySet
 from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_helper import FirstReservableTimeHelper
-from utils.date_utils import local_date
-from utils.db import ArrayUnnest, CoalesceEmpty, Now, SubqueryArray
+from utils.date_utils import local_date, local_datetime
+from utils.db import ArrayToString, ArrayUnnest, CoalesceEmpty, Now, SubqueryArray, SubqueryStringAgg
 
 if TYPE_CHECKING:
     from collections.abc import Callable, Generator
@@ -33,10 +42,6 @@
 type ReservationUnitPK = int
 
 
-def _get_vector_translation_fallback(obj: models.Model, lang: str) -> str:
-    return getattr(obj, f"name_{lang}", "") or getattr(obj, "name_fi", "")
-
-
 class ReservationUnitQuerySet(TranslatedModelQuerySet[ReservationUnit]):
     def with_first_reservable_time(
         self,
@@ -48,7 +53,7 @@ def with_first_reservable_time(
         minimum_duration_minutes: float | Decimal | None,
         show_only_reservable: bool = False,
         pagination_args: PaginationArgs | None = None,
-        cache_key: str = "",
+        use_precomputed: bool = False,
     ) -> Self:
         """Annotate the queryset with `first_reservable_time` and `is_closed` for each reservation unit."""
         helper = FirstReservableTimeHelper(
@@ -60,11 +65,36 @@ def with_first_reservable_time(
             minimum_duration_minutes=minimum_duration_minutes,
             show_only_reservable=show_only_reservable,
             pagination_args=pagination_args,
-            cache_key=cache_key,
+            use_precomputed=use_precomputed,
         )
         helper.calculate_all_first_reservable_times()
         return helper.get_annotated_queryset()
 
+    def with_precomputed_first_reservable_time(self) -> Self:
+        """
+        Annotate the queryset with `first_reservable_time` and `is_closed` for each reservation unit
+        from the pre-calculated results for the default filters. Reservation units without a result are closed.
+        """
+        return self.annotate(
+            is_closed=models.functions.Coalesce(
+                models.F("precomputed_first_reservable_time__is_closed"),
+                models.Value(True),  # noqa: FBT003
+            ),
+            first_reservable_datetime=models.F("precomputed_first_reservable_time__first_reservable_datetime"),
+            effective_access_type=models.F("precomputed_first_reservable_time__effective_access_type"),
+        )
+
+    def without_valid_precomputed_first_reservable_time(self) -> Self:
+        """Reservation units whose pre-calculated first reservable time is missing or no longer valid."""
+        return self.filter(
+            Q(precomputed_first_reservable_time__isnull=True)
+            | Q(precomputed_first_reservable_time__valid_until__lte=local_datetime())
+        )
+
+    def has_precomputed_first_reservable_times(self) -> bool:
+        """Do all reservation units in the queryset have a valid pre-calculated first reservable time?"""
+        return not self.without_valid_precomputed_first_reservable_time().exists()
+
     @property
     def affected_reservation_unit_ids(self) -> models.QuerySet[dict[str, int]]:
         """
@@ -172,100 +202,62 @@ def hidden(self) -> Self:
         return self.published().exclude(self._is_visible)
 
     def update_search_vectors(self, pks: list[int] | None = None) -> None:
-        qs = self.select_related(
-            "unit",
-            "reservation_unit_type",
-        ).prefetch_related(
-            "spaces",
-            "resources",
-            "intended_uses",
-            "equipments",
+        """
+        Update the search vectors of the reservation units in this queryset with a single UPDATE.
+
+        To update only the reservation units affected by a change in a related object, filter the queryset
+        before calling this method, e.g. `ReservationUnit.objects.filter(equipments=equipment)`.
+        """
+        qs = self if pks is None else self.filter(pk__in=pks)
+        qs.update(
+            search_vector_fi=_build_search_vector(lang="fi", config="finnish"),
+            search_vector_en=_build_search_vector(lang="en", config="english"),
+            search_vector_sv=_build_search_vector(lang="sv", config="swedish"),
         )
-        if pks is not None:
-            qs = qs.filter(pk__in=pks)
-
-        reservation_units: list[ReservationUnit] = list(qs)
-
-        for reservation_unit in reservation_units:
-            for lang, config in (("fi", "finnish"), ("en", "english"), ("sv", "swedish")):
-                setattr(
-                    reservation_unit,
-                    f"search_vector_{lang}",
-                    SearchVector(
-                        models.F("pk"),
-                        #
-                        # Use translated fields with fallback to Finnish if empty
-                        CoalesceEmpty(
-                            models.F(f"name_{lang}"),
-                            models.F("name_fi"),
-                            output_field=models.CharField(),
-                        ),
-                        CoalesceEmpty(
-                            models.F(f"description_{lang}"),
-                            models.F("description_fi"),
-                            output_field=models.CharField(),
-                        ),
-                        #
-                        # Additional search terms
-                        models.Value(
-                            " ".join(term for term in reservation_unit.search_terms),
-                            output_field=models.CharField(),
-                        ),
-                        models.Value(
-                            " ".join(term for term in reservation_unit.unit.search_terms),
-                            output_field=models.CharField(),
-                        ),
-                        #
-                        # Joins are not allowed in search vectors, so we compute them as values beforehand.
-                        models.Value(
-                            _get_vector_translation_fallback(reservation_unit.unit, lang),
-                            output_field=models.CharField(),
-                        ),
-                        models.Value(
-                            _get_vector_translation_fallback(reservation_unit.reservation_unit_type, lang),
-                            output_field=models.CharField(),
-                        ),
-                        models.Value(
-                            " ".join(
-                                name
-                                for inst in reservation_unit.spaces.all()
-                                if (name := _get_vector_translation_fallback(inst, lang))
-                            ),
-                            output_field=models.CharField(),
-                        ),
-                        models.Value(
-                            " ".join(
-                                name
-                                for inst in reservation_unit.resources.all()
-                                if (name := _get_vector_translation_fallback(inst, lang))
-                            ),
-                            output_field=models.CharField(),
-                        ),
-                        models.Value(
-                            " ".join(
-                                name
-                                for inst in reservation_unit.intended_uses.all()
-                                if (name := _get_vector_translation_fallback(inst, lang))
-                            ),
-                            output_field=models.CharField(),
-                        ),
-                        models.Value(
-                            " ".join(
-                                name
-                                for inst in reservation_unit.equipments.all()
-                                if (name := _get_vector_translation_fallback(inst, lang))
-                            ),
-                            output_field=models.CharField(),
-                        ),
-                        #
-                        config=config,
-                    ),
-                )
-
-        self.model.objects.bulk_update(
-            reservation_units,
-            ["search_vector_fi", "search_vector_en", "search_vector_sv"],
+
+
+def _translated_name(lang: str) -> CoalesceEmpty:
+    """Translated name of an object with fallback to Finnish if empty."""
+    return CoalesceEmpty(models.F(f"name_{lang}"), models.F("name_fi"), output_field=models.CharField())
+
+
+def _build_search_vector(*, lang: str, config: str) -> SearchVector:
+    """Search vector of a reservation unit in the given language, computed in the database."""
+    unit = Unit.objects.filter(pk=models.OuterRef("unit"))
+    reservation_unit_type = ReservationUnitType.objects.filter(pk=models.OuterRef("reservation_unit_type"))
+
+    # Joins are not allowed in search vectors, so related objects are added with subqueries.
+    related_names = [
+        SubqueryStringAgg(
+            model.objects.filter(reservation_units=models.OuterRef("pk")).values(
+                translated_name=_translated_name(lang)
+            ),
+            aggregate_field="translated_name",
         )
+        for model in (Space, Resource, IntendedUse, Equipment)
+    ]
+
+    return SearchVector(
+        models.F("pk"),
+        #
+        # Use translated fields with fallback to Finnish if empty
+        _translated_name(lang),
+        CoalesceEmpty(
+            models.F(f"description_{lang}"),
+            models.F("description_fi"),
+            output_field=models.CharField(),
+        ),
+        #
+        # Additional search terms
+        ArrayToString(models.F("search_terms")),
+        models.Subquery(unit.values(text=ArrayToString(models.F("search_terms")))),
+        #
+        models.Subquery(unit.values(text=_translated_name(lang))),
+        models.Subquery(reservation_unit_type.values(text=_translated_name(lang))),
+        *related_names,
+        #
+        config=config,
+    )
 
 
 class ReservationUnitManager(ModelManager[ReservationUnit, ReservationUnitQuerySet]):
@@ -16,6 +16,7 @@
     from collections.abc import Collection
 
     from tilavarauspalvelu.models import ReservationUnit, User
+    from tilavarauspalvelu.services.booking_context import BookingContext
 
 __all__ = [
     "ReservationUnitValidator",
@@ -40,13 +41,21 @@ def validate_user_is_adult_if_required(self, user: User) -> None:
         if self.reservation_unit.require_adult_reservee:
             user.validators.validate_is_of_age(code=error_codes.RESERVATION_UNIT_ADULT_RESERVEE_REQUIRED)
 
-    def validate_user_has_not_exceeded_max_reservations(self, user: User) -> None:
+    def validate_user_has_not_exceeded_max_reservations(
+        self,
+        user: User,
+        *,
+        context: BookingContext | None = None,
+    ) -> None:
         if self.reservation_unit.max_reservations_per_user is None:
             return
 
-        qs = Reservation.objects.all().filter_for_user_num_active_reservations(self.reservation_unit, user)
+        if context is not None:
+            num_active_user_reservations = context.num_active_user_reservations
+        else:
+            qs = Reservation.objects.all().filter_for_user_num_active_reservations(self.reservation_unit, user)
+            num_active_user_reservations = qs.count()
 
-        num_active_user_reservations = qs.count()
         if num_active_user_reservations >= self.reservation_unit.max_reservations_per_user:
             msg = "Maximum number of active reservations for this reservation unit exceeded."
             raise ValidationError(msg, code=error_codes.RESERVATION_UNIT_MAX_NUMBER_OF_RESERVATIONS_EXCEEDED)
@@ -81,12 +90,20 @@ def validate_duration_is_allowed(self, duration: datetime.timedelta) -> None:
             msg = f"Reservation duration is not a multiple of the start interval of {interval_minutes} minutes."
             raise ValidationError(msg, code=error_codes.RESERVATION_TIME_DOES_NOT_MATCH_ALLOWED_INTERVAL)
 
-    def validate_reservation_begin_time(self, begin: datetime.datetime) -> None:
+    def validate_reservation_begin_time(
+        self,
+        begin: datetime.datetime,
+        *,
+        context: BookingContext | None = None,
+    ) -> None:
         if begin < local_datetime():
             msg = "Reservation cannot begin in the past."
             raise ValidationError(msg, code=error_codes.RESERVATION_BEGIN_IN_PAST)
 
-        possible_start_times = self.reservation_unit.actions.get_possible_start_times(begin.date())
+        possible_start_times = self.reservation_unit.actions.get_possible_start_times(
+            begin.date(),
+            time_spans=context.reservable_time_spans if context is not None else None,
+        )
 
         if begin.time() not in possible_start_times:
             msg = "Reservation start time does not match the reservation unit's allowed start interval."
@@ -145,13 +162,31 @@ def validate_reservation_days_before(self, begin: datetime.datetime) -> None:
             msg = f"Reservation start time is later than {min_days_before} days before."
             raise ValidationError(msg, code=error_codes.RESERVATION_NOT_WITHIN_ALLOWED_TIME_RANGE)
 
-    def validate_reservation_unit_is_open(self, begin: datetime.datetime, end: datetime.datetime) -> None:
-        if not self.reservation_unit.actions.is_open(begin, end):
+    def validate_reservation_unit_is_open(
+        self,
+        begin: datetime.datetime,
+        end: datetime.datetime,
+        *,
+        context: BookingContext | None = None,
+    ) -> None:
+        is_open = context.is_open if context is not None else self.reservation_unit.actions.is_open(begin, end)
+        if not is_open:
             msg = "Reservation unit is not open within desired reservation time."
             raise ValidationError(msg, code=error_codes.RESERVATION_UNIT_NOT_RESERVABLE)
 
-    def validate_not_in_open_application_round(self, begin: datetime.date, end: datetime.date) -> None:
-        if self.reservation_unit.actions.is_in_open_application_round(begin, end):
+    def validate_not_in_open_application_round(
+        self,
+        begin: datetime.date,
+        end: datetime.date,
+        *,
+        context: BookingContext | None = None,
+    ) -> None:
+        if context is not None:
+            in_open_round = context.in_open_application_round
+        else:
+            in_open_round = self.reservation_unit.actions.is_in_open_application_round(begin, end)
+
+        if in_open_round:
             msg = "Reservation unit is in an open application round."
             raise ValidationError(msg, code=error_codes.RESERVATION_UNIT_IN_OPEN_ROUND)
 
@@ -185,8 +220,16 @@ def validate_cancellation_rule(self, begin: datetime.datetime) -> None:
             msg = "Reservation time cannot be changed because the cancellation period has expired."
             raise ValidationError(msg, code=error_codes.CANCELLATION_TIME_PAST)
 
-    def validate_not_rescheduled_to_paid_date(self, begin: datetime.datetime) -> None:
-        pricing = self.reservation_unit.actions.get_active_pricing(by_date=begin.date())
+    def validate_not_rescheduled_to_paid_date(
+        self,
+        begin: datetime.datetime,
+        *,
+        context: BookingContext | None = None,
+    ) -> None:
+        if context is not None:
+            pricing = context.pricing
+        else:
+            pricing = self.reservation_unit.actions.get_active_pricing(by_date=begin.date())
 
         if pricing is None:
             msg = "Reservation cannot be rescheduled since it has no active pricing."
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .model import ReservationUnitFirstReservableTime
+
+
+__all__ = [
+    "ReservationUnitFirstReservableTimeActions",
+]
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class ReservationUnitFirstReservableTimeActions:
+    reservation_unit_first_reservable_time: ReservationUnitFirstReservableTime
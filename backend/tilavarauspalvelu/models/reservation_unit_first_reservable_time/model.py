@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from contextlib import nullcontext
+from itertools import batched
+from typing import TYPE_CHECKING, ClassVar
+
+from django.conf import settings
+from django.db import models
+from django.db.transaction import get_connection
+from django.utils.translation import gettext_lazy as _
+from lazy_managers import LazyModelAttribute, LazyModelManager
+
+from tilavarauspalvelu.enums import AccessType
+from utils.date_utils import local_datetime
+from utils.fields.model import TextChoicesField
+
+if TYPE_CHECKING:
+    import datetime
+    from collections.abc import Collection
+
+    from tilavarauspalvelu.models import ReservationUnit
+
+    from .actions import ReservationUnitFirstReservableTimeActions
+    from .queryset import ReservationUnitFirstReservableTimeManager
+    from .validators import ReservationUnitFirstReservableTimeValidator
+
+__all__ = [
+    "ReservationUnitFirstReservableTime",
+]
+
+
+class ReservationUnitFirstReservableTime(models.Model):
+    """
+    Pre-calculated first reservable time of a reservation unit with the default filters
+    used by the customer search: from today to two years in the future, with a 15-minute minimum duration.
+
+    The table is updated in the background with a scheduled task, and rows are marked as no longer valid
+    and re-calculated when the first reservable time of the reservation unit might have changed.
+    If a reservation unit doesn't have a valid row, its first reservable time is calculated
+    with the `FirstReservableTimeHelper` instead.
+    """
+
+    reservation_unit: ReservationUnit = models.OneToOneField(
+        "tilavarauspalvelu.ReservationUnit",
+        related_name="precomputed_first_reservable_time",
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    first_reservable_datetime: datetime.datetime | None = models.DateTimeField(null=True, blank=True)
+    is_closed: bool = models.BooleanField()
+    effective_access_type: AccessType | None = TextChoicesField(enum=AccessType, null=True, blank=True)
+    # The row should not be used after this time, since the first reservable time might have passed,
+    # or the default filters have changed.
+    valid_until: datetime.datetime = models.DateTimeField()
+    # When the calculation that produced the row started, or when the row was invalidated.
+    # Calculations that started before this are not allowed to overwrite the row.
+    updated_at: datetime.datetime = models.DateTimeField()
+
+    objects: ClassVar[ReservationUnitFirstReservableTimeManager] = LazyModelManager.new()
+    actions: ReservationUnitFirstReservableTimeActions = LazyModelAttribute.new()
+    validators: ReservationUnitFirstReservableTimeValidator = LazyModelAttribute.new()
+
+    class Meta:
+        db_table = "reservation_unit_first_reservable_time"
+        base_manager_name = "objects"
+        verbose_name = _("reservation unit first reservable time")
+        verbose_name_plural = _("reservation unit first reservable times")
+        ordering = ["reservation_unit"]
+
+    def __str__(self) -> str:
+        return f"First reservable time for reservation unit: {self.reservation_unit_id}"
+
+    @classmethod
+    def refresh(cls, *, reservation_unit_ids: Collection[int] | None = None) -> None:
+        """
+        Calculate the first reservable times for the given reservation units, or all reservation units
+        without a valid result, and save them to the table.
+
+        Reservation units are processed in batches so that the affecting time spans of all reservation units
+        don't need to be held in memory at the same time. If `FIRST_RESERVABLE_TIME_REFRESH_WORKERS` is set,
+        each batch is calculated in parallel in a process pool that is shared by all batches.
+        """
+        from tilavarauspalvelu.models import ReservationUnit
+        from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_calculation import (
+            FirstReservableTimeWorkerPool,
+        )
+        from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_helper import (
+            FirstReservableTimeHelper,
+        )
+
+        if reservation_unit_ids is not None:
+            qs = ReservationUnit.objects.filter(pk__in=reservation_unit_ids)
+        else:
+            qs = ReservationUnit.objects.without_valid_precomputed_first_reservable_time()
+
+        pks: list[int] = list(qs.order_by("pk").values_list("pk", flat=True))
+        if not pks:
+            return
+
+        workers: int = settings.FIRST_RESERVABLE_TIME_REFRESH_WORKERS
+        pool_context = FirstReservableTimeWorkerPool(workers=workers) if workers > 1 else nullcontext()
+
+        with pool_context as worker_pool:
+            for batch in batched(pks, 100, strict=False):
+                started_at = local_datetime()
+
+                helper = FirstReservableTimeHelper(
+                    ReservationUnit.objects.filter(pk__in=batch).order_by("pk"),
+                    worker_pool=worker_pool,
+                )
+                helper.calculate_all_first_reservable_times()
+
+                rows = [
+                    cls(
+                        reservation_unit_id=pk,
+                        first_reservable_datetime=first_reservable_time,
+                        is_closed=helper.reservation_unit_closed_statuses[pk],
+                        effective_access_type=helper.first_reservable_times_access_type[pk],
+                        valid_until=helper.cache.get_valid_until(first_reservable_time),
+                        updated_at=started_at,
+                    )
+                    for pk, first_reservable_time in helper.first_reservable_times.items()
+                ]
+
+                cls.save_rows(rows)
+
+    @classmethod
+    def save_rows(cls, rows: Collection[ReservationUnitFirstReservableTime]) -> None:
+        """
+        Insert or update the given rows. Existing rows that have been invalidated or calculated
+        after the given rows' calculation started are left as they are, so that a slow calculation
+        cannot overwrite the result of a newer calculation or an invalidation.
+        """
+        if not rows:
+            return
+
+        sql = """
+            INSERT INTO reservation_unit_first_reservable_time AS t (
+                reservation_unit_id,
+                first_reservable_datetime,
+                is_closed,
+                effective_access_type,
+                valid_until,
+                updated_at
+            )
+            SELECT *
+            FROM unnest(
+                %s::integer[],
+                %s::timestamptz[],
+                %s::boolean[],
+                %s::varchar[],
+                %s::timestamptz[],
+                %s::timestamptz[]
+            )
+            ON CONFLICT (reservation_unit_id) DO UPDATE
+            SET
+                first_reservable_datetime = EXCLUDED.first_reservable_datetime,
+                is_closed = EXCLUDED.is_closed,
+                effective_access_type = EXCLUDED.effective_access_type,
+                valid_until = EXCLUDED.valid_until,
+                updated_at = EXCLUDED.updated_at
+            WHERE t.updated_at <= EXCLUDED.updated_at
+        """
+        params = [
+            [row.reservation_unit_id for row in rows],
+            [row.first_reservable_datetime for row in rows],
+            [row.is_closed for row in rows],
+            [row.effective_access_type for row in rows],
+            [row.valid_until for row in rows],
+            [row.updated_at for row in rows],
+        ]
+
+        with get_connection().cursor() as cursor:
+            cursor.execute(sql, params)
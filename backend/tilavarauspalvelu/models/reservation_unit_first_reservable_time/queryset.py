@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from tilavarauspalvelu.models import ReservationUnitFirstReservableTime
+from tilavarauspalvelu.models._base import ModelManager, ModelQuerySet
+
+__all__ = [
+    "ReservationUnitFirstReservableTimeManager",
+    "ReservationUnitFirstReservableTimeQuerySet",
+]
+
+
+class ReservationUnitFirstReservableTimeQuerySet(ModelQuerySet[ReservationUnitFirstReservableTime]): ...
+
+
+class ReservationUnitFirstReservableTimeManager(
+    ModelManager[ReservationUnitFirstReservableTime, ReservationUnitFirstReservableTimeQuerySet],
+): ...
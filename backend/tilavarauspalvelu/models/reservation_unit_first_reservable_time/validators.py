@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from tilavarauspalvelu.models import ReservationUnitFirstReservableTime
+
+
+__all__ = [
+    "ReservationUnitFirstReservableTimeValidator",
+]
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class ReservationUnitFirstReservableTimeValidator:
+    reservation_unit_first_reservable_time: ReservationUnitFirstReservableTime
@@ -10,8 +10,11 @@
 from lazy_managers import LazyModelAttribute, LazyModelManager
 
 from tilavarauspalvelu.integrations.sentry import SentryLogger
+from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_cache import FirstReservableTimeCache
 
 if TYPE_CHECKING:
+    from collections.abc import Collection
+
     from tilavarauspalvelu.models import ReservationUnit
 
     from .actions import ReservationUnitHierarchyActions
@@ -23,12 +26,18 @@
 ]
 
 
+# Namespace for the advisory locks taken with `ReservationUnitHierarchy.lock`,
+# so that they don't collide with other advisory locks keyed by integer ids.
+RESERVATION_UNIT_LOCK_NAMESPACE = 1_001
+
+
 class ReservationUnitHierarchy(models.Model):
     """
-    A PostgreSQL materialized view that is used to pre-calculate
+    A PostgreSQL table that is used to pre-calculate
     which reservation units affect a given reservation unit's reservations.
 
-    The view gets stale when:
+    The table is maintained by the `update_reservation_unit_hierarchy` database function,
+    and needs to be updated when:
       1) Reservation units are created or deleted.
       2) Spaces or resources are added to or removed from existing reservation units.
       3) The space hierarchy is changed.
@@ -58,18 +67,76 @@ def __str__(self) -> str:
         return f"Hierarchy for reservation unit: {self.reservation_unit_id}"
 
     @classmethod
-    def refresh(cls, using: str | None = None) -> None:
+    def refresh(
+        cls,
+        using: str | None = None,
+        *,
+        reservation_unit_ids: Collection[int] | None = None,
+        space_ids: Collection[int] | None = None,
+    ) -> None:
         """
-        Called to refresh the contents of the materialized view.
+        Called to refresh the contents of the table.
+
+        If `reservation_unit_ids` or `space_ids` are given, only the hierarchies of the reservation units
+        that could be affected by changes to them are updated: reservation units in the same space trees
+        (MPTT `tree_id`s), reservation units sharing a resource, and reservation units that were previously
+        related to any of these. Otherwise, the whole table is refreshed.
+
+        Affecting time spans of the reservation units whose hierarchy changed are updated at the same time,
+        and their cached first reservable times are invalidated.
 
         This method is called automatically with appropriate signals,
         and with a scheduled task, but can also be called manually if needed.
         """
+        params = [
+            None if reservation_unit_ids is None else list(reservation_unit_ids),
+            None if space_ids is None else list(space_ids),
+        ]
+
         try:
             with get_connection(using).cursor() as cursor:
-                cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY reservation_unit_hierarchy")
+                cursor.execute("SELECT update_reservation_unit_hierarchy(%s::integer[], %s::integer[])", params)
+                changed_ids: list[int] = cursor.fetchone()[0]
         except Exception as error:
             # Only raise error in local development, otherwise log to Sentry
             if settings.RAISE_ERROR_ON_REFRESH_FAILURE:
                 raise
-            SentryLogger.log_exception(error, details="Failed to refresh materialized view.")
+            SentryLogger.log_exception(error, details="Failed to refresh reservation unit hierarchy.")
+            return
+
+        FirstReservableTimeCache.invalidate(changed_ids)
+
+    @classmethod
+    def lock(cls, reservation_unit_ids: Collection[int], using: str | None = None) -> None:
+        """
+        Lock the given reservation units and all reservation units related to them through
+        the reservation unit hierarchy until the end of the current transaction.
+
+        Reservations made to the locked reservation units by other transactions taking the same lock
+        wait until the transaction ends, so that checking for overlapping reservations and saving
+        the new reservation is done one transaction at a time for each space-resource hierarchy.
+        Reservations for unrelated reservation units can still be made concurrently.
+
+        Must be called inside a transaction.
+        """
+        if not reservation_unit_ids:
+            return
+
+        # Locks are taken in the order of the reservation unit ids, so that transactions locking
+        # overlapping sets of reservation units cannot deadlock. Volatile functions are evaluated
+        # after ORDER BY, so the locks are taken in the sorted order.
+        sql = """
+            SELECT pg_advisory_xact_lock(%s, ids.id)
+            FROM (
+                SELECT unnest(rh.related_reservation_unit_ids) AS id
+                FROM reservation_unit_hierarchy rh
+                WHERE rh.reservation_unit_id = ANY(%s::integer[])
+                UNION
+                SELECT unnest(%s::integer[]) AS id
+            ) ids
+            ORDER BY ids.id
+        """
+        pks = list(reservation_unit_ids)
+
+        with get_connection(using).cursor() as cursor:
+            cursor.execute(sql, [RESERVATION_UNIT_LOCK_NAMESPACE, pks, pks])
@@ -6,7 +6,9 @@
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
 from helusers.models import AbstractUser
 from lazy_managers import LazyModelAttribute, LazyModelManager
@@ -86,6 +88,10 @@ class Meta:
         verbose_name = _("user")
         verbose_name_plural = _("users")
         ordering = ["pk"]
+        indexes = [
+            # For 'email__icontains' lookups
+            GinIndex(OpClass(Upper("email"), name="gin_trgm_ops"), name="user_email_trgm_idx"),
+        ]
 
     def __str__(self) -> str:
         default = super().__str__()
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING, Self
+
+from django.db import models
+from lookup_property import L
+
+from tilavarauspalvelu.enums import AccessType, ApplicationRoundStatusChoice
+from tilavarauspalvelu.models import (
+    ApplicationRound,
+    ReservableTimeSpan,
+    Reservation,
+    ReservationUnit,
+    ReservationUnitAccessType,
+    ReservationUnitPricing,
+)
+from utils.date_utils import DEFAULT_TIMEZONE
+from utils.db import SubqueryCount
+
+if TYPE_CHECKING:
+    import datetime
+
+    from tilavarauspalvelu.models import User
+    from tilavarauspalvelu.typing import TimeSpan
+
+__all__ = [
+    "BookingContext",
+]
+
+
+@dataclasses.dataclass(slots=True, frozen=True, kw_only=True)
+class BookingContext:
+    """
+    Data needed to validate a reservation to a reservation unit for a given period.
+
+    Validating a reservation requires information about the reservation unit's pricing, access types,
+    application rounds, reservable time spans, and the user's active reservations. Querying these
+    separately in each validator would take a dozen or so queries, so they are loaded here up front
+    in at most three queries, and given to the validators and actions that need them.
+
+    Overlapping reservations are not checked here, since that must be done right before
+    the reservation is saved (see `ReservationUnitHierarchy.lock`).
+    """
+
+    reservation_unit: ReservationUnit
+    begins_at: datetime.datetime
+    ends_at: datetime.datetime
+
+    pricing: ReservationUnitPricing | None
+    """Pricing active on the day the reservation begins."""
+
+    access_type: AccessType | None
+    """Access type active on the day the reservation begins."""
+
+    in_open_application_round: bool
+    """Whether the reservation unit is in an application round that is open during the reservation."""
+
+    num_active_user_reservations: int
+    """Number of active reservations the user has in the reservation unit."""
+
+    reservable_time_spans: list[TimeSpan]
+    """Reservable time spans of the reservation unit on the day the reservation begins."""
+
+    @classmethod
+    def load(
+        cls,
+        reservation_unit: ReservationUnit | int,
+        begins_at: datetime.datetime,
+        ends_at: datetime.datetime,
+        *,
+        user: User | None = None,
+    ) -> Self:
+        begins_at = begins_at.astimezone(DEFAULT_TIMEZONE)
+        ends_at = ends_at.astimezone(DEFAULT_TIMEZONE)
+        on_date = begins_at.date()
+
+        pk = reservation_unit if isinstance(reservation_unit, int) else reservation_unit.pk
+
+        if user is None:
+            num_active_user_reservations = models.Value(0)
+        else:
+            num_active_user_reservations = SubqueryCount(
+                Reservation.objects.filter_for_user_num_active_reservations(
+                    reservation_unit=models.OuterRef("id"),
+                    user=user,
+                ).values("id")
+            )
+
+        reservation_unit = (
+            ReservationUnit.objects
+            .select_related(
+                "cancellation_rule",
+                "payment_product",
+            )
+            .annotate(
+                booking_in_open_application_round=models.Exists(
+                    ApplicationRound.objects.filter(
+                        reservation_units=models.OuterRef("id"),
+                        reservation_period_end_date__gte=on_date,
+                        reservation_period_begin_date__lte=ends_at.date(),
+                    ).exclude(
+                        L(status=ApplicationRoundStatusChoice.RESULTS_SENT),
+                    )
+                ),
+                booking_access_type=models.Subquery(
+                    ReservationUnitAccessType.objects
+                    .filter(reservation_unit=models.OuterRef("id"))
+                    .active(on_date=on_date)
+                    .values("access_type")[:1]
+                ),
+                booking_num_active_user_reservations=num_active_user_reservations,
+            )
+            .get(pk=pk)
+        )
+
+        pricing: ReservationUnitPricing | None = (
+            ReservationUnitPricing.objects
+            .filter(reservation_unit=pk)
+            .active(from_date=on_date)
+            .select_related("tax_percentage")
+            .first()
+        )
+
+        reservable_time_spans: list[TimeSpan] = []
+        if reservation_unit.origin_hauki_resource_id is not None:
+            reservable_time_spans = list(
+                ReservableTimeSpan.objects
+                .filter(
+                    resource=reservation_unit.origin_hauki_resource_id,
+                    start_datetime__date__lte=on_date,
+                    end_datetime__date__gte=on_date,
+                )
+                .order_by("start_datetime")
+                .values("start_datetime", "end_datetime")
+            )
+
+        access_type = reservation_unit.booking_access_type
+
+        return cls(
+            reservation_unit=reservation_unit,
+            begins_at=begins_at,
+            ends_at=ends_at,
+            pricing=pricing,
+            access_type=AccessType(access_type) if access_type else None,
+            in_open_application_round=reservation_unit.booking_in_open_application_round,
+            num_active_user_reservations=reservation_unit.booking_num_active_user_reservations,
+            reservable_time_spans=reservable_time_spans,
+        )
+
+    @property
+    def is_open(self) -> bool:
+        """Whether a single reservable time span fully fills the reservation's period."""
+        return any(
+            time_span["start_datetime"] <= self.begins_at and time_span["end_datetime"] >= self.ends_at
+            for time_span in self.reservable_time_spans
+        )
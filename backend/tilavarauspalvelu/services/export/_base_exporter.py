@@ -2,15 +2,15 @@
 
 import csv
 import dataclasses
-import json
 from abc import ABC, abstractmethod
-from dataclasses import asdict
+from functools import cache
 from io import StringIO
-from itertools import chain, zip_longest
+from itertools import chain, islice, zip_longest
 from typing import TYPE_CHECKING, Any, Literal, Self
 
-from django.http import FileResponse
+from django.http import StreamingHttpResponse
 
+from tilavarauspalvelu.integrations.sentry import SentryLogger
 from utils.date_utils import (
     DEFAULT_TIMEZONE,
     local_date_string,
@@ -41,25 +41,51 @@ def with_extra(self, extra: Iterable[str]) -> Self:
 
     def as_row(self) -> Iterator[Any]:
         """Export the dataclass to an iterable of its values in the order they were defined."""
-        data = asdict(self)
-        extra_rows: Iterable[str] = data.pop("extra", [])
-        return chain(data.values(), extra_rows)
+        # Read the values directly instead of using 'dataclasses.asdict', which deep-copies every value.
+        values = (getattr(self, name) for name in _row_field_names(type(self)))
+        return chain(values, self.extra)
 
     def as_json(self, *, extra_headers: Iterable[str]) -> dict[str, Any]:
         """Export the dataclass to a json encodable dict."""
-        data = asdict(self)
+        data = {name: _json_value(getattr(self, name)) for name in _row_field_names(type(self))}
 
-        extra = data.pop("extra", [])
         if extra_headers:
-            for extra_header, extra_value in zip_longest(extra_headers, extra, fillvalue=""):
-                data[extra_header] = extra_value
+            for extra_header, extra_value in zip_longest(extra_headers, self.extra, fillvalue=""):
+                data[extra_header] = _json_value(extra_value)
 
-        return json.loads(json.dumps(data, default=str))
+        return data
+
+
+@cache
+def _row_field_names(row_class: type[BaseExportRow]) -> tuple[str, ...]:
+    """Names of the fields of the given export row class in definition order, without the 'extra' field."""
+    return tuple(field.name for field in dataclasses.fields(row_class) if field.name != "extra")
+
+
+def _json_value(value: Any) -> Any:
+    """Convert the given value to a json encodable value, using its string representation if needed."""
+    if value is None or isinstance(value, str | int | float | bool):
+        return value
+    if isinstance(value, list | tuple):
+        return [_json_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _json_value(item) for key, item in value.items()}
+    return str(value)
+
+
+class _Echo:
+    """File-like object that returns the written value, so that 'csv.writer' can be used for streaming."""
+
+    def write(self, value: str) -> str:
+        return value
 
 
 class BaseCSVExporter(ABC):
     """Base class for CSV exporters."""
 
+    chunk_size: int = 2_000
+    """Number of instances fetched from the database at a time when streaming the export."""
+
     def __init__(
         self,
         *,
@@ -72,44 +98,96 @@ def write_csv(self) -> StringIO:
         csv_file = StringIO()
         csv_writer = csv.writer(csv_file, quoting=csv.QUOTE_ALL)
 
-        # Write header rows
+        for row in self.iter_rows():
+            csv_writer.writerow(row)
+
+        return csv_file
+
+    def iter_csv(self, *, chunk_size: int | None = None) -> Iterator[str]:
+        """
+        Iterate the lines of the CSV based on the exporter queryset.
+
+        :param chunk_size: If given, iterate the exporter queryset in chunks of this size using a server-side cursor.
+        """
+        csv_writer = csv.writer(_Echo(), quoting=csv.QUOTE_ALL)
+
+        for row in self.iter_rows(chunk_size=chunk_size):
+            yield csv_writer.writerow(row)
+
+    def iter_rows(self, *, chunk_size: int | None = None) -> Iterator[list[Any]]:
+        """
+        Iterate the header rows and data rows of the CSV based on the exporter queryset.
+
+        :param chunk_size: If given, iterate the exporter queryset in chunks of this size using a server-side cursor.
+        """
         for header_row in self.get_header_rows():
-            csv_writer.writerow(list(header_row.as_row()))
+            yield list(header_row.as_row())
 
-        # Write data rows
-        for instance in self.queryset:
-            for row in self.get_data_rows(instance):
-                csv_writer.writerow(list(row.as_row()))
+        instances = self.queryset if chunk_size is None else self.queryset.iterator(chunk_size=chunk_size)
 
-        return csv_file
+        for instance in instances:
+            for row in self.get_data_rows(instance):
+                yield list(row.as_row())
 
     def write_json(self) -> list[dict[str, Any]]:
         """Write JSON based on the exporter queryset."""
+        return list(self.iter_json())
+
+    def iter_json(
+        self,
+        *,
+        instances: Iterable[models.Model] | None = None,
+        chunk_size: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Iterate JSON encodable rows based on the exporter queryset or the given instances.
+
+        :param instances: Instances to export instead of the exporter queryset, e.g. if they have already been fetched.
+        :param chunk_size: If given, iterate the exporter queryset in chunks of this size using a server-side cursor.
+        """
         extra_headers = [
             to_ascii(string=extra.lower().replace(" ", "_"))
             for header in self.get_header_rows()
             for extra in header.extra
         ]
-        return [
-            row.as_json(extra_headers=extra_headers)
-            for instance in self.queryset
-            for row in self.get_data_rows(instance)
-        ]
+        if instances is None:
+            instances = self.queryset if chunk_size is None else self.queryset.iterator(chunk_size=chunk_size)
+
+        for instance in instances:
+            for row in self.get_data_rows(instance):
+                yield row.as_json(extra_headers=extra_headers)
 
-    def to_file_response(self, file_name: str | None = None) -> FileResponse:
+    def to_file_response(self, file_name: str | None = None) -> StreamingHttpResponse:
         """
-        Write the data to a CSV file and return it as a FileResponse.
+        Stream the data as a CSV file download.
+
+        The data is written while the response is sent, and the exporter queryset is iterated
+        in chunks, so the whole file is never held in memory.
+
+        The header rows and the first data row are written before the response is returned,
+        so that errors in fetching the data are raised to the caller. Since the response has already
+        started when the rest of the rows are written, errors after that interrupt the download,
+        and are logged to Sentry.
 
         :param file_name: The name of the file to be downloaded, without the '.csv' extension.
         """
         if file_name is None:
             file_name = self.default_filename
 
-        csv_file = self.write_csv()
-        response = FileResponse(csv_file.getvalue(), content_type="text/csv")
+        lines = self.iter_csv(chunk_size=self.chunk_size)
+        first_lines = list(islice(lines, len(list(self.get_header_rows())) + 1))
+
+        response = StreamingHttpResponse(chain(first_lines, self._log_errors(lines)), content_type="text/csv")
         response["Content-Disposition"] = f"attachment;filename={file_name}.csv"
         return response
 
+    def _log_errors(self, lines: Iterator[str]) -> Iterator[str]:
+        try:
+            yield from lines
+        except Exception as error:
+            SentryLogger.log_exception(error, details=f"Error while streaming '{type(self).__name__}' CSV export")
+            raise
+
     def format_datetime(self, value: datetime.datetime | None) -> str | None:
         """Format a datetime as string in the given format."""
         if not value:
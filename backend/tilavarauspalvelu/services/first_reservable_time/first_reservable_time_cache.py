@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import datetime
+import uuid
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Any
+from weakref import WeakKeyDictionary
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from tilavarauspalvelu.enums import AccessType
+from utils.date_utils import local_datetime, local_start_of_day
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, Iterable
+
+    from django.db.backends.base.base import BaseDatabaseWrapper
+
+__all__ = [
+    "CachedReservableTime",
+    "FirstReservableTimeCache",
+]
+
+
+type ReservationUnitPK = int
+
+_CACHE_KEY_PREFIX = "first_reservable_time"
+
+
+# Pending invalidations for the current transaction of each database connection.
+_pending_invalidations: WeakKeyDictionary[BaseDatabaseWrapper, _PendingInvalidation] = WeakKeyDictionary()
+
+
+@dataclass
+class CachedReservableTime:
+    closed: bool
+    frt: datetime.datetime | None
+    access_type: AccessType | None
+    valid_until: datetime.datetime
+    # Version token of the reservation unit at the time of the calculation.
+    version: str | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CachedReservableTime:
+        return cls(
+            closed=data["closed"].lower() == "true",
+            frt=None if data["frt"] == "None" else datetime.datetime.fromisoformat(data["frt"]),
+            access_type=None if data["access_type"] == "None" else AccessType(data["access_type"]),
+            valid_until=datetime.datetime.fromisoformat(data["valid_until"]),
+            version=data.get("version"),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "closed": str(self.closed),
+            "frt": self.frt.isoformat() if self.frt is not None else "None",
+            "access_type": AccessType(self.access_type) if self.access_type is not None else "None",
+            "valid_until": self.valid_until.isoformat(),
+            "version": self.version,
+        }
+
+
+class FirstReservableTimeCache:
+    """
+    Cache for the first reservable time results of individual reservation units for a given filter window.
+
+    Cached results stay valid until an event that can change the reservation unit's first reservable time occurs:
+    - A reservation is created, changed, or deleted in the reservation unit's hierarchy.
+    - The ReservableTimeSpans of the reservation unit change.
+    - The reservation unit's settings, access types, or application rounds change.
+    - The reservation unit hierarchy changes.
+
+    These events invalidate the results by changing a version token for the affected reservation units,
+    which is compared to the version token stored with the cached results. Results are also invalidated
+    when time passes the first reservable time, or at the end of the day, since the first reservable time
+    depends on the current time.
+    """
+
+    def __init__(
+        self,
+        *,
+        now: datetime.datetime,
+        filter_date_start: datetime.date,
+        filter_date_end: datetime.date,
+        filter_time_start: datetime.time | None,
+        filter_time_end: datetime.time | None,
+        minimum_duration_minutes: int,
+    ) -> None:
+        self.now = now
+        self.end_of_day = local_start_of_day(now) + datetime.timedelta(days=1)
+        self.window_key = ":".join([
+            filter_date_start.isoformat(),
+            filter_date_end.isoformat(),
+            filter_time_start.isoformat() if filter_time_start is not None else "",
+            filter_time_end.isoformat() if filter_time_end is not None else "",
+            str(minimum_duration_minutes),
+        ])
+
+        # Version tokens read from the cache. Must be read before calculating the results
+        # so that invalidations during the calculation are not missed.
+        self.versions: dict[ReservationUnitPK, str | None] = {}
+
+    def get_many(self, pks: Collection[ReservationUnitPK]) -> dict[ReservationUnitPK, CachedReservableTime]:
+        """Get valid cached results for the given reservation units, and read their current version tokens."""
+        result_keys = {pk: self._result_key(pk) for pk in pks}
+        version_keys = {pk: self._version_key(pk) for pk in pks}
+
+        data: dict[str, Any] = cache.get_many([*result_keys.values(), *version_keys.values()])
+
+        results: dict[ReservationUnitPK, CachedReservableTime] = {}
+        for pk in pks:
+            version = self.versions[pk] = data.get(version_keys[pk])
+
+            item = data.get(result_keys[pk])
+            if item is None:
+                continue
+
+            result = CachedReservableTime.from_dict(item)
+            if result.valid_until <= self.now or result.version != version:
+                continue
+
+            results[pk] = result
+
+        return results
+
+    def set_many(
+        self,
+        results: Iterable[tuple[ReservationUnitPK, bool, datetime.datetime | None, AccessType | None]],
+    ) -> None:
+        """Cache the given results (pk, is_closed, first reservable time, access type) calculated in this request."""
+        data: dict[str, dict[str, Any]] = {}
+        for pk, is_closed, first_reservable_time, access_type in results:
+            data[self._result_key(pk)] = CachedReservableTime(
+                closed=is_closed,
+                frt=first_reservable_time,
+                access_type=access_type,
+                valid_until=self.get_valid_until(first_reservable_time),
+                version=self.versions.get(pk),
+            ).to_dict()
+
+        if data:
+            timeout = max(int((self.end_of_day - self.now).total_seconds()), 1)
+            cache.set_many(data, timeout=timeout)
+
+    def get_valid_until(self, first_reservable_time: datetime.datetime | None) -> datetime.datetime:
+        """Results are valid until the first reservable time is in the past, or the day changes."""
+        if first_reservable_time is None:
+            return self.end_of_day
+        return min(self.end_of_day, first_reservable_time)
+
+    @classmethod
+    def invalidate(cls, pks: Iterable[ReservationUnitPK], *, include_related: bool = False) -> None:
+        """
+        Invalidate cached results for the given reservation units.
+
+        If `include_related` is True, also invalidate results for reservation units in the same hierarchy,
+        e.g. when a reservation in the given reservation units changes.
+
+        Results are invalidated immediately, and again after the current transaction commits,
+        so that results calculated from data before the commit are not left in the cache.
+
+        Pre-calculated results for the default filters are also marked as no longer valid,
+        and re-calculated in the background.
+        """
+        from tilavarauspalvelu.models import ReservationUnitFirstReservableTime
+        from tilavarauspalvelu.tasks import coalesce_task, update_first_reservable_times_task
+
+        pks = set(pks)
+        if include_related:
+            pks.update(cls._related_pks(pks))
+
+        if not pks:
+            return
+
+        cls._set_versions(pks)
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(partial(cls._set_versions, pks))
+
+        now = local_datetime()
+        ReservationUnitFirstReservableTime.objects.filter(reservation_unit__in=pks).update(
+            valid_until=now,
+            updated_at=now,
+        )
+
+        if settings.UPDATE_FIRST_RESERVABLE_TIMES:
+            coalesce_task(update_first_reservable_times_task, {"reservation_unit_ids": sorted(pks)})
+
+    @classmethod
+    def invalidate_on_commit(
+        cls,
+        pks: Iterable[ReservationUnitPK],
+        *,
+        include_related: bool = False,
+        using: str | None = None,
+    ) -> None:
+        """
+        Invalidate cached results for the given reservation units after the current transaction commits.
+
+        Calls made in the same transaction are batched into a single invalidation, so that mass operations
+        which trigger this from signals for each saved object only look up the hierarchy once.
+        Runs immediately if not in a transaction, or if `COALESCE_SIGNAL_TASKS` is disabled.
+
+        :param pks: The reservation units to invalidate.
+        :param include_related: Also invalidate reservation units in the same hierarchy.
+        :param using: The database alias whose transaction the invalidation is tied to.
+        """
+        if not settings.COALESCE_SIGNAL_TASKS:
+            cls.invalidate(pks, include_related=include_related)
+            return
+
+        connection = transaction.get_connection(using)
+        pending = _pending_invalidations.get(connection)
+
+        # Callbacks are discarded when a transaction (or a savepoint) is rolled back,
+        # so only batch to invalidations that are still going to be run.
+        if pending is None or not any(func is pending for _, func, _ in connection.run_on_commit):
+            pending = _pending_invalidations[connection] = _PendingInvalidation()
+            pending.add(pks, include_related=include_related)
+            transaction.on_commit(pending, using=using)
+            return
+
+        pending.add(pks, include_related=include_related)
+
+    @staticmethod
+    def _related_pks(pks: Collection[ReservationUnitPK]) -> set[ReservationUnitPK]:
+        from tilavarauspalvelu.models import ReservationUnitHierarchy
+
+        related_pks: set[ReservationUnitPK] = set()
+        hierarchies = ReservationUnitHierarchy.objects.filter(reservation_unit__in=pks)
+        for related_ids in hierarchies.values_list("related_reservation_unit_ids", flat=True):
+            related_pks.update(related_ids)
+        return related_pks
+
+    @classmethod
+    def _set_versions(cls, pks: Collection[ReservationUnitPK]) -> None:
+        version = uuid.uuid4().hex
+        cache.set_many({cls._version_key(pk): version for pk in pks}, timeout=None)
+
+    def _result_key(self, pk: ReservationUnitPK) -> str:
+        return f"{_CACHE_KEY_PREFIX}:{self.window_key}:{pk}"
+
+    @staticmethod
+    def _version_key(pk: ReservationUnitPK) -> str:
+        return f"{_CACHE_KEY_PREFIX}:version:{pk}"
+
+
+class _PendingInvalidation:
+    """Invalidation waiting for the current transaction to commit."""
+
+    def __init__(self) -> None:
+        self.pks: set[ReservationUnitPK] = set()
+        self.related_pks: set[ReservationUnitPK] = set()
+
+    def add(self, pks: Iterable[ReservationUnitPK], *, include_related: bool) -> None:
+        if include_related:
+            self.related_pks.update(pks)
+        else:
+            self.pks.update(pks)
+
+    def __call__(self) -> None:
+        pks = self.pks | self.related_pks
+        if self.related_pks:
+            pks.update(FirstReservableTimeCache._related_pks(self.related_pks))  # noqa: SLF001
+
+        FirstReservableTimeCache.invalidate(pks)
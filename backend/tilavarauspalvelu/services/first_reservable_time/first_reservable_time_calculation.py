@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import dataclasses
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import batched
+from typing import TYPE_CHECKING, Self
+
+import django
+
+from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_reservation_unit_helper import (
+    ReservationUnitFirstReservableTimeHelper,
+)
+
+if TYPE_CHECKING:
+    import datetime
+    from collections.abc import Sequence
+    from types import TracebackType
+
+    from tilavarauspalvelu.enums import AccessType
+    from tilavarauspalvelu.integrations.opening_hours.time_span_element import TimeSpanElement
+    from tilavarauspalvelu.integrations.opening_hours.time_span_element_array import TimeSpanElementArray
+    from tilavarauspalvelu.models import ReservationUnit
+
+__all__ = [
+    "FirstReservableTimeCalculationContext",
+    "FirstReservableTimeWorkerPool",
+    "ReservationUnitCalculationData",
+    "calculate_first_reservable_times",
+]
+
+
+type ReservationUnitPK = int
+type FirstReservableTimeResult = tuple[ReservationUnitPK, bool, datetime.datetime | None, AccessType | None]
+
+
+@dataclasses.dataclass(slots=True)
+class FirstReservableTimeCalculationContext:
+    """
+    The values from `FirstReservableTimeHelper` needed to calculate the first reservable times
+    for a set of reservation units with `ReservationUnitFirstReservableTimeHelper`.
+
+    Contains only plain values and the columnar closed time span arrays of the reservation units.
+    """
+
+    filter_date_start: datetime.date
+    filter_time_start: datetime.time | None
+    filter_time_end: datetime.time | None
+    filter_minimum_duration_minutes: int
+    shared_hard_closed_time_spans: list[TimeSpanElement]
+    reservation_closed_time_spans_map: dict[ReservationUnitPK, TimeSpanElementArray]
+    blocking_reservation_closed_time_spans_map: dict[ReservationUnitPK, TimeSpanElementArray]
+    # Closed time spans have only been loaded until this time, so results can only be determined
+    # from the reservable time spans before it. None if they have been loaded for the whole filter period.
+    search_end: datetime.datetime | None = None
+
+    def for_reservation_units(self, pks: Sequence[ReservationUnitPK]) -> FirstReservableTimeCalculationContext:
+        """Get a copy of the context with only the closed time spans of the given reservation units."""
+        closed = self.reservation_closed_time_spans_map
+        blocking = self.blocking_reservation_closed_time_spans_map
+        return dataclasses.replace(
+            self,
+            reservation_closed_time_spans_map={pk: closed[pk] for pk in pks if pk in closed},
+            blocking_reservation_closed_time_spans_map={pk: blocking[pk] for pk in pks if pk in blocking},
+        )
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ReservationUnitCalculationData:
+    """
+    The values of a ReservationUnit and its prefetched related objects needed to calculate its first reservable time.
+
+    Contains only plain values, so that it can be sent to the worker processes of `FirstReservableTimeWorkerPool`
+    without the model instance, its prefetch cache, or a database connection.
+    """
+
+    pk: ReservationUnitPK
+    start_interval_minutes: int
+    min_reservation_duration: datetime.timedelta | None
+    max_reservation_duration: datetime.timedelta | None
+    buffer_time_before: datetime.timedelta | None
+    buffer_time_after: datetime.timedelta | None
+    reservation_begins_at: datetime.datetime | None
+    reservation_ends_at: datetime.datetime | None
+    publish_ends_at: datetime.datetime | None
+    reservations_min_days_before: int | None
+    reservations_max_days_before: int | None
+    # (reservation_period_begin_date, reservation_period_end_date) of the prefetched ApplicationRounds.
+    application_round_periods: tuple[tuple[datetime.date, datetime.date], ...]
+    # (begin_date, access_type) of the prefetched ReservationUnitAccessTypes, in the prefetched order.
+    access_types: tuple[tuple[datetime.date, AccessType], ...]
+    # Prefetched ReservableTimeSpans ordered by start time. None if the ReservationUnit has no HaukiResource.
+    reservable_time_spans: tuple[TimeSpanElement, ...] | None
+
+    @classmethod
+    def from_reservation_unit(cls, reservation_unit: ReservationUnit) -> Self:
+        hauki_resource = reservation_unit.origin_hauki_resource
+        reservable_time_spans: tuple[TimeSpanElement, ...] | None = None
+        if hauki_resource is not None:
+            reservable_time_spans = tuple(
+                reservable_time_span.as_time_span_element()
+                for reservable_time_span in hauki_resource.reservable_time_spans.all()
+            )
+
+        return cls(
+            pk=reservation_unit.pk,
+            start_interval_minutes=reservation_unit.actions.start_interval_minutes,
+            min_reservation_duration=reservation_unit.min_reservation_duration,
+            max_reservation_duration=reservation_unit.max_reservation_duration,
+            buffer_time_before=reservation_unit.buffer_time_before,
+            buffer_time_after=reservation_unit.buffer_time_after,
+            reservation_begins_at=reservation_unit.reservation_begins_at,
+            reservation_ends_at=reservation_unit.reservation_ends_at,
+            publish_ends_at=reservation_unit.publish_ends_at,
+            reservations_min_days_before=reservation_unit.reservations_min_days_before,
+            reservations_max_days_before=reservation_unit.reservations_max_days_before,
+            application_round_periods=tuple(
+                (application_round.reservation_period_begin_date, application_round.reservation_period_end_date)
+                for application_round in reservation_unit.application_rounds.all()
+            ),
+            access_types=tuple(
+                (access_type.begin_date, access_type.access_type) for access_type in reservation_unit.access_types.all()
+            ),
+            reservable_time_spans=reservable_time_spans,
+        )
+
+
+def calculate_first_reservable_times(
+    context: FirstReservableTimeCalculationContext,
+    reservation_units: Sequence[ReservationUnitCalculationData],
+) -> list[FirstReservableTimeResult]:
+    """
+    Calculate the first reservable times for the given reservation units.
+    Results are returned in the same order as the given reservation units.
+
+    Results are only returned for the reservation units whose first reservable time could be
+    determined before the context's `search_end`.
+    """
+    results: list[FirstReservableTimeResult] = []
+    for reservation_unit in reservation_units:
+        helper = ReservationUnitFirstReservableTimeHelper(parent=context, reservation_unit=reservation_unit)
+        is_closed, first_reservable_time = helper.calculate_first_reservable_time()
+        if helper.is_search_incomplete:
+            continue
+
+        access_type = helper.get_access_type_for_date(is_closed, first_reservable_time)
+        results.append((reservation_unit.pk, is_closed, first_reservable_time, access_type))
+    return results
+
+
+class FirstReservableTimeWorkerPool:
+    """
+    Process pool for calculating the first reservable times of large sets of reservation units
+    in parallel in `ReservationUnitFirstReservableTime.refresh`.
+
+    Should not be used when handling requests: starting the worker processes takes longer than
+    calculating the results for a single page of reservation units.
+
+    Workers are started with the 'spawn' method, so that they don't inherit the database connections
+    or other state of the calling process, and only receive the plain calculation data for their batch.
+
+    >>> with FirstReservableTimeWorkerPool(workers=4) as pool:
+    ...     results = pool.calculate_first_reservable_times(context, reservation_units)
+    """
+
+    # Don't split the calculation into batches smaller than this, since sending the
+    # calculation data to the worker processes has a cost of its own.
+    min_reservation_units_per_worker: int = 10
+
+    def __init__(self, *, workers: int) -> None:
+        self.workers = workers
+        self._executor = self._create_executor()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def calculate_first_reservable_times(
+        self,
+        context: FirstReservableTimeCalculationContext,
+        reservation_units: Sequence[ReservationUnitCalculationData],
+    ) -> list[FirstReservableTimeResult]:
+        """
+        Calculate the first reservable times for the given reservation units in the worker processes.
+        Results are returned ordered by reservation unit primary key, regardless of which worker finished first.
+
+        Results are only returned for the reservation units whose first reservable time could be
+        determined before the context's `search_end`.
+        """
+        workers = min(self.workers, len(reservation_units) // self.min_reservation_units_per_worker)
+        if workers < 2:  # noqa: PLR2004
+            results = calculate_first_reservable_times(context, reservation_units)
+            return sorted(results, key=lambda result: result[0])
+
+        batch_size = math.ceil(len(reservation_units) / workers)
+        batches = list(batched(reservation_units, batch_size, strict=False))
+
+        try:
+            futures = [
+                self._executor.submit(
+                    calculate_first_reservable_times,
+                    context.for_reservation_units([reservation_unit.pk for reservation_unit in batch]),
+                    batch,
+                )
+                for batch in batches
+            ]
+            results = [result for future in futures for result in future.result()]
+
+        except BrokenProcessPool:
+            # A worker process died, e.g. because it ran out of memory. Calculate the results
+            # in this process instead, and start new workers for the next calculation.
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._create_executor()
+            results = calculate_first_reservable_times(context, reservation_units)
+
+        return sorted(results, key=lambda result: result[0])
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            # Load the Django settings and apps in the workers, which the calculation modules depend on.
+            initializer=django.setup,
+        )
@@ -1,61 +1,50 @@
 from __future__ import annotations
 
 import datetime
-import json
-from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING
 
-from django.core.cache import cache
 from django.db import models
 from graphene_django.settings import graphene_settings
 from lookup_property import L
 from query_optimizer.utils import calculate_queryset_slice
 
-from tilavarauspalvelu.enums import AccessType, ApplicationRoundStatusChoice
+from tilavarauspalvelu.enums import ApplicationRoundStatusChoice
 from tilavarauspalvelu.exceptions import FirstReservableTimeError
 from tilavarauspalvelu.integrations.opening_hours.time_span_element import TimeSpanElement
-from tilavarauspalvelu.integrations.opening_hours.time_span_element_utils import merge_overlapping_time_span_elements
-from tilavarauspalvelu.models import AffectingTimeSpan, ApplicationRound, ReservableTimeSpan, ReservationUnitAccessType
-from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_reservation_unit_helper import (
-    ReservationUnitFirstReservableTimeHelper,
+from tilavarauspalvelu.integrations.opening_hours.time_span_element_array import TimeSpanElementArray
+from tilavarauspalvelu.models import (
+    AffectingTimeSpan,
+    ApplicationRound,
+    ReservableTimeSpan,
+    ReservationUnitAccessType,
+    ReservationUnitFirstReservableTime,
+)
+from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_cache import FirstReservableTimeCache
+from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_calculation import (
+    FirstReservableTimeCalculationContext,
+    ReservationUnitCalculationData,
+    calculate_first_reservable_times,
 )
 from utils.date_utils import local_datetime, local_datetime_max, local_datetime_min, local_start_of_day
 
 if TYPE_CHECKING:
+    from collections.abc import Generator
     from decimal import Decimal
 
     from django.db.models import QuerySet, When
     from query_optimizer.validators import PaginationArgs
 
+    from tilavarauspalvelu.enums import AccessType
     from tilavarauspalvelu.models import ReservationUnit
     from tilavarauspalvelu.models.reservation_unit.queryset import ReservationUnitQuerySet
+    from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_calculation import (
+        FirstReservableTimeWorkerPool,
+    )
 
 type ReservationUnitPK = int
 
-
-@dataclass
-class CachedReservableTime:
-    closed: bool
-    frt: datetime.datetime | None
-    access_type: AccessType | None
-    valid_until: datetime.datetime
-
-    @classmethod
-    def from_dict(cls, data: dict[str, Any]) -> CachedReservableTime:
-        return cls(
-            closed=data["closed"].lower() == "true",
-            frt=None if data["frt"] == "None" else datetime.datetime.fromisoformat(data["frt"]),
-            access_type=None if data["access_type"] == "None" else AccessType(data["access_type"]),
-            valid_until=datetime.datetime.fromisoformat(data["valid_until"]),
-        )
-
-    def to_dict(self) -> dict[str, Any]:
-        return {
-            "closed": str(self.closed),
-            "frt": self.frt.isoformat() if self.frt is not None else "None",
-            "access_type": AccessType(self.access_type) if self.access_type is not None else "None",
-            "valid_until": self.valid_until.isoformat(),
-        }
+# Length of the first window in which AffectingTimeSpans are loaded for calculating first reservable times.
+AFFECTING_TIME_SPAN_WINDOW_DAYS = 14
 
 
 class FirstReservableTimeHelper:
@@ -132,9 +121,9 @@ class FirstReservableTimeHelper:
     optimized_reservation_unit_queryset: ReservationUnitQuerySet
 
     # Contains a set of closed time spans for each ReservationUnit generated from their relevant Reservations
-    reservation_closed_time_spans_map: dict[ReservationUnitPK, list[TimeSpanElement]]
+    reservation_closed_time_spans_map: dict[ReservationUnitPK, TimeSpanElementArray]
     # Contains a set of closed time spans for each ReservationUnit generated from their relevant BLOCKING Reservations
-    blocking_reservation_closed_time_spans_map: dict[ReservationUnitPK, list[TimeSpanElement]]
+    blocking_reservation_closed_time_spans_map: dict[ReservationUnitPK, TimeSpanElementArray]
 
     # Contains a list of the closed status for each ReservationUnit.
     reservation_unit_closed_statuses: dict[ReservationUnitPK, bool]
@@ -155,7 +144,8 @@ def __init__(  # noqa: PLR0915
         minimum_duration_minutes: float | Decimal | None = None,
         show_only_reservable: bool = False,
         pagination_args: PaginationArgs | None = None,
-        cache_key: str = "",
+        use_precomputed: bool = False,
+        worker_pool: FirstReservableTimeWorkerPool | None = None,
     ) -> None:
         self.now = local_datetime()
         today = self.now.date()
@@ -213,8 +203,21 @@ def __init__(  # noqa: PLR0915
         self.filter_time_end = filter_time_end
         self.filter_minimum_duration_minutes = minimum_duration_minutes
         self.show_only_reservable = show_only_reservable
-
-        self.cache_key = cache_key
+        # Use valid pre-calculated results from `ReservationUnitFirstReservableTime` where they exist.
+        # Should only be set when the filters are the defaults used for the pre-calculated results.
+        self.use_precomputed = use_precomputed
+        # Calculate the results in the pool's worker processes instead of this process.
+        # Only set when refreshing the pre-calculated results, never when handling requests.
+        self.worker_pool = worker_pool
+
+        self.cache = FirstReservableTimeCache(
+            now=self.now,
+            filter_date_start=filter_date_start,
+            filter_date_end=filter_date_end,
+            filter_time_start=filter_time_start,
+            filter_time_end=filter_time_end,
+            minimum_duration_minutes=minimum_duration_minutes,
+        )
 
         ##############
         # Pagination #
@@ -225,19 +228,13 @@ def __init__(  # noqa: PLR0915
             qs_slice = calculate_queryset_slice(**pagination_args)
             self.start_offset = qs_slice.start
             self.stop_offset = qs_slice.stop
-            self.needed_reservation_units = self.stop_offset - self.start_offset
-            # If we should only show reservable reservation units, increase the chunk size to max page size
-            # so that if filtering occurs, we don't need to fetch so many chunks.
-            self.chunk_size = (
-                graphene_settings.RELAY_CONNECTION_MAX_LIMIT
-                if self.show_only_reservable
-                else self.needed_reservation_units
-            )
         else:
             self.start_offset = 0
             self.stop_offset = reservation_unit_queryset.count()
-            self.needed_reservation_units = self.stop_offset
-            self.chunk_size = self.stop_offset
+
+        # If we should only show reservable reservation units, use the max page size as the chunk size
+        # so that if filtering occurs, we don't need to fetch so many chunks.
+        self.chunk_size = graphene_settings.RELAY_CONNECTION_MAX_LIMIT
 
         ##########################################
         # Get required objects from the database #
@@ -256,7 +253,6 @@ def __init__(  # noqa: PLR0915
         self.reservation_unit_closed_statuses = {}
         self.first_reservable_times = {}
         self.first_reservable_times_access_type = {}
-        self.cached_value_validity: dict[int, datetime.datetime] = {}
 
         # Closed time spans that are shared by all ReservationUnits
         self.shared_hard_closed_time_spans = self._get_shared_hard_closed_time_spans()
@@ -269,116 +265,142 @@ def calculate_all_first_reservable_times(self) -> None:
         # FRT calculation should run last in the queryset optimization pipeline, so that
         # all possible filtering is already done.
         #
-        # Still, we cannot simply limit the queryset here based on the input pagination args,
-        # since the reservation unit queryset can change if we used the optional 'show_only_reservable'
-        # filter to remove non-reservable reservation units, which we only know after
-        # the FRT calculation is done.
+        # If 'show_only_reservable' is False, we can simply calculate the results for the reservation units
+        # on the current page.
         #
-        # Therefore, if 'show_only_reservable' is False, we should process the reservation units in batches,
-        # starting from where the pagination args tell us, and continuing until we have gathered enough results to
-        # fill the page size.
-        qs = self.optimized_reservation_unit_queryset
-
-        # TODO: Disabled for now, since it might contribute to timeouts in production.
-        #  Refresh still happens on a background task every 2 minutes.
-        #  if not AffectingTimeSpan.is_valid():
-        #      AffectingTimeSpan.refresh()  # noqa: ERA001,RUF100
-        #      cache.delete(self.cache_key)  # noqa: ERA001,RUF100
-
-        has_valid_results_for_previous_pages = self._read_cached_results()
-        if has_valid_results_for_previous_pages:
-            # If we already have cached FRT results for enough reservation units to fill the page
-            # AND all the previous pages, then we don't need to calculate anything.
-            # NOTE: This does not support different orderings of the same queryset!
-            # TODO: This doesn't work for the last page if it's not full!
-            cached = (
-                sum(1 for frt in self.first_reservable_times.values() if frt is not None)
-                if self.show_only_reservable
-                else len(self.first_reservable_times)
-            )
-            if cached >= self.stop_offset:
-                return
+        # Otherwise, we cannot simply limit the queryset here based on the input pagination args,
+        # since the reservation unit queryset changes when we remove non-reservable reservation units,
+        # which we only know after the FRT calculation is done. Therefore, we should process the reservation
+        # units in chunks from the start of the queryset until we have gathered enough reservable reservation
+        # units to fill all pages up to the current one. Cached results make this cheap for the previous pages.
+        pks_qs = self.optimized_reservation_unit_queryset.prefetch_related(None).values_list("pk", flat=True)
+
+        if not self.show_only_reservable:
+            pks = list(pks_qs[self.start_offset : self.stop_offset])
+            self._calculate_first_reservable_times(pks)
+            return
 
-            # Otherwise, we should still have valid cached results for the previous pages.
-            # We can start calculating after the last cached result.
-            qs = qs[len(self.first_reservable_times) :]
-            # We also don't need to skip any results that are not already cached.
-            self.start_offset = 0
+        results: int = 0
+        offset: int = 0
+        while results < self.stop_offset:
+            pks = list(pks_qs[offset : offset + self.chunk_size])
+            if not pks:
+                break
 
-        # If we don't have valid cached results, and this is not the first page,
-        # we should fetch the current and previous pages in one chunk. The next chunk
-        # will also be bigger (if needed), but likely small enough (<100) not to cause any problems.
-        elif self.start_offset > 0:
-            self.chunk_size = self.stop_offset
+            self._calculate_first_reservable_times(pks)
 
-        results: int = 0
-        for reservation_unit in qs.hooked_iterator(self._get_affecting_time_spans, chunk_size=self.chunk_size):
-            helper = ReservationUnitFirstReservableTimeHelper(parent=self, reservation_unit=reservation_unit)
-            is_closed, first_reservable_time = helper.calculate_first_reservable_time()
-            frt_access_type = helper.get_access_type_for_date(is_closed, first_reservable_time)
-
-            self.reservation_unit_closed_statuses[reservation_unit.pk] = is_closed
-            self.first_reservable_times[reservation_unit.pk] = first_reservable_time
-            self.first_reservable_times_access_type[reservation_unit.pk] = frt_access_type
-
-            # If we should only show reservable reservation units, then we should count the result for the
-            # current page only if there is a first reservable time.
-            if not self.show_only_reservable or first_reservable_time is not None:
-                # Start offset should exist only if we need to recalculate previous pages.
-                # -> Don't count the result for the current page.
-                if self.start_offset > 0:
-                    self.start_offset -= 1
-                    continue
-                results += 1
-
-            # This only really matters when showing only reservable reservation units,
-            # since we might need to fetch more than the first chunk size.
-            if results >= self.needed_reservation_units:
+            results += sum(1 for pk in pks if self.first_reservable_times[pk] is not None)
+            offset += self.chunk_size
+
+    def _calculate_first_reservable_times(self, pks: list[ReservationUnitPK]) -> None:
+        """
+        Calculate the first reservable times for the given reservation units.
+        Use pre-calculated or cached results where possible, and cache the results calculated for the rest.
+        """
+        if self.use_precomputed:
+            pks = self._use_precomputed_first_reservable_times(pks)
+            if not pks:
+                return
+
+        cached_results = self.cache.get_many(pks)
+        for pk, cached_result in cached_results.items():
+            self.reservation_unit_closed_statuses[pk] = cached_result.closed
+            self.first_reservable_times[pk] = cached_result.frt
+            self.first_reservable_times_access_type[pk] = cached_result.access_type
+
+        missing_pks = [pk for pk in pks if pk not in cached_results]
+        if not missing_pks:
+            return
+
+        reservation_units = self.fetch_reservation_units(missing_pks)
+
+        # Load the AffectingTimeSpans in windows of increasing length from the start of the filter period.
+        # For most reservation units, the first reservable time can be determined from the first window,
+        # so the rest of the period doesn't need to be loaded and merged. Calculation is continued
+        # with the next window only for the reservation units for which the result was not yet determined.
+        results: list[tuple[ReservationUnitPK, bool, datetime.datetime | None, AccessType | None]] = []
+        loaded_until: datetime.date | None = None
+        for window_end in self._get_affecting_time_span_windows():
+            pks_in_window = [reservation_unit.pk for reservation_unit in reservation_units]
+            self.load_affecting_time_spans(pks_in_window, after=loaded_until, until=window_end)
+            loaded_until = window_end
+
+            context = self.get_calculation_context(loaded_until=loaded_until)
+            if self.worker_pool is not None:
+                window_results = self.worker_pool.calculate_first_reservable_times(context, reservation_units)
+            else:
+                window_results = calculate_first_reservable_times(context, reservation_units)
+            results.extend(window_results)
+
+            found_pks = {pk for pk, *_ in window_results}
+            reservation_units = [unit for unit in reservation_units if unit.pk not in found_pks]
+            if not reservation_units:
                 break
 
-        self._cache_results()
+        for pk, is_closed, first_reservable_time, frt_access_type in results:
+            self.reservation_unit_closed_statuses[pk] = is_closed
+            self.first_reservable_times[pk] = first_reservable_time
+            self.first_reservable_times_access_type[pk] = frt_access_type
 
-    def _read_cached_results(self) -> bool:
+        self.cache.set_many(results)
+
+    def _use_precomputed_first_reservable_times(self, pks: list[ReservationUnitPK]) -> list[ReservationUnitPK]:
+        """
+        Set the results for the given reservation units that have a valid pre-calculated result.
+        Return the reservation units that don't have one.
         """
-        Reads cached FRT results into the helper's memory.
+        precomputed = ReservationUnitFirstReservableTime.objects.filter(
+            reservation_unit__in=pks,
+            valid_until__gt=self.now,
+        ).values_list("reservation_unit", "is_closed", "first_reservable_datetime", "effective_access_type")
+
+        found_pks: set[ReservationUnitPK] = set()
+        for pk, is_closed, first_reservable_time, access_type in precomputed:
+            self.reservation_unit_closed_statuses[pk] = is_closed
+            self.first_reservable_times[pk] = first_reservable_time
+            self.first_reservable_times_access_type[pk] = access_type
+            found_pks.add(pk)
+
+        return [pk for pk in pks if pk not in found_pks]
+
+    def fetch_reservation_units(self, pks: list[ReservationUnitPK]) -> list[ReservationUnitCalculationData]:
+        """Fetch the data needed for calculating the first reservable times of the given reservation units."""
+        return [
+            ReservationUnitCalculationData.from_reservation_unit(reservation_unit)
+            for reservation_unit in self.optimized_reservation_unit_queryset.filter(pk__in=pks)
+        ]
 
-        Check that we have valid results for all the previous pages.
-        If not, we must recalculate results for all previous pages, since they might be different
-        if one FRT has changed from a datetime to None or vice versa.
+    def get_calculation_context(self, *, loaded_until: datetime.date) -> FirstReservableTimeCalculationContext:
+        """
+        Get the values needed for calculating the first reservable times of the fetched reservation units,
+        when their AffectingTimeSpans have been loaded until the given date.
         """
-        cached_data: dict[str, dict[str, Any]] = json.loads(cache.get(self.cache_key, "{}"))
-
-        has_valid_results_for_previous_pages = bool(cached_data)
-        for pk, item in cached_data.items():
-            cached_result = CachedReservableTime.from_dict(item)
-            if cached_result.valid_until < self.now:
-                self.reservation_unit_closed_statuses.clear()
-                self.first_reservable_times.clear()
-                self.first_reservable_times_access_type.clear()
-                return False
-
-            self.reservation_unit_closed_statuses[int(pk)] = cached_result.closed
-            self.first_reservable_times[int(pk)] = cached_result.frt
-            self.first_reservable_times_access_type[int(pk)] = cached_result.access_type
-            self.cached_value_validity[int(pk)] = cached_result.valid_until
-
-        return has_valid_results_for_previous_pages
-
-    def _cache_results(self) -> None:
-        """Save the calculated FRT results to the cache."""
-        cached_data: dict[str, dict[str, Any]] = {}
-        new_valid_until = self.now + datetime.timedelta(minutes=2)
-
-        for pk, frt in self.first_reservable_times.items():
-            is_closed = self.reservation_unit_closed_statuses[pk]
-            access_type = self.first_reservable_times_access_type[pk]
-            # If FRT was not calculated in this request, use the previous 'valid_until' value.
-            valid_until = self.cached_value_validity.get(pk, new_valid_until)
-            cached_data[str(pk)] = CachedReservableTime(
-                frt=frt, closed=is_closed, valid_until=valid_until, access_type=access_type
-            ).to_dict()
-
-        cache.set(self.cache_key, json.dumps(cached_data), timeout=120)
+        search_end: datetime.datetime | None = None
+        if loaded_until < self.filter_date_end:
+            search_end = local_start_of_day(loaded_until) + datetime.timedelta(days=1)
+
+        return FirstReservableTimeCalculationContext(
+            filter_date_start=self.filter_date_start,
+            filter_time_start=self.filter_time_start,
+            filter_time_end=self.filter_time_end,
+            filter_minimum_duration_minutes=self.filter_minimum_duration_minutes,
+            shared_hard_closed_time_spans=self.shared_hard_closed_time_spans,
+            reservation_closed_time_spans_map=self.reservation_closed_time_spans_map,
+            blocking_reservation_closed_time_spans_map=self.blocking_reservation_closed_time_spans_map,
+            search_end=search_end,
+        )
+
+    def _get_affecting_time_span_windows(self) -> Generator[datetime.date]:
+        """Get the end dates of the windows in which AffectingTimeSpans are loaded. Each window is twice as long."""
+        days = AFFECTING_TIME_SPAN_WINDOW_DAYS
+        while True:
+            window_end = self.filter_date_start + datetime.timedelta(days=days - 1)
+            if window_end >= self.filter_date_end:
+                yield self.filter_date_end
+                return
+
+            yield window_end
+            days *= 2
 
     def get_annotated_queryset(self) -> ReservationUnitQuerySet | QuerySet[ReservationUnit]:
         """Annotate the queryset with `first_reservable_datetime` and `is_closed` fields."""
@@ -484,22 +506,36 @@ def _get_shared_hard_closed_time_spans(self) -> list[TimeSpanElement]:
             ),
         ]
 
-    def _get_affecting_time_spans(self, reservation_units: list[ReservationUnit]) -> None:
+    def load_affecting_time_spans(
+        self,
+        pks: list[ReservationUnitPK],
+        *,
+        after: datetime.date | None,
+        until: datetime.date,
+    ) -> None:
         """
-        Find all AffectingTimeSpans for the given ReservationUnits and convert them to a dicts of
+        Find AffectingTimeSpans for the given ReservationUnits and add them to the dicts of
         "closed" and "blocking" TimeSpanElements by the affected ReservationUnit's primary key.
 
+        If `after` is None, find the time spans overlapping the filter period until the `until` date.
+        Otherwise, find the time spans starting after the `after` date until the `until` date,
+        so that time spans loaded for a previous window are not loaded again.
+
         Note: The PK->TimeSpanElements dicts only contain entries for the given ReservationUnits,
         even if the TimeSpanElement would affect other ReservationUnits as well. This is done to allow
         fetching the elements in batches, while also merging overlapping elements for each ReservationUnit.
         """
-        pks: list[ReservationUnitPK] = [result.pk for result in reservation_units]
+        if after is None:
+            period = models.Q(buffered_end_datetime__date__gte=self.filter_date_start)
+        else:
+            period = models.Q(buffered_start_datetime__date__gt=after)
+
         results = (
             AffectingTimeSpan.objects
             .filter(
+                period,
                 affected_reservation_unit_ids__overlap=pks,
-                buffered_start_datetime__date__lte=self.filter_date_end,
-                buffered_end_datetime__date__gte=self.filter_date_start,
+                buffered_start_datetime__date__lte=until,
             )
             .annotate(
                 start_datetime=models.F("buffered_start_datetime") + models.F("buffer_time_before"),
@@ -526,34 +562,30 @@ def _get_affecting_time_spans(self, reservation_units: list[ReservationUnit]) ->
             )
         )
 
-        # TODO: This part is still slow, since we calculate and merge the time spans in advance for the whole period.
-        #  We should probably calculate them in batches of periods where we are likely to find a valid FRT result
-        #  (e.g. a week at a time). Maybe should take into account reservation unit settings and opening hours?
-
         closed = self.reservation_closed_time_spans_map
         blocking = self.blocking_reservation_closed_time_spans_map
 
+        # Time spans are collected to columnar arrays, so that we don't need to create
+        # TimeSpanElements for all of them, only for the ReservationUnits we actually calculate FRT for.
         for result in results:
-            time_span_element = TimeSpanElement(
-                start_datetime=result["start_datetime"],
-                end_datetime=result["end_datetime"],
-                is_reservable=False,
-                buffer_time_before=result["buffer_before"],
-                buffer_time_after=result["buffer_after"],
-            )
             time_spans_map = blocking if result["is_blocking"] else closed
             for pk in result["affected_reservation_unit_ids"]:
                 if pk in pks:
-                    time_spans_map.setdefault(pk, []).append(time_span_element)
+                    time_spans_map.setdefault(pk, TimeSpanElementArray()).append(
+                        start_datetime=result["start_datetime"],
+                        end_datetime=result["end_datetime"],
+                        buffer_time_before=result["buffer_before"],
+                        buffer_time_after=result["buffer_after"],
+                    )
 
         # Merge overlapping elements for each reservation unit to optimize FRT calculation
-        # Only merge what was added, not what is already in the dicts!
+        # Only merge the elements of the given reservation units, not what is already in the dicts!
         for pk in pks:
             timespans = closed.get(pk)
             if timespans is not None:
-                closed[pk] = merge_overlapping_time_span_elements(timespans)
+                closed[pk] = timespans.merge_overlapping()
 
         for pk in pks:
             timespans = blocking.get(pk)
             if timespans is not None:
-                blocking[pk] = merge_overlapping_time_span_elements(timespans)
+                blocking[pk] = timespans.merge_overlapping()
@@ -2,6 +2,7 @@
 
 import datetime
 import math
+from copy import copy
 from typing import TYPE_CHECKING
 
 from tilavarauspalvelu.exceptions import FirstReservableTimeError
@@ -12,7 +13,6 @@
 
 if TYPE_CHECKING:
     from tilavarauspalvelu.integrations.opening_hours.time_span_element import TimeSpanElement
-    from tilavarauspalvelu.models import ReservableTimeSpan
     from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_reservation_unit_helper import (
         ReservationUnitFirstReservableTimeHelper,
     )
@@ -26,18 +26,19 @@ class ReservableTimeSpanFirstReservableTimeHelper:
     """
 
     parent: ReservationUnitFirstReservableTimeHelper
-    reservable_time_span: ReservableTimeSpan
+    # ReservableTimeSpan as a TimeSpanElement in the default timezone. Not modified during the calculation.
+    reservable_time_span: TimeSpanElement
 
     def __init__(
         self,
         parent: ReservationUnitFirstReservableTimeHelper,
-        reservable_time_span: ReservableTimeSpan,
+        reservable_time_span: TimeSpanElement,
     ) -> None:
         self.parent = parent
         self.reservable_time_span = reservable_time_span
 
     def calculate_first_reservable_time(self) -> ReservableTimeOutput:
-        current_time_span = self.reservable_time_span.as_time_span_element()
+        current_time_span = copy(self.reservable_time_span)
 
         # Remove hard closed time spans from given reservable time span.
         # This might split it into multiple time spans, thus the list.
@@ -61,31 +62,35 @@ def calculate_first_reservable_time(self) -> ReservableTimeOutput:
         # Finally, try to find the first reservable time span from the left over reservable time spans.
         first_reservable_time: datetime.datetime | None = self._find_first_reservable_time_span(
             normalised_reservable_time_spans=normalised_time_spans,
-            reservation_time_spans=self.parent.reservation_closed_time_spans,
+            reservation_time_spans=self.parent.reservation_closed_time_span_elements,
         )
 
         return ReservableTimeOutput(is_closed=False, first_reservable_time=first_reservable_time)
 
     def _hard_normalise_time_span(self, current_time_span: TimeSpanElement) -> list[TimeSpanElement]:
         """Remove Hard-Closed time spans from a TimeSpanElement."""
-        combined_hard_closed_time_spans: list[TimeSpanElement] = (
-            self.parent.hard_closed_time_spans
-            + current_time_span.generate_closed_time_spans_outside_filter(
-                filter_time_start=self.parent.parent.filter_time_start,
-                filter_time_end=self.parent.parent.filter_time_end,
-            )
+        # Closed time spans generated from the filter values are different for each reservable time span,
+        # so they are not part of the index. Generate them before normalisation modifies the time span.
+        filter_closed_time_spans = current_time_span.generate_closed_time_spans_outside_filter(
+            filter_time_start=self.parent.parent.filter_time_start,
+            filter_time_end=self.parent.parent.filter_time_end,
         )
 
-        return override_reservable_with_closed_time_spans(
+        normalised_time_spans = self.parent.hard_closed_time_span_index.override_reservable_time_spans(
             reservable_time_spans=[current_time_span],
-            closed_time_spans=combined_hard_closed_time_spans,
+        )
+        if not filter_closed_time_spans:
+            return normalised_time_spans
+
+        return override_reservable_with_closed_time_spans(
+            reservable_time_spans=normalised_time_spans,
+            closed_time_spans=filter_closed_time_spans,
         )
 
     def _soft_normalise_time_span(self, hard_normalised_time_spans: list[TimeSpanElement]) -> list[TimeSpanElement]:
         """Remove Soft-Closed time spans from the reservable time span."""
-        return override_reservable_with_closed_time_spans(
+        return self.parent.soft_closed_time_span_index.override_reservable_time_spans(
             reservable_time_spans=hard_normalised_time_spans,
-            closed_time_spans=self.parent.soft_closed_time_spans,
         )
 
     def _find_first_reservable_time_span(
@@ -198,7 +203,7 @@ def _move_time_span_to_next_valid_start_time(self, time_span: TimeSpanElement) -
           - A new reservation must start at 11:15, 12:45, 14:15, 15:45 etc.
         """
         reservation_unit = self.parent.reservation_unit
-        interval_minutes = reservation_unit.actions.start_interval_minutes
+        interval_minutes = reservation_unit.start_interval_minutes
 
         time_span.round_start_time_to_next_minute()
 
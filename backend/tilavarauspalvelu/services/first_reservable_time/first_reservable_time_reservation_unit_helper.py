@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 import datetime
+from functools import cached_property
 from typing import TYPE_CHECKING
 
 from tilavarauspalvelu.integrations.opening_hours.time_span_element import TimeSpanElement
-from tilavarauspalvelu.integrations.opening_hours.time_span_element_utils import merge_overlapping_time_span_elements
+from tilavarauspalvelu.integrations.opening_hours.time_span_element_array import TimeSpanElementArray
+from tilavarauspalvelu.integrations.opening_hours.time_span_element_utils import (
+    ClosedTimeSpanIndex,
+    merge_overlapping_time_span_elements,
+)
 from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_reservable_time_span_helper import (
     ReservableTimeSpanFirstReservableTimeHelper,
 )
@@ -13,19 +18,23 @@
 
 if TYPE_CHECKING:
     from tilavarauspalvelu.enums import AccessType
-    from tilavarauspalvelu.models import ReservationUnit
-    from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_helper import FirstReservableTimeHelper
+    from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_calculation import (
+        FirstReservableTimeCalculationContext,
+        ReservationUnitCalculationData,
+    )
 
 
 class ReservationUnitFirstReservableTimeHelper:
     """
     Helper class for finding the first reservable time for a ReservationUnit.
 
-    This helper is meant to be used only together with the `FirstReservableTimeHelper` class.
+    This helper is meant to be used only together with the `FirstReservableTimeHelper` class,
+    which passes the values needed for the calculation in a `FirstReservableTimeCalculationContext`.
+    The ReservationUnit is read from its `ReservationUnitCalculationData`, which contains only plain values.
     """
 
-    parent: FirstReservableTimeHelper
-    reservation_unit: ReservationUnit
+    parent: FirstReservableTimeCalculationContext
+    reservation_unit: ReservationUnitCalculationData
 
     # Hard Closed Time Spans
     # [x] Affects closed status
@@ -40,12 +49,19 @@ class ReservationUnitFirstReservableTimeHelper:
     # BLOCKED-type Reservation Closed Time Spans
     # [ ] Affects closed status
     # [X] Can overlap with buffers
-    blocking_reservation_closed_time_spans: list[TimeSpanElement]
+    blocking_reservation_closed_time_spans: TimeSpanElementArray
 
     # Reservation Closed Time Spans
     # [ ] Affects closed status
     # [ ] Can overlap with buffers
-    reservation_closed_time_spans: list[TimeSpanElement]
+    reservation_closed_time_spans: TimeSpanElementArray
+
+    # Indexes for the hard and soft closed time spans, which are used to normalise every
+    # ReservableTimeSpan of the ReservationUnit, so that they don't need to be sorted and merged every time.
+    # Reservation closed time spans are soft closed, and are added to the soft closed time span index
+    # directly from their arrays, so that they don't need to be converted to TimeSpanElements for it.
+    hard_closed_time_span_index: ClosedTimeSpanIndex
+    soft_closed_time_span_index: ClosedTimeSpanIndex
 
     # Minimum duration in minutes for the ReservationUnit
     minimum_duration_minutes: int
@@ -54,7 +70,15 @@ class ReservationUnitFirstReservableTimeHelper:
 
     is_reservation_unit_closed: bool
 
-    def __init__(self, parent: FirstReservableTimeHelper, reservation_unit: ReservationUnit) -> None:
+    # Set if the first reservable time could not be determined, because the closed time spans
+    # have not been loaded for the whole period where the search would need to continue.
+    is_search_incomplete: bool
+
+    def __init__(
+        self,
+        parent: FirstReservableTimeCalculationContext,
+        reservation_unit: ReservationUnitCalculationData,
+    ) -> None:
         self.parent = parent
         self.reservation_unit = reservation_unit
 
@@ -64,16 +88,21 @@ def __init__(self, parent: FirstReservableTimeHelper, reservation_unit: Reservat
         )
 
         pk = reservation_unit.pk
-        self.reservation_closed_time_spans = parent.reservation_closed_time_spans_map.get(pk, [])
-        self.blocking_reservation_closed_time_spans = parent.blocking_reservation_closed_time_spans_map.get(pk, [])
+        self.reservation_closed_time_spans = parent.reservation_closed_time_spans_map.get(pk, TimeSpanElementArray())
+        self.blocking_reservation_closed_time_spans = parent.blocking_reservation_closed_time_spans_map.get(
+            pk, TimeSpanElementArray()
+        )
+
+        self.soft_closed_time_spans = self._get_soft_closed_time_spans()
 
-        self.soft_closed_time_spans = merge_overlapping_time_span_elements(
-            self._get_soft_closed_time_spans(),
+        self.hard_closed_time_span_index = ClosedTimeSpanIndex(self.hard_closed_time_spans)
+        self.soft_closed_time_span_index = ClosedTimeSpanIndex(
+            self.soft_closed_time_spans,
             self.reservation_closed_time_spans,
             self.blocking_reservation_closed_time_spans,
         )
 
-        start_interval_minutes = reservation_unit.actions.start_interval_minutes
+        start_interval_minutes = reservation_unit.start_interval_minutes
 
         self.minimum_duration_minutes = max(
             parent.filter_minimum_duration_minutes,
@@ -95,18 +124,30 @@ def __init__(self, parent: FirstReservableTimeHelper, reservation_unit: Reservat
 
     def calculate_first_reservable_time(self) -> ReservableTimeOutput:
         self.is_reservation_unit_closed = True
+        self.is_search_incomplete = False
 
         # ReservationUnits are not reservable without a HaukiResource
-        if self.reservation_unit.origin_hauki_resource is None:
+        if self.reservation_unit.reservable_time_spans is None:
             return ReservableTimeOutput(is_closed=self.is_reservation_unit_closed, first_reservable_time=None)
 
+        search_end = self.parent.search_end
+
         # Go through each ReservableTimeSpan individually one-by-one until a suitable time span is found.
-        for reservable_time_span in self.reservation_unit.origin_hauki_resource.reservable_time_spans.all():
+        for reservable_time_span in self.reservation_unit.reservable_time_spans:
+            # Reservations after the search end have not been loaded, so we can't continue the search.
+            if search_end is not None and reservable_time_span.start_datetime >= search_end:
+                self.is_search_incomplete = True
+                return ReservableTimeOutput(is_closed=self.is_reservation_unit_closed, first_reservable_time=None)
+
             helper = ReservableTimeSpanFirstReservableTimeHelper(parent=self, reservable_time_span=reservable_time_span)
             output = helper.calculate_first_reservable_time()
 
             # If we have found a first reservable time, we can return early
             if output.first_reservable_time is not None:
+                # Reservations that haven't been loaded could still overlap with a reservation
+                # made at the found time if it would end after the search end.
+                if search_end is not None and self._get_buffered_end(output.first_reservable_time) > search_end:
+                    self.is_search_incomplete = True
                 return output
 
             # The ReservationUnit is not closed. Save the value in case we don't find a first reservable time.
@@ -127,9 +168,23 @@ def calculate_first_reservable_time(self) -> ReservableTimeOutput:
                     self.soft_closed_time_spans,
                 )
                 self.soft_closed_time_spans = []
+                self.hard_closed_time_span_index = ClosedTimeSpanIndex(
+                    self.hard_closed_time_spans,
+                    self.reservation_closed_time_spans,
+                    self.blocking_reservation_closed_time_spans,
+                )
+                self.soft_closed_time_span_index = ClosedTimeSpanIndex(self.soft_closed_time_spans)
 
         return ReservableTimeOutput(is_closed=self.is_reservation_unit_closed, first_reservable_time=None)
 
+    @cached_property
+    def reservation_closed_time_span_elements(self) -> list[TimeSpanElement]:
+        """
+        Reservation closed time spans as TimeSpanElements for checking the buffers of the found reservable time spans.
+        Only converted if a reservable time span is left after normalising it with the closed time spans.
+        """
+        return self.reservation_closed_time_spans.to_time_span_elements()
+
     def get_access_type_for_date(
         self,
         is_closed: bool,  # noqa: FBT001
@@ -141,11 +196,16 @@ def get_access_type_for_date(
             access_type_date = first_reservable_time.date()
 
         # Find the access type active at the first reservable time (These are sorted in reverse order in the QuerySet)
-        for access_type in self.reservation_unit.access_types.all():
-            if access_type.begin_date <= access_type_date:
-                return access_type.access_type
+        for begin_date, access_type in self.reservation_unit.access_types:
+            if begin_date <= access_type_date:
+                return access_type
         return None
 
+    def _get_buffered_end(self, begin: datetime.datetime) -> datetime.datetime:
+        """Get the end of the shortest possible reservation starting at the given time, including its buffer."""
+        buffer_time_after = self.reservation_unit.buffer_time_after or datetime.timedelta()
+        return begin + datetime.timedelta(minutes=self.minimum_duration_minutes) + buffer_time_after
+
     def _get_hard_closed_time_spans(self) -> list[TimeSpanElement]:
         """
         Get a list of closed time spans that cause the ReservationUnit to be shown as closed
@@ -189,13 +249,11 @@ def _get_hard_closed_time_spans(self) -> list[TimeSpanElement]:
         # so we don't need to filter those away here.
         reservation_unit_closed_time_spans.extend(
             TimeSpanElement(
-                start_datetime=local_start_of_day(application_round.reservation_period_begin_date),
-                end_datetime=(
-                    local_start_of_day(application_round.reservation_period_end_date) + datetime.timedelta(days=1)
-                ),
+                start_datetime=local_start_of_day(period_begin_date),
+                end_datetime=local_start_of_day(period_end_date) + datetime.timedelta(days=1),
                 is_reservable=False,
             )
-            for application_round in self.reservation_unit.application_rounds.all()
+            for period_begin_date, period_end_date in self.reservation_unit.application_round_periods
         )
 
         return reservation_unit_closed_time_spans
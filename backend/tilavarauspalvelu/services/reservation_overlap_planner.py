@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import bisect
+import datetime
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+from tilavarauspalvelu.models import Reservation, ReservationUnitHierarchy
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from tilavarauspalvelu.integrations.opening_hours.time_span_element import TimeSpanElement
+    from tilavarauspalvelu.models import ReservationUnit
+
+__all__ = [
+    "ReservationOverlapPlanner",
+]
+
+
+type ReservationUnitPK = int
+
+
+class ReservationOverlapPlanner:
+    """
+    Find reservations that overlap with periods in many reservation units at once,
+    e.g., when generating reservation series for all allocations of an application round.
+
+    All reservations that could overlap with the given period in any reservation unit related
+    to the given reservation units through the reservation unit hierarchy are loaded in a single query,
+    and indexed by their reservation unit. Reservations created while planning should be added
+    to the planner with `add_reservations`, so that they are accounted for in later checks.
+    """
+
+    def __init__(
+        self,
+        reservation_units: Iterable[ReservationUnit],
+        begin: datetime.datetime,
+        end: datetime.datetime,
+    ) -> None:
+        pks = {reservation_unit.pk for reservation_unit in reservation_units}
+
+        self.related_reservation_unit_ids: dict[ReservationUnitPK, list[ReservationUnitPK]] = dict(
+            ReservationUnitHierarchy.objects.filter(reservation_unit__in=pks).values_list(
+                "reservation_unit_id", "related_reservation_unit_ids"
+            )
+        )
+        self.indexes: defaultdict[ReservationUnitPK, TimeSpanIndex] = defaultdict(TimeSpanIndex)
+
+        related_pks = {pk for related in self.related_reservation_unit_ids.values() for pk in related}
+        if not related_pks:
+            return
+
+        reservations = (
+            Reservation.objects
+            .with_buffered_begin_and_end()
+            .going_to_occur()
+            .filter(
+                reservation_unit__in=related_pks,
+                buffered_ends_at__gt=begin.astimezone(datetime.UTC),
+                buffered_begins_at__lt=end.astimezone(datetime.UTC),
+            )
+            .only("reservation_unit_id", "begins_at", "ends_at", "buffer_time_before", "buffer_time_after", "type")
+        )
+        self.add_reservations(reservations)
+
+    def add_reservations(self, reservations: Iterable[Reservation]) -> None:
+        for reservation in reservations:
+            self.indexes[reservation.reservation_unit_id].add(reservation.as_time_span_element())
+
+    def overlapping_time_spans(
+        self,
+        reservation_unit: ReservationUnit,
+        begin: datetime.datetime,
+        end: datetime.datetime,
+    ) -> Iterator[TimeSpanElement]:
+        """
+        Find the time spans of the reservations in the reservation unit's hierarchy
+        whose buffered time overlaps with the given period.
+        """
+        for pk in self.related_reservation_unit_ids.get(reservation_unit.pk, []):
+            index = self.indexes.get(pk)
+            if index is not None:
+                yield from index.overlapping(begin, end)
+
+
+class TimeSpanIndex:
+    """Time spans sorted by their buffered start time, for finding the time spans overlapping a period."""
+
+    __slots__ = ("max_duration", "starts", "time_spans")
+
+    def __init__(self) -> None:
+        self.starts: list[datetime.datetime] = []
+        self.time_spans: list[TimeSpanElement] = []
+        self.max_duration = datetime.timedelta()
+
+    def add(self, time_span: TimeSpanElement) -> None:
+        index = bisect.bisect_right(self.starts, time_span.buffered_start_datetime)
+        self.starts.insert(index, time_span.buffered_start_datetime)
+        self.time_spans.insert(index, time_span)
+
+        duration = time_span.buffered_end_datetime - time_span.buffered_start_datetime
+        self.max_duration = max(self.max_duration, duration)
+
+    def overlapping(self, begin: datetime.datetime, end: datetime.datetime) -> Iterator[TimeSpanElement]:
+        # Time spans starting before this cannot end after the period begins.
+        low = bisect.bisect_left(self.starts, begin - self.max_duration)
+        high = bisect.bisect_left(self.starts, end)
+
+        for time_span in self.time_spans[low:high]:
+            if time_span.buffered_end_datetime > begin:
+                yield time_span
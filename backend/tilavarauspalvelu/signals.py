@@ -34,15 +34,22 @@
 
 from tilavarauspalvelu.integrations.sentry import SentryLogger
 from tilavarauspalvelu.models import (
+    ApplicationRound,
+    Equipment,
     IntendedUse,
     PaymentAccounting,
     Reservation,
     ReservationUnit,
+    ReservationUnitAccessType,
     ReservationUnitImage,
+    ReservationUnitType,
+    Resource,
     Space,
     Unit,
 )
+from tilavarauspalvelu.services.first_reservable_time.first_reservable_time_cache import FirstReservableTimeCache
 from tilavarauspalvelu.tasks import (
+    coalesce_task,
     create_statistics_for_reservations_task,
     purge_image_cache_task,
     refresh_reservation_unit_accounting_task,
@@ -90,29 +97,89 @@ def _reservation_unit_image_pre_save(sender: Any, **kwargs: Unpack[PreSaveKwargs
 # --- Post save signals -------------------------------------------------------------------------------------------
 
 
+def _update_reservation_unit_search_vectors(
+    instance: Space | Unit | Resource | IntendedUse | Equipment | ReservationUnitType,
+    *,
+    using: str | None,
+) -> None:
+    """Update the search vectors of the reservation units that use the given related object, if there are any."""
+    pks = list(instance.reservation_units.values_list("pk", flat=True))
+    if pks:
+        coalesce_task(update_reservation_unit_search_vectors_task, {"pks": pks}, using=using)
+
+
 @receiver(post_save, sender=Space, dispatch_uid="space_post_save")
 def _space_post_save(sender: Any, **kwargs: Unpack[PostSaveKwargs[Space]]) -> None:
+    instance = kwargs["instance"]
     using = kwargs["using"]
 
     if settings.REBUILD_SPACE_HIERARCHY:
         Space.objects.rebuild()
 
     if settings.UPDATE_RESERVATION_UNIT_HIERARCHY:
-        update_reservation_unit_hierarchy_task.delay(using=using)
+        coalesce_task(update_reservation_unit_hierarchy_task, {"using": using, "space_ids": [instance.pk]}, using=using)
+
+    if settings.UPDATE_SEARCH_VECTORS:
+        _update_reservation_unit_search_vectors(instance, using=using)
 
 
 @receiver(post_save, sender=Reservation, dispatch_uid="reservation_post_save")
 def _reservation_post_save(sender: Any, **kwargs: Unpack[PostSaveKwargs[Reservation]]) -> None:
     instance = kwargs["instance"]
-    _using = kwargs["using"]
+    using = kwargs["using"]
 
     if settings.SAVE_RESERVATION_STATISTICS:
-        create_statistics_for_reservations_task.delay(reservation_pks=[instance.pk])
+        coalesce_task(create_statistics_for_reservations_task, {"reservation_pks": [instance.pk]}, using=using)
 
-    # TODO: Disabled for now, since it might contribute to timeouts in production.
-    #  Refresh still happens on a background task every 2 minutes.
-    #  if settings.UPDATE_AFFECTING_TIME_SPANS:  # noqa: ERA001,RUF100
-    #      update_affecting_time_spans_task.delay(using=using)  # noqa: ERA001,RUF100
+    # Note: AffectingTimeSpans are updated by database triggers.
+
+    # Reservations affect the first reservable times of all reservation units in the same hierarchy.
+    reservation_unit_ids = _first_reservable_time_affected_reservation_unit_ids(
+        instance,
+        created=kwargs["created"],
+        update_fields=kwargs["update_fields"],
+    )
+    if reservation_unit_ids:
+        FirstReservableTimeCache.invalidate_on_commit(reservation_unit_ids, include_related=True, using=using)
+
+
+def _first_reservable_time_affected_reservation_unit_ids(
+    instance: Reservation,
+    *,
+    created: bool,
+    update_fields: frozenset[str] | None,
+) -> set[int]:
+    """
+    Get the reservation units whose first reservable times are affected by saving the given reservation,
+    i.e. its current and previous reservation unit if any of the saved `first_reservable_time_fields` changed.
+    """
+    fields = [instance._meta.get_field(name) for name in Reservation.first_reservable_time_fields]
+    if update_fields is not None:
+        fields = [field for field in fields if field.name in update_fields or field.attname in update_fields]
+        if not fields:
+            return set()
+
+    # Deferred fields that have not been set are not saved.
+    saved_values = {
+        field.attname: instance.__dict__[field.attname] for field in fields if field.attname in instance.__dict__
+    }
+
+    previous_values = getattr(instance, "loaded_first_reservable_time_values", None)
+    instance.loaded_first_reservable_time_values = (previous_values or {}) | saved_values
+
+    # Reservations that were not loaded from the database cannot be compared to their previous values.
+    if not created and previous_values is not None:
+        changed = any(
+            attname not in previous_values or previous_values[attname] != value
+            for attname, value in saved_values.items()
+        )
+        if not changed:
+            return set()
+
+    reservation_unit_ids = {instance.reservation_unit_id}
+    if previous_values is not None and "reservation_unit_id" in previous_values:
+        reservation_unit_ids.add(previous_values["reservation_unit_id"])
+    return reservation_unit_ids
 
 
 @receiver(post_save, sender=ReservationUnit, dispatch_uid="reservation_unit_post_save")
@@ -125,10 +192,31 @@ def _reservation_unit_post_save(sender: Any, **kwargs: Unpack[PostSaveKwargs[Res
         refresh_reservation_unit_product_mapping_task.delay(instance.pk)
 
     if settings.UPDATE_RESERVATION_UNIT_HIERARCHY and created:
-        update_reservation_unit_hierarchy_task.delay(using=using)
+        coalesce_task(
+            update_reservation_unit_hierarchy_task, {"using": using, "reservation_unit_ids": [instance.pk]}, using=using
+        )
 
     if settings.UPDATE_SEARCH_VECTORS:
-        update_reservation_unit_search_vectors_task.delay(pks=[instance.pk])
+        coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [instance.pk]}, using=using)
+
+    FirstReservableTimeCache.invalidate([instance.pk])
+
+
+@receiver(post_save, sender=ReservationUnitAccessType, dispatch_uid="reservation_unit_access_type_post_save")
+def _reservation_unit_access_type_post_save(
+    sender: Any,
+    **kwargs: Unpack[PostSaveKwargs[ReservationUnitAccessType]],
+) -> None:
+    instance = kwargs["instance"]
+
+    FirstReservableTimeCache.invalidate([instance.reservation_unit_id])
+
+
+@receiver(post_save, sender=ApplicationRound, dispatch_uid="application_round_post_save")
+def _application_round_post_save(sender: Any, **kwargs: Unpack[PostSaveKwargs[ApplicationRound]]) -> None:
+    instance = kwargs["instance"]
+
+    FirstReservableTimeCache.invalidate(instance.reservation_units.values_list("pk", flat=True))
 
 
 @receiver(post_save, sender=ReservationUnitImage, dispatch_uid="reservation_unit_image_post_save")
@@ -142,10 +230,46 @@ def _reservation_unit_image_post_save(sender: Any, **kwargs: Unpack[PostSaveKwar
 @receiver(post_save, sender=Unit, dispatch_uid="unit_post_save")
 def _unit_post_save(sender: Any, **kwargs: Unpack[PostSaveKwargs[Unit]]) -> None:
     instance = kwargs["instance"]
+    using = kwargs["using"]
 
     if settings.UPDATE_SEARCH_VECTORS:
-        pks = list(instance.reservation_units.values_list("pk", flat=True))
-        update_reservation_unit_search_vectors_task.delay(pks=pks)
+        _update_reservation_unit_search_vectors(instance, using=using)
+
+
+@receiver(post_save, sender=Resource, dispatch_uid="resource_post_save")
+def _resource_post_save(sender: Any, **kwargs: Unpack[PostSaveKwargs[Resource]]) -> None:
+    instance = kwargs["instance"]
+    using = kwargs["using"]
+
+    if settings.UPDATE_SEARCH_VECTORS:
+        _update_reservation_unit_search_vectors(instance, using=using)
+
+
+@receiver(post_save, sender=IntendedUse, dispatch_uid="intended_use_post_save")
+def _intended_use_post_save(sender: Any, **kwargs: Unpack[PostSaveKwargs[IntendedUse]]) -> None:
+    instance = kwargs["instance"]
+    using = kwargs["using"]
+
+    if settings.UPDATE_SEARCH_VECTORS:
+        _update_reservation_unit_search_vectors(instance, using=using)
+
+
+@receiver(post_save, sender=Equipment, dispatch_uid="equipment_post_save")
+def _equipment_post_save(sender: Any, **kwargs: Unpack[PostSaveKwargs[Equipment]]) -> None:
+    instance = kwargs["instance"]
+    using = kwargs["using"]
+
+    if settings.UPDATE_SEARCH_VECTORS:
+        _update_reservation_unit_search_vectors(instance, using=using)
+
+
+@receiver(post_save, sender=ReservationUnitType, dispatch_uid="reservation_unit_type_post_save")
+def _reservation_unit_type_post_save(sender: Any, **kwargs: Unpack[PostSaveKwargs[ReservationUnitType]]) -> None:
+    instance = kwargs["instance"]
+    using = kwargs["using"]
+
+    if settings.UPDATE_SEARCH_VECTORS:
+        _update_reservation_unit_search_vectors(instance, using=using)
 
 
 @receiver(post_save, sender=PaymentAccounting, dispatch_uid="payment_accounting_post_save")
@@ -169,26 +293,38 @@ def _space_post_delete(sender: Any, **kwargs: Unpack[PostDeleteKwargs[Space]]) -
     if settings.REBUILD_SPACE_HIERARCHY:
         Space.objects.rebuild()
 
+    # Reservation units of the deleted spaces cannot be found anymore, so refresh the whole hierarchy.
     if settings.UPDATE_RESERVATION_UNIT_HIERARCHY:
-        update_reservation_unit_hierarchy_task.delay(using=using)
+        coalesce_task(update_reservation_unit_hierarchy_task, {"using": using}, using=using)
 
 
 @receiver(post_delete, sender=Reservation, dispatch_uid="reservation_post_delete")
 def _reservation_post_delete(sender: Any, **kwargs: Unpack[PostDeleteKwargs[Reservation]]) -> None:
-    _using = kwargs["using"]
+    instance = kwargs["instance"]
+    using = kwargs["using"]
 
-    # TODO: Disabled for now, since it might contribute to timeouts in production.
-    #  Refresh still happens on a background task every 2 minutes.
-    #  if settings.UPDATE_AFFECTING_TIME_SPANS:  # noqa: ERA001,RUF100
-    #      update_affecting_time_spans_task.delay(using=using)  # noqa: ERA001,RUF100
+    FirstReservableTimeCache.invalidate_on_commit([instance.reservation_unit_id], include_related=True, using=using)
+
+
+@receiver(post_delete, sender=ReservationUnitAccessType, dispatch_uid="reservation_unit_access_type_post_delete")
+def _reservation_unit_access_type_post_delete(
+    sender: Any,
+    **kwargs: Unpack[PostDeleteKwargs[ReservationUnitAccessType]],
+) -> None:
+    instance = kwargs["instance"]
+
+    FirstReservableTimeCache.invalidate([instance.reservation_unit_id])
 
 
 @receiver(post_delete, sender=ReservationUnit, dispatch_uid="reservation_unit_post_delete")
 def _reservation_unit_post_delete(sender: Any, **kwargs: Unpack[PostDeleteKwargs[ReservationUnit]]) -> None:
+    instance = kwargs["instance"]
     using = kwargs["using"]
 
     if settings.UPDATE_RESERVATION_UNIT_HIERARCHY:
-        update_reservation_unit_hierarchy_task.delay(using=using)
+        coalesce_task(
+            update_reservation_unit_hierarchy_task, {"using": using, "reservation_unit_ids": [instance.pk]}, using=using
+        )
 
 
 # --- M2M changed signals -----------------------------------------------------------------------------------------
@@ -198,52 +334,106 @@ def _reservation_unit_post_delete(sender: Any, **kwargs: Unpack[PostDeleteKwargs
 def _reservation_unit_spaces_m2m(sender: Any, **kwargs: Unpack[M2MChangedKwargs[ReservationUnit]]) -> None:
     action = kwargs["action"]
     instance = kwargs["instance"]
+    reverse = kwargs["reverse"]
     using = kwargs["using"]
 
     post_modify = action in {"post_add", "post_remove", "post_clear"}
 
     if settings.UPDATE_RESERVATION_UNIT_HIERARCHY and post_modify:
-        update_reservation_unit_hierarchy_task.delay(using=using)
+        # When modified from the space's side, the instance is a space.
+        if reverse:
+            coalesce_task(
+                update_reservation_unit_hierarchy_task, {"using": using, "space_ids": [instance.pk]}, using=using
+            )
+        else:
+            coalesce_task(
+                update_reservation_unit_hierarchy_task,
+                {"using": using, "reservation_unit_ids": [instance.pk]},
+                using=using,
+            )
 
     if settings.UPDATE_SEARCH_VECTORS and post_modify:
-        update_reservation_unit_search_vectors_task.delay(pks=[instance.pk])
+        coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [instance.pk]}, using=using)
 
 
 @receiver(m2m_changed, sender=ReservationUnit.resources.through, dispatch_uid="reservation_unit_resources_m2m")
 def _reservation_unit_resources_m2m(sender: Any, **kwargs: Unpack[M2MChangedKwargs[ReservationUnit]]) -> None:
     action = kwargs["action"]
     instance = kwargs["instance"]
+    reverse = kwargs["reverse"]
     using = kwargs["using"]
 
     post_modify = action in {"post_add", "post_remove", "post_clear"}
 
     if settings.UPDATE_RESERVATION_UNIT_HIERARCHY and post_modify:
-        update_reservation_unit_hierarchy_task.delay(using=using)
+        # When modified from the resource's side, the instance is a resource, and the reservation units
+        # removed by a clear are not known anymore, so the whole hierarchy is refreshed.
+        if not reverse:
+            coalesce_task(
+                update_reservation_unit_hierarchy_task,
+                {"using": using, "reservation_unit_ids": [instance.pk]},
+                using=using,
+            )
+        elif action == "post_clear":
+            coalesce_task(update_reservation_unit_hierarchy_task, {"using": using}, using=using)
+        else:
+            coalesce_task(
+                update_reservation_unit_hierarchy_task,
+                {"using": using, "reservation_unit_ids": list(kwargs["pk_set"])},
+                using=using,
+            )
 
     if settings.UPDATE_SEARCH_VECTORS and post_modify:
-        update_reservation_unit_search_vectors_task.delay(pks=[instance.pk])
+        coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [instance.pk]}, using=using)
 
 
 @receiver(m2m_changed, sender=ReservationUnit.intended_uses.through, dispatch_uid="reservation_unit_intended_uses_m2m")
 def _reservation_unit_intended_uses_m2m(sender: Any, **kwargs: Unpack[M2MChangedKwargs[ReservationUnit]]) -> None:
     action = kwargs["action"]
     instance = kwargs["instance"]
+    using = kwargs["using"]
 
     post_modify = action in {"post_add", "post_remove", "post_clear"}
 
     if settings.UPDATE_SEARCH_VECTORS and post_modify:
-        update_reservation_unit_search_vectors_task.delay(pks=[instance.pk])
+        coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [instance.pk]}, using=using)
 
 
 @receiver(m2m_changed, sender=ReservationUnit.equipments.through, dispatch_uid="reservation_unit_equipments_m2m")
 def _reservation_unit_equipments_m2m(sender: Any, **kwargs: Unpack[M2MChangedKwargs[ReservationUnit]]) -> None:
     action = kwargs["action"]
     instance = kwargs["instance"]
+    using = kwargs["using"]
 
     post_modify = action in {"post_add", "post_remove", "post_clear"}
 
     if settings.UPDATE_SEARCH_VECTORS and post_modify:
-        update_reservation_unit_search_vectors_task.delay(pks=[instance.pk])
+        coalesce_task(update_reservation_unit_search_vectors_task, {"pks": [instance.pk]}, using=using)
+
+
+@receiver(
+    m2m_changed,
+    sender=ApplicationRound.reservation_units.through,
+    dispatch_uid="application_round_reservation_units_m2m",
+)
+def _application_round_reservation_units_m2m(sender: Any, **kwargs: Unpack[M2MChangedKwargs[ApplicationRound]]) -> None:
+    action = kwargs["action"]
+    instance = kwargs["instance"]
+    reverse = kwargs["reverse"]
+
+    # Reservation units removed by a clear can only be found before the clear.
+    if action not in {"post_add", "post_remove", "pre_clear"}:
+        return
+
+    # When modified from the reservation unit's side, the instance is a reservation unit.
+    if reverse:
+        pks = [instance.pk]
+    elif action == "pre_clear":
+        pks = list(instance.reservation_units.values_list("pk", flat=True))
+    else:
+        pks = list(kwargs["pk_set"])
+
+    FirstReservableTimeCache.invalidate(pks)
 
 
 # --- Misc signals ------------------------------------------------------------------------------------------------
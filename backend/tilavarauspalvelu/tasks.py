@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import datetime
+import hashlib
+import json
 import time
 import uuid
 from decimal import Decimal
 from functools import wraps
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
+from weakref import WeakKeyDictionary
 
 from django.conf import settings
 from django.core.cache import cache
@@ -24,8 +27,10 @@
     PaymentOrder,
     PersonalInfoViewLog,
     Reservation,
+    ReservationOccupancy,
     ReservationStatistic,
     ReservationUnit,
+    ReservationUnitFirstReservableTime,
     ReservationUnitHierarchy,
     ReservationUnitImage,
     ReservationUnitPricing,
@@ -42,6 +47,7 @@
     from collections.abc import Collection, Iterable
 
     from celery.contrib.django.task import Task
+    from django.db.backends.base.base import BaseDatabaseWrapper
 
 
 __all__ = [
@@ -60,14 +66,17 @@
     "refresh_reservation_unit_accounting_task",
     "refresh_reservation_unit_product_mapping_task",
     "remove_old_personal_info_view_logs_task",
+    "run_coalesced_task",
     "save_personal_info_view_log_task",
     "send_application_handled_email_task",
     "send_application_in_allocation_email_task",
     "send_permission_deactivation_email_task",
     "send_user_anonymization_email_task",
     "update_affecting_time_spans_task",
+    "update_first_reservable_times_task",
     "update_origin_hauki_resource_reservable_time_spans_task",
     "update_pindora_access_code_is_active_task",
+    "update_reservation_occupancy_task",
     "update_reservation_unit_hierarchy_task",
     "update_reservation_unit_image_urls_task",
     "update_reservation_unit_pricings_tax_percentage_task",
@@ -114,6 +123,117 @@ def wrapper(*args: P.args, **kwargs: P.kwargs) -> None:
     return task
 
 
+# Pending coalesced task calls for the current transaction of each database connection.
+_coalesced_task_calls: WeakKeyDictionary[BaseDatabaseWrapper, dict[str, _CoalescedTaskCall]] = WeakKeyDictionary()
+
+
+def coalesce_task(task: Task, kwargs: dict[str, Any], *, using: str | None = None) -> None:
+    """
+    Schedule the given task to run with the given keyword arguments after the current transaction commits,
+    coalescing it with other calls to the same task with the same non-list arguments.
+
+    List arguments of coalesced calls are combined. A call without any list arguments (e.g. a full refresh)
+    absorbs all other calls, so list arguments should only be given when they narrow down what the task does.
+
+    After the transaction commits, further calls are coalesced for `COALESCE_SIGNAL_TASKS_WINDOW_SECONDS`
+    before the task is actually run. This way mass operations that trigger the same task from signals
+    for each saved object only schedule the task once.
+
+    :param task: The task to run.
+    :param kwargs: Keyword arguments for the task. Must be JSON serializable.
+    :param using: The database alias whose transaction the call is tied to.
+    """
+    if not settings.COALESCE_SIGNAL_TASKS:
+        task.apply_async(kwargs=kwargs)
+        return
+
+    connection = transaction.get_connection(using)
+    key = _coalesced_task_key(task.name, kwargs)
+
+    pending_calls = _coalesced_task_calls.setdefault(connection, {})
+    pending_call = pending_calls.get(key)
+
+    # Callbacks are discarded when a transaction (or a savepoint) is rolled back,
+    # so only coalesce to calls that are still going to be run.
+    if pending_call is not None and any(func is pending_call for _, func, _ in connection.run_on_commit):
+        pending_call.add(kwargs)
+        return
+
+    pending_call = _CoalescedTaskCall(task_name=task.name, key=key, kwargs=kwargs, pending_calls=pending_calls)
+    pending_calls[key] = pending_call
+    # Runs immediately if not in a transaction.
+    transaction.on_commit(pending_call, using=using)
+
+
+class _CoalescedTaskCall:
+    """Task call waiting for the current transaction to commit."""
+
+    def __init__(
+        self,
+        *,
+        task_name: str,
+        key: str,
+        kwargs: dict[str, Any],
+        pending_calls: dict[str, _CoalescedTaskCall],
+    ) -> None:
+        self.task_name = task_name
+        self.key = key
+        self.kwargs = kwargs
+        self.pending_calls = pending_calls
+
+    def add(self, kwargs: dict[str, Any]) -> None:
+        self.kwargs = _merge_coalesced_task_kwargs([self.kwargs, kwargs])
+
+    def __call__(self) -> None:
+        if self.pending_calls.get(self.key) is self:
+            del self.pending_calls[self.key]
+
+        window = settings.COALESCE_SIGNAL_TASKS_WINDOW_SECONDS
+        if window <= 0:
+            app.tasks[self.task_name].apply_async(kwargs=self.kwargs)
+            return
+
+        # Store the call in the cache under a running index. The first call in a time window schedules
+        # a task that runs all calls stored during the window (and any calls stored after it).
+        cache.add(f"{self.key}:index", 0, timeout=None)
+        index = cache.incr(f"{self.key}:index")
+        cache.set(f"{self.key}:{index}", self.kwargs, timeout=window + 3600)
+
+        if cache.add(f"{self.key}:lock", index, timeout=window):
+            run_coalesced_task.apply_async(
+                kwargs={"task_name": self.task_name, "key": self.key, "start": index},
+                # Some leeway so that calls stored at the end of the window are included.
+                countdown=window + 1,
+            )
+
+
+def _coalesced_task_key(task_name: str, kwargs: dict[str, Any]) -> str:
+    static_kwargs = {name: value for name, value in kwargs.items() if not isinstance(value, list)}
+    digest = hashlib.sha256(json.dumps(static_kwargs, sort_keys=True).encode()).hexdigest()
+    return f"coalesced_task:{task_name}:{digest}"
+
+
+def _merge_coalesced_task_kwargs(calls: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    merged: dict[str, Any] = {}
+    list_kwargs: dict[str, set[Any]] = {}
+    absorb = False
+
+    for kwargs in calls:
+        lists = {name: value for name, value in kwargs.items() if isinstance(value, list)}
+        merged |= {name: value for name, value in kwargs.items() if name not in lists}
+
+        if not lists:
+            absorb = True
+
+        for name, value in lists.items():
+            list_kwargs.setdefault(name, set()).update(value)
+
+    if not absorb:
+        merged |= {name: sorted(values) for name, values in list_kwargs.items()}
+
+    return merged
+
+
 @app.task(
     name="rebuild_space_tree_hierarchy",
     tvp_auto_create_name="Päivitä tilojen puuhierarkia",
@@ -128,6 +248,23 @@ def rebuild_space_tree_hierarchy_task() -> None:
         ReservationUnitHierarchy.refresh()
 
 
+@app.task(name="run_coalesced")
+def run_coalesced_task(task_name: str, key: str, start: int) -> None:
+    """Run the task calls coalesced by `coalesce_task` starting from the given index as a single call."""
+    end: int = cache.get(f"{key}:index", start)
+    item_keys = [f"{key}:{index}" for index in range(start, end + 1)]
+
+    calls = cache.get_many(item_keys)
+    cache.delete_many(item_keys)
+
+    # Calls might have already been run by a task from an earlier time window.
+    if not calls:
+        return
+
+    task: Task = app.tasks[task_name]
+    task(**_merge_coalesced_task_kwargs(calls.values()))
+
+
 @app.task(
     name="update_units_from_tprek",
     tvp_auto_create_name="Päivitä toimipisteiden tiedot",
@@ -290,23 +427,53 @@ def cancel_payment_order_without_webshop_payment_task(payment_order_pk: int) ->
 
 
 @app.task(name="update_reservation_unit_hierarchy")
-def update_reservation_unit_hierarchy_task(using: str | None = None) -> None:
-    ReservationUnitHierarchy.refresh(using=using)
+def update_reservation_unit_hierarchy_task(
+    using: str | None = None,
+    reservation_unit_ids: list[int] | None = None,
+    space_ids: list[int] | None = None,
+) -> None:
+    ReservationUnitHierarchy.refresh(using=using, reservation_unit_ids=reservation_unit_ids, space_ids=space_ids)
 
 
 @app.task(
     name="update_affecting_time_spans",
-    tvp_auto_create_name="Päivitä vaikuttavien varausten tietokantanäkymä",
+    tvp_auto_create_name="Päivitä vaikuttavien varausten tietokantataulu",
     tvp_auto_create_description=(
-        "Päivittää näkymän ensimmäiseen varattavaan aikaan vaikuttavista varauksista, joista tiettyihin "
-        "varausyksikköihin tietyllä aikavälillä vaikuttavat varaukset voidaan hakea esikäsiteltynä."
+        "Päivittää kokonaan taulun ensimmäiseen varattavaan aikaan vaikuttavista varauksista, ja poistaa siitä "
+        "menneet varaukset. Yksittäisten varausten muutokset päivittyvät tauluun automaattisesti."
     ),
-    tvp_auto_create_schedule=CeleryAutoCreateTaskSchedule(hour="*", minute="*/2"),
+    tvp_auto_create_schedule=CeleryAutoCreateTaskSchedule(hour="*", minute="15"),
 )
 def update_affecting_time_spans_task(using: str | None = None) -> None:
     AffectingTimeSpan.refresh(using=using)
 
 
+@app.task(
+    name="update_reservation_occupancy",
+    tvp_auto_create_name="Päivitä varausten tilankäytön tietokantataulu",
+    tvp_auto_create_description=(
+        "Päivittää kokonaan taulun varausten käyttämistä tiloista ja resursseista, ja poistaa siitä "
+        "menneet varaukset. Yksittäisten varausten muutokset päivittyvät tauluun automaattisesti."
+    ),
+    tvp_auto_create_schedule=CeleryAutoCreateTaskSchedule(hour="*", minute="45"),
+)
+def update_reservation_occupancy_task(using: str | None = None) -> None:
+    ReservationOccupancy.refresh(using=using)
+
+
+@app.task(
+    name="update_first_reservable_times",
+    tvp_auto_create_name="Päivitä esilasketut ensimmäiset varattavat ajat",
+    tvp_auto_create_description=(
+        "Laskee ensimmäisen varattavan ajan oletushakuehdoilla niille varausyksiköille, joiden esilaskettu "
+        "tulos puuttuu tai on vanhentunut. Muutokset varausyksiköihin päivittävät tulokset automaattisesti."
+    ),
+    tvp_auto_create_schedule=CeleryAutoCreateTaskSchedule(hour="*", minute="0,5,10,15,20,25,30,35,40,45,50,55"),
+)
+def update_first_reservable_times_task(reservation_unit_ids: list[int] | None = None) -> None:
+    ReservationUnitFirstReservableTime.refresh(reservation_unit_ids=reservation_unit_ids)
+
+
 @app.task(name="create_statistics_for_reservations")
 def create_statistics_for_reservations_task(reservation_pks: list[int]) -> None:
     Reservation.objects.filter(pk__in=reservation_pks).upsert_statistics()
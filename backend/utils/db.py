@@ -22,11 +22,13 @@
 
 __all__ = [
     "ArrayRemove",
+    "ArrayToString",
     "ArrayUnnest",
     "Now",
     "NowTT",
     "SubqueryArray",
     "SubqueryCount",
+    "SubqueryStringAgg",
     "SubquerySum",
     "text_search",
 ]
@@ -114,6 +116,19 @@ class SubquerySum(SubqueryAggregate):
     default_alias = "_sum"
 
 
+class SubqueryStringAgg(SubqueryAggregate):
+    """
+    Concatenate the values of a subquery into a single string, separated by spaces.
+
+    >>> names = Space.objects.filter(reservation_units=models.OuterRef("pk")).values("name")
+    >>> ReservationUnit.objects.annotate(space_names=SubqueryStringAgg(names, aggregate_field="name"))
+    """
+
+    template = "(SELECT STRING_AGG(%(aggregate_field)s, ' ') FROM (%(subquery)s) %(alias)s)"
+    output_field = models.TextField()
+    default_alias = "_string_agg"
+
+
 class SubqueryArray(models.Subquery):
     """
     Aggregate subquery values into an array that can be returned from it.
@@ -170,6 +185,19 @@ class ArrayRemove(models.Func):
     arity = 2
 
 
+class ArrayToString(models.Func):
+    """
+    Concatenates the elements of the given array into a single string, separated by spaces.
+
+    See: https://www.postgresql.org/docs/current/functions-array.html
+    """
+
+    function = "ARRAY_TO_STRING"
+    template = "%(function)s(%(expressions)s, ' ')"
+    arity = 1
+    output_field = models.TextField()
+
+
 class ArrayUnnest(models.Func):
     """
     Expands an array into a set of rows. The array's elements are read out in storage order.
@@ -281,6 +309,7 @@ def text_search[TQuerySet](
     fields: Collection[str],
     text: str,
     *,
+    search_vector: str | None = None,
     language: Literal["finnish", "english", "swedish"] = "finnish",
     or_contains: bool = False,
 ) -> TQuerySet:
@@ -291,13 +320,16 @@ def text_search[TQuerySet](
     :param qs: QuerySet to filter.
     :param fields: Fields to search.
     :param text: Text to search for.
+    :param search_vector: Pre-calculated search vector field built from the given fields in the given language.
+                          If given, the search uses it instead of building a search vector at query time,
+                          which allows using an index on the search vector.
     :param language: Language to search in.
     :param or_contains: Search results with a LIKE query in addition to full text search.
                         This makes the search slower, but complements full text search with partial matches.
     """
-    # If this becomes slow, look into optimisation strategies here:
+    # See optimisation strategies here:
     # https://docs.djangoproject.com/en/5.1/ref/contrib/postgres/search/#performance
-    vector = SearchVector(*fields, config=language)
+    vector = models.F(search_vector) if search_vector is not None else SearchVector(*fields, config=language)
 
     search = build_search(text)
     query = SearchQuery(value=search, config=language, search_type="raw")
@@ -4,7 +4,7 @@
 from typing import TYPE_CHECKING, Any, Literal
 
 import stamina
-from requests import request
+from django.conf import settings
 from rest_framework.status import HTTP_500_INTERNAL_SERVER_ERROR
 
 from utils.external_service.errors import (
@@ -12,10 +12,13 @@
     ExternalServiceParseJSONError,
     ExternalServiceRequestError,
 )
+from utils.external_service.session import get_connection_pool_stats, get_session
 
 if TYPE_CHECKING:
     from requests import Response
 
+    from utils.external_service.session import ConnectionPoolStats
+
 
 class BaseExternalServiceClient:
     """Base class for creating external service clients"""
@@ -75,6 +78,11 @@ def response_json(cls, response: Response) -> dict[str, Any] | list[dict[str, An
 
         return response_json
 
+    @classmethod
+    def connection_pool_stats(cls) -> ConnectionPoolStats:
+        """Number of requests made and connections opened to the service in the current process."""
+        return get_connection_pool_stats(cls.SERVICE_NAME or cls.__name__)
+
     @classmethod
     def handle_500_error(cls, response: Response) -> None:
         raise ExternalServiceRequestError(response, cls.SERVICE_NAME)
@@ -85,8 +93,12 @@ def handle_500_error(cls, response: Response) -> None:
 
     @classmethod
     def request(cls, method: Literal["get", "post", "put", "delete"], url: str, **kwargs: Any) -> Response:
+        # Requests are made using a session shared by all requests to the service,
+        # so that connections to the service can be reused.
+        session = get_session(cls.SERVICE_NAME or cls.__name__)
+        timeout = (settings.EXTERNAL_SERVICE_CONNECT_TIMEOUT_SECONDS, cls.REQUEST_TIMEOUT_SECONDS)
         try:
-            return request(method, url, **kwargs, timeout=cls.REQUEST_TIMEOUT_SECONDS)
+            return session.request(method, url, **kwargs, timeout=timeout)
         except Exception as err:
             # Convert all exceptions to ExternalServiceError to allow easily suppressing them with
             raise ExternalServiceError from err
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import dataclasses
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+from django.conf import settings
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+__all__ = [
+    "ConnectionPoolStats",
+    "get_connection_pool_stats",
+    "get_session",
+]
+
+
+_lock = threading.Lock()
+# Sessions by service name. Sessions are created for each process separately,
+# since connections in the pool cannot be shared with forked processes.
+_sessions: dict[str, tuple[int, Session]] = {}
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ConnectionPoolStats:
+    requests: int = 0
+    connections: int = 0
+
+    @property
+    def reused_connections(self) -> int:
+        """How many requests were made using an already open connection."""
+        return self.requests - self.connections
+
+
+def get_session(service_name: str) -> Session:
+    """
+    Get a session for making requests to the given external service from the current process.
+
+    Using the same session for all requests to a service allows reusing connections to it,
+    so that a new TCP connection and TLS handshake is not needed for every request.
+    """
+    pid = os.getpid()
+    entry = _sessions.get(service_name)
+    if entry is not None and entry[0] == pid:
+        return entry[1]
+
+    with _lock:
+        entry = _sessions.get(service_name)
+        if entry is not None and entry[0] == pid:
+            return entry[1]
+
+        session = _create_session()
+        _sessions[service_name] = (pid, session)
+        return session
+
+
+def get_connection_pool_stats(service_name: str) -> ConnectionPoolStats:
+    """
+    Get the number of requests made and connections opened by the session for the given service
+    in the current process. Only counts connection pools that are still open.
+    """
+    entry = _sessions.get(service_name)
+    if entry is None or entry[0] != os.getpid():
+        return ConnectionPoolStats()
+
+    requests = 0
+    connections = 0
+    # The same adapter is mounted for both HTTP and HTTPS.
+    adapters = {id(adapter): adapter for adapter in entry[1].adapters.values()}
+    for adapter in adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():  # noqa: SIM118
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests += pool.num_requests
+            connections += pool.num_connections
+
+    return ConnectionPoolStats(requests=requests, connections=connections)
+
+
+def _create_session() -> Session:
+    session = Session()
+
+    # Sessions are shared between all requests to the service, so cookies set
+    # by the service for one request must not be sent with the other requests.
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    # Retries are handled by the clients.
+    adapter = HTTPAdapter(
+        pool_connections=settings.EXTERNAL_SERVICE_POOL_CONNECTIONS,
+        pool_maxsize=settings.EXTERNAL_SERVICE_POOL_MAXSIZE,
+        max_retries=0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session